@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Bulk Load Benchmark
+Compares the previous DELETE + DataFrame.to_sql(append) write path with the
+ON CONFLICT upsert loader (bulk_loader) for a 3k-row daily load and a 90k-row
+30-day lookback, each written into an empty slice, reloaded unchanged and
+reloaded with 5% of the rows changed. Every write is one transaction.
+
+Usage: python benchmarks/bench_bulk_load.py [--daily-rows 3000] [--lookback-days 30] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_transform import synthetic_datadump
+from bulk_loader import format_counts, upsert_frame
+from db_connection import close_all, connect
+from fund_etl_pipeline import FUND_DATA_COLUMNS, FundDataETL
+
+
+def legacy_write(conn, df_load: pd.DataFrame, region: str, dates):
+    """DELETE the slice, then append the frame (the write path before the upsert loader)"""
+    cursor = conn.cursor()
+    for date in dates:
+        cursor.execute("DELETE FROM fund_data WHERE date = ? AND region = ?", (date, region))
+    df_load.to_sql('fund_data', conn, if_exists='append', index=False)
+    conn.commit()
+
+
+def upsert_write(conn, df_load: pd.DataFrame, region: str, dates):
+    counts = upsert_frame(conn.cursor(), df_load, region, dates)
+    conn.commit()
+    return counts
+
+
+def build_load(etl: FundDataETL, rows: int, days: int) -> pd.DataFrame:
+    """Transformed fund_data rows for `days` business days of `rows` funds each"""
+    raw = synthetic_datadump(rows)
+    day, frames = datetime(2025, 6, 2), []
+    while len(frames) < days:
+        if day.weekday() < 5:
+            frames.append(etl.transform_data(raw, 'AMRS', day))
+        day += timedelta(days=1)
+    df_load = pd.concat(frames, ignore_index=True)
+    return df_load[[col for col in FUND_DATA_COLUMNS if col in df_load.columns]]
+
+
+def with_changes(df_load: pd.DataFrame, share: float, seed: int = 11) -> pd.DataFrame:
+    """Copy of df_load with `share` of the rows given new asset values"""
+    changed = df_load.copy()
+    rows = np.random.default_rng(seed).random(len(changed)) < share
+    changed.loc[rows, 'share_class_assets'] = changed.loc[rows, 'share_class_assets'].fillna(0) + 1
+    return changed
+
+
+def time_scenarios(db_path: str, write, df_load: pd.DataFrame, repeat: int):
+    """Best-of-N seconds for initial, unchanged and 5%-changed writes of one slice set"""
+    dates = sorted(df_load['date'].unique())
+    scenarios = [('initial', df_load), ('reload unchanged', df_load),
+                 ('reload 5% changed', with_changes(df_load, 0.05))]
+    results = {name: float('inf') for name, _ in scenarios}
+    counts = {}
+
+    for _ in range(repeat):
+        conn = connect(db_path)
+        conn.execute("DELETE FROM fund_data")
+        conn.commit()
+        for name, frame in scenarios:
+            started = time.perf_counter()
+            counts[name] = write(conn, frame, 'AMRS', dates)
+            results[name] = min(results[name], time.perf_counter() - started)
+        conn.close()
+    return results, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark fund_data write paths')
+    parser.add_argument('--daily-rows', type=int, default=3000, help='Funds per daily file')
+    parser.add_argument('--lookback-days', type=int, default=30, help='Business days in the lookback load')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per scenario')
+    args = parser.parse_args()
+
+    etl = FundDataETL('/nonexistent/config.json')
+    loads = [('daily', build_load(etl, args.daily_rows, 1)),
+             ('lookback', build_load(etl, args.daily_rows, args.lookback_days))]
+
+    with tempfile.TemporaryDirectory(prefix='bench_bulk_') as tmp:
+        etl.db_path = os.path.join(tmp, 'fund_data.db')
+        etl.setup_database()
+
+        for label, df_load in loads:
+            print(f"\n{label} load: {len(df_load):,} rows (best of {args.repeat})")
+            print(f"  {'scenario':<20} {'delete+to_sql':>16} {'upsert':>16}  upsert counts")
+            legacy, _ = time_scenarios(etl.db_path, legacy_write, df_load, args.repeat)
+            upsert, counts = time_scenarios(etl.db_path, upsert_write, df_load, args.repeat)
+            for name in legacy:
+                print(f"  {name:<20} {len(df_load) / legacy[name]:>11,.0f} r/s "
+                      f"{len(df_load) / upsert[name]:>11,.0f} r/s  {format_counts(counts[name])}")
+        close_all(etl.db_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Columnar Mirror Benchmark
+Long-range reads from SQLite (fund_data_resolved through the partition
+router) vs the Parquet mirror: three-month and full-range exports of a few
+columns, and one fund's full history (which stays on SQLite's
+(fund_code, date) index), plus the mirror write added to a load.
+
+Usage: python benchmarks/bench_columnar.py [--funds 3000] [--days 250] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_indexes import fill
+from columnar_mirror import ColumnarMirror, parquet_available
+from daily_summary import rebuild
+from db_connection import close_all, connect
+from fund_etl_pipeline import FundDataETL
+from partitions import ROUTED_VIEW, PartitionRouter
+
+EXPORT_COLUMNS = ['date', 'region', 'fund_code', 'share_class_assets', 'one_day_yield']
+
+
+def best_ms(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite vs Parquet mirror for long-range reads')
+    parser.add_argument('--funds', type=int, default=3000, help='Funds per region and date')
+    parser.add_argument('--days', type=int, default=250, help='Business days stored')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per measurement')
+    args = parser.parse_args()
+    if not parquet_available():
+        parser.error('pyarrow (or fastparquet) is required')
+
+    with tempfile.TemporaryDirectory(prefix='bench_columnar_') as tmp:
+        etl = FundDataETL('/nonexistent/config.json')
+        etl.db_path = os.path.join(tmp, 'fund_data.db')
+        etl.setup_database()
+        conn = connect(etl.db_path)
+        fill(conn, args.funds, args.days)
+        rebuild(conn.cursor())
+        conn.commit()
+        start, end = conn.execute("SELECT MIN(date), MAX(date) FROM fund_data").fetchone()
+        quarter = conn.execute("SELECT date(?, '-3 months')", (end,)).fetchone()[0]
+
+        mirror = ColumnarMirror(os.path.join(tmp, 'columnar'))
+        started = time.perf_counter()
+        mirror.rebuild(conn)
+        build_s = time.perf_counter() - started
+        size_mb = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(mirror.root)
+                      for f in files) / 1024 / 1024
+        router = PartitionRouter(conn)
+
+        cases = {
+            'fund history, all days': (
+                lambda: router.read_frame(f"SELECT date, share_class_assets, one_day_yield FROM {ROUTED_VIEW} "
+                                          f"WHERE fund_code = ? AND date BETWEEN ? AND ? ORDER BY date",
+                                          ['A000001', start, end], start=start, end=end),
+                lambda: mirror.read(conn, start, end, ['date', 'share_class_assets', 'one_day_yield'],
+                                    fund_code='A000001')),
+            '3-month export, 5 cols': (
+                lambda: router.read_frame(f"SELECT {', '.join(EXPORT_COLUMNS)} FROM {ROUTED_VIEW} "
+                                          f"WHERE date BETWEEN ? AND ? ORDER BY date, region, fund_code",
+                                          [quarter, end], start=quarter, end=end),
+                lambda: mirror.read(conn, quarter, end, EXPORT_COLUMNS)),
+            'full export, 5 cols': (
+                lambda: router.read_frame(f"SELECT {', '.join(EXPORT_COLUMNS)} FROM {ROUTED_VIEW} "
+                                          f"WHERE date BETWEEN ? AND ? ORDER BY date, region, fund_code",
+                                          [start, end], start=start, end=end),
+                lambda: mirror.read(conn, start, end, EXPORT_COLUMNS))
+        }
+        timings = {name: (best_ms(sql, args.repeat), best_ms(parquet, args.repeat))
+                   for name, (sql, parquet) in cases.items()}
+        write_ms = best_ms(lambda: mirror.write_dates(conn, 'AMRS', [end]), args.repeat)
+        db_mb = os.path.getsize(etl.db_path) / 1024 / 1024
+        conn.close()
+        close_all(etl.db_path)
+
+    print(f"\n{args.funds * args.days * 2:,} rows; SQLite {db_mb:.1f} MB, mirror {size_mb:.1f} MB "
+          f"built in {build_s:.1f} s; per-load mirror write {write_ms:.1f} ms")
+    print(f"{'query':<26} {'sqlite ms':>10} {'parquet ms':>11} {'speedup':>8}")
+    for name, (sql_ms, parquet_ms) in timings.items():
+        print(f"{name:<26} {sql_ms:>10.1f} {parquet_ms:>11.1f} {sql_ms / parquet_ms:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Daily Summary Benchmark
+Dashboard overview and telemetry figures computed by aggregating
+fund_data_resolved (as the UI did) vs read from daily_summary, for growing
+amounts of history, plus what refreshing one day's summary adds to a load.
+
+Usage: python benchmarks/bench_daily_summary.py [--funds 3000] [--days 20 60 250] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_indexes import fill
+from daily_summary import rebuild, refresh, totals
+from db_connection import close_all, connect
+from fund_etl_pipeline import FundDataETL
+
+AGGREGATE_QUERIES = [
+    "SELECT COUNT(*) FROM fund_data_resolved",
+    "SELECT COUNT(DISTINCT fund_code) FROM fund_data_resolved",
+    "SELECT COUNT(*) FROM fund_data",
+    "SELECT region, COUNT(*) FROM fund_data_resolved GROUP BY region",
+    "SELECT MIN(date), MAX(date) FROM resolved_dates"
+]
+
+
+def best_ms(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Aggregating fund_data vs reading daily_summary')
+    parser.add_argument('--funds', type=int, default=3000, help='Funds per region and date')
+    parser.add_argument('--days', type=int, nargs='+', default=[20, 60, 250], help='Business days stored')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per measurement')
+    args = parser.parse_args()
+
+    print(f"\n{'days':>5} {'rows':>10} {'aggregate ms':>13} {'summary ms':>11} {'refresh 1 day ms':>17}")
+    for days in args.days:
+        with tempfile.TemporaryDirectory(prefix='bench_summary_') as tmp:
+            etl = FundDataETL('/nonexistent/config.json')
+            etl.db_path = os.path.join(tmp, 'fund_data.db')
+            etl.setup_database()
+            conn = connect(etl.db_path)
+            fill(conn, args.funds, days)
+            rebuild(conn.cursor())
+            conn.commit()
+            latest = conn.execute("SELECT MAX(date) FROM fund_data").fetchone()[0]
+
+            aggregate = best_ms(lambda: [conn.execute(sql).fetchall() for sql in AGGREGATE_QUERIES], args.repeat)
+            summary = best_ms(lambda: totals(conn), args.repeat)
+            refresh_ms = best_ms(lambda: refresh(conn.cursor(), 'AMRS', [latest]), args.repeat)
+            conn.rollback()
+            conn.close()
+            close_all(etl.db_path)
+
+        print(f"{days:>5} {args.funds * days * 2:>10,} {aggregate:>13.2f} {summary:>11.3f} {refresh_ms:>17.2f}")
+
+
+if __name__ == '__main__':
+    main()
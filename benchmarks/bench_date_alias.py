@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Date Alias Benchmark
+Stores several weeks of daily loads (Friday covering the weekend, one Monday
+holiday carried forward) twice: as physical copies, the way loads were written
+before date_alias, and as business-day rows plus aliases. Reports fund_data
+rows, database size, total write time, the cost of correcting one Friday row
+on every date it appears under, and a resolved-date read.
+
+Usage: python benchmarks/bench_date_alias.py [--rows 3000] [--weeks 8]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_transform import synthetic_datadump
+from bulk_loader import FUND_DATA_COLUMNS, upsert_frame
+from date_alias import set_aliases
+from db_connection import close_all, connect
+from fund_etl_pipeline import FundDataETL
+
+HOLIDAY_WEEK = 2  # Monday of this week is carried forward
+
+
+def calendar(weeks: int):
+    """(date, kind) for each calendar day: 'load', 'weekend' or 'holiday'"""
+    start = datetime(2025, 6, 2)
+    days = []
+    for offset in range(weeks * 7):
+        day = start + timedelta(days=offset)
+        if day.weekday() >= 5:
+            days.append((day, 'weekend'))
+        elif day.weekday() == 0 and offset // 7 == HOLIDAY_WEEK:
+            days.append((day, 'holiday'))
+        else:
+            days.append((day, 'load'))
+    return days
+
+
+def write_copies(cursor, df_load, day: datetime, kind: str, last_load: str):
+    date = day.strftime('%Y-%m-%d')
+    if kind == 'load':
+        upsert_frame(cursor, df_load.assign(date=date), 'AMRS', [date])
+        return
+    cursor.execute("DELETE FROM fund_data WHERE region = 'AMRS' AND date = ?", (date,))
+    columns = ', '.join(col for col in FUND_DATA_COLUMNS if col != 'date')
+    cursor.execute(f"INSERT INTO fund_data (date, {columns}) SELECT ?, {columns} FROM fund_data "
+                   f"WHERE region = 'AMRS' AND date = ?", (date, last_load))
+
+
+def write_aliases(cursor, df_load, day: datetime, kind: str, last_load: str):
+    date = day.strftime('%Y-%m-%d')
+    if kind == 'load':
+        upsert_frame(cursor, df_load.assign(date=date), 'AMRS', [date])
+        return
+    set_aliases(cursor, 'AMRS', [date], last_load, 'weekend' if kind == 'weekend' else 'carry_forward')
+
+
+def correct_friday(cursor, friday: str, aliased: bool) -> int:
+    """Update one fund on a Friday and every date that repeats it; returns statements run"""
+    dates = [friday] if aliased else [
+        (datetime.strptime(friday, '%Y-%m-%d') + timedelta(days=days)).strftime('%Y-%m-%d') for days in range(3)]
+    for date in dates:
+        cursor.execute("UPDATE fund_data SET share_class_assets = share_class_assets + 1 "
+                       "WHERE region = 'AMRS' AND date = ? AND fund_code = 'FUND000001'", (date,))
+    return len(dates)
+
+
+def run(etl: FundDataETL, df_load, days, aliased: bool, tmp: str) -> dict:
+    etl.db_path = os.path.join(tmp, f"{'alias' if aliased else 'copies'}.db")
+    etl.setup_database()
+    write = write_aliases if aliased else write_copies
+    conn = connect(etl.db_path)
+    cursor = conn.cursor()
+
+    last_load, started = None, time.perf_counter()
+    for day, kind in days:
+        write(cursor, df_load, day, kind, last_load)
+        conn.commit()
+        if kind == 'load':
+            last_load = day.strftime('%Y-%m-%d')
+    load_seconds = time.perf_counter() - started
+
+    friday = next(day for day, kind in days if kind == 'load' and day.weekday() == 4).strftime('%Y-%m-%d')
+    started = time.perf_counter()
+    statements = correct_friday(cursor, friday, aliased)
+    conn.commit()
+    correction_ms = (time.perf_counter() - started) * 1000
+
+    sunday = (datetime.strptime(friday, '%Y-%m-%d') + timedelta(days=2)).strftime('%Y-%m-%d')
+    started = time.perf_counter()
+    cursor.execute("SELECT COUNT(*), SUM(share_class_assets) FROM fund_data_resolved "
+                   "WHERE region = 'AMRS' AND date = ?", (sunday,)).fetchone()
+    read_ms = (time.perf_counter() - started) * 1000
+
+    rows = cursor.execute("SELECT COUNT(*) FROM fund_data").fetchone()[0]
+    resolved = cursor.execute("SELECT COUNT(*) FROM fund_data_resolved").fetchone()[0]
+    cursor.execute("VACUUM")
+    conn.close()
+    close_all(etl.db_path)
+    return {'rows': rows, 'resolved': resolved, 'size_mb': os.path.getsize(etl.db_path) / 1e6,
+            'load_s': load_seconds, 'correction_ms': correction_ms, 'statements': statements,
+            'read_ms': read_ms}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Physical weekend copies vs date aliases')
+    parser.add_argument('--rows', type=int, default=3000, help='Funds per daily file')
+    parser.add_argument('--weeks', type=int, default=8, help='Calendar weeks to store')
+    args = parser.parse_args()
+
+    etl = FundDataETL('/nonexistent/config.json')
+    df_load = etl.transform_data(synthetic_datadump(args.rows), 'AMRS', datetime(2025, 6, 2))
+    df_load = df_load[[col for col in FUND_DATA_COLUMNS if col in df_load.columns]]
+    days = calendar(args.weeks)
+
+    with tempfile.TemporaryDirectory(prefix='bench_alias_') as tmp:
+        results = {'copies': run(etl, df_load, days, False, tmp),
+                   'aliases': run(etl, df_load, days, True, tmp)}
+
+    print(f"\n{args.weeks} weeks of {args.rows:,}-fund AMRS loads "
+          f"({sum(kind == 'load' for _, kind in days)} business-day files)")
+    print(f"{'storage':<8} {'rows':>9} {'resolved':>9} {'db MB':>7} {'writes s':>9} "
+          f"{'fix ms':>7} {'UPDATEs':>8} {'read ms':>8}")
+    for name, result in results.items():
+        print(f"{name:<8} {result['rows']:>9,} {result['resolved']:>9,} {result['size_mb']:>7.1f} "
+              f"{result['load_s']:>9.2f} {result['correction_ms']:>7.2f} {result['statements']:>8} "
+              f"{result['read_ms']:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
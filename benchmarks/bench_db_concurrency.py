@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Database Concurrency Benchmark
+Measures dashboard-style reader latency while another process commits daily
+loads into fund_data, once with plain sqlite3.connect() defaults (rollback
+journal, synchronous=FULL, a connection per query) and once through
+db_connection (WAL, synchronous=NORMAL, pooled connections). This is the
+situation of the UI container reading /data/fund_data.db during an ETL run.
+
+Usage: python benchmarks/bench_db_concurrency.py [--rows 25000] [--loads 5]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_connection import close_all, connect
+from fund_etl_pipeline import FUND_DATA_COLUMNS, FundDataETL
+
+READER_QUERY = """
+SELECT region, COUNT(*), COUNT(DISTINCT fund_code), SUM(share_class_assets)
+FROM fund_data
+WHERE date = (SELECT MAX(date) FROM fund_data)
+GROUP BY region
+"""
+
+
+def open_connection(db_path: str, mode: str) -> sqlite3.Connection:
+    if mode == 'managed':
+        return connect(db_path)
+    return sqlite3.connect(db_path)
+
+
+def daily_rows(date: str, rows: int):
+    """fund_data rows for one AMRS load"""
+    values = []
+    for i in range(rows):
+        row = dict.fromkeys(FUND_DATA_COLUMNS)
+        row.update(date=date, region='AMRS', fund_code=f'FUND{i:06d}', fund_name=f'Fund {i}',
+                   currency='USD', share_class_assets=1000.0 + i, one_day_yield=0.05)
+        values.append([row[col] for col in FUND_DATA_COLUMNS])
+    return values
+
+
+def writer(db_path: str, mode: str, rows: int, loads: int, ready):
+    """Commit one daily load per iteration, replacing the date's rows as the pipeline does"""
+    ready.wait()
+    placeholders = ', '.join('?' for _ in FUND_DATA_COLUMNS)
+    for day in range(loads):
+        date = f'2024-02-{day + 1:02d}'
+        values = daily_rows(date, rows)
+        conn = open_connection(db_path, mode)
+        conn.execute("DELETE FROM fund_data WHERE date = ? AND region = 'AMRS'", (date,))
+        conn.executemany(f"INSERT INTO fund_data ({', '.join(FUND_DATA_COLUMNS)}) VALUES ({placeholders})",
+                         values)
+        conn.commit()
+        conn.close()
+
+
+def run(mode: str, rows: int, loads: int) -> dict:
+    with tempfile.TemporaryDirectory(prefix='bench_db_') as tmp:
+        db_path = os.path.join(tmp, 'fund_data.db')
+        etl = FundDataETL('/nonexistent/config.json')
+        etl.db_path = db_path
+        etl.setup_database()
+        close_all()
+        if mode == 'legacy':
+            # setup_database goes through the manager; start the legacy run from a rollback journal
+            conn = sqlite3.connect(db_path)
+            conn.execute("PRAGMA journal_mode = DELETE")
+            conn.close()
+
+        ready = multiprocessing.Event()
+        process = multiprocessing.Process(target=writer, args=(db_path, mode, rows, loads, ready))
+        process.start()
+
+        latencies, errors = [], 0
+        ready.set()
+        started = time.perf_counter()
+        while process.is_alive():
+            query_started = time.perf_counter()
+            try:
+                conn = open_connection(db_path, mode)
+                conn.execute(READER_QUERY).fetchall()
+                conn.close()
+                latencies.append((time.perf_counter() - query_started) * 1000)
+            except sqlite3.OperationalError:
+                errors += 1
+            time.sleep(0.002)
+        process.join()
+        elapsed = time.perf_counter() - started
+        close_all(db_path)
+
+    latencies = np.array(latencies)
+    return {
+        'queries': len(latencies),
+        'errors': errors,
+        'p50': np.percentile(latencies, 50) if len(latencies) else float('nan'),
+        'p95': np.percentile(latencies, 95) if len(latencies) else float('nan'),
+        'p99': np.percentile(latencies, 99) if len(latencies) else float('nan'),
+        'max': latencies.max() if len(latencies) else float('nan'),
+        'load_seconds': elapsed
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reader latency during daily load commits')
+    parser.add_argument('--rows', type=int, default=25000, help='Rows per daily load')
+    parser.add_argument('--loads', type=int, default=5, help='Daily loads committed by the writer')
+    args = parser.parse_args()
+
+    print(f"Writer commits {args.loads} loads of {args.rows:,} rows; reader polls the dashboard query\n")
+    print(f"{'connections':<10} {'queries':>8} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8} {'loads s':>8}")
+    for mode in ('legacy', 'managed'):
+        result = run(mode, args.rows, args.loads)
+        print(f"{mode:<10} {result['queries']:>8,} {result['errors']:>7} {result['p50']:>8.2f} "
+              f"{result['p95']:>8.2f} {result['p99']:>8.2f} {result['max']:>8.1f} "
+              f"{result['load_seconds']:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
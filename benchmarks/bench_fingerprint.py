@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Row Fingerprint Benchmark
+Validating one region against a 30-day lookback in which only a few days
+carry corrections: the full window comparison vs hash-first validation,
+which skips days whose digest matches the stored one and threshold-checks
+only the rows whose hash differs. The full comparison runs on the same
+lookback without its 7-DSY column (never filled here, so the changes found
+are the same), which is what makes validation fall back to it.
+
+Usage: python benchmarks/bench_fingerprint.py [--funds 3000] [--days 30] [--drift-days 0 1 3 30] [--changed 0.01]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_indexes import fill
+from bench_lookback_compare import lookback_frame
+from db_connection import close_all, connect
+from fund_etl_pipeline import FundDataETL
+from lookback_compare import LOOKBACK_FIELDS
+from row_fingerprint import rebuild
+
+
+def timed_validation(etl, lookback_df):
+    started = time.perf_counter()
+    results = etl.validate_against_lookback('AMRS', lookback_df)
+    return time.perf_counter() - started, results['summary']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Full vs hash-first lookback validation')
+    parser.add_argument('--funds', type=int, default=3000, help='Funds per region and date')
+    parser.add_argument('--days', type=int, default=30, help='Business days in the lookback')
+    parser.add_argument('--drift-days', type=int, nargs='+', default=[0, 1, 3, 30],
+                        help='Days of the lookback with corrected rows')
+    parser.add_argument('--changed', type=float, default=0.01, help='Share of rows corrected on those days')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='bench_fingerprint_') as tmp:
+        etl = FundDataETL('/nonexistent/config.json')
+        etl.db_path = os.path.join(tmp, 'fund_data.db')
+        etl.setup_database()
+        conn = connect(etl.db_path)
+        fill(conn, args.funds, args.days)
+        # Rows inserted directly are hashed the way a migrated database is
+        started = time.perf_counter()
+        rebuild(conn.cursor())
+        conn.commit()
+        rebuild_s = time.perf_counter() - started
+        stored = lookback_frame(conn, 'AMRS', 0.0)
+        conn.close()
+        close_all(etl.db_path)
+
+        dates = stored['Date'].drop_duplicates().to_numpy()
+        column = LOOKBACK_FIELDS['share_class_assets']
+        print(f"\nHashed {len(stored) * 2:,} stored rows and built their digests in {rebuild_s:.2f} s")
+        print(f"\n{'drift days':>10} {'full s':>8} {'hash-first s':>13} {'skipped days':>13} {'changed':>8}")
+        for drift_days in args.drift_days:
+            lookback_df = stored.copy()
+            drifting = lookback_df['Date'].isin(dates[:drift_days]).to_numpy()
+            corrected = drifting & (np.random.default_rng(0).random(len(lookback_df)) < args.changed)
+            lookback_df.loc[corrected, column] *= 1.5
+
+            full_s, full = timed_validation(etl, lookback_df.drop(columns=LOOKBACK_FIELDS['seven_day_yield']))
+            hashed_s, hashed = timed_validation(etl, lookback_df)
+            assert full['changed_records_count'] == hashed['changed_records_count']
+            print(f"{drift_days:>10} {full_s:>8.2f} {hashed_s:>13.2f} {hashed['unchanged_dates_count']:>13} "
+                  f"{hashed['changed_records_count']:>8,}")
+        close_all(etl.db_path)
+
+
+if __name__ == '__main__':
+    main()
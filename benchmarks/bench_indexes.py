@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Index Benchmark
+Times every query_catalog query on a fund_data table indexed the way
+setup_database used to (single-column date, region and fund_code indexes, no
+ANALYZE), then applies the index migrations and times them again.
+
+Usage: python benchmarks/bench_indexes.py [--funds 3000] [--days 60] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_connection import close_all, connect
+from fund_etl_pipeline import FundDataETL
+from query_catalog import INDEXES, QUERY_CATALOG, advise, apply_index_migrations, sample_params, time_queries
+
+
+def fill(conn, funds: int, days: int):
+    """`days` business days of `funds` rows for AMRS and EMEA, plus their etl_log entries"""
+    day, dates = datetime(2025, 1, 2), []
+    while len(dates) < days:
+        if day.weekday() < 5:
+            dates.append(day.strftime('%Y-%m-%d'))
+        day += timedelta(days=1)
+
+    for date in dates:
+        for region in ('AMRS', 'EMEA'):
+            conn.executemany(
+                "INSERT INTO fund_data (date, region, fund_code, fund_name, share_class_assets, one_day_yield) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(date, region, f'{region[0]}{i:06d}', f'Fund {i}', 1000.0 + i, 0.05) for i in range(funds)])
+            conn.execute("INSERT INTO etl_log (run_date, region, file_date, status, records_processed) "
+                         "VALUES (?, ?, ?, 'SUCCESS', ?)", (date, region, date, funds))
+    conn.commit()
+
+
+def make_legacy(conn):
+    for name in INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    for column in ('date', 'region', 'fund_code'):
+        conn.execute(f"CREATE INDEX idx_fund_data_{column} ON fund_data({column})")
+    conn.execute("DROP TABLE IF EXISTS sqlite_stat1")
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Catalog query timings before and after the index migrations')
+    parser.add_argument('--funds', type=int, default=3000, help='Funds per region and date')
+    parser.add_argument('--days', type=int, default=60, help='Business days stored')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='bench_idx_') as tmp:
+        etl = FundDataETL('/nonexistent/config.json')
+        etl.db_path = os.path.join(tmp, 'fund_data.db')
+        etl.setup_database()
+        conn = connect(etl.db_path)
+        make_legacy(conn)
+        fill(conn, args.funds, args.days)
+
+        params = sample_params(conn)
+        before = time_queries(conn, params, args.repeat)
+        before_plans = {entry['name']: entry['issues'] for entry in advise(conn, params)}
+        result = apply_index_migrations(conn.cursor())
+        conn.commit()
+        after = time_queries(conn, params, args.repeat)
+        after_plans = {entry['name']: entry['issues'] for entry in advise(conn, params)}
+        conn.close()
+        close_all(etl.db_path)
+
+    rows = args.funds * args.days * 2
+    print(f"\n{rows:,} fund_data rows; created {result['created']}, dropped {result['dropped']}")
+    print(f"{'query':<24} {'legacy ms':>10} {'catalog ms':>11} {'speedup':>8}  full scans before -> after")
+    for name in QUERY_CATALOG:
+        print(f"{name:<24} {before[name]:>10.3f} {after[name]:>11.3f} {before[name] / after[name]:>7.1f}x  "
+              f"{len(before_plans[name])} -> {len(after_plans[name])}")
+
+
+if __name__ == '__main__':
+    main()
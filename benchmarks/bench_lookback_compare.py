@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Lookback Comparison Benchmark
+Comparing one lookback date with its stored rows: the previous iterrows loop
+(a fund code filter of the stored frame and scalar checks per row) vs the
+merge-based comparison, and a full 30-day validation of both regions with
+the merge-based one.
+
+Usage: python benchmarks/bench_lookback_compare.py [--funds 3000] [--days 30] [--changed 0.01]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_indexes import fill
+from db_connection import close_all, connect
+from fund_etl_pipeline import FundDataETL
+from lookback_compare import EPSILON, LOOKBACK_FIELDS
+
+FIELDS = ['share_class_assets', 'portfolio_assets', 'one_day_yield', 'seven_day_yield']
+
+
+def iterrows_compare(db_df: pd.DataFrame, lookback_df: pd.DataFrame, threshold_pct: float) -> int:
+    """The row by row comparison the merge replaced; returns the changed rows"""
+    changed = 0
+    for _, lookback_row in lookback_df.iterrows():
+        db_record = db_df[db_df['fund_code'] == lookback_row['Fund Code']]
+        if len(db_record) == 0:
+            changed += 1
+            continue
+        db_record = db_record.iloc[0]
+        fields = 0
+        for field in FIELDS:
+            db_value, lookback_value = db_record[field], lookback_row[LOOKBACK_FIELDS[field]]
+            if pd.notna(db_value):
+                db_value = float(db_value)
+            if pd.isna(db_value) and pd.isna(lookback_value):
+                continue
+            if pd.isna(db_value) != pd.isna(lookback_value):
+                fields += 1
+            elif abs(db_value - lookback_value) >= EPSILON:
+                if abs(db_value) > EPSILON:
+                    fields += abs((lookback_value - db_value) / db_value * 100) > threshold_pct
+                elif abs(lookback_value) > EPSILON:
+                    fields += 1
+        changed += fields > 0
+    return changed
+
+
+def lookback_frame(conn, region: str, changed: float) -> pd.DataFrame:
+    """The stored rows of a region as a typed lookback frame with a share of assets corrected"""
+    stored = pd.read_sql_query("SELECT * FROM fund_data WHERE region = ? ORDER BY date, fund_code",
+                               conn, params=(region,))
+    lookback_df = pd.DataFrame({'Date': pd.to_datetime(stored['date']), 'Fund Code': stored['fund_code'],
+                                'Fund Name': stored['fund_name']})
+    for field, column in LOOKBACK_FIELDS.items():
+        lookback_df[column] = stored[field].astype(float)
+    corrected = np.random.default_rng(0).random(len(lookback_df)) < changed
+    lookback_df.loc[corrected, LOOKBACK_FIELDS['share_class_assets']] *= 1.5
+    return lookback_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Row by row vs merge-based lookback comparison')
+    parser.add_argument('--funds', type=int, default=3000, help='Funds per region and date')
+    parser.add_argument('--days', type=int, default=30, help='Business days in the lookback')
+    parser.add_argument('--changed', type=float, default=0.01, help='Share of rows with a corrected value')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='bench_lookback_compare_') as tmp:
+        etl = FundDataETL('/nonexistent/config.json')
+        etl.db_path = os.path.join(tmp, 'fund_data.db')
+        etl.setup_database()
+        conn = connect(etl.db_path)
+        fill(conn, args.funds, args.days)
+        lookbacks = {region: lookback_frame(conn, region, args.changed) for region in ('AMRS', 'EMEA')}
+
+        first_date = lookbacks['AMRS']['Date'].min()
+        db_df = pd.read_sql_query("SELECT * FROM fund_data WHERE region = 'AMRS' AND date = ?",
+                                  conn, params=(first_date.strftime('%Y-%m-%d'),))
+        conn.close()
+        date_df = lookbacks['AMRS'][lookbacks['AMRS']['Date'] == first_date]
+
+        started = time.perf_counter()
+        loop_changed = iterrows_compare(db_df, date_df, 5.0)
+        loop_s = time.perf_counter() - started
+        started = time.perf_counter()
+        merge_changed = len(etl._compare_dataframes(db_df, date_df, FIELDS, 5.0))
+        merge_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        validated = {region: etl.validate_against_lookback(region, lookback) for region, lookback in lookbacks.items()}
+        validation_s = time.perf_counter() - started
+        close_all(etl.db_path)
+
+    comparisons = 2 * args.days
+    print(f"\nOne date: {len(date_df):,} lookback rows, {merge_changed} changed "
+          f"(row by row found {loop_changed})")
+    print(f"{'iterrows loop':<22} {loop_s * 1000:>10.1f} ms   (x{comparisons} dates ~ {loop_s * comparisons:.0f} s)")
+    print(f"{'merge and arrays':<22} {merge_s * 1000:>10.1f} ms   (x{comparisons} dates ~ {merge_s * comparisons:.1f} s)")
+    changed = sum(result['summary']['changed_records_count'] for result in validated.values())
+    print(f"\nValidation of {args.days} days x 2 regions: {validation_s:.2f} s, {changed:,} changed records")
+
+
+if __name__ == '__main__':
+    main()
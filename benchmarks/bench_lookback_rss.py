@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Lookback Peak Memory Benchmark
+Peak RSS of one process reading a DataDump workbook as the file grows:
+a daily streaming ingest (ingest_file), reconcile mode over the whole
+lookback frame (read_lookback_file + reconcile_lookback) and reconcile mode
+streamed into the staging table (reconcile_lookback_file). The lookback
+runs reconcile against a database already holding the file's rows, as on
+most days. Each run is a fresh process with the parsed-file cache off, so
+the workbook is parsed every time; the figure reported is the peak above
+the process's footprint after imports. --cache-kb and --mmap-mb set the
+SQLite page cache and memory map, which count towards RSS up to their
+limits.
+
+Selective and full lookback updates hold the lookback as one frame, as the
+whole-frame row does here.
+
+Usage: python benchmarks/bench_lookback_rss.py [--rows 10000 40000 160000] [--chunk-size 5000]
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODES = ('ingest', 'frame', 'stream')
+
+FUNDS_PER_DAY = 3000
+
+
+def peak_mb() -> float:
+    """Peak resident set size of this process in MB (ru_maxrss is in KB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def write_workbook(filepath: str, columns, rows: int, daily: bool):
+    """Lookback-shaped workbook of rows rows; daily puts every row on one date"""
+    from openpyxl import Workbook
+
+    rng = np.random.default_rng(0)
+    dates = np.busday_offset('2024-01-02', np.arange(rows // FUNDS_PER_DAY + 1)).astype('datetime64[D]')
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(columns)
+    for i in range(rows):
+        date = dates[0] if daily else dates[i // FUNDS_PER_DAY]
+        values = {
+            'Date': date.astype(datetime),
+            'Fund Code': f'FUND{i % FUNDS_PER_DAY if not daily else i:06d}',
+            'Fund Name': f'Fund {i % FUNDS_PER_DAY}',
+            'Currency': 'US Dollar',
+            'Share Class Assets (dly/$mils)': float(rng.uniform(1, 5000)),
+            'Portfolio Assets (dly/$mils)': float(rng.uniform(1, 5000)),
+            '1-DSY (dly)': float(rng.uniform(0, 5)),
+            '7-DSY (dly)': float(rng.uniform(0, 5))
+        }
+        sheet.append([values.get(col) for col in columns])
+    workbook.save(filepath)
+
+
+def child(mode: str, filepath: str, db_path: str, args):
+    """Run one mode in this process and print the peak RSS above the post-import footprint"""
+    from fund_etl_pipeline import FundDataETL
+
+    etl = FundDataETL('/nonexistent/config.json')
+    etl.db_path = db_path
+    etl.db_settings = {'cache_size_kb': args.cache_kb, 'mmap_size_mb': args.mmap_mb}
+    etl.read_chunk_size = args.chunk_size
+    etl.parsed_cache.enabled = False
+    etl.setup_database()
+    baseline = peak_mb()
+
+    if mode == 'ingest':
+        etl.ingest_file(filepath, 'AMRS', datetime(2024, 1, 2))
+    elif mode == 'frame':
+        etl.reconcile_lookback('AMRS', etl.read_lookback_file(filepath, 'AMRS'))
+    else:
+        etl.reconcile_lookback_file('AMRS', filepath)
+    print(f"{peak_mb() - baseline:.1f}")
+
+
+def run_child(args, mode: str, filepath: str, db_path: str) -> float:
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--chunk-size', str(args.chunk_size),
+                             '--cache-kb', str(args.cache_kb), '--mmap-mb', str(args.mmap_mb),
+                             '--child', mode, filepath, db_path],
+                            check=True, capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Peak RSS of streaming ingest and lookback reconciliation')
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 40000, 160000], help='Workbook rows')
+    parser.add_argument('--chunk-size', type=int, default=5000, help='read_chunk_size')
+    parser.add_argument('--cache-kb', type=int, default=65536, help='database.cache_size_kb')
+    parser.add_argument('--mmap-mb', type=int, default=256, help='database.mmap_size_mb')
+    parser.add_argument('--child', nargs=3, metavar=('MODE', 'FILE', 'DB'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        import logging
+        logging.disable(logging.WARNING)
+        child(*args.child, args)
+        return
+
+    from fund_etl_pipeline import FundDataETL
+    columns = FundDataETL('/nonexistent/config.json').expected_columns
+
+    with tempfile.TemporaryDirectory(prefix='bench_lookback_rss_') as tmp:
+        print(f"\n{'rows':>8} {'file MB':>8} " + ' '.join(f"{mode + ' MB':>10}" for mode in MODES))
+        for rows in args.rows:
+            daily = os.path.join(tmp, 'daily.xlsx')
+            lookback = os.path.join(tmp, 'lookback.xlsx')
+            write_workbook(daily, columns, rows, daily=True)
+            write_workbook(lookback, columns, rows, daily=False)
+            seeded = os.path.join(tmp, 'seeded.db')
+            run_child(args, 'stream', lookback, seeded)
+
+            peaks = [run_child(args, 'ingest', daily, os.path.join(tmp, 'ingest.db'))]
+            for mode in ('frame', 'stream'):
+                db_path = os.path.join(tmp, f'{mode}.db')
+                shutil.copy(seeded, db_path)
+                peaks.append(run_child(args, mode, lookback, db_path))
+            print(f"{rows:>8,} {os.path.getsize(lookback) / 1024 / 1024:>8.1f} "
+                  + ' '.join(f"{peak:>10.1f}" for peak in peaks))
+            for name in os.listdir(tmp):
+                os.remove(os.path.join(tmp, name))
+
+
+if __name__ == '__main__':
+    main()
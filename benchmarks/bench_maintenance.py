@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Database Maintenance Benchmark
+Churn like the months the partition archiver moves out (or lookback
+deletions) leaves free pages in the file. Measures what each maintenance
+step costs and how much of the file incremental_vacuum returns within its
+budget, for the post-load and weekly variants, against a database left
+without maintenance.
+
+Usage: python benchmarks/bench_maintenance.py [--funds 3000] [--days 60] [--churn-days 20] [--budget 30]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_indexes import fill
+from db_connection import close_all, connect
+from db_maintenance import run_maintenance
+from fund_etl_pipeline import FundDataETL
+
+
+def churned_database(path: str, funds: int, days: int, churn_days: int):
+    etl = FundDataETL('/nonexistent/config.json')
+    etl.db_path = path
+    etl.setup_database()
+    conn = connect(path)
+    fill(conn, funds, days)
+    dates = [row[0] for row in conn.execute("SELECT DISTINCT date FROM fund_data ORDER BY date LIMIT ?",
+                                            (churn_days,))]
+    conn.execute(f"DELETE FROM fund_data WHERE date IN ({', '.join('?' for _ in dates)})", dates)
+    conn.commit()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Database maintenance step costs and space reclaimed')
+    parser.add_argument('--funds', type=int, default=3000, help='Funds per region and date')
+    parser.add_argument('--days', type=int, default=60, help='Business days loaded')
+    parser.add_argument('--churn-days', type=int, default=20, help='Oldest days deleted again')
+    parser.add_argument('--budget', type=float, default=30, help='incremental_vacuum budget in seconds')
+    args = parser.parse_args()
+
+    for weekly in (False, True):
+        with tempfile.TemporaryDirectory(prefix='bench_maintenance_') as tmp:
+            path = os.path.join(tmp, 'fund_data.db')
+            churned_database(path, args.funds, args.days, args.churn_days)
+            size = os.path.getsize(path)
+            steps = run_maintenance(path, weekly, {'vacuum_budget_seconds': args.budget})
+            close_all(path)
+
+        print(f"\n{'weekly' if weekly else 'post-load'} maintenance, database {size / 1e6:.1f} MB "
+              f"with {steps[0]['free_pages_before']:,} free pages")
+        for step in steps:
+            print(f"  {step['step']:<20} {step['duration_ms']:>9.1f} ms "
+                  f"{(step['db_bytes_after'] - step['db_bytes_before']) / 1e6:>+9.1f} MB  {step['detail']}")
+        print(f"  {'total':<20} {sum(step['duration_ms'] for step in steps):>9.1f} ms "
+              f"{(steps[-1]['db_bytes_after'] - size) / 1e6:>+9.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
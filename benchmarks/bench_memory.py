@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Memory Benchmark
+Reports the in-memory footprint of a 30-day lookback frame with the
+low-cardinality attributes (currency, domicile, rating, fund complex, ...) held
+as Python object columns versus pandas categoricals, both for the frame as read
+and for the transformed fund_data rows.
+
+Usage: python benchmarks/bench_memory.py [--file data/lookback/DataDump__AMRS_30DAYS_20250708.xlsx]
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fund_etl_pipeline import FundDataETL
+from transform_plan import categorize
+from xlsx_stream_reader import read_excel_streaming
+
+DEFAULT_FILE = os.path.join('data', 'lookback', 'DataDump__AMRS_30DAYS_20250708.xlsx')
+
+
+def footprint(df: pd.DataFrame) -> pd.Series:
+    """Deep memory usage per column in bytes"""
+    return df.memory_usage(deep=True, index=False)
+
+
+def decategorize(df: pd.DataFrame) -> pd.DataFrame:
+    """Copy of df with category columns turned back into object columns"""
+    return df.astype({col: object for col in df.select_dtypes('category').columns})
+
+
+def report(title: str, as_object: pd.DataFrame, as_category: pd.DataFrame):
+    before = footprint(as_object)
+    after = footprint(as_category)
+    changed = [col for col in as_category.columns if isinstance(as_category[col].dtype, pd.CategoricalDtype)]
+
+    print(f"\n{title}: {len(as_object):,} rows")
+    print(f"  {'column':<30} {'distinct':>8} {'object KB':>11} {'category KB':>12}")
+    for col in changed:
+        print(f"  {col:<30} {as_category[col].cat.categories.size:>8} "
+              f"{before[col] / 1024:>11,.1f} {after[col] / 1024:>12,.1f}")
+    print(f"  {'categorical columns':<30} {'':>8} {before[changed].sum() / 1024 ** 2:>10,.2f}M "
+          f"{after[changed].sum() / 1024 ** 2:>11,.2f}M")
+    print(f"  {'whole frame':<30} {'':>8} {before.sum() / 1024 ** 2:>10,.2f}M "
+          f"{after.sum() / 1024 ** 2:>11,.2f}M  ({1 - after.sum() / before.sum():.0%} smaller)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report categorical memory savings on a lookback file')
+    parser.add_argument('--file', default=DEFAULT_FILE, help='30-day lookback workbook')
+    parser.add_argument('--region', default='AMRS', help='Region tag for the frame')
+    args = parser.parse_args()
+
+    etl = FundDataETL('/nonexistent/config.json')
+
+    lookback = read_excel_streaming(args.file, etl.expected_columns, read_plan=etl.read_plan)
+    lookback['Region'] = args.region
+    report('Lookback frame as read', lookback, categorize(lookback.copy()))
+
+    transformed = etl.transform_data(lookback.drop(columns='Region'), args.region, datetime.now())
+    report('Transformed fund_data rows', decategorize(transformed), transformed)
+
+
+if __name__ == '__main__':
+    main()
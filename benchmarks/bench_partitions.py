@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Partition Benchmark
+Main database size, VACUUM, online backup and index-build times with a
+year of history in fund_data vs after closed months are archived to monthly
+partition files, plus a recent-range and a one-archived-month fund history
+read through the router.
+
+Usage: python benchmarks/bench_partitions.py [--funds 3000] [--days 250] [--open-months 3]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_indexes import fill
+from daily_summary import rebuild
+from db_connection import close_all, connect
+from fund_etl_pipeline import FundDataETL
+from partitions import ROUTED_VIEW, PartitionRouter, archive_closed_months
+
+HISTORY_SQL = (f"SELECT date, share_class_assets FROM {ROUTED_VIEW} "
+               f"WHERE fund_code = ? AND date BETWEEN ? AND ? ORDER BY date")
+
+
+def timed_ms(func) -> float:
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1000
+
+
+def maintenance(conn, db_path: str, backup_path: str) -> dict:
+    size_mb = os.path.getsize(db_path) / 1024 / 1024
+    vacuum = timed_ms(lambda: conn.execute("VACUUM"))
+
+    def backup():
+        target = sqlite3.connect(backup_path)
+        conn.backup(target)
+        target.close()
+        os.remove(backup_path)
+
+    reindex = timed_ms(lambda: conn.execute("REINDEX idx_fund_data_fund_code_date"))
+    return {'size': size_mb, 'vacuum': vacuum, 'backup': timed_ms(backup), 'reindex': reindex}
+
+
+def history_ms(conn, start: str, end: str) -> float:
+    router = PartitionRouter(conn)
+    best = float('inf')
+    for _ in range(3):
+        best = min(best, timed_ms(lambda: router.read_frame(HISTORY_SQL, ['A000001', start, end],
+                                                            start=start, end=end)))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Maintenance cost with and without monthly partitions')
+    parser.add_argument('--funds', type=int, default=3000, help='Funds per region and date')
+    parser.add_argument('--days', type=int, default=250, help='Business days stored')
+    parser.add_argument('--open-months', type=int, default=3, help='Months kept in fund_data')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='bench_part_') as tmp:
+        etl = FundDataETL('/nonexistent/config.json')
+        etl.db_path = os.path.join(tmp, 'fund_data.db')
+        etl.setup_database()
+        conn = connect(etl.db_path)
+        fill(conn, args.funds, args.days)
+        rebuild(conn.cursor())
+        conn.commit()
+        latest = conn.execute("SELECT MAX(date) FROM fund_data").fetchone()[0]
+        recent = (latest[:7] + '-01', latest)
+        old = ('2025-02-01', '2025-02-28')
+
+        backup_path = os.path.join(tmp, 'backup.db')
+        before = maintenance(conn, etl.db_path, backup_path)
+        before['recent'] = history_ms(conn, *recent)
+        before['old'] = history_ms(conn, *old)
+
+        archive_ms = timed_ms(lambda: archive_closed_months(conn, os.path.join(tmp, 'partitions'),
+                                                            args.open_months, as_of=latest))
+        months = conn.execute("SELECT COUNT(*), SUM(size_bytes) FROM fund_data_partitions").fetchone()
+        after = maintenance(conn, etl.db_path, backup_path)
+        after['recent'] = history_ms(conn, *recent)
+        after['old'] = history_ms(conn, *old)
+        conn.close()
+        close_all(etl.db_path)
+
+    print(f"\n{args.funds * args.days * 2:,} rows; archived {months[0]} months "
+          f"({months[1] / 1024 / 1024:.1f} MB of partitions) in {archive_ms / 1000:.1f} s")
+    print(f"{'':<28} {'single table':>13} {'partitioned':>12}")
+    rows = [('main database MB', 'size', '.1f'), ('VACUUM ms', 'vacuum', '.0f'),
+            ('online backup ms', 'backup', '.0f'), ('REINDEX fund_code ms', 'reindex', '.0f'),
+            ('history, open month ms', 'recent', '.2f'), ('history, archived month ms', 'old', '.2f')]
+    for label, key, fmt in rows:
+        print(f"{label:<28} {format(before[key], fmt):>13} {format(after[key], fmt):>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Lookback Reconciliation Benchmark
+Validating and correcting one region against a 30-day lookback with a
+share of corrected values: validate_against_lookback plus the selective
+update_from_lookback (pandas) vs reconcile_lookback (staging table and SQL
+joins). Each path runs on its own copy of the database.
+
+Usage: python benchmarks/bench_reconcile.py [--funds 3000] [--days 30] [--changed 0.01]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_indexes import fill
+from bench_lookback_compare import lookback_frame
+from db_connection import close_all, connect
+from fund_etl_pipeline import FundDataETL
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lookback validation and update in pandas vs in SQL')
+    parser.add_argument('--funds', type=int, default=3000, help='Funds per region and date')
+    parser.add_argument('--days', type=int, default=30, help='Business days in the lookback')
+    parser.add_argument('--changed', type=float, default=0.01, help='Share of rows with a corrected value')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='bench_reconcile_') as tmp:
+        etl = FundDataETL('/nonexistent/config.json')
+        etl.db_path = os.path.join(tmp, 'fund_data.db')
+        etl.setup_database()
+        conn = connect(etl.db_path)
+        fill(conn, args.funds, args.days)
+        lookback_df = lookback_frame(conn, 'AMRS', args.changed)
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.close()
+        close_all(etl.db_path)
+        pristine = os.path.join(tmp, 'pristine.db')
+        shutil.copy(etl.db_path, pristine)
+
+        started = time.perf_counter()
+        validated = etl.validate_against_lookback('AMRS', lookback_df.copy())
+        validate_s = time.perf_counter() - started
+        started = time.perf_counter()
+        etl.update_from_lookback('AMRS', lookback_df.copy(), validated)
+        update_s = time.perf_counter() - started
+        close_all(etl.db_path)
+
+        shutil.copy(pristine, etl.db_path)
+        for suffix in ('-wal', '-shm'):
+            if os.path.exists(etl.db_path + suffix):
+                os.remove(etl.db_path + suffix)
+        started = time.perf_counter()
+        reconciled = etl.reconcile_lookback('AMRS', lookback_df.copy())
+        reconcile_s = time.perf_counter() - started
+        close_all(etl.db_path)
+
+    print(f"\nLookback: {len(lookback_df):,} rows over {args.days} dates")
+    print(f"{'validate (pandas)':<28} {validate_s:>7.2f} s   {validated['summary']['changed_records_count']:,} changed")
+    print(f"{'selective update (pandas)':<28} {update_s:>7.2f} s")
+    print(f"{'reconcile (SQL)':<28} {reconcile_s:>7.2f} s   "
+          f"{reconciled['summary']['changed_records_count']:,} changed, "
+          f"{reconciled['reconciled']['revisions']:,} revisions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Revision Log Benchmark
+A full-mode lookback over the last 30 business days where a small share of
+values changed: upserting every lookback row (the old full mode) vs diffing
+against the stored rows and applying only the field deltas, with the log
+rows written compared to keeping a snapshot of every date. Also times an
+as-of read of one date.
+
+Usage: python benchmarks/bench_revisions.py [--funds 3000] [--days 30] [--changed 0.01] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_indexes import fill
+from bulk_loader import upsert_frame
+from db_connection import close_all, connect
+from fund_etl_pipeline import FundDataETL
+from revision_log import apply_revisions, as_of, diff_stored, record, stored_rows
+
+FIELDS = ['fund_name', 'share_class_assets', 'one_day_yield']
+
+
+def best_ms(func, repeat: int, conn) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+        conn.rollback()
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Full lookback upsert vs field-level deltas')
+    parser.add_argument('--funds', type=int, default=3000, help='Funds per region and date')
+    parser.add_argument('--days', type=int, default=30, help='Business days in the lookback')
+    parser.add_argument('--changed', type=float, default=0.01, help='Share of rows with a corrected value')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per measurement')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='bench_revisions_') as tmp:
+        etl = FundDataETL('/nonexistent/config.json')
+        etl.db_path = os.path.join(tmp, 'fund_data.db')
+        etl.setup_database()
+        conn = connect(etl.db_path)
+        fill(conn, args.funds, args.days)
+        cursor = conn.cursor()
+        dates = [row[0] for row in conn.execute("SELECT DISTINCT date FROM fund_data ORDER BY date")]
+
+        # The lookback repeats the stored rows with a few corrected assets
+        lookback = stored_rows(cursor, 'AMRS', dates, FIELDS)
+        changed = np.random.default_rng(0).random(len(lookback)) < args.changed
+        lookback.loc[changed, 'share_class_assets'] += 1.0
+        lookback['region'] = 'AMRS'
+
+        upsert_ms = best_ms(lambda: upsert_frame(cursor, lookback, 'AMRS', dates), args.repeat, conn)
+
+        def apply_deltas():
+            changes = diff_stored(cursor, 'AMRS', dates, lookback, FIELDS)
+            apply_revisions(cursor, 'AMRS', changes)
+            return record(cursor, 'AMRS', changes, 'lookback_full')
+
+        delta_ms = best_ms(apply_deltas, args.repeat, conn)
+        revisions = apply_deltas()
+        conn.commit()
+        as_of_ms = best_ms(lambda: as_of(conn, 'AMRS', dates[-1], '2000-01-01 00:00:00'), args.repeat, conn)
+        conn.close()
+        close_all(etl.db_path)
+
+    print(f"\nLookback: {len(lookback):,} rows over {len(dates)} dates, {int(changed.sum()):,} corrected")
+    print(f"{'upsert every row':<26} {upsert_ms:>9.1f} ms")
+    print(f"{'diff and apply deltas':<26} {delta_ms:>9.1f} ms")
+    print(f"{'revision rows logged':<26} {revisions:>9,}  (snapshot of the dates: {len(lookback):,} rows)")
+    print(f"{'as-of read of one date':<26} {as_of_ms:>9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Selective Update Benchmark
+Writing 1k, 10k and 50k corrected records from a lookback: update_rows
+called once per record (a read, an UPDATE and a revision insert each) vs
+one update_rows call, which diffs all of them at once and runs one executemany per set of changed
+fields. Also times the whole selective update_from_lookback.
+
+Usage: python benchmarks/bench_selective_update.py [--funds 5000] [--days 10] [--sizes 1000 10000 50000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_indexes import fill
+from db_connection import close_all, connect
+from fund_etl_pipeline import FundDataETL
+from revision_log import update_rows
+
+COLUMNS = {'share_class_assets': 'Share Class Assets (dly/$mils)', 'one_day_yield': '1-DSY (dly)'}
+
+
+def corrections(conn, size: int) -> pd.DataFrame:
+    """size stored AMRS rows with new assets, half of them with a new yield too"""
+    stored = pd.read_sql_query("SELECT date, fund_code, share_class_assets, one_day_yield FROM fund_data "
+                               "WHERE region = 'AMRS' ORDER BY date, fund_code", conn)
+    rows = stored.sample(n=size, random_state=0).reset_index(drop=True)
+    rows['share_class_assets'] += 1.0
+    rows.loc[np.arange(size) % 2 == 0, 'one_day_yield'] += 0.01
+    return rows
+
+
+def timed(func) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-record vs batched selective lookback updates')
+    parser.add_argument('--funds', type=int, default=5000, help='Funds per region and date')
+    parser.add_argument('--days', type=int, default=10, help='Business days stored')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000], help='Corrected records')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='bench_selective_update_') as tmp:
+        etl = FundDataETL('/nonexistent/config.json')
+        etl.db_path = os.path.join(tmp, 'fund_data.db')
+        etl.setup_database()
+        conn = connect(etl.db_path)
+        fill(conn, args.funds, args.days)
+        cursor = conn.cursor()
+
+        print(f"\n{'records':>8} {'per record s':>13} {'batched s':>10} {'update_from_lookback s':>23} {'revisions':>10}")
+        for size in args.sizes:
+            rows = corrections(conn, size)
+
+            per_record_s = timed(lambda: [update_rows(cursor, 'AMRS', rows.iloc[[i]], 'bench')
+                                          for i in range(len(rows))])
+            conn.rollback()
+            batched_s = timed(lambda: update_rows(cursor, 'AMRS', rows, 'bench'))
+            conn.rollback()
+
+            lookback_df = pd.DataFrame({'Date': pd.to_datetime(rows['date']), 'Fund Code': rows['fund_code'],
+                                        **{column: rows[field] for field, column in COLUMNS.items()}})
+            records = [{'fund_code': fund_code, 'date': date, 'type': 'value_change'}
+                       for date, fund_code in zip(rows['date'], rows['fund_code'])]
+            result = {}
+            pipeline_s = timed(lambda: result.update(
+                etl.update_from_lookback('AMRS', lookback_df, {'changed_records': records})))
+            print(f"{size:>8,} {per_record_s:>13.2f} {batched_s:>10.2f} {pipeline_s:>23.2f} {result['revisions']:>10,}")
+
+            # Put the stored values back for the next size
+            conn.execute("DELETE FROM fund_data_revisions")
+            rows['share_class_assets'] -= 1.0
+            rows.loc[np.arange(size) % 2 == 0, 'one_day_yield'] -= 0.01
+            update_rows(cursor, 'AMRS', rows, 'bench')
+            conn.execute("DELETE FROM fund_data_revisions")
+            conn.commit()
+        conn.close()
+        close_all(etl.db_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Read Snapshot Benchmark
+Dashboard query latency while another process commits lookback-style
+rewrites of the last 30 days, reading the live database (WAL, pooled
+connections) vs the published read-only snapshot, plus what publishing a
+snapshot costs as the database grows.
+
+Usage: python benchmarks/bench_snapshot.py [--funds 3000] [--days 60] [--rewrites 5]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_indexes import fill
+from db_connection import READ_ONLY_SETTINGS, close_all, connect
+from fund_etl_pipeline import FundDataETL
+from snapshot import publish_snapshot
+
+READER_QUERIES = [
+    "SELECT region, COUNT(*), SUM(share_class_assets) FROM fund_data WHERE date = "
+    "(SELECT MAX(date) FROM fund_data) GROUP BY region",
+    "SELECT date, share_class_assets FROM fund_data WHERE fund_code = 'A000042' ORDER BY date",
+    "SELECT * FROM etl_log ORDER BY created_at DESC LIMIT 20"
+]
+
+
+def writer(db_path: str, rewrites: int, ready):
+    """Rewrite the assets of the last 30 days, one transaction per pass, as a full lookback does"""
+    ready.wait()
+    conn = connect(db_path)
+    for rewrite in range(rewrites):
+        conn.execute("""
+        UPDATE fund_data SET share_class_assets = share_class_assets + 1
+        WHERE date >= (SELECT date FROM (SELECT DISTINCT date FROM fund_data ORDER BY date DESC LIMIT 30)
+                       ORDER BY date LIMIT 1)
+        """)
+        conn.commit()
+    conn.close()
+
+
+def poll(db_path: str, settings, process) -> np.ndarray:
+    latencies = []
+    while process.is_alive():
+        started = time.perf_counter()
+        conn = connect(db_path, settings)
+        for query in READER_QUERIES:
+            conn.execute(query).fetchall()
+        conn.close()
+        latencies.append((time.perf_counter() - started) * 1000)
+        time.sleep(0.002)
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reader latency on the live database vs a published snapshot')
+    parser.add_argument('--funds', type=int, default=3000, help='Funds per region and date')
+    parser.add_argument('--days', type=int, default=60, help='Business days stored')
+    parser.add_argument('--rewrites', type=int, default=5, help='Lookback rewrites committed by the writer')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='bench_snapshot_') as tmp:
+        db_path = os.path.join(tmp, 'fund_data.db')
+        snapshot_path = os.path.join(tmp, 'snapshots', 'fund_data.db')
+        etl = FundDataETL('/nonexistent/config.json')
+        etl.db_path = db_path
+        etl.setup_database()
+        conn = connect(db_path)
+        fill(conn, args.funds, args.days)
+        conn.execute("ANALYZE")
+        conn.commit()
+        conn.close()
+        published = publish_snapshot(db_path, snapshot_path)
+
+        print(f"\nSnapshot of {published['bytes'] / 1e6:.1f} MB published in {published['duration_ms']:.0f} ms "
+              f"(backup {published['backup_ms']:.0f} ms)")
+        print(f"Writer commits {args.rewrites} rewrites of 30 days; reader polls {len(READER_QUERIES)} "
+              f"dashboard queries\n")
+        print(f"{'reading':<10} {'polls':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8} {'writes s':>9}")
+        for name, path, settings in (('live', db_path, None), ('snapshot', snapshot_path, READ_ONLY_SETTINGS)):
+            ready = multiprocessing.Event()
+            process = multiprocessing.Process(target=writer, args=(db_path, args.rewrites, ready))
+            process.start()
+            ready.set()
+            started = time.perf_counter()
+            latencies = poll(path, settings, process)
+            process.join()
+            elapsed = time.perf_counter() - started
+            print(f"{name:<10} {len(latencies):>7,} {np.percentile(latencies, 50):>8.2f} "
+                  f"{np.percentile(latencies, 95):>8.2f} {np.percentile(latencies, 99):>8.2f} "
+                  f"{latencies.max():>8.1f} {elapsed:>9.2f}")
+        close_all()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+Runs each CLI entry point in a fresh interpreter under `python -X importtime`
+and checks its import cost against a budget. fund_etl_api starts a new
+fund_etl_scheduler.py process for every workflow, so these numbers are paid
+on each API-triggered run. Exits non-zero when an entry point is over budget
+or fails to run (reported as FAILED, with its last stderr line).
+
+Usage: python benchmarks/bench_startup.py [--repeat 3] [--scale 1.0]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libraries that should only load on the code paths that use them
+HEAVY_MODULES = ['pandas', 'numpy', 'matplotlib', 'seaborn', 'requests', 'holidays', 'selenium', 'flask']
+
+# name -> (arguments after `python -X importtime`, import budget in ms)
+ENTRY_POINTS = {
+    'scheduler --help': (['fund_etl_scheduler.py', '--help'], 150),
+    'scheduler --setup-cron': (['fund_etl_scheduler.py', '--setup-cron'], 150),
+    'scheduler --create-config': (['fund_etl_scheduler.py', '--create-config'], 700),
+    'scheduler (import)': (['-c', 'import fund_etl_scheduler'], 150),
+    'api (import)': (['-c', 'import fund_etl_api'], 400),
+    'pipeline (import)': (['-c', 'from fund_etl_pipeline import FundDataETL'], 700),
+    'monitor (import)': (['-c', 'from fund_etl_utilities import FundDataMonitor'], 700),
+    'quick_status (import)': (['-c', 'import quick_status'], 150),
+}
+
+
+def parse_importtime(stderr: str) -> Tuple[int, List[Tuple[str, int]]]:
+    """Total import time (us) and the top-level imports with their cumulative time"""
+    top_level = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|', 2)
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        # Nested imports are indented two spaces per level
+        if len(name) - len(name.lstrip()) == 1:
+            top_level.append((name.strip(), int(cumulative)))
+    return sum(us for _, us in top_level), top_level
+
+
+def measure(args: List[str], cwd: str) -> Dict:
+    """Run one entry point and collect its import profile"""
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE='1')
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=cwd, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    wall_ms = (time.perf_counter() - started) * 1000
+
+    total_us, top_level = parse_importtime(result.stderr)
+    loaded = {line.split('|', 2)[2].strip() for line in result.stderr.splitlines()
+              if line.startswith('import time:') and line.count('|') == 2}
+    errors = [line for line in result.stderr.splitlines() if line and not line.startswith('import time:')]
+    return {
+        'returncode': result.returncode,
+        'error': errors[-1] if errors else '',
+        'import_ms': total_us / 1000,
+        'wall_ms': wall_ms,
+        'heavy': [mod for mod in HEAVY_MODULES if mod in loaded],
+        'slowest': sorted(top_level, key=lambda item: -item[1])[:3]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check CLI entry point import time against budgets')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per entry point (best is kept)')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply every budget (slow machines)')
+    args = parser.parse_args()
+
+    over_budget, failed = [], []
+    print(f"{'entry point':<28} {'import ms':>9} {'wall ms':>8} {'budget':>7}  heavy modules loaded")
+
+    # Run from a scratch directory: --create-config writes its templates to the cwd,
+    # and the pipeline opens fund_etl.log there
+    with tempfile.TemporaryDirectory(prefix='bench_startup_') as cwd:
+        for name, (entry_args, budget_ms) in ENTRY_POINTS.items():
+            if entry_args[0].endswith('.py'):
+                entry_args = [os.path.join(ROOT, entry_args[0])] + entry_args[1:]
+            # Warm the OS file cache, then keep the fastest run
+            measure(entry_args, cwd)
+            runs = [measure(entry_args, cwd) for _ in range(max(args.repeat, 1))]
+            best = min(runs, key=lambda run: run['import_ms'])
+
+            budget = budget_ms * args.scale
+            if best['returncode'] != 0:
+                status = 'FAILED'
+                failed.append(name)
+            elif best['import_ms'] > budget:
+                status = 'OVER'
+                over_budget.append(name)
+            else:
+                status = 'ok'
+
+            print(f"{name:<28} {best['import_ms']:>9,.0f} {best['wall_ms']:>8,.0f} {budget:>7,.0f}  "
+                  f"{', '.join(best['heavy']) or '-'}  [{status}]")
+            if status == 'OVER':
+                slowest = ', '.join(f"{mod} {us / 1000:,.0f}ms" for mod, us in best['slowest'])
+                print(f"{'':<28} slowest imports: {slowest}")
+            elif status == 'FAILED':
+                print(f"{'':<28} exit code {best['returncode']}: {best['error']}")
+
+    if failed:
+        print(f"\nFailed to run: {', '.join(failed)}")
+    if over_budget:
+        print(f"\nOver budget: {', '.join(over_budget)}")
+    if failed or over_budget:
+        sys.exit(1)
+    print("\nAll entry points within budget")
+
+
+if __name__ == '__main__':
+    main()
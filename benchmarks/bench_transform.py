@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Transform Benchmark
+Compares the previous per-cell transform_data implementation with the compiled
+column plan on a synthetic DataDump frame (100k rows by default) whose value
+mix follows the real files: int Fund Codes, financial columns holding floats,
+ints, '-' sentinels and comma-formatted strings, padded text with gaps.
+
+Usage: python benchmarks/bench_transform.py [--rows 100000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fund_etl_pipeline import FundDataETL
+from transform_plan import COLUMN_MAPPING, TEXT_COLUMNS, NUMERIC_COLUMNS
+
+
+def legacy_transform_data(df: pd.DataFrame, region: str, date: datetime) -> pd.DataFrame:
+    """transform_data as it was before the column plan (kept for comparison)"""
+    df_transformed = df.copy()
+    df_transformed['region'] = region
+    df_transformed['date'] = date.strftime('%Y-%m-%d')
+
+    if 'Date' in df_transformed.columns:
+        df_transformed['file_date'] = pd.to_datetime(df_transformed['Date']).dt.strftime('%Y-%m-%d')
+        df_transformed = df_transformed.drop('Date', axis=1)
+
+    if 'Fund Code' in df_transformed.columns:
+        multivalue_mask = df_transformed['Fund Code'] == '#MULTIVALUE'
+        if multivalue_mask.sum() > 0:
+            df_transformed = df_transformed[~multivalue_mask]
+
+    if 'Fund Code' in df_transformed.columns:
+        df_transformed['Fund Code'] = df_transformed['Fund Code'].astype(str).str.strip()
+
+    df_transformed = df_transformed.rename(columns=COLUMN_MAPPING)
+
+    for col in TEXT_COLUMNS:
+        if col in df_transformed.columns:
+            df_transformed[col] = df_transformed[col].fillna('')
+            df_transformed[col] = df_transformed[col].apply(lambda x: str(x).strip() if x else '')
+
+    for col in NUMERIC_COLUMNS:
+        if col in df_transformed.columns:
+            df_transformed[col] = df_transformed[col].astype(str)
+            df_transformed[col] = df_transformed[col].str.replace(',', '')
+            df_transformed[col] = df_transformed[col].replace(['-', '', 'N/A', 'nan'], np.nan)
+            df_transformed[col] = pd.to_numeric(df_transformed[col], errors='coerce')
+
+    return df_transformed
+
+
+def synthetic_datadump(rows: int, seed: int = 7) -> pd.DataFrame:
+    """Build a raw frame shaped like StreamingXLSXReader output for a DataDump file"""
+    rng = np.random.default_rng(seed)
+
+    def financial(scale: float, integer_share: float = 0.1) -> np.ndarray:
+        values = np.round(rng.random(rows) * scale, 2).astype(object)
+        kind = rng.random(rows)
+        ints = kind < integer_share
+        values[ints] = [int(v) for v in values[ints]]
+        values[(kind >= 0.80) & (kind < 0.95)] = '-'
+        commas = kind >= 0.95
+        values[commas] = [f"{v:,.2f}" for v in rng.random(commas.sum()) * scale * 1000]
+        return values
+
+    def text(pool, missing: float = 0.02) -> np.ndarray:
+        values = rng.choice(np.array(pool, dtype=object), rows)
+        values[rng.random(rows) < missing] = None
+        return values
+
+    df = pd.DataFrame({
+        'Date': pd.Timestamp('2025-07-07'),
+        'Fund Code': np.arange(100000, 100000 + rows),
+        'Fund Name': text([f'Test Fund {i} ' for i in range(500)], 0),
+        'Master Class Fund Name': text([f'Master Fund {i}' for i in range(300)], 0),
+        'Rating (M/S&P/F)': text(['-/AAAm/-', '-/-/AAAmmf', 'Aaa-mf/AAAm/AAAmmf'], 0),
+        'Unique Identifier': text([f'{i:09d}' for i in range(1000)]),
+        'NASDAQ': text([f'T{i:04d}X' for i in range(1000)], 0.01),
+        'Fund Complex (Historical)': text(['American Beacon', 'AllianceBernstein', 'BlackRock '], 0),
+        'SubCategory Historical': text(['Govt & Agencies Instit', 'Prime Retail'], 0),
+        'Domicile': text(['US', 'IE', 'LU'], 0),
+        'Currency': text(['US Dollar', 'Euro', 'Pound Sterling'], 0),
+        'Share Class Assets (dly/$mils)': financial(5000),
+        'Portfolio Assets (dly/$mils)': financial(50000),
+        '1-DSY (dly)': financial(5),
+        '1-GDSY (dly)': financial(5, 0),
+        '7-DSY (dly)': financial(5),
+        '7-GDSY (dly)': financial(5, 0),
+        'Chgd Expense Ratio (mo/dly)': financial(1),
+        'WAM (dly)': financial(60, 1.0),
+        'WAL (dly)': financial(120, 1.0),
+        'Transactional NAV': text(['1.00   ', '1.0001 ', '-'], 0.04),
+        'Market NAV': text(['-', 1.0, 1], 0),
+        'Daily Liquidity (%)': np.round(rng.random(rows) * 100, 2),
+        'Weekly Liquidity (%)': np.round(rng.random(rows) * 100, 2),
+        'Fees': text(['False', 'True'], 0),
+        'Gates': text(['False', 'True'], 0)
+    })
+    return df
+
+
+def time_transform(func, df: pd.DataFrame, repeat: int) -> float:
+    """Best-of-N wall time for one transform call"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df, 'AMRS', datetime(2025, 7, 7))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark transform_data')
+    parser.add_argument('--rows', type=int, default=100000, help='Synthetic rows')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per implementation')
+    args = parser.parse_args()
+
+    etl = FundDataETL('/nonexistent/config.json')
+    df = synthetic_datadump(args.rows)
+
+    # Outputs must agree before timings mean anything
+    expected = legacy_transform_data(df, 'AMRS', datetime(2025, 7, 7))
+    actual = etl.transform_data(df, 'AMRS', datetime(2025, 7, 7))
+    actual = actual.astype({col: object for col in actual.select_dtypes('category').columns})
+    pd.testing.assert_frame_equal(actual[expected.columns], expected, check_dtype=False)
+
+    legacy = time_transform(legacy_transform_data, df, args.repeat)
+    planned = time_transform(etl.transform_data, df, args.repeat)
+
+    print(f"transform_data on {args.rows:,} synthetic rows (best of {args.repeat})")
+    print(f"  per-cell (before): {legacy:8.3f}s  {args.rows / legacy:>12,.0f} rows/sec")
+    print(f"  column plan:       {planned:8.3f}s  {args.rows / planned:>12,.0f} rows/sec")
+    print(f"  speedup:           {legacy / planned:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Bulk Loader
+Writes transformed fund_data rows with a prepared
+INSERT ... ON CONFLICT(date, region, fund_code) DO UPDATE over typed tuples.
+Rows whose values are identical to the stored row are left untouched, and
+funds that disappear from a reloaded (date, region) slice are deleted, so a
+load reports how many rows it inserted, updated, left unchanged and removed
+instead of deleting and re-appending the whole slice. Dates written here become
+physical again, so any date alias they had is dropped. Dates in a month that
+has been archived to a read-only partition are refused. Each row is written
+with its row_hash fingerprint (row_fingerprint).
+"""
+
+import logging
+from functools import lru_cache
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from date_alias import clear_aliases
+from partitions import check_open
+from row_fingerprint import ROW_HASH_COLUMN, row_hashes
+
+logger = logging.getLogger(__name__)
+
+# fund_data columns written by the loaders (created_at is filled by SQLite)
+FUND_DATA_COLUMNS = [
+    'date', 'region', 'fund_code', 'fund_name', 'master_class_fund_name',
+    'rating', 'unique_identifier', 'nasdaq', 'fund_complex', 'subcategory',
+    'domicile', 'currency', 'share_class_assets', 'portfolio_assets',
+    'one_day_yield', 'one_day_gross_yield', 'seven_day_yield',
+    'seven_day_gross_yield', 'expense_ratio', 'wam', 'wal',
+    'transactional_nav', 'market_nav', 'daily_liquidity',
+    'weekly_liquidity', 'fees', 'gates'
+]
+
+FUND_DATA_KEY = ('date', 'region', 'fund_code')
+
+COUNT_NAMES = ('inserted', 'updated', 'unchanged', 'deleted')
+
+
+@lru_cache(maxsize=None)
+def upsert_sql(columns: Tuple[str, ...]) -> str:
+    """INSERT ... ON CONFLICT DO UPDATE that only rewrites rows whose values differ"""
+    values = [col for col in columns if col not in FUND_DATA_KEY]
+    # row_hash follows the values; a cleared one does not make identical data a change
+    compared = [col for col in values if col != ROW_HASH_COLUMN]
+    if not compared:
+        return (f"INSERT INTO fund_data ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+                f"ON CONFLICT({', '.join(FUND_DATA_KEY)}) DO NOTHING")
+    return f"""
+    INSERT INTO fund_data ({', '.join(columns)})
+    VALUES ({', '.join('?' for _ in columns)})
+    ON CONFLICT({', '.join(FUND_DATA_KEY)}) DO UPDATE SET
+        {', '.join(f'{col} = excluded.{col}' for col in values)}
+    WHERE {' OR '.join(f'fund_data.{col} IS NOT excluded.{col}' for col in compared)}
+    """
+
+
+def typed_column(series: pd.Series) -> list:
+    """Column as Python values with None for missing ones, ready for sqlite3"""
+    if series.dtype.kind in 'iub':
+        return series.tolist()
+    if series.dtype.kind == 'f':
+        values = series.to_numpy()
+        column = values.tolist()
+        for i in np.flatnonzero(np.isnan(values)):
+            column[i] = None
+        return column
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Code -1 (missing) picks the trailing None
+        categories = series.cat.categories.astype(object).tolist() + [None]
+        return [categories[code] for code in series.cat.codes.tolist()]
+    values = series.astype(object)
+    return values.where(values.notna(), None).tolist()
+
+
+def typed_rows(df: pd.DataFrame, columns: Sequence[str]) -> List[tuple]:
+    """Rows of df[columns] as tuples of Python values"""
+    return list(zip(*(typed_column(df[col]) for col in columns)))
+
+
+class SliceUpsert:
+    """
+    One load of a region's rows for a set of dates, inside the caller's
+    transaction. write() may be called once per chunk; finish() removes the
+    funds the load no longer contains and returns the row counts.
+    """
+
+    def __init__(self, cursor, region: str, dates: Iterable[str]):
+        self.cursor = cursor
+        self.region = region
+        self.dates = sorted(set(dates))
+        check_open(cursor, self.dates)
+        clear_aliases(cursor, region, self.dates)
+        cursor.execute(f"""
+        SELECT date, fund_code FROM fund_data
+        WHERE region = ? AND date IN ({', '.join('?' for _ in self.dates)})
+        """, [region] + self.dates)
+        self.existing = set(cursor.fetchall())
+        self.stale = set(self.existing)
+        self.seen = set()
+        self.counts = dict.fromkeys(COUNT_NAMES, 0)
+
+    def write(self, df_load: pd.DataFrame) -> int:
+        """Upsert transformed rows; returns the number of rows written"""
+        columns = tuple(col for col in FUND_DATA_COLUMNS if col in df_load.columns)
+        if not columns or len(df_load) == 0:
+            return 0
+
+        inserted = 0
+        for key in zip(df_load['date'].astype(str), typed_column(df_load['fund_code'])):
+            if key in self.stale:
+                self.stale.discard(key)
+            elif key not in self.existing and key not in self.seen:
+                inserted += 1
+            self.seen.add(key)
+
+        rows = zip(*(typed_column(df_load[col]) for col in columns), row_hashes(df_load).tolist())
+        self.cursor.executemany(upsert_sql(columns + (ROW_HASH_COLUMN,)), rows)
+        # Identical rows fail the DO UPDATE condition and count as no change
+        changed = self.cursor.rowcount
+        self.counts['inserted'] += inserted
+        self.counts['updated'] += changed - inserted
+        self.counts['unchanged'] += len(df_load) - changed
+        return len(df_load)
+
+    def finish(self) -> Dict[str, int]:
+        """Delete rows of the slice that this load did not write"""
+        if self.stale:
+            self.cursor.executemany("""
+            DELETE FROM fund_data WHERE region = ? AND date = ? AND fund_code IS ?
+            """, [(self.region, date, fund_code) for date, fund_code in sorted(self.stale, key=str)])
+            self.counts['deleted'] += len(self.stale)
+            self.stale = set()
+        return dict(self.counts)
+
+
+def upsert_frame(cursor, df_load: pd.DataFrame, region: str, dates: Iterable[str] = None) -> Dict[str, int]:
+    """Upsert a whole frame as one load of the dates it covers (or the given dates)"""
+    if dates is None:
+        dates = df_load['date'].astype(str).unique().tolist()
+    upsert = SliceUpsert(cursor, region, dates)
+    upsert.write(df_load)
+    return upsert.finish()
+
+
+def format_counts(counts: Dict[str, int]) -> str:
+    return ', '.join(f"{counts.get(name, 0)} {name}" for name in COUNT_NAMES)
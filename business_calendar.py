@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Business Calendar
+Precomputed business-day calendars for the ETL regions. Each calendar holds a
+NumPy business-day mask over a span of years (weekends and public holidays
+off), built once from the holidays package and cached on disk (keyed by the
+installed holidays version, so an upgrade rebuilds them), so business-day
+checks, prior/next business day and range enumeration are array operations
+instead of day-by-day walks. Calendars are also memoized per process.
+"""
+
+import logging
+import os
+from importlib import metadata
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bump when the cached layout (or the way holidays are chosen) changes
+CALENDAR_VERSION = 1
+
+DEFAULT_FIRST_YEAR = 2020
+DEFAULT_LAST_YEAR = 2029
+
+# Monday-Friday
+WEEKMASK = '1111100'
+
+DateLike = Union[date, datetime, np.datetime64, str]
+
+_calendars: Dict[Tuple[str, Optional[str]], 'BusinessCalendar'] = {}
+
+
+def _holidays_version() -> str:
+    # Read from the package metadata: importing holidays is slow and a cache hit does not need it
+    try:
+        return metadata.version('holidays')
+    except metadata.PackageNotFoundError:
+        return 'none'
+
+
+def _day(value: DateLike) -> np.datetime64:
+    return np.datetime64(value, 'D')
+
+
+class BusinessCalendar:
+    """Business-day mask for one holiday country, covering whole calendar years"""
+
+    def __init__(self, country: str = 'US', first_year: int = DEFAULT_FIRST_YEAR,
+                 last_year: int = DEFAULT_LAST_YEAR, cache_dir: Optional[str] = None):
+        self.country = country
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._load(first_year, last_year)
+
+    def _cache_path(self, first_year: int, last_year: int) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        return (self.cache_dir / f"{self.country}_{first_year}_{last_year}"
+                f".holidays-{_holidays_version()}.v{CALENDAR_VERSION}.npz")
+
+    def _load(self, first_year: int, last_year: int):
+        """Read the mask for [first_year, last_year] from the disk cache, building it on a miss"""
+        path = self._cache_path(first_year, last_year)
+        self.first_year = first_year
+        self.last_year = last_year
+        self.start = np.datetime64(f'{first_year}-01-01', 'D')
+        self.end = np.datetime64(f'{last_year + 1}-01-01', 'D')
+        self.days = np.arange(self.start, self.end)
+        self.holidays = self.mask = None
+
+        if path is not None and path.exists():
+            try:
+                with np.load(path) as cached:
+                    self.holidays, self.mask = cached['holidays'], cached['mask']
+            except Exception as e:
+                logger.warning(f"Discarding unreadable calendar cache {path.name}: {e}")
+
+        if self.mask is None or len(self.mask) != len(self.days):
+            self.holidays = self._build_holidays(first_year, last_year)
+            self.mask = np.is_busday(self.days, weekmask=WEEKMASK, holidays=self.holidays)
+            if path is not None:
+                self._save(path)
+
+        self.busdaycal = np.busdaycalendar(weekmask=WEEKMASK, holidays=self.holidays)
+
+    def __getstate__(self):
+        # np.busdaycalendar does not pickle; worker processes rebuild it from the holidays
+        state = self.__dict__.copy()
+        del state['busdaycal']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.busdaycal = np.busdaycalendar(weekmask=WEEKMASK, holidays=self.holidays)
+
+    def _build_holidays(self, first_year: int, last_year: int) -> np.ndarray:
+        import holidays
+
+        country_holidays = holidays.country_holidays(self.country, years=range(first_year, last_year + 1))
+        logger.info(f"Built {self.country} business-day calendar for {first_year}-{last_year} "
+                    f"({len(country_holidays)} holidays)")
+        return np.array(sorted(country_holidays), dtype='datetime64[D]')
+
+    def _save(self, path: Path):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npz")
+            np.savez(tmp_path, holidays=self.holidays, mask=self.mask)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not cache business-day calendar at {path}: {e}")
+
+    def _cover(self, *days: np.datetime64):
+        """Widen the calendar (whole years) when a date falls outside it"""
+        years = [int(str(day)[:4]) for day in days if day < self.start or day >= self.end]
+        if years:
+            self._load(min([self.first_year] + years), max([self.last_year] + years))
+
+    def is_business_day(self, value: DateLike) -> bool:
+        """Whether a date is a weekday and not a holiday"""
+        day = _day(value)
+        self._cover(day)
+        return bool(self.mask[(day - self.start).astype(int)])
+
+    def is_business_days(self, values) -> np.ndarray:
+        """Vectorized is_business_day for an array of dates"""
+        days = np.asarray(values, dtype='datetime64[D]')
+        if days.size:
+            self._cover(days.min(), days.max())
+        return np.is_busday(days, busdaycal=self.busdaycal)
+
+    def prior_business_day(self, value: DateLike):
+        """Closest business day strictly before value (returned as the same type, time kept)"""
+        day = _day(value)
+        self._cover(day - 10)
+        prior = np.busday_offset(day - 1, 0, roll='backward', busdaycal=self.busdaycal)
+        return self._shift(value, day, prior)
+
+    def next_business_day(self, value: DateLike):
+        """Closest business day strictly after value (returned as the same type, time kept)"""
+        day = _day(value)
+        self._cover(day + 10)
+        following = np.busday_offset(day + 1, 0, roll='forward', busdaycal=self.busdaycal)
+        return self._shift(value, day, following)
+
+    def business_days(self, start: DateLike, end: DateLike) -> np.ndarray:
+        """Business days from start to end inclusive as datetime64[D]"""
+        first, last = _day(start), _day(end)
+        if last < first:
+            return np.array([], dtype='datetime64[D]')
+        self._cover(first, last)
+        window = slice((first - self.start).astype(int), (last - self.start).astype(int) + 1)
+        return self.days[window][self.mask[window]]
+
+    def count_business_days(self, start: DateLike, end: DateLike) -> int:
+        """Number of business days from start to end inclusive"""
+        first, last = _day(start), _day(end)
+        if last < first:
+            return 0
+        self._cover(first, last)
+        return int(np.busday_count(first, last + 1, busdaycal=self.busdaycal))
+
+    @staticmethod
+    def _shift(value: DateLike, day: np.datetime64, target: np.datetime64):
+        if isinstance(value, (date, datetime)):
+            return value + timedelta(days=int((target - day).astype(int)))
+        return target
+
+
+def get_calendar(country: str = 'US', cache_dir: Optional[str] = None) -> BusinessCalendar:
+    """Process-wide calendar for a holiday country, loaded from cache_dir when cached"""
+    key = (country, str(cache_dir) if cache_dir else None)
+    if key not in _calendars:
+        _calendars[key] = BusinessCalendar(country, cache_dir=cache_dir)
+    return _calendars[key]
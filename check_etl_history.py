@@ -7,7 +7,7 @@ import sys
 import os
 sys.path.append('/app')
 
-import sqlite3
+from db_connection import connect
 import pandas as pd
 from datetime import datetime, timedelta
 
@@ -16,7 +16,7 @@ def check_etl_history():
     print("=== ETL History Analysis ===\n")
     
     db_path = '/data/fund_data.db'
-    conn = sqlite3.connect(db_path)
+    conn = connect(db_path)
     
     # 1. Check ETL log
     print("1. ETL RUN HISTORY (Last 30 days)")
@@ -70,7 +70,7 @@ def check_etl_history():
         date,
         region,
         COUNT(*) as record_count
-    FROM fund_data
+    FROM fund_data_resolved
     GROUP BY date, region
     ORDER BY date DESC
     LIMIT 20
@@ -148,7 +148,7 @@ def check_etl_history():
     print("\n6. ANALYSIS & RECOMMENDATIONS")
     print("-" * 60)
     
-    total_records = pd.read_sql_query("SELECT COUNT(*) as count FROM fund_data", conn).iloc[0]['count']
+    total_records = pd.read_sql_query("SELECT COUNT(*) as count FROM fund_data_resolved", conn).iloc[0]['count']
     
     if total_records == 0:
         print("❌ DATABASE IS EMPTY")
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Columnar Mirror
+Parquet copy of fund_data for long-range history and exports. Each region
+and month is one file, region=<R>/month=<YYYY-MM>/part.parquet, sorted by
+fund_code and date, so a multi-year read opens only the months in range,
+decodes only the requested columns and, for one fund, only the row groups
+holding it, instead of scanning the row store through fund_data_resolved.
+
+The pipeline replaces a date's rows in its month file after each committed
+load, carry-forward or lookback update. Weekend and carried-forward dates are
+not written: reads re-create them from the source dates recorded in
+daily_summary, which covers archived months too.
+
+Mirror writes are best-effort, so readers check is_fresh() for their range
+(per-date row counts against daily_summary) and read SQLite when it is not.
+Needs pyarrow; without it the mirror reports itself unavailable and callers
+keep reading SQLite.
+
+Usage: python columnar_mirror.py [--db /data/fund_data.db] [--dir /data/columnar]
+"""
+
+import argparse
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import pandas as pd
+
+from bulk_loader import FUND_DATA_COLUMNS
+from date_alias import resolve_date
+from partitions import ROUTED_VIEW, PartitionRouter, month_bounds
+from transform_plan import NUMERIC_COLUMNS
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+# Rows per Parquet row group; a month of one region holds about 21 x 3000 rows
+ROW_GROUP_SIZE = 8192
+
+
+def parquet_available() -> bool:
+    """True when pyarrow is installed"""
+    return pa is not None
+
+
+def mirror_schema():
+    """Arrow schema of the mirror: fund_data's columns as float64 or string"""
+    return pa.schema([(col, pa.float64() if col in NUMERIC_COLUMNS else pa.string())
+                      for col in FUND_DATA_COLUMNS])
+
+
+class ColumnarMirror:
+    """Parquet files of fund_data partitioned by region and month"""
+
+    def __init__(self, root, enabled: bool = True):
+        self.root = Path(root)
+        self.enabled = enabled
+
+    def available(self) -> bool:
+        """Enabled, pyarrow is installed and the mirror has been written"""
+        return self.enabled and parquet_available() and self.root.is_dir()
+
+    def month_file(self, region: str, month: str) -> Path:
+        return self.root / f"region={region}" / f"month={month}" / "part.parquet"
+
+    def _write_month(self, region: str, month: str, table):
+        path = self.month_file(region, month)
+        if table.num_rows == 0:
+            if path.exists():
+                path.unlink()
+            return
+        # Sorted by fund_code so row-group statistics skip other funds
+        table = table.sort_by([('fund_code', 'ascending'), ('date', 'ascending')])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_SIZE)
+        os.replace(tmp_path, path)
+
+    def _table(self, df: pd.DataFrame):
+        return pa.Table.from_pandas(df[FUND_DATA_COLUMNS], schema=mirror_schema(), preserve_index=False)
+
+    def write_dates(self, conn, region: str, dates: Iterable[str]) -> int:
+        """
+        Replace the rows of `dates` in their month files with the committed
+        fund_data rows; aliased or emptied dates end up with no rows.
+        Returns the number of rows written.
+        """
+        if not self.enabled or not parquet_available():
+            return 0
+        cursor = conn.cursor()
+        by_month = {}
+        for date in sorted(set(dates)):
+            by_month.setdefault(date[:7], []).append(date)
+
+        written = 0
+        for month, month_dates in by_month.items():
+            stored = [date for date in month_dates if resolve_date(cursor, region, date) == date]
+            tables = []
+            path = self.month_file(region, month)
+            if path.exists():
+                kept = pq.read_table(path, schema=mirror_schema())
+                tables.append(kept.filter(pc.invert(pc.is_in(kept['date'], pa.array(month_dates)))))
+            if stored:
+                rows = pd.read_sql_query(f"""
+                SELECT {', '.join(FUND_DATA_COLUMNS)} FROM fund_data
+                WHERE region = ? AND date IN ({', '.join('?' for _ in stored)})
+                """, conn, params=[region] + stored)
+                tables.append(self._table(rows))
+                written += len(rows)
+            self._write_month(region, month, pa.concat_tables(tables) if tables
+                              else mirror_schema().empty_table())
+        return written
+
+    def rebuild(self, conn) -> int:
+        """Write every stored month, archived months included, into an empty mirror"""
+        if self.root.exists():
+            shutil.rmtree(self.root)
+        self.root.mkdir(parents=True)
+        router = PartitionRouter(conn)
+        months = conn.execute("""
+        SELECT DISTINCT region, substr(date, 1, 7) FROM daily_summary
+        WHERE source_date IS NULL ORDER BY 1, 2
+        """).fetchall()
+        written = 0
+        for region, month in months:
+            first_date, last_date = month_bounds(month)
+            # The routed view includes aliased dates; the mirror stores physical ones only
+            df = router.read_frame(f"""
+            SELECT {', '.join(f'f.{col}' for col in FUND_DATA_COLUMNS)} FROM {ROUTED_VIEW} f
+            JOIN daily_summary s ON s.region = f.region AND s.date = f.date AND s.source_date IS NULL
+            WHERE f.region = ? AND f.date BETWEEN ? AND ?
+            """, [region, first_date, last_date], start=first_date, end=last_date)
+            self._write_month(region, month, self._table(df))
+            written += len(df)
+        logger.info(f"Columnar mirror rebuilt: {len(months)} region/month files, {written} rows")
+        return written
+
+    def is_fresh(self, conn, start: str, end: str, regions: Optional[List[str]] = None) -> bool:
+        """
+        Whether the mirror holds as many rows as daily_summary records for
+        every stored date in [start, end]; a failed or skipped mirror write
+        makes it stale
+        """
+        query = ("SELECT region, date, row_count FROM daily_summary "
+                 "WHERE source_date IS NULL AND date BETWEEN ? AND ?")
+        params = [start, end]
+        if regions:
+            query += f" AND region IN ({', '.join('?' for _ in regions)})"
+            params += list(regions)
+        expected = {(region, date): count for region, date, count in conn.execute(query, params).fetchall()}
+
+        months = sorted({(region, date[:7]) for region, date in expected})
+        files = [str(path) for path in (self.month_file(region, month) for region, month in months)
+                 if path.exists()]
+        actual = {}
+        if files:
+            condition = (pc.field('date') >= start) & (pc.field('date') <= end)
+            table = ds.dataset(files, schema=mirror_schema(), format='parquet').to_table(
+                columns=['region', 'date'], filter=condition)
+            for row in table.group_by(['region', 'date']).aggregate([([], 'count_all')]).to_pylist():
+                actual[(row['region'], row['date'])] = row['count_all']
+        return actual == expected
+
+    def read(self, conn, start: str, end: str, columns: Optional[List[str]] = None,
+             regions: Optional[List[str]] = None, fund_code: Optional[str] = None) -> pd.DataFrame:
+        """
+        Rows of every calendar date in [start, end] (aliased dates included)
+        with only `columns`, optionally for one fund, in date, region and
+        fund_code order.
+        """
+        columns = list(columns or FUND_DATA_COLUMNS)
+        read_columns = list(dict.fromkeys(['date', 'region', 'fund_code'] + columns))
+
+        query = "SELECT region, source_date, date FROM daily_summary WHERE date BETWEEN ? AND ?"
+        params = [start, end]
+        if regions:
+            query += f" AND region IN ({', '.join('?' for _ in regions)})"
+            params += list(regions)
+        # Aliased dates are read from their source date's rows
+        dates = pd.DataFrame(conn.execute(query, params).fetchall(), columns=['region', 'source_date', 'date'])
+        dates['source_date'] = dates['source_date'].fillna(dates['date'])
+
+        files = [str(path) for path in (self.month_file(region, month) for region, month in
+                                        sorted(set(zip(dates['region'], dates['source_date'].str[:7]))))
+                 if path.exists()]
+        if not files:
+            return pd.DataFrame(columns=columns)
+
+        condition = pc.field('date').isin(sorted(set(dates['source_date'])))
+        if fund_code is not None:
+            condition = condition & (pc.field('fund_code') == fund_code)
+        table = ds.dataset(files, schema=mirror_schema(), format='parquet').to_table(
+            columns=read_columns, filter=condition)
+
+        df = table.to_pandas().rename(columns={'date': 'source_date'})
+        df = df.merge(dates, on=['region', 'source_date'])
+        return df.sort_values(['date', 'region', 'fund_code'], ignore_index=True)[columns]
+
+
+def main():
+    from db_connection import connect
+
+    parser = argparse.ArgumentParser(description='Rebuild the Parquet mirror of fund_data')
+    parser.add_argument('--db', default='/data/fund_data.db', help='SQLite database')
+    parser.add_argument('--dir', default='/data/columnar', help='Mirror directory')
+    args = parser.parse_args()
+
+    if not parquet_available():
+        parser.error('pyarrow is required for the columnar mirror')
+    conn = connect(args.db)
+    rows = ColumnarMirror(args.dir).rebuild(conn)
+    conn.close()
+    print(f"Wrote {rows:,} rows to {args.dir}")
+
+
+if __name__ == '__main__':
+    main()
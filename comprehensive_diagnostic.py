@@ -9,7 +9,7 @@ sys.path.append('/app')
 
 from fund_etl_pipeline import FundDataETL
 import pandas as pd
-import sqlite3
+from db_connection import connect
 from datetime import datetime, timedelta
 
 def comprehensive_diagnostic():
@@ -17,25 +17,25 @@ def comprehensive_diagnostic():
     print("=== Comprehensive Fund ETL Diagnostic ===\n")
     
     etl = FundDataETL('/config/config.json')
-    conn = sqlite3.connect(etl.db_path)
+    conn = connect(etl.db_path)
     
     # 1. Check database status
     print("1. DATABASE STATUS CHECK")
     print("-" * 60)
     
     # Count total records
-    total_query = "SELECT COUNT(*) as count, COUNT(DISTINCT fund_code) as funds FROM fund_data"
+    total_query = "SELECT COUNT(*) as count, COUNT(DISTINCT fund_code) as funds FROM fund_data_resolved"
     result = pd.read_sql_query(total_query, conn)
     print(f"Total records in database: {result.iloc[0]['count']:,}")
     print(f"Unique fund codes: {result.iloc[0]['funds']:,}")
     
     # Check date range
-    date_query = "SELECT MIN(date) as min_date, MAX(date) as max_date FROM fund_data"
+    date_query = "SELECT MIN(date) as min_date, MAX(date) as max_date FROM resolved_dates"
     dates = pd.read_sql_query(date_query, conn)
     print(f"Date range: {dates.iloc[0]['min_date']} to {dates.iloc[0]['max_date']}")
     
     # Check regions
-    region_query = "SELECT region, COUNT(*) as count FROM fund_data GROUP BY region"
+    region_query = "SELECT region, COUNT(*) as count FROM fund_data_resolved GROUP BY region"
     regions = pd.read_sql_query(region_query, conn)
     print("\nRecords by region:")
     for _, row in regions.iterrows():
@@ -47,7 +47,7 @@ def comprehensive_diagnostic():
     
     sample_query = """
     SELECT DISTINCT fund_code, fund_name 
-    FROM fund_data 
+    FROM fund_data_resolved 
     WHERE region = 'AMRS' 
     ORDER BY fund_code 
     LIMIT 10
@@ -89,7 +89,7 @@ def comprehensive_diagnostic():
     # Get all AMRS fund codes from database for any date
     db_funds_query = """
     SELECT DISTINCT fund_code 
-    FROM fund_data 
+    FROM fund_data_resolved 
     WHERE region = 'AMRS'
     """
     db_funds = pd.read_sql_query(db_funds_query, conn)['fund_code'].tolist()
@@ -140,7 +140,7 @@ def comprehensive_diagnostic():
     # Get database records for this date
     date_query = f"""
     SELECT fund_code, fund_name, share_class_assets, one_day_yield
-    FROM fund_data 
+    FROM fund_data_resolved 
     WHERE date = '{sample_date}' AND region = 'AMRS'
     LIMIT 5
     """
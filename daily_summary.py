@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Daily Summary
+Per (date, region) aggregates of the stored fund data: row count, distinct
+funds, completeness percentages and total/average share class assets, plus a
+fund_registry of the fund codes stored per region. Loads, carry-forward and
+lookback updates refresh only the slices they wrote, so the dashboard,
+telemetry and trend reports read a few rows per day of history instead of
+aggregating fund_data on every request.
+"""
+
+import logging
+from typing import Any, Dict, Iterable
+
+from date_alias import alias_dates_of, resolve_date
+from load_quality import COMPLETENESS_FIELDS
+from partitions import archived_condition, ensure_table as ensure_partitions_table
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_COLUMNS = (['row_count', 'unique_funds'] + list(COMPLETENESS_FIELDS)
+                   + ['total_assets', 'avg_assets'])
+
+CREATE_DAILY_SUMMARY_SQL = f"""
+CREATE TABLE IF NOT EXISTS daily_summary (
+    date DATE,
+    region TEXT,
+    source_date DATE,
+    row_count INTEGER,
+    unique_funds INTEGER,
+    {', '.join(f'{field} REAL' for field in COMPLETENESS_FIELDS)},
+    total_assets REAL,
+    avg_assets REAL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (date, region)
+)
+"""
+
+# Fund codes stored per region; a fund is dropped once its last stored row is deleted
+CREATE_FUND_REGISTRY_SQL = """
+CREATE TABLE IF NOT EXISTS fund_registry (
+    region TEXT,
+    fund_code TEXT,
+    first_date DATE,
+    last_date DATE,
+    PRIMARY KEY (region, fund_code)
+)
+"""
+
+# Aggregates of fund_data rows in SUMMARY_COLUMNS order
+_AGGREGATES = ', '.join(
+    ['COUNT(*)', 'COUNT(DISTINCT fund_code)']
+    + [f'100.0 * COUNT({column}) / COUNT(*)' for column in COMPLETENESS_FIELDS.values()]
+    + ['SUM(share_class_assets)', 'AVG(share_class_assets)'])
+
+_UPSERT_SQL = f"""
+INSERT OR REPLACE INTO daily_summary (date, region, source_date, {', '.join(SUMMARY_COLUMNS)})
+"""
+
+
+def ensure_table(cursor) -> bool:
+    """Create daily_summary and fund_registry; True when daily_summary is new"""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'daily_summary'")
+    created = cursor.fetchone() is None
+    cursor.execute(CREATE_DAILY_SUMMARY_SQL)
+    cursor.execute(CREATE_FUND_REGISTRY_SQL)
+    return created
+
+
+def _register_funds(cursor, where: str, params: list):
+    cursor.execute(f"""
+    INSERT INTO fund_registry (region, fund_code, first_date, last_date)
+    SELECT region, fund_code, MIN(date), MAX(date) FROM fund_data
+    WHERE {where} AND fund_code IS NOT NULL
+    GROUP BY region, fund_code
+    ON CONFLICT(region, fund_code) DO UPDATE SET
+        first_date = MIN(first_date, excluded.first_date),
+        last_date = MAX(last_date, excluded.last_date)
+    """, params)
+
+
+def _prune_registry(cursor, region: str, dates: list):
+    """
+    Drop registered funds, seen within the refreshed dates, that have no row
+    left in fund_data. Funds first seen in an archived month still have rows
+    in its partition and stay.
+    """
+    cursor.execute(f"""
+    DELETE FROM fund_registry
+    WHERE region = ? AND first_date <= ? AND last_date >= ?
+      AND NOT {archived_condition('fund_registry.first_date')}
+      AND NOT EXISTS (SELECT 1 FROM fund_data f
+                      WHERE f.fund_code = fund_registry.fund_code AND f.region = fund_registry.region)
+    """, (region, dates[-1], dates[0]))
+
+
+def _copy_row(cursor, region: str, source_date: str, date: str):
+    cursor.execute(f"""
+    {_UPSERT_SQL}
+    SELECT ?, region, ?, {', '.join(SUMMARY_COLUMNS)} FROM daily_summary
+    WHERE region = ? AND date = ?
+    """, (date, source_date, region, source_date))
+
+
+def refresh(cursor, region: str, dates: Iterable[str]):
+    """
+    Recompute the summary of the given stored dates and copy it to every date
+    aliased to them; aliased dates in `dates` take their source's summary.
+    """
+    ensure_table(cursor)
+    ensure_partitions_table(cursor)
+    dates = sorted(set(dates))
+    if not dates:
+        return
+    stored, aliased = [], {}
+    for date in dates:
+        source_date = resolve_date(cursor, region, date)
+        if source_date == date:
+            stored.append(date)
+        else:
+            aliased[date] = source_date
+
+    for date in stored:
+        cursor.execute(f"SELECT {_AGGREGATES} FROM fund_data WHERE region = ? AND date = ?", (region, date))
+        row = cursor.fetchone()
+        if row[0] == 0:
+            cursor.execute("DELETE FROM daily_summary WHERE region = ? AND date = ?", (region, date))
+            continue
+        cursor.execute(f"{_UPSERT_SQL} VALUES ({', '.join('?' for _ in range(len(SUMMARY_COLUMNS) + 3))})",
+                       (date, region, None) + tuple(row))
+        _register_funds(cursor, "region = ? AND date = ?", [region, date])
+    _prune_registry(cursor, region, dates)
+
+    for source_date, dates_of in alias_dates_of(cursor, region, stored).items():
+        aliased.update({date: source_date for date in dates_of})
+    for date, source_date in sorted(aliased.items()):
+        _copy_row(cursor, region, source_date, date)
+
+
+def rebuild(cursor):
+    """
+    Recompute every summary row and the fund registry from fund_data. Rows of
+    months archived to read-only partitions cannot change and are kept.
+    """
+    ensure_table(cursor)
+    ensure_partitions_table(cursor)
+    cursor.execute(f"DELETE FROM daily_summary WHERE NOT {archived_condition('daily_summary.date')}")
+    cursor.execute(f"""
+    {_UPSERT_SQL}
+    SELECT date, region, NULL, {_AGGREGATES} FROM fund_data GROUP BY date, region
+    """)
+    cursor.execute(f"""
+    {_UPSERT_SQL}
+    SELECT a.date, a.region, a.source_date, {', '.join(f's.{col}' for col in SUMMARY_COLUMNS)}
+    FROM date_alias a
+    JOIN daily_summary s ON s.region = a.region AND s.date = a.source_date
+    """)
+    cursor.execute(f"DELETE FROM fund_registry WHERE NOT {archived_condition('fund_registry.first_date')}")
+    _register_funds(cursor, "1 = 1", [])
+    cursor.execute("SELECT COUNT(*) FROM daily_summary")
+    logger.info(f"Rebuilt daily_summary: {cursor.fetchone()[0]} date/region rows")
+
+
+def totals(conn) -> Dict[str, Any]:
+    """
+    Whole-database figures from the summary: resolved and stored row counts,
+    distinct funds, date range and resolved rows per region.
+    """
+    cursor = conn.execute("""
+    SELECT COALESCE(SUM(row_count), 0),
+           COALESCE(SUM(CASE WHEN source_date IS NULL THEN row_count END), 0),
+           MIN(date), MAX(date)
+    FROM daily_summary
+    """)
+    records, stored_records, min_date, max_date = cursor.fetchone()
+    unique_funds = conn.execute("SELECT COUNT(DISTINCT fund_code) FROM fund_registry").fetchone()[0]
+    regions = dict(conn.execute("SELECT region, SUM(row_count) FROM daily_summary "
+                                "GROUP BY region ORDER BY region").fetchall())
+    return {'records': records, 'stored_records': stored_records, 'unique_funds': unique_funds,
+            'min_date': min_date, 'max_date': max_date, 'region_records': regions}
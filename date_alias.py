@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Date Aliases
+Weekend and carried-forward dates are stored as rows of date_alias pointing
+at the business date whose data they repeat, instead of as physical copies in
+fund_data. The fund_data_resolved view adds the aliased dates back, so readers
+see every calendar date while loads, lookback corrections and storage only
+touch business days. A correction to Friday's rows is visible on Saturday and
+Sunday without another write.
+
+A date is either physical (rows in fund_data) or aliased, never both, and an
+alias always points at a physical date.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+RESOLVED_VIEW = 'fund_data_resolved'
+DATES_VIEW = 'resolved_dates'
+
+CREATE_DATE_ALIAS_SQL = """
+CREATE TABLE IF NOT EXISTS date_alias (
+    date DATE,
+    region TEXT,
+    source_date DATE,
+    reason TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (date, region)
+)
+"""
+
+
+def _fund_data_columns(cursor) -> List[str]:
+    cursor.execute("PRAGMA table_info(fund_data)")
+    return [row[1] for row in cursor.fetchall()]
+
+
+def ensure_schema(cursor) -> bool:
+    """Create date_alias and (re)create the resolved views; True when the table is new"""
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'date_alias'")
+    created = cursor.fetchone() is None
+    cursor.execute(CREATE_DATE_ALIAS_SQL)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_date_alias_source
+    ON date_alias(region, source_date)
+    """)
+
+    # The view lists fund_data's columns explicitly, so it is rebuilt with the table
+    columns = _fund_data_columns(cursor)
+    aliased = ', '.join('a.date' if col == 'date' else f'f.{col}' for col in columns)
+    cursor.execute(f"DROP VIEW IF EXISTS {RESOLVED_VIEW}")
+    cursor.execute(f"""
+    CREATE VIEW {RESOLVED_VIEW} AS
+    SELECT {', '.join(columns)} FROM fund_data
+    UNION ALL
+    SELECT {aliased}
+    FROM date_alias a
+    JOIN fund_data f ON f.region = a.region AND f.date = a.source_date
+    """)
+
+    # Dates only, for MAX(date)/missing-date checks that need not read any rows.
+    # Stored and aliased dates never overlap, so UNION ALL is exact.
+    cursor.execute(f"DROP VIEW IF EXISTS {DATES_VIEW}")
+    cursor.execute(f"""
+    CREATE VIEW {DATES_VIEW} AS
+    SELECT DISTINCT region, date FROM fund_data
+    UNION ALL
+    SELECT region, date FROM date_alias
+    """)
+    return created
+
+
+def set_aliases(cursor, region: str, dates: Iterable[str], source_date: str, reason: str) -> int:
+    """
+    Point dates at source_date, removing any physical rows stored under them.
+    Aliases that pointed at one of the dates follow it to source_date.
+    Returns the number of physical rows removed.
+    """
+    # Keep aliases one hop deep: source_date may itself be an alias
+    source_date = resolve_date(cursor, region, source_date)
+    dates = [date for date in sorted(set(dates)) if date != source_date]
+    if not dates:
+        return 0
+    placeholders = ', '.join('?' for _ in dates)
+
+    cursor.execute(f"DELETE FROM fund_data WHERE region = ? AND date IN ({placeholders})",
+                   [region] + dates)
+    removed = cursor.rowcount
+    cursor.execute(f"UPDATE date_alias SET source_date = ? WHERE region = ? AND source_date IN ({placeholders})",
+                   [source_date, region] + dates)
+    cursor.executemany("""
+    INSERT OR REPLACE INTO date_alias (date, region, source_date, reason)
+    VALUES (?, ?, ?, ?)
+    """, [(date, region, source_date, reason) for date in dates])
+    return removed
+
+
+def clear_aliases(cursor, region: str, dates: Iterable[str]):
+    """Drop aliases for dates about to be written physically"""
+    dates = sorted(set(dates))
+    if dates:
+        cursor.execute(f"DELETE FROM date_alias WHERE region = ? AND date IN ({', '.join('?' for _ in dates)})",
+                       [region] + dates)
+
+
+def resolve_date(cursor, region: str, date: str) -> str:
+    """Business date whose rows are shown for date (date itself when it is physical)"""
+    cursor.execute("SELECT source_date FROM date_alias WHERE region = ? AND date = ?", (region, date))
+    row = cursor.fetchone()
+    return row[0] if row else date
+
+
+def alias_dates_of(cursor, region: str, source_dates: Iterable[str]) -> Dict[str, List[str]]:
+    """Aliased dates grouped by the source date they resolve to"""
+    source_dates = sorted(set(source_dates))
+    if not source_dates:
+        return {}
+    cursor.execute(f"""
+    SELECT source_date, date FROM date_alias
+    WHERE region = ? AND source_date IN ({', '.join('?' for _ in source_dates)})
+    ORDER BY date
+    """, [region] + source_dates)
+    aliases = {}
+    for source_date, date in cursor.fetchall():
+        aliases.setdefault(source_date, []).append(date)
+    return aliases
+
+
+def materialize(cursor, region: str, dates: Iterable[str]) -> int:
+    """
+    Turn aliased dates back into physical rows, for corrections that apply to
+    one date only (e.g. a lookback revising a carried-forward holiday).
+    Returns the number of rows written.
+    """
+    columns = [col for col in _fund_data_columns(cursor) if col not in ('date', 'created_at')]
+    written = 0
+    for date in sorted(set(dates)):
+        source_date = resolve_date(cursor, region, date)
+        if source_date == date:
+            continue
+        cursor.execute(f"""
+        INSERT INTO fund_data (date, {', '.join(columns)})
+        SELECT ?, {', '.join(columns)} FROM fund_data
+        WHERE region = ? AND date = ?
+        """, (date, region, source_date))
+        written += cursor.rowcount
+        clear_aliases(cursor, region, [date])
+    return written
+
+
+def _latest_physical_date(cursor, region: str, before: str) -> Optional[str]:
+    cursor.execute("""
+    SELECT MAX(date) FROM fund_data WHERE region = ? AND date < ?
+    """, (region, before))
+    return cursor.fetchone()[0]
+
+
+def _same_rows(cursor, region: str, date: str, source_date: str, columns: List[str]) -> bool:
+    select = f"SELECT {', '.join(columns)} FROM fund_data WHERE region = ? AND date = ?"
+    for first, second in ((date, source_date), (source_date, date)):
+        cursor.execute(f"SELECT EXISTS ({select} EXCEPT {select})", (region, first, region, second))
+        if cursor.fetchone()[0]:
+            return False
+    return True
+
+
+def virtualize_copies(cursor) -> int:
+    """
+    One-time migration of databases written before date_alias existed:
+    weekend and carried-forward dates whose rows are an exact copy of the
+    previous stored date become aliases. Returns the number of rows removed.
+    """
+    columns = [col for col in _fund_data_columns(cursor) if col not in ('date', 'created_at')]
+    cursor.execute("""
+    SELECT DISTINCT region, date FROM fund_data
+    WHERE strftime('%w', date) IN ('0', '6')
+    UNION
+    SELECT DISTINCT region, file_date FROM etl_log WHERE status = 'CARRIED_FORWARD'
+    ORDER BY 1, 2
+    """)
+    candidates = cursor.fetchall()
+
+    removed = 0
+    for region, date in candidates:
+        source_date = _latest_physical_date(cursor, region, date)
+        if source_date is None or not _same_rows(cursor, region, date, source_date, columns):
+            continue
+        reason = 'weekend' if _is_weekend(date) else 'carry_forward'
+        removed += set_aliases(cursor, region, [date], source_date, reason)
+
+    if removed:
+        logger.info(f"Replaced {removed} copied weekend/carry-forward rows with date aliases")
+    return removed
+
+
+def _is_weekend(date: str) -> bool:
+    return datetime.strptime(date[:10], '%Y-%m-%d').weekday() >= 5
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Database Connections
+Shared SQLite connection manager for the pipeline, monitor, UI and workflow
+tracker. Connections are opened with WAL journaling and tuned pragmas, so UI
+readers are not blocked while a daily load commits, and are pooled per thread:
+conn.close() hands the connection back to the calling thread's pool instead of
+closing it, and the next connect() for the same database reuses it.
+
+With read_only=True a database is opened immutable (no locks, no WAL), for
+snapshot files that are replaced rather than written; a swapped-in file is
+picked up because pooled connections to a replaced file are discarded.
+
+Every connection accepts URI filenames, also in ATTACH DATABASE; build them
+with sqlite_uri().
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+from urllib.request import pathname2url
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size_kb': 65536,
+    'mmap_size_mb': 256,
+    'temp_store': 'MEMORY',
+    'busy_timeout_ms': 30000,
+    # Idle connections kept per thread and database
+    'pool_size': 2,
+    # Open the file immutable and read-only (published snapshots)
+    'read_only': False
+}
+
+READ_ONLY_SETTINGS = {'read_only': True}
+
+_local = threading.local()
+_registry_lock = threading.Lock()
+_registry: 'weakref.WeakSet[PooledConnection]' = weakref.WeakSet()
+
+
+def _key(db_path) -> str:
+    return os.path.abspath(str(db_path))
+
+
+def sqlite_uri(path, **params) -> str:
+    """file: URI of a database path, e.g. sqlite_uri(path, mode='ro')"""
+    query = '&'.join(f"{name}={value}" for name, value in params.items())
+    return f"file:{pathname2url(os.path.abspath(str(path)))}" + (f"?{query}" if query else '')
+
+
+def _identity(path: str):
+    """(device, inode) of the database file, None when it does not exist yet"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() returns it to the calling thread's pool"""
+
+    def close(self):
+        if not _release(self):
+            self.discard()
+
+    def discard(self):
+        """Really close the connection"""
+        self.pool_key = None
+        with _registry_lock:
+            _registry.discard(self)
+        sqlite3.Connection.close(self)
+
+
+def _pool(key: str) -> list:
+    pools = getattr(_local, 'pools', None)
+    if pools is None:
+        pools = _local.pools = {}
+    return pools.setdefault(key, [])
+
+
+def _release(conn: PooledConnection) -> bool:
+    """Put a connection back in its pool; False when it should be closed instead"""
+    key = getattr(conn, 'pool_key', None)
+    if key is None or conn.pid != os.getpid() or conn.thread_id != threading.get_ident():
+        return False
+
+    pool = _pool(conn.pool_name)
+    if conn in pool:
+        return True  # closed twice
+    if len(pool) >= conn.settings['pool_size'] or _identity(key) != conn.identity:
+        return False
+
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+    except sqlite3.Error:
+        return False
+    conn.row_factory = None
+    pool.append(conn)
+    return True
+
+
+def _apply_pragmas(conn: sqlite3.Connection, settings: Dict[str, Any]):
+    # Read-only snapshots have nothing to journal or lock
+    if not settings['read_only']:
+        conn.execute(f"PRAGMA busy_timeout = {int(settings['busy_timeout_ms'])}")
+        try:
+            mode = conn.execute(f"PRAGMA journal_mode = {settings['journal_mode']}").fetchone()[0]
+            if mode.upper() != str(settings['journal_mode']).upper():
+                logger.debug(f"SQLite kept journal_mode={mode} (requested {settings['journal_mode']})")
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Could not set journal_mode={settings['journal_mode']}: {e}")
+        conn.execute(f"PRAGMA synchronous = {settings['synchronous']}")
+    # Negative cache_size is in KiB rather than pages
+    conn.execute(f"PRAGMA cache_size = {-int(settings['cache_size_kb'])}")
+    conn.execute(f"PRAGMA mmap_size = {int(settings['mmap_size_mb']) * 1024 * 1024}")
+    conn.execute(f"PRAGMA temp_store = {settings['temp_store']}")
+
+
+def connect(db_path, settings: Optional[Dict[str, Any]] = None) -> sqlite3.Connection:
+    """
+    Connection to db_path from this thread's pool, or a new one with the
+    manager's pragmas. settings override DEFAULT_SETTINGS for new connections.
+    """
+    key = _key(db_path)
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+
+    if db_path == ':memory:' or str(db_path).startswith('file:'):
+        return sqlite3.connect(db_path, timeout=settings['busy_timeout_ms'] / 1000, uri=True)
+
+    # Read-only and read-write connections to a file are pooled apart
+    pool_name = f"{key}?mode=ro" if settings['read_only'] else key
+    pool = _pool(pool_name)
+    identity = _identity(key)
+    while pool:
+        conn = pool.pop()
+        if conn.pool_key is None:
+            continue  # closed by close_all
+        if conn.identity == identity:
+            return conn
+        # The database file was replaced or removed since this connection was opened
+        conn.discard()
+
+    if settings['read_only']:
+        conn = sqlite3.connect(sqlite_uri(key, mode='ro', immutable=1), uri=True,
+                               factory=PooledConnection, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(sqlite_uri(key), timeout=settings['busy_timeout_ms'] / 1000, uri=True,
+                               factory=PooledConnection, check_same_thread=False)
+    _apply_pragmas(conn, settings)
+    conn.pool_key = key
+    conn.pool_name = pool_name
+    conn.settings = settings
+    conn.pid = os.getpid()
+    conn.thread_id = threading.get_ident()
+    conn.identity = _identity(key)
+    with _registry_lock:
+        _registry.add(conn)
+    return conn
+
+
+@contextmanager
+def transaction(db_path, settings: Optional[Dict[str, Any]] = None) -> Iterator[sqlite3.Connection]:
+    """Pooled connection that commits on success, rolls back on error and is then released"""
+    conn = connect(db_path, settings)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def close_all(db_path=None):
+    """
+    Close pooled connections (all threads) to db_path, or to every database.
+    Call before deleting or replacing a database file.
+    """
+    key = _key(db_path) if db_path is not None else None
+    with _registry_lock:
+        connections = [conn for conn in _registry if key is None or conn.pool_key == key]
+    for conn in connections:
+        try:
+            conn.discard()
+        except sqlite3.Error as e:
+            logger.debug(f"Error closing pooled connection: {e}")
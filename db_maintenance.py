@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Database Maintenance
+Keeps the SQLite database fast and compact between loads: refreshes planner
+statistics, releases free pages with incremental_vacuum inside a time budget,
+checkpoints the WAL so the file shrinks, and checks integrity. Every step
+is recorded in maintenance_log with its duration and the database/WAL file
+sizes before and after, which the dashboard shows.
+
+The scheduler runs the light variant after successful loads (PRAGMA
+optimize, passive checkpoint, quick_check) and the weekly variant once its
+interval has passed (full ANALYZE, truncating checkpoint, integrity_check).
+A database created without auto_vacuum=INCREMENTAL is converted by the
+weekly run with one full VACUUM, after which free pages can be reclaimed in
+small steps.
+
+Only sqlite3 is imported so the scheduler stays light to start.
+
+Usage: python db_maintenance.py [--db /data/fund_data.db] [--weekly] [--budget 30]
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from db_connection import connect
+
+logger = logging.getLogger(__name__)
+
+# sqlite auto_vacuum modes
+AUTO_VACUUM_INCREMENTAL = 2
+
+DEFAULT_SETTINGS = {
+    'vacuum_budget_seconds': 30,
+    'vacuum_pages_per_step': 1024,
+    'weekly_interval_days': 7,
+    # Run the one-time VACUUM that switches an existing database to incremental vacuum
+    'convert_auto_vacuum': True
+}
+
+CREATE_MAINTENANCE_LOG_SQL = """
+CREATE TABLE IF NOT EXISTS maintenance_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_started TIMESTAMP,
+    trigger TEXT,
+    step TEXT,
+    status TEXT,
+    duration_ms REAL,
+    db_bytes_before INTEGER,
+    db_bytes_after INTEGER,
+    wal_bytes_before INTEGER,
+    wal_bytes_after INTEGER,
+    free_pages_before INTEGER,
+    free_pages_after INTEGER,
+    detail TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+def ensure_table(cursor):
+    cursor.execute(CREATE_MAINTENANCE_LOG_SQL)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_maintenance_log_trigger
+    ON maintenance_log(trigger, run_started)
+    """)
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _pragma(conn, name: str):
+    return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+class MaintenanceRun:
+    """One maintenance run; each step is timed, measured and logged"""
+
+    def __init__(self, db_path: str, trigger: str, settings: Optional[Dict[str, Any]] = None):
+        self.db_path = os.path.abspath(db_path)
+        self.trigger = trigger
+        self.settings = {**DEFAULT_SETTINGS, **(settings or {})}
+        self.started = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.steps: List[Dict[str, Any]] = []
+        self.conn = connect(self.db_path)
+        ensure_table(self.conn.cursor())
+        self.conn.commit()
+
+    def _sizes(self) -> Dict[str, int]:
+        return {'db_bytes': _file_size(self.db_path), 'wal_bytes': _file_size(self.db_path + '-wal'),
+                'free_pages': _pragma(self.conn, 'freelist_count')}
+
+    def step(self, name: str, func) -> Dict[str, Any]:
+        """Run func(conn) -> (status, detail) and log it; errors are logged, not raised"""
+        before = self._sizes()
+        started = time.perf_counter()
+        try:
+            status, detail = func(self.conn)
+        except sqlite3.Error as e:
+            status, detail = 'FAILED', str(e)
+            logger.error(f"Maintenance step {name} failed: {e}")
+        duration_ms = (time.perf_counter() - started) * 1000
+        after = self._sizes()
+
+        result = {'step': name, 'status': status, 'duration_ms': round(duration_ms, 1), 'detail': detail,
+                  **{f'{key}_before': value for key, value in before.items()},
+                  **{f'{key}_after': value for key, value in after.items()}}
+        self.conn.execute("""
+        INSERT INTO maintenance_log (run_started, trigger, step, status, duration_ms,
+            db_bytes_before, db_bytes_after, wal_bytes_before, wal_bytes_after,
+            free_pages_before, free_pages_after, detail)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (self.started, self.trigger, name, status, result['duration_ms'],
+              before['db_bytes'], after['db_bytes'], before['wal_bytes'], after['wal_bytes'],
+              before['free_pages'], after['free_pages'], detail))
+        self.conn.commit()
+        self.steps.append(result)
+        logger.info(f"Maintenance {name}: {status} in {duration_ms:.0f} ms ({detail})")
+        return result
+
+    def close(self):
+        self.conn.close()
+
+
+def _statistics(full: bool):
+    def run(conn):
+        if full:
+            conn.execute("ANALYZE")
+            return 'OK', 'ANALYZE'
+        # Only re-analyzes tables whose statistics are stale
+        conn.execute("PRAGMA optimize")
+        return 'OK', 'PRAGMA optimize'
+    return run
+
+
+def _checkpoint(mode: str):
+    def run(conn):
+        busy, log_frames, checkpointed = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        if log_frames == -1:
+            return 'SKIPPED', 'not in WAL mode'
+        # Busy means a reader kept the WAL from being fully copied back; the next run retries
+        return ('PARTIAL' if busy else 'OK'), f"{mode}: {checkpointed}/{log_frames} frames"
+    return run
+
+
+def _incremental_vacuum(budget_seconds: float, pages_per_step: int, convert: bool):
+    def run(conn):
+        if _pragma(conn, 'auto_vacuum') != AUTO_VACUUM_INCREMENTAL:
+            if not convert:
+                return 'SKIPPED', 'auto_vacuum is not INCREMENTAL'
+            # Switching modes needs one full rebuild of the file
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+            return 'OK', 'converted to auto_vacuum=INCREMENTAL with VACUUM'
+
+        deadline = time.perf_counter() + budget_seconds
+        freed = 0
+        while time.perf_counter() < deadline:
+            free_pages = _pragma(conn, 'freelist_count')
+            if free_pages == 0:
+                break
+            # executescript steps the pragma to completion; execute() frees a single page
+            conn.executescript(f"PRAGMA incremental_vacuum({pages_per_step});")
+            freed += free_pages - _pragma(conn, 'freelist_count')
+        remaining = _pragma(conn, 'freelist_count')
+        return ('OK' if remaining == 0 else 'PARTIAL'), f"{freed} pages freed, {remaining} left"
+    return run
+
+
+def _integrity(full: bool):
+    def run(conn):
+        pragma = 'integrity_check' if full else 'quick_check'
+        problems = [row[0] for row in conn.execute(f"PRAGMA {pragma}(20)").fetchall()]
+        if problems == ['ok']:
+            return 'OK', pragma
+        return 'FAILED', f"{pragma}: " + '; '.join(problems)
+    return run
+
+
+def run_maintenance(db_path: str, weekly: bool = False, settings: Optional[Dict[str, Any]] = None,
+                    trigger: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Run the post-load (or weekly) steps on db_path and return their logged
+    results. Steps continue after a failure so each one is recorded.
+    """
+    run = MaintenanceRun(db_path, trigger or ('weekly' if weekly else 'post_load'), settings)
+    try:
+        run.step('analyze' if weekly else 'optimize', _statistics(weekly))
+        run.step('incremental_vacuum', _incremental_vacuum(
+            run.settings['vacuum_budget_seconds'], run.settings['vacuum_pages_per_step'],
+            weekly and run.settings['convert_auto_vacuum']))
+        # After the vacuum, so its page moves reach the database file and it shrinks
+        run.step('checkpoint', _checkpoint('TRUNCATE' if weekly else 'PASSIVE'))
+        run.step('integrity_check', _integrity(weekly))
+    finally:
+        run.close()
+
+    total_ms = sum(step['duration_ms'] for step in run.steps)
+    change = run.steps[-1]['db_bytes_after'] - run.steps[0]['db_bytes_before']
+    logger.info(f"{run.trigger} maintenance finished in {total_ms:.0f} ms, database {change:+,} bytes")
+    return run.steps
+
+
+def recent_runs(conn, limit: int = 10) -> List[Dict[str, Any]]:
+    """Latest runs, one entry per run with total duration, size change and step statuses"""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'maintenance_log'").fetchone() is None:
+        return []
+    rows = conn.execute("""
+    SELECT run_started, trigger, SUM(duration_ms),
+        (SELECT db_bytes_before FROM maintenance_log f
+         WHERE f.run_started = m.run_started AND f.trigger = m.trigger ORDER BY id LIMIT 1),
+        (SELECT db_bytes_after FROM maintenance_log l
+         WHERE l.run_started = m.run_started AND l.trigger = m.trigger ORDER BY id DESC LIMIT 1),
+        SUM(status = 'FAILED'),
+        GROUP_CONCAT(step || ' ' || status, ', ')
+    FROM maintenance_log m
+    GROUP BY run_started, trigger
+    ORDER BY run_started DESC
+    LIMIT ?
+    """, (limit,)).fetchall()
+    return [{'run_started': started, 'trigger': trigger, 'duration_ms': round(duration_ms or 0, 1),
+             'db_bytes_before': before, 'db_bytes_after': after, 'failed': bool(failed), 'steps': steps}
+            for started, trigger, duration_ms, before, after, failed, steps in rows]
+
+
+def weekly_due(db_path: str, interval_days: int = DEFAULT_SETTINGS['weekly_interval_days'],
+               now: Optional[datetime] = None) -> bool:
+    """True when no weekly run is logged within interval_days"""
+    conn = connect(db_path)
+    try:
+        ensure_table(conn.cursor())
+        last = conn.execute("""
+        SELECT MAX(run_started) FROM maintenance_log WHERE trigger = 'weekly'
+        """).fetchone()[0]
+    finally:
+        conn.close()
+    if last is None:
+        return True
+    now = now or datetime.now()
+    return datetime.strptime(last, '%Y-%m-%d %H:%M:%S') <= now - timedelta(days=interval_days)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run database maintenance')
+    parser.add_argument('--db', default='/data/fund_data.db', help='SQLite database')
+    parser.add_argument('--weekly', action='store_true', help='Full ANALYZE, truncating checkpoint and integrity check')
+    parser.add_argument('--budget', type=float, default=DEFAULT_SETTINGS['vacuum_budget_seconds'],
+                        help='Seconds incremental_vacuum may run')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    steps = run_maintenance(args.db, args.weekly, {'vacuum_budget_seconds': args.budget},
+                            trigger='weekly' if args.weekly else 'manual')
+    for step in steps:
+        print(f"{step['step']:<20} {step['status']:<8} {step['duration_ms']:>10.1f} ms  "
+              f"{step['db_bytes_after'] - step['db_bytes_before']:>+14,} bytes  {step['detail']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -9,7 +9,7 @@ sys.path.append('/app')
 
 from fund_etl_pipeline import FundDataETL
 import pandas as pd
-import sqlite3
+from db_connection import connect
 from datetime import datetime
 
 def diagnose_validation_issues():
@@ -35,9 +35,9 @@ def diagnose_validation_issues():
     print(f"\n2. Using sample date: {sample_date}")
     
     # Get data from database for this date
-    conn = sqlite3.connect(etl.db_path)
+    conn = connect(etl.db_path)
     db_query = f"""
-    SELECT * FROM fund_data 
+    SELECT * FROM fund_data_resolved 
     WHERE date = '{sample_date.strftime('%Y-%m-%d')}' 
     AND region = '{region}'
     LIMIT 5
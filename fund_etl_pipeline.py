@@ -7,16 +7,41 @@ Now includes selective update capability for validation to only update materiall
 """
 
 import os
-import sqlite3
+import hashlib
+import itertools
+import multiprocessing
 import pandas as pd
 import numpy as np
+from pandas.api.types import infer_dtype
 from datetime import datetime, timedelta
-import requests
 import logging
 from typing import Dict, List, Tuple, Optional, Any
-import holidays
 import json
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from parsed_file_cache import ParsedFileCache
+from columnar_mirror import ColumnarMirror
+from query_catalog import apply_index_migrations
+from bulk_loader import FUND_DATA_COLUMNS, SliceUpsert, format_counts, upsert_frame
+from business_calendar import get_calendar
+from date_alias import (RESOLVED_VIEW, alias_dates_of, ensure_schema as ensure_date_alias_schema,
+                        materialize, resolve_date, set_aliases, virtualize_copies)
+from daily_summary import (ensure_table as ensure_summary_table, rebuild as rebuild_summary,
+                           refresh as refresh_summary)
+from db_connection import connect
+from lookback_compare import LOOKBACK_FIELDS, change_records, compare_frames
+from lookback_reconcile import reconcile
+from load_quality import (copy_profile, ensure_table as ensure_load_quality_table, merge_profiles,
+                          profile_frame, refresh_profiles, save_profile)
+from partitions import archive_closed_months, check_open, ensure_table as ensure_partitions_table
+from snapshot import publish_snapshot
+from row_fingerprint import (LOOKBACK_COLUMNS, ROW_HASH_COLUMN, day_digests, drifted,
+                             ensure_schema as ensure_fingerprint_schema, rebuild as rebuild_fingerprints,
+                             refresh as refresh_digests, row_hashes, stored_digests)
+from revision_log import (REVISION_FIELDS, apply_revisions, diff_stored, ensure_table as ensure_revisions_table,
+                          record as record_revisions, update_rows)
+from transform_plan import ReadPlan, TransformPlan, categorize, is_typed, schema_key
 
 # Configure logging
 logging.basicConfig(
@@ -42,11 +67,20 @@ class FundDataETL:
         """Initialize ETL with configuration"""
         self.config = self._load_config(config_path)
         self.db_path = self.config.get('db_path', '/data/fund_data.db')
+        # Overrides for db_connection.DEFAULT_SETTINGS (cache_size_kb, mmap_size_mb, busy_timeout_ms, ...)
+        self.db_settings = self.config.get('database', {})
         self.data_dir = Path(self.config.get('data_dir', '/data'))
         self.data_dir.mkdir(exist_ok=True)
         
-        # Initialize US holidays (AMRS)
-        self.us_holidays = holidays.US(years=range(2020, 2030))
+        # Business-day calendars per region (holiday country), cached under data_dir
+        calendar_config = self.config.get('calendar', {})
+        calendar_dir = calendar_config.get('cache_dir', str(self.data_dir / 'cache' / 'calendar'))
+        self.calendars = {
+            region: get_calendar(country, calendar_dir)
+            for region, country in calendar_config.get('regions', {'AMRS': 'US', 'EMEA': 'US'}).items()
+        }
+        # Run dates follow the AMRS (US) calendar
+        self.calendar = self.calendars.get('AMRS') or get_calendar('US', calendar_dir)
         
         # Expected columns based on file analysis
         self.expected_columns = [
@@ -60,6 +94,37 @@ class FundDataETL:
             'Daily Liquidity (%)', 'Weekly Liquidity (%)', 'Fees', 'Gates'
         ]
         
+        # Rows per chunk when streaming XLSX files
+        self.read_chunk_size = self.config.get('read_chunk_size', 5000)
+        
+        # Final dtypes given to each chunk as it is read (float64 financials, stripped text)
+        self.read_plan = ReadPlan(self.expected_columns)
+        
+        # Compiled transform plans keyed by input schema
+        self._transform_plans = {}
+        
+        # Content-addressed cache of parsed workbooks, shared by every reader of a file
+        cache_config = self.config.get('parsed_cache', {})
+        self.parsed_cache = ParsedFileCache(
+            cache_config.get('cache_dir', str(self.data_dir / 'cache' / 'parsed')),
+            max_age_days=cache_config.get('max_age_days', 14),
+            max_size_mb=cache_config.get('max_size_mb', 512),
+            enabled=cache_config.get('enabled', True)
+        )
+        
+        # Closed months of fund_data move to read-only monthly partition files
+        self.partition_config = self.config.get('partitions', {})
+        
+        # Read-only copy of the database published for the UI after each run
+        self.snapshot_config = self.config.get('snapshot', {})
+        
+        # Parquet copy of fund_data for long-range history and exports
+        mirror_config = self.config.get('columnar_mirror', {})
+        self.columnar_mirror = ColumnarMirror(
+            mirror_config.get('dir', str(self.data_dir / 'columnar')),
+            enabled=mirror_config.get('enabled', False)
+        )
+        
     def _load_config(self, config_path: str) -> dict:
         """Load configuration from JSON file"""
         try:
@@ -76,16 +141,13 @@ class FundDataETL:
                 'data_dir': '/data'
             }
     
-    def is_business_day(self, date: datetime) -> bool:
-        """Check if date is a US business day (not weekend or holiday)"""
-        return date.weekday() < 5 and date not in self.us_holidays
+    def is_business_day(self, date: datetime, region: Optional[str] = None) -> bool:
+        """Check if date is a business day (not weekend or holiday), on the US calendar by default"""
+        return self.calendars.get(region, self.calendar).is_business_day(date)
     
-    def get_prior_business_day(self, date: datetime) -> datetime:
+    def get_prior_business_day(self, date: datetime, region: Optional[str] = None) -> datetime:
         """Get the prior business day for a given date"""
-        prior_date = date - timedelta(days=1)
-        while not self.is_business_day(prior_date):
-            prior_date -= timedelta(days=1)
-        return prior_date
+        return self.calendars.get(region, self.calendar).prior_business_day(date)
     
     def download_file(self, url: str, region: str, date: datetime) -> Optional[str]:
         """
@@ -171,32 +233,48 @@ class FundDataETL:
         Validate dataframe structure and data quality
         Returns: (is_valid, list_of_issues)
         """
+        stats = self._collect_quality_stats(df)
+        return self._evaluate_quality_stats(stats, region)
+    
+    def _collect_quality_stats(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Gather the counts validate_dataframe needs from one frame (or one chunk).
+        Stats from several chunks can be combined with _merge_quality_stats.
+        """
+        # Clean whitespace from all string columns (the read plan already stripped typed frames)
+        for col in ([] if is_typed(df) else df.columns):
+            if df[col].dtype == 'object' and infer_dtype(df[col], skipna=True) in ('string', 'mixed', 'mixed-integer'):
+                stripped = df[col].str.strip()
+                # Non-string cells come back as NaN from .str and keep their value
+                df[col] = stripped.where(stripped.notna(), df[col])
+        
+        # Empty rows, null counts, fund code counts and date range in one pass
+        return profile_frame(df)
+    
+    def _merge_quality_stats(self, total: Optional[Dict[str, Any]], chunk: Dict[str, Any]) -> Dict[str, Any]:
+        """Fold one chunk's quality stats into a running total"""
+        return merge_profiles(total, chunk)
+    
+    def _evaluate_quality_stats(self, stats: Dict[str, Any], region: str) -> Tuple[bool, List[str]]:
+        """Turn accumulated quality stats into (is_valid, list_of_issues)"""
         issues = []
         
-        # Clean whitespace from all string columns
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                df[col] = df[col].apply(lambda x: x.strip() if isinstance(x, str) else x)
-        
         # Check if all expected columns are present
-        missing_cols = set(self.expected_columns) - set(df.columns)
+        missing_cols = set(self.expected_columns) - stats['columns']
         if missing_cols:
             issues.append(f"Missing columns: {missing_cols}")
         
         # Check if dataframe is empty
-        if len(df) == 0:
+        if stats['total_rows'] == 0:
             issues.append("Dataframe is empty")
             return False, issues
         
         # Check for completely empty rows
-        empty_rows = df.isna().all(axis=1).sum()
-        if empty_rows > 0:
-            issues.append(f"Found {empty_rows} completely empty rows")
-            df = df.dropna(how='all')
+        if stats['empty_rows'] > 0:
+            issues.append(f"Found {stats['empty_rows']} completely empty rows")
         
         # Check for duplicate primary keys (now that #MULTIVALUE has been handled)
-        duplicate_keys = df.groupby(['Fund Code']).size()
-        duplicates = duplicate_keys[duplicate_keys > 1]
+        duplicates = stats['fund_code_counts'][stats['fund_code_counts'] > 1]
         
         if len(duplicates) > 0:
             issues.append(f"Found {len(duplicates)} duplicate Fund Codes")
@@ -204,28 +282,29 @@ class FundDataETL:
         # Check required columns for null values
         required_cols = ['Date', 'Fund Code', 'Fund Name', 'Currency']
         for col in required_cols:
-            if col in df.columns:
-                null_count = df[col].isna().sum()
-                if null_count > 0:
-                    issues.append(f"Column '{col}' has {null_count} null values")
+            null_count = stats['null_counts'].get(col, 0)
+            if null_count > 0:
+                issues.append(f"Column '{col}' has {null_count} null values")
+        
+        rows = stats['rows']
         
         # Region-specific validation
-        if region == 'EMEA':
-            # EMEA typically has more missing NASDAQ values (expected)
-            nasdaq_missing = df['NASDAQ'].isna().sum() / len(df)
-            if nasdaq_missing < 0.9:
-                logger.info(f"EMEA: {nasdaq_missing:.1%} NASDAQ values missing (expected ~100%)")
-        else:  # US
-            # US should have most NASDAQ values populated
-            nasdaq_missing = df['NASDAQ'].isna().sum() / len(df)
-            if nasdaq_missing > 0.1:
-                issues.append(f"US: High proportion of missing NASDAQ values ({nasdaq_missing:.1%})")
+        if 'NASDAQ' in stats['null_counts'] and rows > 0:
+            nasdaq_missing = stats['null_counts']['NASDAQ'] / rows
+            if region == 'EMEA':
+                # EMEA typically has more missing NASDAQ values (expected)
+                if nasdaq_missing < 0.9:
+                    logger.info(f"EMEA: {nasdaq_missing:.1%} NASDAQ values missing (expected ~100%)")
+            else:  # US
+                # US should have most NASDAQ values populated
+                if nasdaq_missing > 0.1:
+                    issues.append(f"US: High proportion of missing NASDAQ values ({nasdaq_missing:.1%})")
         
         # Data quality metrics
         logger.info(f"\n{region} Data Quality Metrics:")
-        logger.info(f"Total rows: {len(df)}")
-        logger.info(f"Unique funds: {df['Fund Code'].nunique()}")
-        logger.info(f"Date range: {df['Date'].min()} to {df['Date'].max()}")
+        logger.info(f"Total rows: {rows}")
+        logger.info(f"Unique funds: {len(stats['fund_code_counts'])}")
+        logger.info(f"Date range: {stats['min_date']} to {stats['max_date']}")
         
         # Calculate missing data percentages for key financial columns
         financial_cols = [
@@ -234,19 +313,19 @@ class FundDataETL:
         ]
         
         for col in financial_cols:
-            if col in df.columns:
-                missing_pct = (df[col].isna().sum() / len(df)) * 100
+            if col in stats['null_counts'] and rows > 0:
+                missing_pct = (stats['null_counts'][col] / rows) * 100
                 logger.info(f"{col}: {missing_pct:.1f}% missing")
         
         return len(issues) == 0, issues
     
     def process_dates(self, df: pd.DataFrame, file_date: datetime) -> pd.DataFrame:
         """
-        Process dates according to business rules:
-        - Friday data carries over to Saturday and Sunday
-        - Holiday data carries forward
+        Process dates according to business rules. Friday data covers Saturday
+        and Sunday, and holidays carry the previous day forward, through
+        date_alias rather than copied rows, so only the file's own rows are returned.
         """
-        df = df.copy()
+        df = categorize(df.copy())
         
         # Ensure Date column is datetime - handle different date formats
         df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
@@ -259,21 +338,8 @@ class FundDataETL:
         # Get the date from the data (should be prior business day)
         data_date = df['Date'].iloc[0].date()
         
-        # If it's Friday data, create Saturday and Sunday copies
         if data_date.weekday() == 4:  # Friday
-            logger.info(f"Processing Friday data from {data_date}")
-            
-            # Create Saturday data
-            saturday_df = df.copy()
-            saturday_df['Date'] = pd.to_datetime(data_date + timedelta(days=1))
-            
-            # Create Sunday data  
-            sunday_df = df.copy()
-            sunday_df['Date'] = pd.to_datetime(data_date + timedelta(days=2))
-            
-            # Combine all three days
-            df = pd.concat([df, saturday_df, sunday_df], ignore_index=True)
-            logger.info(f"Created weekend data for {data_date + timedelta(days=1)} and {data_date + timedelta(days=2)}")
+            logger.info(f"Processing Friday data from {data_date} (weekend dates resolve to it)")
         
         return df
     
@@ -301,9 +367,16 @@ class FundDataETL:
             raise PermissionError(f"Cannot write to directory: {db_dir}")
         
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = connect(self.db_path, self.db_settings)
             cursor = conn.cursor()
             
+            # New databases reclaim free pages in steps (db_maintenance) instead of full VACUUMs.
+            # WAL mode has already written the header, so the mode is set with a VACUUM of the empty file.
+            cursor.execute("SELECT COUNT(*) FROM sqlite_master")
+            if cursor.fetchone()[0] == 0:
+                cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                cursor.execute("VACUUM")
+            
             # Create main fund data table - matching our Excel structure
             cursor.execute("""
             CREATE TABLE IF NOT EXISTS fund_data (
@@ -351,25 +424,41 @@ class FundDataETL:
                 download_time REAL,
                 processing_time REAL,
                 issues TEXT,
+                file_hash TEXT,
+                data_digest TEXT,
+                rows_inserted INTEGER,
+                rows_updated INTEGER,
+                rows_unchanged INTEGER,
+                rows_deleted INTEGER,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
             """)
+            self._ensure_etl_log_columns(cursor)
             
-            # Create indices for better query performance
-            cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_fund_data_date 
-            ON fund_data(date)
-            """)
+            # Per-load quality profile read by the dashboard and reports
+            ensure_load_quality_table(cursor)
             
-            cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_fund_data_region 
-            ON fund_data(region)
-            """)
+            # Row hashes and per-day digests for hash-first lookback validation (before
+            # the resolved views are rebuilt, so they carry row_hash)
+            if ensure_fingerprint_schema(cursor):
+                rebuild_fingerprints(cursor)
             
-            cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_fund_data_fund_code 
-            ON fund_data(fund_code)
-            """)
+            # Weekend/carry-forward dates point at their business date instead of copying it
+            if ensure_date_alias_schema(cursor):
+                virtualize_copies(cursor)
+            
+            # Registry of closed months archived to partition files
+            ensure_partitions_table(cursor)
+            
+            # Field-level log of lookback corrections, for as-of reads
+            ensure_revisions_table(cursor)
+            
+            # Per-day aggregates for the dashboard, built once from existing data
+            if ensure_summary_table(cursor):
+                rebuild_summary(cursor)
+            
+            # Composite indexes for the query catalog (replaces the single-column ones)
+            apply_index_migrations(cursor)
             
             # Verify tables were created
             cursor.execute("""
@@ -401,150 +490,50 @@ class FundDataETL:
         Returns:
             Transformed DataFrame ready for database insertion
         """
-        # Create a copy to avoid modifying the original
-        df_transformed = df.copy()
-        
-        # Add region and date columns
-        df_transformed['region'] = region
-        df_transformed['date'] = date.strftime('%Y-%m-%d')
-        
-        # Add file_date for tracking (date from the actual file)
-        if 'Date' in df_transformed.columns:
-            df_transformed['file_date'] = pd.to_datetime(df_transformed['Date']).dt.strftime('%Y-%m-%d')
-            # Drop the original Date column to avoid duplication
-            df_transformed = df_transformed.drop('Date', axis=1)
-        
-        # Filter out #MULTIVALUE rows
-        if 'Fund Code' in df_transformed.columns:
-            multivalue_mask = df_transformed['Fund Code'] == '#MULTIVALUE'
-            if multivalue_mask.sum() > 0:
-                logger.info(f"Filtering out {multivalue_mask.sum()} #MULTIVALUE records")
-                df_transformed = df_transformed[~multivalue_mask]
-        
-        # CRITICAL: Ensure Fund Code is string before transformation
-        if 'Fund Code' in df_transformed.columns:
-            df_transformed['Fund Code'] = df_transformed['Fund Code'].astype(str).str.strip()
-        
-        # Rename columns to match database schema
-        column_mapping = {
-            # 'Date' is handled separately above
-            'Fund Code': 'fund_code',
-            'Fund Name': 'fund_name',
-            'Master Class Fund Name': 'master_class_fund_name',
-            'Rating (M/S&P/F)': 'rating',
-            'Unique Identifier': 'unique_identifier',
-            'NASDAQ': 'nasdaq',
-            'Fund Complex (Historical)': 'fund_complex',
-            'SubCategory Historical': 'subcategory',
-            'Domicile': 'domicile',
-            'Currency': 'currency',
-            'Share Class Assets (dly/$mils)': 'share_class_assets',
-            'Portfolio Assets (dly/$mils)': 'portfolio_assets',
-            '1-DSY (dly)': 'one_day_yield',
-            '1-GDSY (dly)': 'one_day_gross_yield',
-            '7-DSY (dly)': 'seven_day_yield',
-            '7-GDSY (dly)': 'seven_day_gross_yield',
-            'Chgd Expense Ratio (mo/dly)': 'expense_ratio',
-            'WAM (dly)': 'wam',
-            'WAL (dly)': 'wal',
-            'Transactional NAV': 'transactional_nav',
-            'Market NAV': 'market_nav',
-            'Daily Liquidity (%)': 'daily_liquidity',
-            'Weekly Liquidity (%)': 'weekly_liquidity',
-            'Fees': 'fees',
-            'Gates': 'gates'
-        }
-        
-        df_transformed = df_transformed.rename(columns=column_mapping)
+        # Each column is converted in one vectorized pass by a plan compiled per schema
+        key = schema_key(df)
+        plan = self._transform_plans.get(key)
+        if plan is None:
+            plan = self._transform_plans[key] = TransformPlan(df)
         
-        # Clean text fields to handle special characters
-        text_columns = [
-            'fund_code', 'fund_name', 'master_class_fund_name', 'rating',
-            'unique_identifier', 'nasdaq', 'fund_complex', 'subcategory',
-            'domicile', 'currency', 'transactional_nav', 'market_nav',
-            'fees', 'gates'
-        ]
-        
-        for col in text_columns:
-            if col in df_transformed.columns:
-                # Replace None with empty string and strip whitespace
-                df_transformed[col] = df_transformed[col].fillna('')
-                df_transformed[col] = df_transformed[col].apply(lambda x: str(x).strip() if x else '')
-        
-        # Convert numeric columns
-        numeric_columns = [
-            'share_class_assets', 'portfolio_assets', 'one_day_yield',
-            'one_day_gross_yield', 'seven_day_yield', 'seven_day_gross_yield',
-            'expense_ratio', 'wam', 'wal', 'daily_liquidity', 'weekly_liquidity'
-        ]
-        
-        for col in numeric_columns:
-            if col in df_transformed.columns:
-                # First convert to string to handle any non-string values
-                df_transformed[col] = df_transformed[col].astype(str)
-                # Remove commas from numeric strings
-                df_transformed[col] = df_transformed[col].str.replace(',', '')
-                # Replace '-', 'N/A', and empty strings with NaN before converting to numeric
-                df_transformed[col] = df_transformed[col].replace(['-', '', 'N/A', 'nan'], np.nan)
-                df_transformed[col] = pd.to_numeric(df_transformed[col], errors='coerce')
-        
-        # Ensure date column is in the correct format
-        if 'date' in df_transformed.columns:
-            df_transformed['date'] = date.strftime('%Y-%m-%d')
-        
-        return df_transformed
+        return plan.apply(df, region, date)
     
     def load_to_database(self, df: pd.DataFrame, region: str, file_date: datetime, conn=None):
         """Load processed data to SQLite database"""
         close_conn = False  # Initialize first to prevent NameError
         
         if conn is None:
-            conn = sqlite3.connect(self.db_path)
+            conn = connect(self.db_path, self.db_settings)
             close_conn = True
         
         try:
             # Transform the data using the new method
             df_load = self.transform_data(df, region, file_date)
             
-            # Delete existing data for this date/region to handle updates
             cursor = conn.cursor()
             
             # Log what we're about to do
             logger.debug(f"About to load {len(df_load)} records for {region} on {df_load['date'].iloc[0]}")
             logger.debug(f"Unique fund codes in data: {df_load['fund_code'].nunique()}")
             
-            cursor.execute("""
-            DELETE FROM fund_data 
-            WHERE date = ? AND region = ?
-            """, (df_load['date'].iloc[0], region))
-            
-            # If this is Friday data, also delete weekend dates to avoid duplicates
-            if len(df_load) > 0:
-                first_date = pd.to_datetime(df_load['date'].iloc[0])
-                if first_date.weekday() == 4:  # Friday
-                    # Also delete Saturday and Sunday
-                    saturday = (first_date + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
-                    sunday = (first_date + pd.Timedelta(days=2)).strftime('%Y-%m-%d')
-                    cursor.execute("""
-                    DELETE FROM fund_data
-                    WHERE date IN (?, ?) AND region = ?
-                    """, (saturday, sunday, region))
-            
-            # Load to database (replace existing data for the date/region)
-            try:
-                df_load.to_sql('fund_data', conn, if_exists='append', index=False)
-            except sqlite3.IntegrityError as e:
-                # During lookback updates, duplicates are expected for weekend dates
-                logger.warning(f"Ignoring duplicate entries during update: {str(e)}")
+            # Upsert the date/region slice; Friday loads also alias the weekend dates
+            counts = upsert_frame(cursor, df_load, region, [file_date.strftime('%Y-%m-%d')])
+            alias_dates = self._alias_weekend(cursor, region, file_date)
+            
+            ensure_load_quality_table(cursor)
+            save_profile(cursor, region, [df_load['date'].iloc[0]] + alias_dates, profile_frame(df),
+                         file_date.strftime('%Y-%m-%d'))
+            refresh_summary(cursor, region, [file_date.strftime('%Y-%m-%d')])
+            refresh_digests(cursor, region, [file_date.strftime('%Y-%m-%d')])
             
             # Log the ETL run
-            cursor.execute("""
-            INSERT INTO etl_log (run_date, region, file_date, status, records_processed)
-            VALUES (?, ?, ?, ?, ?)
-            """, (datetime.now().strftime('%Y-%m-%d'), region, file_date.strftime('%Y-%m-%d'), 'SUCCESS', len(df)))
+            self._ensure_etl_log_columns(cursor)
+            self._log_load(cursor, region, file_date.strftime('%Y-%m-%d'), 'SUCCESS', len(df),
+                           None, None, counts=counts)
             
             conn.commit()
-            logger.info(f"Successfully loaded {len(df)} records for {region}")
+            self._update_mirror(conn, region, [file_date.strftime('%Y-%m-%d')] + alias_dates)
+            logger.info(f"Successfully loaded {len(df)} records for {region} ({format_counts(counts)})")
             
         except Exception as e:
             logger.error(f"Database load failed: {str(e)}")
@@ -553,8 +542,11 @@ class FundDataETL:
             if close_conn:
                 conn.close()
     
-    def _handle_multivalue_funds(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Handle #MULTIVALUE fund codes by assigning unique identifiers"""
+    def _handle_multivalue_funds(self, df: pd.DataFrame, start_index: int = 0) -> pd.DataFrame:
+        """Handle #MULTIVALUE fund codes by assigning unique identifiers
+        
+        start_index continues the numbering when a file is processed in chunks.
+        """
         df = df.copy()
         
         # Check if there are any #MULTIVALUE fund codes
@@ -569,7 +561,9 @@ class FundDataETL:
             if multivalue_count > 0:
                 logger.info(f"Found {multivalue_count} #MULTIVALUE fund codes - assigning unique identifiers")
                 # Assign unique identifiers to each #MULTIVALUE record
-                df.loc[multivalue_mask, 'Fund Code'] = [f'#MULTIVALUE_{i+1}' for i in range(multivalue_count)]
+                df.loc[multivalue_mask, 'Fund Code'] = [
+                    f'#MULTIVALUE_{i+1}' for i in range(start_index, start_index + multivalue_count)
+                ]
                 
                 # Log results
                 unique_codes_after = df['Fund Code'].nunique()
@@ -577,12 +571,322 @@ class FundDataETL:
         
         return df
     
+    def read_excel_file(self, filepath: str) -> pd.DataFrame:
+        """Read a DataDump workbook through the parsed-file cache"""
+        df = self.parsed_cache.read(filepath, self.expected_columns, self.read_chunk_size,
+                                    self.read_plan)
+        # Whole-file frames (lookback reports especially) keep low-cardinality text as categories
+        return categorize(df)
+    
+    def _alias_weekend(self, cursor, region: str, data_date: datetime) -> List[str]:
+        """Alias Saturday and Sunday to a Friday load; returns the aliased dates"""
+        if data_date.weekday() != 4:  # Friday
+            return []
+        weekend = [(data_date + timedelta(days=days)).strftime('%Y-%m-%d') for days in (1, 2)]
+        set_aliases(cursor, region, weekend, data_date.strftime('%Y-%m-%d'), 'weekend')
+        return weekend
+    
+    def _update_mirror(self, conn, region: str, dates):
+        """Rewrite the columnar mirror for committed dates; a failure leaves SQLite untouched"""
+        if not self.columnar_mirror.enabled:
+            return
+        try:
+            self.columnar_mirror.write_dates(conn, region, dates)
+        except Exception as e:
+            logger.warning(f"Columnar mirror update failed for {region} {sorted(dates)}: {e} "
+                           f"(rebuild with columnar_mirror.py)")
+    
+    def _ensure_etl_log_columns(self, cursor):
+        """Add digest and row-count columns to etl_log tables created before they existed"""
+        cursor.execute("PRAGMA table_info(etl_log)")
+        existing = {row[1] for row in cursor.fetchall()}
+        for column, column_type in (('file_hash', 'TEXT'), ('data_digest', 'TEXT'),
+                                    ('rows_inserted', 'INTEGER'), ('rows_updated', 'INTEGER'),
+                                    ('rows_unchanged', 'INTEGER'), ('rows_deleted', 'INTEGER')):
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE etl_log ADD COLUMN {column} {column_type}")
+    
+    def _row_digests(self, df_load: pd.DataFrame) -> np.ndarray:
+        """Per-row hashes of the values written to fund_data, excluding the load date"""
+        columns = [col for col in FUND_DATA_COLUMNS if col in df_load.columns and col != 'date']
+        values = df_load[columns].copy()
+        for col in columns:
+            # A column is int64 in one chunk and float64 in another once NaNs appear
+            if values[col].dtype.kind in 'iub':
+                values[col] = values[col].astype('float64')
+        values = values.astype(object).where(values.notna(), None).astype(str)
+        return pd.util.hash_pandas_object(values, index=False).to_numpy()
+    
+    def _last_load_digests(self, cursor, region: str, file_date: str) -> Tuple[Optional[str], Optional[str]]:
+        """File hash and row-set digest of the last successful load of a region/date"""
+        cursor.execute("""
+        SELECT file_hash, data_digest FROM etl_log
+        WHERE region = ? AND file_date = ? AND status = 'SUCCESS'
+        ORDER BY id DESC LIMIT 1
+        """, (region, file_date))
+        row = cursor.fetchone()
+        if not row:
+            return None, None
+        
+        # Digests only count while the loaded slice is still there
+        cursor.execute("SELECT 1 FROM fund_data WHERE region = ? AND date = ? LIMIT 1",
+                       (region, file_date))
+        if cursor.fetchone() is None:
+            return None, None
+        return row[0], row[1]
+    
+    def _log_load(self, cursor, region: str, file_date: str, status: str, records: int,
+                  file_hash: Optional[str], data_digest: Optional[str], issues: Optional[str] = None,
+                  counts: Optional[Dict[str, int]] = None):
+        """Record an ingest outcome in etl_log together with its digests and upsert row counts"""
+        counts = counts or {}
+        cursor.execute("""
+        INSERT INTO etl_log (run_date, region, file_date, status, records_processed,
+                             issues, file_hash, data_digest,
+                             rows_inserted, rows_updated, rows_unchanged, rows_deleted)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (datetime.now().strftime('%Y-%m-%d'), region, file_date, status, records,
+              issues, file_hash, data_digest, counts.get('inserted'), counts.get('updated'),
+              counts.get('unchanged'), counts.get('deleted')))
+    
+    def _combine_digests(self, row_digests: List[np.ndarray]) -> str:
+        """Order-independent digest of a row set from its per-row hashes"""
+        return hashlib.sha256(np.sort(np.concatenate(row_digests)).tobytes()).hexdigest()
+    
+    def _transform_chunks(self, reader, region: str, data_date: datetime, progress: Dict):
+        """
+        Yield a database-ready frame for each file chunk.
+        
+        Quality stats and row digests accumulate in progress under 'stats' and
+        'row_digests'.
+        """
+        progress.update({'stats': None, 'row_digests': []})
+        multivalue_seen = 0
+        
+        for chunk in reader.iter_chunks():
+            multivalue_count = int((chunk['Fund Code'] == '#MULTIVALUE').sum())
+            chunk = self._handle_multivalue_funds(chunk, start_index=multivalue_seen)
+            multivalue_seen += multivalue_count
+            
+            progress['stats'] = self._merge_quality_stats(progress['stats'], self._collect_quality_stats(chunk))
+            
+            chunk = chunk.dropna(how='all')
+            chunk['Date'] = pd.to_datetime(chunk['Date'], errors='coerce')
+            invalid_dates = chunk['Date'].isna()
+            if invalid_dates.any():
+                logger.warning(f"Found {invalid_dates.sum()} rows with invalid dates")
+                chunk = chunk[~invalid_dates]
+            
+            df_load = self.transform_data(chunk, region, data_date)
+            progress['row_digests'].append(self._row_digests(df_load))
+            yield df_load
+    
+    def ingest_file(self, filepath: str, region: str, data_date: datetime) -> Tuple[bool, List[str]]:
+        """
+        Stream a daily file into the database chunk by chunk.
+        
+        The header is checked against expected_columns before any body rows are
+        read. Each chunk is cleaned, profiled, transformed, digested and upserted
+        in one pass, inside a savepoint of the load's transaction; only one chunk
+        is held in memory. The file is parsed and hashed once.
+        
+        A file whose raw hash or normalized row-set digest matches the last
+        successful load of the same region/date is logged as SKIPPED_UNCHANGED;
+        an unchanged row set (or one failing the quality checks) rolls the
+        savepoint back, so fund_data is left as it was.
+        
+        Returns: (is_valid, list_of_issues)
+        """
+        file_date = data_date.strftime('%Y-%m-%d')
+        file_hash = self.parsed_cache.file_digest(filepath)
+        
+        conn = connect(self.db_path, self.db_settings)
+        cursor = conn.cursor()
+        
+        try:
+            self._ensure_etl_log_columns(cursor)
+            last_hash, last_digest = self._last_load_digests(cursor, region, file_date)
+            
+            if last_hash == file_hash:
+                logger.info(f"{region} file for {file_date} is byte-identical to the last load - skipping")
+                self._log_load(cursor, region, file_date, 'SKIPPED_UNCHANGED', 0, file_hash, last_digest,
+                               'File hash matches last successful load')
+                conn.commit()
+                return True, []
+            
+            progress = {}
+            with self.parsed_cache.open_reader(filepath, self.expected_columns, self.read_chunk_size,
+                                               self.read_plan, digest=file_hash) as reader:
+                if reader.missing_columns:
+                    return False, [f"Missing columns: {reader.missing_columns}"]
+                
+                cursor.execute("SAVEPOINT ingest_file")
+                upsert = SliceUpsert(cursor, region, [file_date])
+                records_loaded = 0
+                for df_load in self._transform_chunks(reader, region, data_date, progress):
+                    records_loaded += upsert.write(df_load)
+                rows_read = reader.rows_read
+            
+            if progress['stats'] is None:
+                self._rollback_savepoint(cursor, 'ingest_file')
+                return False, ["Dataframe is empty"]
+            
+            is_valid, issues = self._evaluate_quality_stats(progress['stats'], region)
+            if not is_valid:
+                self._rollback_savepoint(cursor, 'ingest_file')
+                return is_valid, issues
+            
+            data_digest = self._combine_digests(progress['row_digests'])
+            
+            if data_digest == last_digest:
+                logger.info(f"{region} data for {file_date} is unchanged since the last load - skipping")
+                self._rollback_savepoint(cursor, 'ingest_file')
+                self._log_load(cursor, region, file_date, 'SKIPPED_UNCHANGED', 0, file_hash, data_digest,
+                               'Row-set digest matches last successful load')
+                conn.commit()
+                return is_valid, issues
+            
+            counts = upsert.finish()
+            cursor.execute("RELEASE SAVEPOINT ingest_file")
+            alias_dates = self._alias_weekend(cursor, region, data_date)
+            save_profile(cursor, region, [file_date] + alias_dates, progress['stats'], file_date)
+            refresh_summary(cursor, region, [file_date])
+            refresh_digests(cursor, region, [file_date])
+            self._log_load(cursor, region, file_date, 'SUCCESS', records_loaded, file_hash, data_digest,
+                           counts=counts)
+            conn.commit()
+            self._update_mirror(conn, region, [file_date] + alias_dates)
+            logger.info(f"Successfully loaded {records_loaded} records for {region} "
+                        f"from {rows_read} file rows ({format_counts(counts)})")
+            return is_valid, issues
+            
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _rollback_savepoint(cursor, name: str):
+        """Undo everything written since SAVEPOINT name and drop the savepoint"""
+        cursor.execute(f"ROLLBACK TO SAVEPOINT {name}")
+        cursor.execute(f"RELEASE SAVEPOINT {name}")
+    
+    def prepare_file(self, filepath: str, region: str, data_date: datetime) -> Dict[str, Any]:
+        """
+        Parse, profile and transform a daily file without writing to fund_data.
+        
+        Used by the concurrent run mode, where this runs in a worker process and
+        the result is applied by write_prepared on the single writer. The
+        transformed frames are held in memory (daily files are a few thousand rows).
+        """
+        file_date = data_date.strftime('%Y-%m-%d')
+        file_hash = self.parsed_cache.file_digest(filepath)
+        prepared = {
+            'region': region, 'data_date': data_date, 'filepath': str(filepath),
+            'file_hash': file_hash,
+            'unchanged_file': False, 'is_valid': False, 'issues': [],
+            'frames': [], 'data_digest': None, 'rows_read': 0, 'stats': None
+        }
+        
+        conn = connect(self.db_path, self.db_settings)
+        try:
+            cursor = conn.cursor()
+            self._ensure_etl_log_columns(cursor)
+            last_hash, _ = self._last_load_digests(cursor, region, file_date)
+        finally:
+            conn.close()
+        
+        if last_hash == prepared['file_hash']:
+            prepared.update({'unchanged_file': True, 'is_valid': True})
+            return prepared
+        
+        with self.parsed_cache.open_reader(filepath, self.expected_columns, self.read_chunk_size,
+                                           self.read_plan, digest=file_hash) as reader:
+            if reader.missing_columns:
+                prepared['issues'] = [f"Missing columns: {reader.missing_columns}"]
+                return prepared
+            
+            progress = {}
+            prepared['frames'] = list(self._transform_chunks(reader, region, data_date, progress))
+            prepared['rows_read'] = reader.rows_read
+        
+        if progress['stats'] is None:
+            prepared['issues'] = ["Dataframe is empty"]
+            return prepared
+        
+        prepared['stats'] = progress['stats']
+        prepared['is_valid'], prepared['issues'] = self._evaluate_quality_stats(progress['stats'], region)
+        if prepared['is_valid']:
+            prepared['data_digest'] = self._combine_digests(progress['row_digests'])
+        return prepared
+    
+    def write_prepared(self, prepared: Dict[str, Any]) -> Tuple[bool, List[str]]:
+        """Apply a prepare_file result to the database in one transaction"""
+        region = prepared['region']
+        data_date = prepared['data_date']
+        file_date = data_date.strftime('%Y-%m-%d')
+        
+        if not prepared['is_valid']:
+            return False, prepared['issues']
+        
+        conn = connect(self.db_path, self.db_settings)
+        cursor = conn.cursor()
+        
+        try:
+            self._ensure_etl_log_columns(cursor)
+            last_hash, last_digest = self._last_load_digests(cursor, region, file_date)
+            
+            if prepared['unchanged_file'] and last_hash == prepared['file_hash']:
+                logger.info(f"{region} file for {file_date} is byte-identical to the last load - skipping")
+                self._log_load(cursor, region, file_date, 'SKIPPED_UNCHANGED', 0, prepared['file_hash'],
+                               last_digest, 'File hash matches last successful load')
+                conn.commit()
+                return True, []
+            
+            if prepared['unchanged_file']:
+                # The last load changed between prepare and write; parse again here
+                conn.close()
+                return self.ingest_file(prepared['filepath'], region, data_date)
+            
+            if prepared['data_digest'] == last_digest:
+                logger.info(f"{region} data for {file_date} is unchanged since the last load - skipping")
+                self._log_load(cursor, region, file_date, 'SKIPPED_UNCHANGED', 0, prepared['file_hash'],
+                               prepared['data_digest'], 'Row-set digest matches last successful load')
+                conn.commit()
+                return prepared['is_valid'], prepared['issues']
+            
+            upsert = SliceUpsert(cursor, region, [file_date])
+            records_loaded = sum(upsert.write(df_load) for df_load in prepared['frames'])
+            counts = upsert.finish()
+            alias_dates = self._alias_weekend(cursor, region, data_date)
+            save_profile(cursor, region, [file_date] + alias_dates, prepared['stats'], file_date)
+            refresh_summary(cursor, region, [file_date])
+            refresh_digests(cursor, region, [file_date])
+            self._log_load(cursor, region, file_date, 'SUCCESS', records_loaded,
+                           prepared['file_hash'], prepared['data_digest'], counts=counts)
+            conn.commit()
+            self._update_mirror(conn, region, [file_date] + alias_dates)
+            logger.info(f"Successfully loaded {records_loaded} records for {region} "
+                        f"from {prepared['rows_read']} file rows ({format_counts(counts)})")
+            return prepared['is_valid'], prepared['issues']
+            
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+    
     def carry_forward_data(self, date: datetime, region: str):
-        """Carry forward previous day's data when no new file is available"""
+        """Carry forward previous day's data when no new file is available
+        
+        The date becomes an alias of the most recent stored business date
+        rather than a copy of its rows.
+        """
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            # Find the most recent data for this region
+            conn = connect(self.db_path, self.db_settings)
+            # Find the most recent stored data for this region
             query = """
             SELECT DISTINCT date FROM fund_data 
             WHERE region = ? AND date < ?
@@ -596,27 +900,15 @@ class FundDataETL:
                 source_date = result[0]
                 logger.info(f"Carrying forward {region} data from {source_date} to {date.strftime('%Y-%m-%d')}")
                 
-                # First, delete any existing data for the target date to avoid conflicts
-                cursor.execute("""
-                DELETE FROM fund_data 
-                WHERE date = ? AND region = ?
-                """, (date.strftime('%Y-%m-%d'), region))
-                
-                # Copy data with new date
-                cursor.execute("""
-                INSERT INTO fund_data 
-                SELECT ?, region, fund_code, fund_name, master_class_fund_name,
-                       rating, unique_identifier, nasdaq, fund_complex, subcategory,
-                       domicile, currency, share_class_assets, portfolio_assets,
-                       one_day_yield, one_day_gross_yield, seven_day_yield,
-                       seven_day_gross_yield, expense_ratio, wam, wal,
-                       transactional_nav, market_nav, daily_liquidity,
-                       weekly_liquidity, fees, gates, CURRENT_TIMESTAMP
-                FROM fund_data
-                WHERE date = ? AND region = ?
-                """, (date.strftime('%Y-%m-%d'), source_date, region))
+                # Replaces any rows stored for the target date
+                set_aliases(cursor, region, [date.strftime('%Y-%m-%d')], source_date, 'carry_forward')
                 
-                records = cursor.rowcount
+                records = cursor.execute("""
+                SELECT COUNT(*) FROM fund_data WHERE date = ? AND region = ?
+                """, (source_date, region)).fetchone()[0]
+                copy_profile(cursor, region, source_date, date.strftime('%Y-%m-%d'))
+                refresh_summary(cursor, region, [date.strftime('%Y-%m-%d')])
+                refresh_digests(cursor, region, [date.strftime('%Y-%m-%d')])
                 
                 # Log the carry forward
                 cursor.execute("""
@@ -626,6 +918,7 @@ class FundDataETL:
                       records, f'Data carried forward from {source_date}'))
                 
                 conn.commit()
+                self._update_mirror(conn, region, [date.strftime('%Y-%m-%d')])
                 logger.info(f"Carried forward {records} records")
             else:
                 logger.warning(f"No previous data found for {region} to carry forward")
@@ -643,58 +936,68 @@ class FundDataETL:
         filename = f"DataDump__{region.upper()}_30DAYS_{date.strftime('%Y%m%d')}.xlsx"
         return lookback_dir / filename
     
-    def download_lookback_file(self, region: str, lookback_days: int = 30) -> Optional[pd.DataFrame]:
-        """Download and return 30-day lookback file for validation"""
+    def download_lookback_path(self, region: str) -> Optional[str]:
+        """Download the 30-day lookback file for a region and return its path"""
+        lookback_url_key = f"{region.lower()}_30days"
+        if lookback_url_key not in self.config.get('sap_urls', {}):
+            logger.warning(f"No lookback URL configured for {region}")
+            return None
+        
+        # Download using existing SAP module
+        from sap_download_module import SAPOpenDocumentDownloader
+        
+        # Stage downloads outside lookback/ - the downloader clears its download_dir,
+        # which would otherwise delete lookback files still waiting to be read
+        sap_config = {
+            'username': self.config.get('auth', {}).get('username', 'sduggan'),
+            'password': self.config.get('auth', {}).get('password', 'sduggan'),
+            'download_dir': str(self.data_dir / 'downloads' / 'lookback'),
+            'headless': True,
+            'timeout': self.config.get('download_timeout', 300),
+            'lookback_timeout': self.config.get('lookback_timeout', 600),
+            'sap_urls': self.config.get('sap_urls', {})
+        }
+        
+        downloader = SAPOpenDocumentDownloader(sap_config)
+        
         try:
-            lookback_url_key = f"{region.lower()}_30days"
-            if lookback_url_key not in self.config.get('sap_urls', {}):
-                logger.warning(f"No lookback URL configured for {region}")
-                return None
-                
-            url = self.config['sap_urls'][lookback_url_key]
+            # Create lookback directory
+            lookback_dir = self.data_dir / 'lookback'
+            lookback_dir.mkdir(exist_ok=True)
             
-            # Download using existing SAP module
-            from sap_download_module import SAPOpenDocumentDownloader
+            # Log the extended timeout being used
+            logger.info(f"Downloading {region} lookback file with extended timeout of {sap_config['lookback_timeout']} seconds")
             
-            # Fixed configuration without duplicates
-            sap_config = {
-                'username': self.config.get('auth', {}).get('username', 'sduggan'),
-                'password': self.config.get('auth', {}).get('password', 'sduggan'),
-                'download_dir': str(self.data_dir / 'lookback'),
-                'headless': True,
-                'timeout': self.config.get('download_timeout', 300),
-                'lookback_timeout': self.config.get('lookback_timeout', 600),
-                'sap_urls': self.config.get('sap_urls', {})
-            }
+            filepath = downloader.download_file(
+                f"{region.upper()}_30DAYS", 
+                datetime.now(), 
+                lookback_dir
+            )
             
-            downloader = SAPOpenDocumentDownloader(sap_config)
+            if filepath and os.path.exists(filepath):
+                return filepath
             
-            try:
-                # Create lookback directory
-                lookback_dir = self.data_dir / 'lookback'
-                lookback_dir.mkdir(exist_ok=True)
-                
-                # Log the extended timeout being used
-                logger.info(f"Downloading {region} lookback file with extended timeout of {sap_config['lookback_timeout']} seconds")
-                
-                filepath = downloader.download_file(
-                    f"{region.upper()}_30DAYS", 
-                    datetime.now(), 
-                    lookback_dir
-                )
-                
-                if filepath and os.path.exists(filepath):
-                    df = pd.read_excel(filepath)
-                    # Add region column to the lookback data
-                    df['Region'] = region
-                    logger.info(f"Downloaded {region} lookback file with {len(df)} records, assigned Region={region}")
-                    return df
-                else:
-                    logger.error(f"Failed to download {region} lookback file")
-                    return None
-                    
-            finally:
-                downloader.close()
+            logger.error(f"Failed to download {region} lookback file")
+            return None
+            
+        finally:
+            downloader.close()
+    
+    def read_lookback_file(self, filepath: str, region: str) -> pd.DataFrame:
+        """Read a lookback file and tag it with its region"""
+        df = self.read_excel_file(filepath)
+        # Add region column to the lookback data
+        df['Region'] = pd.Categorical.from_codes(np.zeros(len(df), dtype='int8'), [region])
+        logger.info(f"Downloaded {region} lookback file with {len(df)} records, assigned Region={region}")
+        return df
+    
+    def download_lookback_file(self, region: str, lookback_days: int = 30) -> Optional[pd.DataFrame]:
+        """Download and return 30-day lookback file for validation"""
+        try:
+            filepath = self.download_lookback_path(region)
+            if filepath is None:
+                return None
+            return self.read_lookback_file(filepath, region)
                 
         except Exception as e:
             logger.error(f"Error downloading lookback file for {region}: {str(e)}")
@@ -702,7 +1005,7 @@ class FundDataETL:
 
     def validate_against_lookback(self, region: str, lookback_df: pd.DataFrame) -> Dict[str, Any]:
         """Validate database data against 30-day lookback file"""
-        conn = sqlite3.connect(self.db_path)  # Open connection
+        conn = connect(self.db_path, self.db_settings)  # Open connection
         
         validation_results = {
             'missing_dates': [],
@@ -719,29 +1022,18 @@ class FundDataETL:
             # Clean and prepare lookback data
             lookback_df['Date'] = pd.to_datetime(lookback_df['Date'], errors='coerce')
             
-            # CRITICAL FIX: Ensure fund codes are strings in both datasets
-            lookback_df['Fund Code'] = lookback_df['Fund Code'].astype(str).str.strip()
+            # Frames from read_lookback_file are already typed (string fund codes,
+            # float64 financials); anything else gets the same read plan here, on a
+            # copy so the caller's frame keeps its dtypes
+            lookback_df = self.read_plan.apply(lookback_df.copy())
             
             # Get unique dates from lookback file
-            lookback_dates = lookback_df['Date'].dt.date.unique()
+            date_strs = lookback_df['Date'].dt.strftime('%Y-%m-%d')
+            lookback_dates = list(date_strs.dropna().unique())
             validation_results['summary']['total_dates_checked'] = len(lookback_dates)
             
             logger.info(f"Validating {region} against {len(lookback_dates)} dates from lookback file")
             
-            # Check for missing dates in database
-            for date in lookback_dates:
-                date_str = date.strftime('%Y-%m-%d')
-                check_query = f"""
-                SELECT COUNT(*) as count FROM fund_data 
-                WHERE date = '{date_str}' AND region = '{region}'
-                """
-                result = pd.read_sql_query(check_query, conn)
-                
-                if result.iloc[0]['count'] == 0:
-                    validation_results['missing_dates'].append(date_str)
-                    validation_results['summary']['missing_dates_count'] += 1
-                    validation_results['summary']['requires_update'] = True
-            
             # Get validation configuration
             change_threshold = self.config.get('validation', {}).get('change_threshold_percent', 5.0)
             critical_fields = self.config.get('validation', {}).get('critical_fields', 
@@ -749,42 +1041,76 @@ class FundDataETL:
             
             logger.info(f"Using change threshold: {change_threshold}% for fields: {critical_fields}")
             
+            # If lookback data has a region column, filter by it
+            region_column = next((col for col in ('Region', 'region') if col in lookback_df.columns), None)
+            if region_column:
+                in_region = (lookback_df[region_column] == region).to_numpy()
+                region_df, date_strs = lookback_df[in_region], date_strs[in_region]
+                logger.debug(f"Filtered lookback data for {region}: {len(region_df)} records")
+            else:
+                region_df = lookback_df
+                # Log warning if no region column found - lookback file should be region-specific
+                if len(region_df) > 0:
+                    logger.warning(f"No region column found in lookback data. Processing {len(region_df)} records for {region}. "
+                                 f"Ensure the lookback file is specific to {region} region.")
+            rows_by_date = region_df.groupby(date_strs.to_numpy(), sort=False).indices
+            
+            fields = [field for field in critical_fields if field in LOOKBACK_FIELDS]
+            projection = ''.join(f', {field}' for field in fields)
+            hash_first = all(column in region_df.columns for column in LOOKBACK_COLUMNS.values())
+            if hash_first:
+                # Days whose digest matches the stored one are identical and skipped,
+                # and only the rows of the other days are read
+                lookback_hashes = row_hashes(region_df, LOOKBACK_COLUMNS)
+                lookback_digests = day_digests(date_strs.to_numpy(), lookback_hashes)
+                digests = stored_digests(conn.cursor(), region, lookback_dates)
+                stored_dates = set(digests)
+                compare_dates = [date_str for date_str in lookback_dates if date_str in digests
+                                 and (digests[date_str] is None or digests[date_str] != lookback_digests.get(date_str))]
+                validation_results['summary']['unchanged_dates_count'] = len(stored_dates) - len(compare_dates)
+                # row_hash is read with an unhashed flag, as a NULL would turn the column to float
+                db_data = pd.read_sql_query(f"""
+                SELECT date, fund_code, {ROW_HASH_COLUMN} IS NULL AS unhashed,
+                       IFNULL({ROW_HASH_COLUMN}, 0) AS {ROW_HASH_COLUMN}{projection} FROM {RESOLVED_VIEW}
+                WHERE region = ? AND date IN ({', '.join('?' for _ in compare_dates)})
+                """, conn, params=[region] + compare_dates) if compare_dates else pd.DataFrame(
+                    columns=['date', 'fund_code', 'unhashed', ROW_HASH_COLUMN] + fields)
+            else:
+                # One query for the whole window, projected to the compared fields
+                db_data = pd.read_sql_query(f"""
+                SELECT date, fund_code{projection} FROM {RESOLVED_VIEW}
+                WHERE region = ? AND date BETWEEN ? AND ?
+                """, conn, params=(region, min(lookback_dates, default=''), max(lookback_dates, default='')))
+            
+            # CRITICAL FIX: Ensure database fund codes are also strings
+            db_data['fund_code'] = db_data['fund_code'].astype(str).str.strip()
+            stored_by_date = dict(tuple(db_data.groupby('date', sort=False)))
+            if hash_first:
+                # Rows carrying the stored hash of their fund are unchanged
+                drift = drifted(date_strs.to_numpy(), region_df['Fund Code'].to_numpy(), lookback_hashes, db_data)
+            else:
+                stored_dates = set(stored_by_date)
+            
+            # Check for missing dates in database
+            for date_str in lookback_dates:
+                if date_str not in stored_dates:
+                    validation_results['missing_dates'].append(date_str)
+                    validation_results['summary']['missing_dates_count'] += 1
+                    validation_results['summary']['requires_update'] = True
+            
             # Check for changed records
             total_comparisons = 0
-            for date in lookback_dates:
-                if date.strftime('%Y-%m-%d') not in validation_results['missing_dates']:
-                    # Get data from database for this date
-                    db_query = f"""
-                    SELECT * FROM fund_data 
-                    WHERE date = '{date.strftime('%Y-%m-%d')}' 
-                    AND region = '{region}'
-                    """
-                    db_data = pd.read_sql_query(db_query, conn)
-                    
-                    # CRITICAL FIX: Ensure database fund codes are also strings
-                    db_data['fund_code'] = db_data['fund_code'].astype(str).str.strip()
-                    
-                    # Get lookback data for this date
-                    lookback_date_data = lookback_df[lookback_df['Date'].dt.date == date].copy()
-                    
-                    # If lookback data has a region column, filter by it
-                    if 'Region' in lookback_date_data.columns:
-                        lookback_date_data = lookback_date_data[lookback_date_data['Region'] == region]
-                        logger.debug(f"Filtered lookback data for {region}: {len(lookback_date_data)} records")
-                    elif 'region' in lookback_date_data.columns:
-                        lookback_date_data = lookback_date_data[lookback_date_data['region'] == region]
-                        logger.debug(f"Filtered lookback data for {region}: {len(lookback_date_data)} records")
-                    else:
-                        # Log warning if no region column found - lookback file should be region-specific
-                        if len(lookback_date_data) > 0:
-                            logger.warning(f"No region column found in lookback data. Processing {len(lookback_date_data)} records for {region}. "
-                                         f"Ensure the lookback file is specific to {region} region.")
-                    
+            for date_str in lookback_dates:
+                if date_str in stored_by_date and date_str in rows_by_date:
+                    rows = rows_by_date[date_str]
+                    if hash_first:
+                        rows = rows[drift[rows]]
+                    lookback_date_data = region_df.iloc[rows]
                     total_comparisons += len(lookback_date_data)
                     
                     # Compare records
                     changes = self._compare_dataframes(
-                        db_data, lookback_date_data, 
+                        stored_by_date[date_str], lookback_date_data, 
                         critical_fields, change_threshold
                     )
                     
@@ -796,6 +1122,9 @@ class FundDataETL:
             # Log validation summary
             logger.info(f"Validation summary for {region}:")
             logger.info(f"  - Total records compared: {total_comparisons}")
+            if hash_first:
+                logger.info(f"  - Dates skipped with unchanged digests: "
+                            f"{validation_results['summary']['unchanged_dates_count']}")
             logger.info(f"  - Missing dates: {validation_results['summary']['missing_dates_count']}")
             logger.info(f"  - Records with changes: {validation_results['summary']['changed_records_count']}")
             
@@ -822,375 +1151,105 @@ class FundDataETL:
     def _compare_dataframes(self, db_df: pd.DataFrame, lookback_df: pd.DataFrame, 
                            critical_fields: List[str], threshold_pct: float) -> List[Dict]:
         """Compare two dataframes and identify significant changes"""
-        changes = []
-        
-        # Map database columns to Excel columns
-        column_mapping_reverse = {
-            'fund_code': 'Fund Code',
-            'share_class_assets': 'Share Class Assets (dly/$mils)',
-            'portfolio_assets': 'Portfolio Assets (dly/$mils)',
-            'one_day_yield': '1-DSY (dly)',
-            'seven_day_yield': '7-DSY (dly)'
-        }
-        
-        # Add logging for debugging
         logger.debug(f"Comparing {len(lookback_df)} records from lookback file")
         
-        # Process each fund in lookback data
-        for _, lookback_row in lookback_df.iterrows():
-            # Ensure fund code is string
-            fund_code = str(lookback_row['Fund Code']).strip()
-            
-            # Find corresponding database record
-            db_record = db_df[db_df['fund_code'] == fund_code]
-            
-            if len(db_record) == 0:
-                # New fund not in database
-                changes.append({
-                    'type': 'new_fund',
-                    'fund_code': fund_code,
-                    'date': lookback_row['Date'].strftime('%Y-%m-%d'),
-                    'details': 'Fund not found in database',
-                    'lookback_row': lookback_row  # Store full row for insertion
-                })
-                continue
-                
-            db_record = db_record.iloc[0]
-            
-            # Track which fields have changed for this record
-            changed_fields = []
-            
-            # Check critical fields for changes
-            for db_field in critical_fields:
-                if db_field in column_mapping_reverse:
-                    excel_field = column_mapping_reverse[db_field]
-                    
-                    if excel_field in lookback_row.index:
-                        db_value = db_record[db_field]
-                        lookback_value = lookback_row[excel_field]
-                        
-                        # Convert lookback value to numeric, handling special cases
-                        if pd.isna(lookback_value) or lookback_value == '-' or lookback_value == '':
-                            lookback_value = None
-                        else:
-                            lookback_value = pd.to_numeric(lookback_value, errors='coerce')
-                        
-                        # Convert database value to float for comparison if not null
-                        if pd.notna(db_value):
-                            db_value = float(db_value)
-                        
-                        # Skip if both values are null
-                        if pd.isna(db_value) and pd.isna(lookback_value):
-                            continue
-                        
-                        # Flag if one is null and other isn't
-                        if pd.isna(db_value) != pd.isna(lookback_value):
-                            logger.debug(f"Fund {fund_code}, field {db_field}: null mismatch - "
-                                       f"DB: {db_value}, Lookback: {lookback_value}")
-                            changed_fields.append({
-                                'field': db_field,
-                                'db_value': db_value,
-                                'lookback_value': lookback_value
-                            })
-                            continue
-                        
-                        # Check for material changes in numeric values
-                        if not pd.isna(db_value) and not pd.isna(lookback_value):
-                            # Use a small epsilon for float comparison to handle precision issues
-                            epsilon = 1e-10
-                            
-                            # First check if values are effectively equal (handles float precision)
-                            if abs(db_value - lookback_value) < epsilon:
-                                continue
-                            
-                            # Calculate percentage change
-                            if abs(db_value) > epsilon:  # db_value is not effectively zero
-                                pct_change = abs((lookback_value - db_value) / db_value * 100)
-                                if pct_change > threshold_pct:
-                                    logger.debug(f"Fund {fund_code}, field {db_field}: "
-                                               f"{pct_change:.2f}% change - "
-                                               f"DB: {db_value}, Lookback: {lookback_value}")
-                                    changed_fields.append({
-                                        'field': db_field,
-                                        'db_value': db_value,
-                                        'lookback_value': lookback_value,
-                                        'pct_change': pct_change
-                                    })
-                            elif abs(lookback_value) > epsilon:  # db_value is ~0 but lookback isn't
-                                logger.debug(f"Fund {fund_code}, field {db_field}: "
-                                           f"zero to non-zero change - "
-                                           f"DB: {db_value}, Lookback: {lookback_value}")
-                                changed_fields.append({
-                                    'field': db_field,
-                                    'db_value': db_value,
-                                    'lookback_value': lookback_value
-                                })
-            
-            # If any fields changed, record the change
-            if changed_fields:
-                changes.append({
-                    'type': 'value_change',
-                    'fund_code': fund_code,
-                    'date': db_record['date'],
-                    'changed_fields': changed_fields,
-                    'lookback_row': lookback_row  # Store full row for update
-                })
+        # Merged on fund code and compared a whole field at a time
+        change_set = compare_frames(db_df, lookback_df, critical_fields, threshold_pct)
+        changes = change_records(change_set, lookback_df)
         
         logger.info(f"Comparison complete: {len(changes)} records with changes detected")
         return changes
 
-    def update_from_lookback(self, region: str, lookback_df: pd.DataFrame, 
-                            validation_results: Dict[str, Any], update_mode: Optional[str] = None):
+    def _lookback_load(self, lookback_rows: pd.DataFrame, region: str) -> pd.DataFrame:
         """
-        Update database with data from lookback file where changes detected
-        
-        Args:
-            region: Region to update
-            lookback_df: DataFrame with lookback data
-            validation_results: Results from validation
-            update_mode: 'selective' (default) or 'full' - override config setting
+        Lookback rows as fund_data rows under their own dates. Rows without a
+        date or fund code (such as blank trailing rows) are dropped, as
+        validation ignores them.
         """
-        if not validation_results['summary']['requires_update']:
-            logger.info(f"No updates required for {region}")
-            return
-        
-        # Determine update mode from config or parameter
-        if update_mode is None:
-            update_mode = self.config.get('validation', {}).get('update_mode', 'selective')
-        
-        logger.info(f"Running {update_mode} update for {region}")
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        fund_codes = lookback_rows['Fund Code']
+        keyed = (lookback_rows['Date'].notna() & fund_codes.notna()
+                 & (fund_codes.astype(str).str.strip() != '')).to_numpy()
+        if not keyed.all():
+            logger.info(f"Skipping {int((~keyed).sum())} lookback rows without a date or fund code")
+        df_load = self.transform_data(lookback_rows[keyed], region, datetime.now())
+        df_load['date'] = df_load['file_date']
+        return df_load
+    
+    def reconcile_lookback(self, region: str, lookback_df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Validate and correct region against a lookback in SQL (update_mode
+        'reconcile'). Returns validation results with the reconciliation
+        counts under 'reconciled'.
+        """
+        # On a copy, so the caller's frame keeps its dtypes
+        lookback_rows = lookback_df.copy()
+        lookback_rows['Date'] = pd.to_datetime(lookback_rows['Date'], errors='coerce')
+        self.read_plan.apply(lookback_rows)
+        for region_column in ('Region', 'region'):
+            if region_column in lookback_rows.columns:
+                lookback_rows = lookback_rows[lookback_rows[region_column] == region].drop(columns=region_column)
+        
+        df_load = self._lookback_load(lookback_rows, region)
+        return self._reconcile_loads(region, [df_load], [col for col in REVISION_FIELDS if col in df_load.columns])
+    
+    def reconcile_lookback_file(self, region: str, filepath: str) -> Dict[str, Any]:
+        """
+        reconcile_lookback over a region's lookback file, streamed into the
+        staging table one read_chunk_size chunk at a time, so the file is
+        never held whole in memory
+        """
+        with self.parsed_cache.open_reader(filepath, self.expected_columns, self.read_chunk_size,
+                                           self.read_plan) as reader:
+            loads = (self._lookback_chunk_load(chunk, region) for chunk in reader.iter_chunks())
+            # Every chunk has the file's columns; the first decides the fields staged
+            first = next(loads, None)
+            if first is None:
+                return self._reconcile_loads(region, [], [])
+            fields = [col for col in REVISION_FIELDS if col in first.columns]
+            results = self._reconcile_loads(region, itertools.chain([first], loads), fields)
+        logger.info(f"Reconciled {region} lookback file {os.path.basename(filepath)} "
+                    f"({reader.rows_read} file rows)")
+        return results
+    
+    def _lookback_chunk_load(self, chunk: pd.DataFrame, region: str) -> pd.DataFrame:
+        chunk['Date'] = pd.to_datetime(chunk['Date'], errors='coerce')
+        return self._lookback_load(chunk, region)
+    
+    def _reconcile_loads(self, region: str, loads, fields: List[str]) -> Dict[str, Any]:
+        """Reconcile region against lookback rows (frames of fund_data rows) in SQL"""
+        change_threshold = self.config.get('validation', {}).get('change_threshold_percent', 5.0)
+        critical_fields = self.config.get('validation', {}).get('critical_fields', 
+            ['share_class_assets', 'portfolio_assets', 'one_day_yield', 'seven_day_yield'])
         
+        conn = connect(self.db_path, self.db_settings)
         try:
-            # Begin transaction
-            cursor.execute("BEGIN TRANSACTION")
-            
-            updates_made = 0
-            records_updated = 0
-            records_inserted = 0
-            
-            # Process missing dates (always full insert)
-            for missing_date in validation_results['missing_dates']:
-                date_data = lookback_df[
-                    lookback_df['Date'].dt.strftime('%Y-%m-%d') == missing_date
-                ]
-                
-                if len(date_data) > 0:
-                    logger.info(f"Adding {len(date_data)} records for missing date {missing_date}")
-                    
-                    # Handle #MULTIVALUE fund codes before processing
-                    date_data = self._handle_multivalue_funds(date_data.copy())
-                    
-                    # Process and load missing date data
-                    date_data_processed = self.process_dates(date_data, 
-                        datetime.strptime(missing_date, '%Y-%m-%d'))
-                    self.load_to_database(date_data_processed, region, 
-                        datetime.strptime(missing_date, '%Y-%m-%d'), conn)
-                    records_inserted += len(date_data)
-            
-            # Process changed records based on update mode
-            if update_mode == 'selective':
-                # SELECTIVE MODE: Update only specific changed records
-                for change in validation_results['changed_records']:
-                    if change['type'] == 'new_fund':
-                        # Insert new fund
-                        self._insert_single_record(conn, cursor, change['lookback_row'], 
-                                                 region, change['date'])
-                        records_inserted += 1
-                    elif change['type'] == 'value_change':
-                        # Update existing fund with only changed fields
-                        self._update_single_record(conn, cursor, change['lookback_row'], 
-                                                 region, change['date'], change['changed_fields'])
-                        records_updated += 1
-                
-                updates_made = records_updated + records_inserted
-                
-            else:
-                # FULL MODE: Replace all data for changed dates (original behavior)
-                changed_dates = set()
-                for change in validation_results['changed_records']:
-                    changed_dates.add(change['date'])
-                
-                for date_str in changed_dates:
-                    # Delete existing data for this date
-                    cursor.execute("""
-                        DELETE FROM fund_data 
-                        WHERE date = ? AND region = ?
-                    """, (date_str, region))
-                    
-                    # If this is Friday, also delete weekend dates
-                    check_date = pd.to_datetime(date_str)
-                    if check_date.weekday() == 4:
-                        saturday = (check_date + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
-                        sunday = (check_date + pd.Timedelta(days=2)).strftime('%Y-%m-%d')
-                        cursor.execute("""
-                        DELETE FROM fund_data
-                        WHERE date IN (?, ?) AND region = ?
-                        """, (saturday, sunday, region))
-                    
-                    # Load new data from lookback file
-                    date_data = lookback_df[
-                        lookback_df['Date'].dt.strftime('%Y-%m-%d') == date_str
-                    ]
-                    
-                    if len(date_data) > 0:
-                        logger.info(f"Replacing {len(date_data)} records for {date_str}")
-                        
-                        # Handle #MULTIVALUE fund codes before processing
-                        date_data = self._handle_multivalue_funds(date_data.copy())
-                        
-                        date_data_processed = self.process_dates(date_data, 
-                            datetime.strptime(date_str, '%Y-%m-%d'))
-                        self.load_to_database(date_data_processed, region, 
-                            datetime.strptime(date_str, '%Y-%m-%d'), conn)
-                        updates_made += len(date_data)
-            
-            # Commit transaction
-            conn.commit()
-            
-            if update_mode == 'selective':
-                logger.info(f"Successfully updated {records_updated} records and inserted "
-                           f"{records_inserted} new records for {region}")
-            else:
-                logger.info(f"Successfully replaced {updates_made} records for {region}")
-            
-            # Log the update in ETL log
-            update_description = (
-                f"{update_mode.capitalize()} update from lookback: "
-                f"{validation_results['summary']['missing_dates_count']} missing dates, "
-            )
-            if update_mode == 'selective':
-                update_description += f"{records_updated} records updated, {records_inserted} records inserted"
-            else:
-                update_description += f"{validation_results['summary']['changed_records_count']} dates replaced"
-            
-            cursor.execute("""
-                INSERT INTO etl_log (run_date, region, file_date, status, records_processed, issues)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                datetime.now().date(), 
-                region, 
-                datetime.now().date(), 
-                'LOOKBACK_UPDATE',
-                updates_made,
-                update_description
-            ))
+            cursor = conn.cursor()
+            ensure_revisions_table(cursor)
+            result = reconcile(cursor, region, loads, fields, critical_fields, change_threshold)
+            
+            # Stored quality profiles follow the corrected slices and the dates aliased to them
+            aliases = alias_dates_of(cursor, region, result['dates'])
+            refresh_profiles(cursor, region, sorted(set(result['dates']).union(*aliases.values())))
+            refresh_summary(cursor, region, result['dates'])
+            refresh_digests(cursor, region, result['dates'])
             conn.commit()
-            
-        except Exception as e:
-            conn.rollback()
-            logger.error(f"Failed to update from lookback for {region}: {str(e)}")
-            raise
+            self._update_mirror(conn, region, result['dates'] + result['aliased_dates'])
         finally:
             conn.close()
-
-    def _update_single_record(self, conn, cursor, lookback_record, region: str, date_str: str, changed_fields: List[Dict]):
-        """Update a single fund record with only changed fields from lookback file"""
-        
-        # Log what we're updating
-        fund_code = lookback_record['Fund Code']
-        logger.debug(f"Updating fund {fund_code} on {date_str} with {len(changed_fields)} changed fields")
-        
-        # Map Excel columns to database columns - comprehensive mapping
-        column_mapping = {
-            'Fund Name': 'fund_name',
-            'Master Class Fund Name': 'master_class_fund_name',
-            'Rating (M/S&P/F)': 'rating',
-            'Unique Identifier': 'unique_identifier',
-            'NASDAQ': 'nasdaq',
-            'Fund Complex (Historical)': 'fund_complex',
-            'SubCategory Historical': 'subcategory',
-            'Domicile': 'domicile',
-            'Currency': 'currency',
-            'Share Class Assets (dly/$mils)': 'share_class_assets',
-            'Portfolio Assets (dly/$mils)': 'portfolio_assets',
-            '1-DSY (dly)': 'one_day_yield',
-            '1-GDSY (dly)': 'one_day_gross_yield',
-            '7-DSY (dly)': 'seven_day_yield',
-            '7-GDSY (dly)': 'seven_day_gross_yield',
-            'Chgd Expense Ratio (mo/dly)': 'expense_ratio',
-            'WAM (dly)': 'wam',
-            'WAL (dly)': 'wal',
-            'Transactional NAV': 'transactional_nav',
-            'Market NAV': 'market_nav',
-            'Daily Liquidity (%)': 'daily_liquidity',
-            'Weekly Liquidity (%)': 'weekly_liquidity',
-            'Fees': 'fees',
-            'Gates': 'gates'
-        }
-        
-        # Build UPDATE statement with only changed fields
-        update_fields = []
-        update_values = []
-        
-        # Get list of changed field names
-        changed_field_names = [cf['field'] for cf in changed_fields]
         
-        logger.debug(f"Changed fields to update: {changed_field_names}")
-        
-        # Update only the changed fields
-        for excel_col, db_col in column_mapping.items():
-            if db_col in changed_field_names and excel_col in lookback_record.index:
-                value = lookback_record[excel_col]
-                
-                # Handle numeric conversion for numeric columns
-                numeric_columns = [
-                    'share_class_assets', 'portfolio_assets', 'one_day_yield',
-                    'one_day_gross_yield', 'seven_day_yield', 'seven_day_gross_yield',
-                    'expense_ratio', 'wam', 'wal', 'daily_liquidity', 'weekly_liquidity'
-                ]
-                
-                if db_col in numeric_columns:
-                    if pd.notna(value) and value != '-':
-                        value = pd.to_numeric(value, errors='coerce')
-                    elif value == '-':
-                        value = None
-                else:
-                    # For text fields, clean whitespace
-                    if pd.notna(value):
-                        value = str(value).strip()
-                    else:
-                        value = ''
-                
-                update_fields.append(f"{db_col} = ?")
-                update_values.append(value)
-        
-        if update_fields:
-            # Add WHERE clause values
-            update_values.extend([date_str, region, fund_code])
-            
-            update_sql = f"""
-            UPDATE fund_data 
-            SET {', '.join(update_fields)}
-            WHERE date = ? AND region = ? AND fund_code = ?
-            """
-            
-            logger.debug(f"Executing update with {len(update_fields)} fields")
-            cursor.execute(update_sql, update_values)
-            
-            # Handle weekend dates if this is a Friday
-            if pd.to_datetime(date_str).weekday() == 4:
-                for days_ahead in [1, 2]:  # Saturday and Sunday
-                    weekend_date = (pd.to_datetime(date_str) + pd.Timedelta(days=days_ahead)).strftime('%Y-%m-%d')
-                    update_values[-3] = weekend_date  # Update the date parameter
-                    cursor.execute(update_sql, update_values)
-                    logger.debug(f"Also updated weekend date: {weekend_date}")
-        else:
-            logger.warning(f"No fields to update for fund {fund_code} on {date_str}")
-
-    def _insert_single_record(self, conn, cursor, lookback_record, region: str, date_str: str):
-        """Insert a single new fund record from lookback file"""
-        
-        # Prepare the record as a single-row DataFrame for processing
-        single_row_df = pd.DataFrame([lookback_record])
-        
-        # Process dates to handle Friday->weekend expansion
-        processed_df = self.process_dates(single_row_df, datetime.strptime(date_str, '%Y-%m-%d'))
-        
-        # Use existing load_to_database method to handle all the column mapping and cleaning
-        self.load_to_database(processed_df, region, datetime.strptime(date_str, '%Y-%m-%d'), conn)
+        changed = result['updated'] + result['new_funds']
+        return {
+            'missing_dates': result['missing_dates'],
+            # Changed rows stay in SQLite; only their counts are reported
+            'changed_records': [],
+            'summary': {
+                'total_dates_checked': result['staged_dates'],
+                'missing_dates_count': len(result['missing_dates']),
+                'changed_records_count': changed,
+                'requires_update': bool(result['missing_dates'] or changed)
+            },
+            'reconciled': result
+        }
 
     def run_daily_etl(self, run_date: Optional[datetime] = None):
         """
@@ -1209,96 +1268,68 @@ class FundDataETL:
             # For weekends and holidays, carry forward previous data
             for region in ['AMRS', 'EMEA']:
                 self.carry_forward_data(run_date, region)
+            self.publish_snapshot()
             return {'success': True}
         
         # Get prior business day (files contain prior day's data)
         data_date = self.get_prior_business_day(run_date)
         logger.info(f"Processing data for {data_date.strftime('%Y-%m-%d')}")
         
-        # Process each region
-        for region in ['AMRS', 'EMEA']:
-            try:
-                # Download the file using SAP OpenDocument
-                filepath = self.download_file(
-                    self.config['sap_urls'][region.lower()],
-                    region,
-                    data_date
-                )
-                
-                if not filepath or not os.path.exists(filepath):
-                    logger.warning(f"No file available for {region}, carrying forward data")
-                    self.carry_forward_data(run_date, region)
-                    continue
-                
-                # Read the Excel file
-                logger.info(f"Reading {region} file: {filepath}")
-                df = pd.read_excel(filepath)
-                
-                # Handle #MULTIVALUE fund codes before validation
-                df = self._handle_multivalue_funds(df)
-                
-                # Validate data
-                is_valid, issues = self.validate_dataframe(df, region)
-                if not is_valid:
-                    logger.error(f"Validation failed for {region}: {issues}")
-                    continue
-                elif issues:
-                    logger.warning(f"Validation warnings for {region}: {issues}")
-                
-                # Process dates (handle Friday -> weekend logic)
-                df = self.process_dates(df, data_date)
-                
-                # Load to database
-                self.load_to_database(df, region, data_date)
-                
-            except Exception as e:
-                logger.error(f"ETL failed for {region}: {str(e)}")
-                
-                # Log failure
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                cursor.execute("""
-                INSERT INTO etl_log (run_date, region, file_date, status, issues)
-                VALUES (?, ?, ?, ?, ?)
-                """, (datetime.now().date(), region, data_date.date(), 'FAILED', str(e)))
-                conn.commit()
-                conn.close()
+        regions = ['AMRS', 'EMEA']
+        validate = self.config.get('validation', {}).get('enabled', True)
         
-        # After successful daily load, run lookback validation
-        validation_alerts = []
-        if self.config.get('validation', {}).get('enabled', True):
-            logger.info("Starting 30-day lookback validation...")
-            
-            for region in ['AMRS', 'EMEA']:
+        if self.config.get('concurrency', {}).get('enabled', False):
+            validation_alerts = self._run_regions_concurrently(run_date, data_date, regions, validate)
+        else:
+            # Process each region
+            for region in regions:
                 try:
-                    # Download lookback file
-                    lookback_df = self.download_lookback_file(region)
-                    
-                    if lookback_df is not None:
-                        # Validate against database
-                        validation_results = self.validate_against_lookback(region, lookback_df)
+                    self._process_region(run_date, data_date, region)
+                except Exception as e:
+                    logger.error(f"ETL failed for {region}: {str(e)}")
+                    self._log_region_failure(region, data_date, e)
+            
+            # After successful daily load, run lookback validation
+            validation_alerts = []
+            if validate:
+                logger.info("Starting 30-day lookback validation...")
+                
+                for region in regions:
+                    try:
+                        if self._reconcile_in_sql():
+                            # Validated and corrected in one pass inside SQLite, the file streamed into it
+                            filepath = self.download_lookback_path(region)
+                            if filepath is not None:
+                                alert_msg = self._lookback_alert(region, self.reconcile_lookback_file(region, filepath))
+                                if alert_msg:
+                                    validation_alerts.append(alert_msg)
+                            continue
                         
-                        # Log results
-                        logger.info(f"{region} validation results: "
-                                  f"{validation_results['summary']['missing_dates_count']} missing dates, "
-                                  f"{validation_results['summary']['changed_records_count']} changed records")
+                        # Download lookback file
+                        lookback_df = self.download_lookback_file(region)
                         
-                        # Generate alert details if needed
-                        if validation_results['summary']['requires_update']:
-                            alert_msg = f"\n{region} Validation Alert:\n"
-                            alert_msg += f"- Missing dates: {', '.join(validation_results['missing_dates'][:5])}"
-                            if len(validation_results['missing_dates']) > 5:
-                                alert_msg += f" and {len(validation_results['missing_dates']) - 5} more"
-                            alert_msg += f"\n- Changed records: {validation_results['summary']['changed_records_count']}"
-                            
-                            validation_alerts.append(alert_msg)
-                            
-                            # Update database with corrected data
-                            self.update_from_lookback(region, lookback_df, validation_results)
+                        if lookback_df is not None:
+                            # Validate against database
+                            validation_results = self.validate_against_lookback(region, lookback_df)
+                            alert_msg = self._lookback_alert(region, validation_results)
                             
-                except Exception as e:
-                    logger.error(f"Lookback validation failed for {region}: {str(e)}")
-                    validation_alerts.append(f"\n{region} Validation Error: {str(e)}")
+                            if alert_msg:
+                                validation_alerts.append(alert_msg)
+                                
+                                # Update database with corrected data
+                                self.update_from_lookback(region, lookback_df, validation_results)
+                                
+                    except Exception as e:
+                        logger.error(f"Lookback validation failed for {region}: {str(e)}")
+                        validation_alerts.append(f"\n{region} Validation Error: {str(e)}")
+        
+        if self.partition_config.get('enabled', False):
+            try:
+                self.archive_closed_months(run_date)
+            except Exception as e:
+                logger.error(f"Archiving closed months failed: {str(e)}")
+        
+        self.publish_snapshot()
         
         logger.info("ETL process completed")
         
@@ -1308,6 +1339,231 @@ class FundDataETL:
         else:
             return {'success': True}
     
+    def archive_closed_months(self, as_of: Optional[datetime] = None) -> Dict[str, Any]:
+        """Move months older than the open window into read-only monthly partitions"""
+        as_of = (as_of or datetime.now()).strftime('%Y-%m-%d')
+        conn = connect(self.db_path, self.db_settings)
+        try:
+            result = archive_closed_months(
+                conn,
+                self.partition_config.get('dir', str(self.data_dir / 'partitions')),
+                open_months=self.partition_config.get('open_months', 3),
+                as_of=as_of,
+                cold_dir=self.partition_config.get('cold_dir'),
+                cold_after_months=self.partition_config.get('cold_after_months', 12),
+                vacuum=self.partition_config.get('vacuum', True)
+            )
+            # Aliases into an archived month became physical rows in the open months
+            cursor = conn.cursor()
+            for region, dates in result['materialized'].items():
+                refresh_summary(cursor, region, dates)
+                refresh_digests(cursor, region, dates)
+            conn.commit()
+            for region, dates in result['materialized'].items():
+                self._update_mirror(conn, region, dates)
+        finally:
+            conn.close()
+        
+        if result['archived'] or result['cold']:
+            logger.info(f"Archived {len(result['archived'])} closed month(s), "
+                        f"moved {len(result['cold'])} to cold storage")
+        return result
+    
+    def publish_snapshot(self) -> Optional[Dict[str, Any]]:
+        """Publish the committed database as the UI's read-only snapshot, when enabled"""
+        if not self.snapshot_config.get('enabled', False):
+            return None
+        try:
+            return publish_snapshot(self.db_path, self.snapshot_config.get(
+                'path', str(self.data_dir / 'snapshots' / 'fund_data.db')))
+        except Exception as e:
+            # The UI keeps serving the previous snapshot
+            logger.error(f"Publishing the read snapshot failed: {str(e)}")
+            return None
+    
+    def _process_region(self, run_date: datetime, data_date: datetime, region: str):
+        """Download and ingest one region's daily file, carrying forward if none arrives"""
+        # Download the file using SAP OpenDocument
+        filepath = self.download_file(
+            self.config['sap_urls'][region.lower()],
+            region,
+            data_date
+        )
+        
+        if not filepath or not os.path.exists(filepath):
+            logger.warning(f"No file available for {region}, carrying forward data")
+            self.carry_forward_data(run_date, region)
+            return
+        
+        # Stream the Excel file: validate, transform and load chunk by chunk
+        logger.info(f"Reading {region} file: {filepath}")
+        is_valid, issues = self.ingest_file(filepath, region, data_date)
+        self._report_ingest(region, is_valid, issues)
+    
+    def _report_ingest(self, region: str, is_valid: bool, issues: List[str]):
+        """Log the outcome of a region's ingest"""
+        if not is_valid:
+            logger.error(f"Validation failed for {region}: {issues}")
+        elif issues:
+            logger.warning(f"Validation warnings for {region}: {issues}")
+    
+    def _log_region_failure(self, region: str, data_date: datetime, error: Exception):
+        """Record a failed region run in etl_log"""
+        conn = connect(self.db_path, self.db_settings)
+        cursor = conn.cursor()
+        cursor.execute("""
+        INSERT INTO etl_log (run_date, region, file_date, status, issues)
+        VALUES (?, ?, ?, ?, ?)
+        """, (datetime.now().date(), region, data_date.date(), 'FAILED', str(error)))
+        conn.commit()
+        conn.close()
+    
+    def _lookback_alert(self, region: str, validation_results: Dict) -> Optional[str]:
+        """Log lookback validation results and build an alert if an update is required"""
+        logger.info(f"{region} validation results: "
+                  f"{validation_results['summary']['missing_dates_count']} missing dates, "
+                  f"{validation_results['summary']['changed_records_count']} changed records")
+        
+        if not validation_results['summary']['requires_update']:
+            return None
+        
+        alert_msg = f"\n{region} Validation Alert:\n"
+        alert_msg += f"- Missing dates: {', '.join(validation_results['missing_dates'][:5])}"
+        if len(validation_results['missing_dates']) > 5:
+            alert_msg += f" and {len(validation_results['missing_dates']) - 5} more"
+        alert_msg += f"\n- Changed records: {validation_results['summary']['changed_records_count']}"
+        return alert_msg
+    
+    def _reconcile_in_sql(self) -> bool:
+        return self.config.get('validation', {}).get('update_mode') == 'reconcile'
+    
+    def _prepare_lookback(self, filepath: str, region: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """Read a lookback file and validate it against the database (read-only)"""
+        lookback_df = self.read_lookback_file(filepath, region)
+        return lookback_df, self.validate_against_lookback(region, lookback_df)
+    
+    def _run_regions_concurrently(self, run_date: datetime, data_date: datetime,
+                                  regions: List[str], validate: bool) -> List[str]:
+        """
+        Concurrent variant of the per-region daily load and lookback validation.
+        
+        Downloads run on an I/O thread pool (one worker by default, since SAP
+        downloads share a Chrome lock), parsing/transforming/validating runs in
+        worker processes as soon as each file lands, and every SQLite write is
+        funnelled through a single writer thread. Lookback downloads start
+        immediately; their validation waits until the daily loads are written.
+        
+        Returns: list of validation alert messages
+        """
+        concurrency = self.config.get('concurrency', {})
+        # Spawned (not forked) workers: forking while download threads run can deadlock
+        mp_context = multiprocessing.get_context('spawn')
+        
+        with ThreadPoolExecutor(max_workers=concurrency.get('download_workers', 1),
+                                thread_name_prefix='etl-download') as io_pool, \
+             ProcessPoolExecutor(max_workers=concurrency.get('process_workers', len(regions)),
+                                 mp_context=mp_context) as cpu_pool, \
+             ThreadPoolExecutor(max_workers=1, thread_name_prefix='etl-writer') as writer:
+            
+            # Daily downloads first, then lookback downloads, in one I/O queue
+            daily_downloads = {
+                region: io_pool.submit(self.download_file, self.config['sap_urls'][region.lower()],
+                                       region, data_date)
+                for region in regions
+            }
+            lookback_downloads = {
+                region: io_pool.submit(self.download_lookback_path, region)
+                for region in regions
+            } if validate else {}
+            
+            # Hand each daily file to a worker process as soon as it arrives
+            prepared = {}
+            for region, download in daily_downloads.items():
+                try:
+                    filepath = download.result()
+                    if not filepath or not os.path.exists(filepath):
+                        logger.warning(f"No file available for {region}, carrying forward data")
+                        prepared[region] = writer.submit(self.carry_forward_data, run_date, region)
+                        continue
+                    logger.info(f"Reading {region} file: {filepath}")
+                    prepared[region] = cpu_pool.submit(self.prepare_file, filepath, region, data_date)
+                except Exception as e:
+                    prepared[region] = e
+            
+            daily_writes = []
+            for region, future in prepared.items():
+                try:
+                    if isinstance(future, Exception):
+                        raise future
+                    result = future.result()
+                    if isinstance(result, dict):
+                        daily_writes.append((region, writer.submit(self.write_prepared, result)))
+                except Exception as e:
+                    logger.error(f"ETL failed for {region}: {str(e)}")
+                    writer.submit(self._log_region_failure, region, data_date, e)
+            
+            for region, write in daily_writes:
+                try:
+                    self._report_ingest(region, *write.result())
+                except Exception as e:
+                    logger.error(f"ETL failed for {region}: {str(e)}")
+                    writer.submit(self._log_region_failure, region, data_date, e)
+            
+            # Daily loads are committed; lookback validation can now read them
+            writer.submit(lambda: None).result()
+            
+            validation_alerts = []
+            if validate:
+                logger.info("Starting 30-day lookback validation...")
+            
+            validations = {}
+            lookback_files = {}
+            for region, download in lookback_downloads.items():
+                try:
+                    filepath = download.result()
+                    if filepath is not None and self._reconcile_in_sql():
+                        # Streamed into SQLite by the writer; nothing to parse up front
+                        lookback_files[region] = filepath
+                    elif filepath is not None:
+                        validations[region] = cpu_pool.submit(self._prepare_lookback, filepath, region)
+                except Exception as e:
+                    logger.error(f"Error downloading lookback file for {region}: {str(e)}")
+            
+            updates = []
+            # Validation and correction both write, so they run on the writer
+            reconciliations = [(region, writer.submit(self.reconcile_lookback_file, region, filepath))
+                               for region, filepath in lookback_files.items()]
+            for region, future in validations.items():
+                try:
+                    lookback_df, validation_results = future.result()
+                    alert_msg = self._lookback_alert(region, validation_results)
+                    if alert_msg:
+                        validation_alerts.append(alert_msg)
+                        # Update database with corrected data
+                        updates.append((region, writer.submit(
+                            self.update_from_lookback, region, lookback_df, validation_results)))
+                except Exception as e:
+                    logger.error(f"Lookback validation failed for {region}: {str(e)}")
+                    validation_alerts.append(f"\n{region} Validation Error: {str(e)}")
+            
+            for region, reconciliation in reconciliations:
+                try:
+                    alert_msg = self._lookback_alert(region, reconciliation.result())
+                    if alert_msg:
+                        validation_alerts.append(alert_msg)
+                except Exception as e:
+                    logger.error(f"Lookback validation failed for {region}: {str(e)}")
+                    validation_alerts.append(f"\n{region} Validation Error: {str(e)}")
+            
+            for region, update in updates:
+                try:
+                    update.result()
+                except Exception as e:
+                    logger.error(f"Lookback validation failed for {region}: {str(e)}")
+                    validation_alerts.append(f"\n{region} Validation Error: {str(e)}")
+        
+        return validation_alerts
+    
     def _format_validation_summary(self, results: Dict) -> str:
         """Format validation results into a summary string"""
         summary = results.get('summary', {})
@@ -1323,136 +1579,111 @@ class FundDataETL:
     def update_from_lookback(self, region: str, lookback_df: pd.DataFrame, 
                            validation_results: Dict, update_mode: str = 'selective') -> Dict:
         """Update database from lookback data based on validation results"""
+        if update_mode == 'reconcile':
+            # Validation results are not needed; reconciliation finds the changes itself
+            return {'mode': 'reconcile', **self.reconcile_lookback(region, lookback_df)['reconciled']}
+        if update_mode not in ('selective', 'full'):
+            return None
+        
+        conn = connect(self.db_path, self.db_settings)
+        cursor = conn.cursor()
+        
         try:
+            ensure_revisions_table(cursor)
+            
             if update_mode == 'selective':
                 # Only update changed records
                 changed_records = validation_results.get('changed_records', [])
-                records_updated = 0
                 
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
+                # A correction to a carried-forward date applies to that date only
+                materialize(cursor, region, {record['date'] for record in changed_records})
                 
-                for record in changed_records:
-                    fund_code = record['fund_code']
-                    date = record['date']
-                    
-                    # Get the lookback record (lookback_df has Excel column names)
-                    lb_record = lookback_df[
-                        (lookback_df['Date'].dt.strftime('%Y-%m-%d') == date) & 
-                        (lookback_df['Fund Code'] == fund_code)
-                    ]
-                    
-                    if not lb_record.empty:
-                        # Update the record - need to map Excel columns to DB columns
-                        excel_data = lb_record.iloc[0].to_dict()
-                        
-                        # Column mapping from Excel to database
-                        column_mapping = {
-                            'Share Class Assets (dly/$mils)': 'share_class_assets',
-                            'Portfolio Assets (dly/$mils)': 'portfolio_assets',
-                            '1-DSY (dly)': 'one_day_yield',
-                            '7-DSY (dly)': 'seven_day_yield',
-                            'WAM (dly)': 'wam',
-                            'WAL (dly)': 'wal',
-                            'Daily Liquidity (%)': 'daily_liquidity',
-                            'Weekly Liquidity (%)': 'weekly_liquidity'
-                        }
-                        
-                        # Build update data with only mapped columns that exist
-                        update_values = []
-                        update_columns = []
-                        for excel_col, db_col in column_mapping.items():
-                            if excel_col in excel_data:
-                                update_columns.append(db_col)
-                                update_values.append(excel_data[excel_col])
-                        
-                        if update_columns:
-                            set_clause = ', '.join([f"{col} = ?" for col in update_columns])
-                            update_values.extend([region, date, fund_code])
-                            
-                            cursor.execute(f"""
-                            UPDATE fund_data 
-                            SET {set_clause}
-                            WHERE region = ? AND date = ? AND fund_code = ?
-                            """, update_values)
-                        
-                        records_updated += 1
+                # Column mapping from Excel to database
+                column_mapping = {
+                    'Share Class Assets (dly/$mils)': 'share_class_assets',
+                    'Portfolio Assets (dly/$mils)': 'portfolio_assets',
+                    '1-DSY (dly)': 'one_day_yield',
+                    '7-DSY (dly)': 'seven_day_yield',
+                    'WAM (dly)': 'wam',
+                    'WAL (dly)': 'wal',
+                    'Daily Liquidity (%)': 'daily_liquidity',
+                    'Weekly Liquidity (%)': 'weekly_liquidity'
+                }
+                
+                # The lookback row of each changed record, matched once for all of them
+                columns = {excel_col: db_col for excel_col, db_col in column_mapping.items()
+                           if excel_col in lookback_df.columns}
+                lookback_rows = lookback_df[list(columns)].rename(columns=columns)
+                lookback_rows.insert(0, 'date', lookback_df['Date'].dt.strftime('%Y-%m-%d'))
+                lookback_rows.insert(1, 'fund_code', lookback_df['Fund Code'])
+                lookback_rows = lookback_rows.drop_duplicates(['date', 'fund_code'])
+                requested = pd.DataFrame([(record['date'], record['fund_code']) for record in changed_records],
+                                         columns=['date', 'fund_code'])
+                matched = requested.merge(lookback_rows, on=['date', 'fund_code'])
+                records_updated = len(matched)
+                updated_dates = set(matched['date'])
                 
+                # Only changed fields are written, each logged with its old value
+                revisions = update_rows(cursor, region, matched, 'lookback_selective')
+                
+                # Stored quality profiles follow the corrected slices and the dates aliased to them
+                aliases = alias_dates_of(cursor, region, updated_dates)
+                refresh_profiles(cursor, region, sorted(updated_dates.union(*aliases.values())))
+                refresh_summary(cursor, region, updated_dates)
+                refresh_digests(cursor, region, updated_dates)
                 conn.commit()
-                conn.close()
+                self._update_mirror(conn, region, {record['date'] for record in changed_records})
                 
                 return {
                     'records_updated': records_updated,
-                    'mode': 'selective'
+                    'mode': 'selective',
+                    'revisions': revisions
                 }
                 
-            elif update_mode == 'full':
-                # Replace all records for the dates in lookback
+            else:
+                # Bring the dates in lookback in line with it
                 # Convert dates to strings
-                dates = lookback_df['Date'].dt.strftime('%Y-%m-%d').unique()
+                dates = lookback_df['Date'].dropna().dt.strftime('%Y-%m-%d').unique()
                 
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
+                # Diff against the stored rows; funds missing from a lookback date are removed
+                lookback_rows = lookback_df.drop(columns=['Region'], errors='ignore')
+                df_load = self._lookback_load(lookback_rows, region)
+                fields = [col for col in REVISION_FIELDS if col in df_load.columns]
+                changes = diff_stored(cursor, region, dates, df_load, fields)
+                changed_dates = sorted(set(changes['date']))
                 
-                # Delete existing records for these dates
-                for date in dates:
-                    cursor.execute("""
-                    DELETE FROM fund_data 
-                    WHERE region = ? AND date = ?
-                    """, (region, date))
+                # Aliased dates that are revised, or whose source date is, become physical first
+                source_dates = {date: resolve_date(cursor, region, date) for date in dates}
+                materialize(cursor, region, [date for date, source in source_dates.items() if source != date
+                                             and (date in changed_dates or source in changed_dates)])
+                check_open(cursor, changed_dates)
+                counts = apply_revisions(cursor, region, changes)
+                counts['unchanged'] = len(df_load) - counts['inserted'] - counts['updated']
+                revisions = record_revisions(cursor, region, changes, 'lookback_full')
                 
-                # Prepare lookback data for insertion
-                insert_df = lookback_df.copy()
-                # Use the same column mapping as in load_to_database
-                column_mapping = {
-                    'Date': 'date',
-                    'Fund Code': 'fund_code',
-                    'Fund Name': 'fund_name',
-                    'Master Class Fund Name': 'master_class_fund_name',
-                    'Rating (M/S&P/F)': 'rating',
-                    'Unique Identifier': 'unique_identifier',
-                    'NASDAQ': 'nasdaq',
-                    'Fund Complex (Historical)': 'fund_complex',
-                    'SubCategory Historical': 'subcategory',
-                    'Domicile': 'domicile',
-                    'Currency': 'currency',
-                    'Share Class Assets (dly/$mils)': 'share_class_assets',
-                    'Portfolio Assets (dly/$mils)': 'portfolio_assets',
-                    '1-DSY (dly)': 'one_day_yield',
-                    '1-GDSY (dly)': 'one_day_gross_yield',
-                    '7-DSY (dly)': 'seven_day_yield',
-                    '7-GDSY (dly)': 'seven_day_gross_yield',
-                    'Chgd Expense Ratio (mo/dly)': 'expense_ratio',
-                    'WAM (dly)': 'wam',
-                    'WAL (dly)': 'wal',
-                    'Transactional NAV': 'transactional_nav',
-                    'Market NAV': 'market_nav',
-                    'Daily Liquidity (%)': 'daily_liquidity',
-                    'Weekly Liquidity (%)': 'weekly_liquidity',
-                    'Fees': 'fees',
-                    'Gates': 'gates'
-                }
-                insert_df = insert_df.rename(columns=column_mapping)
-                insert_df['region'] = region
-                insert_df['date'] = insert_df['date'].dt.strftime('%Y-%m-%d')
-                
-                # Insert all lookback records
-                insert_df.to_sql('fund_data', conn, if_exists='append', index=False)
+                aliases = alias_dates_of(cursor, region, changed_dates)
+                refresh_profiles(cursor, region, sorted(set(changed_dates).union(*aliases.values())))
+                refresh_summary(cursor, region, changed_dates)
+                refresh_digests(cursor, region, changed_dates)
                 
                 conn.commit()
-                conn.close()
+                self._update_mirror(conn, region, changed_dates)
+                logger.info(f"Full lookback update for {region}: {format_counts(counts)}, "
+                            f"{revisions} field revisions")
                 
                 return {
                     'records_updated': len(lookback_df),
-                    'mode': 'full'
+                    'mode': 'full',
+                    'revisions': revisions,
+                    **counts
                 }
-            
-            else:
-                return None
                 
         except Exception as e:
             logger.error(f"Failed to update from lookback: {str(e)}")
-            return None
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
 
 
 # Configuration template
@@ -1471,6 +1702,41 @@ CONFIG_TEMPLATE = {
     "data_dir": "/data",
     "download_timeout": 300,
     "lookback_timeout": 1200,
+    "read_chunk_size": 5000,
+    "concurrency": {
+        "enabled": False,
+        "download_workers": 1,
+        "process_workers": 2
+    },
+    "parsed_cache": {
+        "enabled": True,
+        "max_age_days": 14,
+        "max_size_mb": 512
+    },
+    "calendar": {
+        "regions": {"AMRS": "US", "EMEA": "US"}
+    },
+    "database": {
+        "cache_size_kb": 65536,
+        "mmap_size_mb": 256,
+        "busy_timeout_ms": 30000
+    },
+    "snapshot": {
+        "enabled": False,
+        "path": "/data/snapshots/fund_data.db"
+    },
+    "columnar_mirror": {
+        "enabled": False,
+        "dir": "/data/columnar"
+    },
+    "partitions": {
+        "enabled": False,
+        "dir": "/data/partitions",
+        "open_months": 3,
+        "cold_dir": None,
+        "cold_after_months": 12,
+        "vacuum": True
+    },
     "verify_ssl": True,
     "email_alerts": {
         "enabled": False,
@@ -10,9 +10,6 @@ import sys
 import argparse
 import logging
 from datetime import datetime, timedelta
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import json
 import traceback
 from pathlib import Path
@@ -23,8 +20,8 @@ import tempfile
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from fund_etl_pipeline import FundDataETL
-from fund_etl_utilities import FundDataMonitor
+# The pipeline and monitor (pandas, numpy) are imported when a scheduler is
+# built, so --setup-cron, --create-config and --help start without them
 
 
 class ETLScheduler:
@@ -38,6 +35,9 @@ class ETLScheduler:
         )
         self.logger = logging.getLogger(__name__)
         
+        from fund_etl_pipeline import FundDataETL
+        from fund_etl_utilities import FundDataMonitor
+        
         self.config = self._load_config(config_path)
         self.etl = FundDataETL(self.config.get('etl_config_path', '/config/config.json'))
         self.monitor = FundDataMonitor(self.etl.db_path)
@@ -114,7 +114,12 @@ class ETLScheduler:
                 },
                 'backfill_days': 7,
                 'log_dir': '/logs',
-                'etl_config_path': '/config/config.json'
+                'etl_config_path': '/config/config.json',
+                'maintenance': {
+                    'enabled': True,
+                    'weekly_interval_days': 7,
+                    'vacuum_budget_seconds': 30
+                }
             }
     
     def send_email_alert(self, subject: str, body: str, is_error: bool = False):
@@ -122,6 +127,10 @@ class ETLScheduler:
         if not self.config.get('email_alerts', {}).get('enabled', False):
             return
         
+        import smtplib
+        from email.mime.text import MIMEText
+        from email.mime.multipart import MIMEMultipart
+        
         try:
             email_config = self.config['email_alerts']
             
@@ -212,6 +221,39 @@ class ETLScheduler:
         
         return False
 
+    def run_maintenance(self, weekly: bool = False) -> bool:
+        """
+        Run database maintenance (statistics, checkpoint, incremental vacuum,
+        integrity check); alerts when the integrity check fails
+        """
+        from db_maintenance import run_maintenance
+        
+        try:
+            steps = run_maintenance(self.etl.db_path, weekly, self.config.get('maintenance', {}))
+        except Exception as e:
+            self.logger.error(f"Database maintenance failed: {str(e)}")
+            return False
+        
+        failed = [f"{step['step']}: {step['detail']}" for step in steps if step['status'] == 'FAILED']
+        if failed:
+            self.send_email_alert(
+                f"Database Maintenance Failed - {datetime.now().strftime('%Y-%m-%d')}",
+                "\n".join(failed),
+                is_error=True
+            )
+        return not failed
+    
+    def maintain_after_load(self) -> bool:
+        """Post-load maintenance, or the weekly run when it is due"""
+        maintenance_config = self.config.get('maintenance', {})
+        if not maintenance_config.get('enabled', True):
+            return True
+        
+        from db_maintenance import weekly_due
+        
+        weekly = weekly_due(self.etl.db_path, maintenance_config.get('weekly_interval_days', 7))
+        return self.run_maintenance(weekly)
+    
     def backfill_missing_dates(self, days: int = None):
         """Backfill any missing dates"""
         if days is None:
@@ -269,6 +311,8 @@ class ETLScheduler:
                 
                 # Check for and backfill any missing recent dates
                 self.backfill_missing_dates()
+                
+                self.maintain_after_load()
             
             self.logger.info("Scheduled ETL run completed")
             
@@ -292,6 +336,7 @@ class ETLScheduler:
             
             if success:
                 self.logger.info(f"ETL run completed successfully for {target_date.strftime('%Y-%m-%d')}")
+                self.maintain_after_load()
             else:
                 self.logger.error(f"ETL run failed for {target_date.strftime('%Y-%m-%d')}")
             
@@ -306,28 +351,29 @@ class ETLScheduler:
         
         self.logger.info(f"Running historical load from {start_date} to {end_date}")
         
-        current = start
+        # Every business day in the range in one calendar lookup
+        business_days = self.etl.calendar.business_days(start, end)
+        total_count = len(business_days)
         success_count = 0
-        total_count = 0
         
-        while current <= end:
-            if self.etl.is_business_day(current):
-                total_count += 1
-                self.logger.info(f"Processing {current.strftime('%Y-%m-%d')}")
-                
-                if self.run_with_retry(current):
-                    success_count += 1
-                
-            current += timedelta(days=1)
+        for day in business_days.tolist():
+            current = datetime.combine(day, datetime.min.time())
+            self.logger.info(f"Processing {current.strftime('%Y-%m-%d')}")
+            
+            if self.run_with_retry(current):
+                success_count += 1
         
         self.logger.info(f"Historical load complete: {success_count}/{total_count} successful")
+        
+        if success_count:
+            self.maintain_after_load()
 
     def run_validation(self, update_mode: Optional[str] = None):
         """
         Run 30-day lookback validation with configurable update mode
         
         Args:
-            update_mode: 'selective' or 'full' - overrides config setting
+            update_mode: 'selective', 'full' or 'reconcile' - overrides config setting
         """
         if not self.acquire_lock():
             print("Another ETL process is already running. Skipping validation.")
@@ -349,7 +395,20 @@ class ETLScheduler:
                 print(f"\nValidating {region}...")
                 try:
                     lookback_df = self.etl.download_lookback_file(region)
-                    if lookback_df is not None:
+                    mode = update_mode or self.etl.config.get('validation', {}).get('update_mode', 'selective')
+                    if lookback_df is not None and mode == 'reconcile':
+                        # Validates and corrects in SQL in one pass
+                        results = self.etl.reconcile_lookback(region, lookback_df)
+                        reconciled = results['reconciled']
+                        print(f"Total records in lookback file: {len(lookback_df)}")
+                        print(f"Missing dates: {results['summary']['missing_dates_count']}")
+                        print(f"Changed records: {results['summary']['changed_records_count']}")
+                        validation_summary.append(
+                            f"{region}: Reconcile update - "
+                            f"{len(reconciled['missing_dates'])} missing dates added, "
+                            f"{reconciled['updated']} records updated, {reconciled['new_funds']} new funds added"
+                        )
+                    elif lookback_df is not None:
                         results = self.etl.validate_against_lookback(region, lookback_df)
                         
                         # Display validation results
@@ -358,8 +417,6 @@ class ETLScheduler:
                         print(f"Changed records: {results['summary']['changed_records_count']}")
                         
                         if results['summary']['requires_update']:
-                            # Determine update mode
-                            mode = update_mode or self.etl.config.get('validation', {}).get('update_mode', 'selective')
                             print(f"Updating database with corrected data using {mode} mode...")
                             
                             # Update with specified mode
@@ -396,6 +453,9 @@ class ETLScheduler:
                 print(f"  - {summary}")
             print("="*60)
             
+            # The dashboard sees the corrections once they are all committed
+            self.etl.publish_snapshot()
+            
             # Generate validation report
             validation_report = self.monitor.generate_validation_report()
             print(validation_report)
@@ -426,7 +486,14 @@ SCHEDULER_CONFIG_TEMPLATE = {
         "retry_delay_minutes": 30
     },
     "backfill_days": 7,
-    "log_dir": "/logs"
+    "log_dir": "/logs",
+    "maintenance": {
+        "enabled": True,
+        "weekly_interval_days": 7,
+        "vacuum_budget_seconds": 30,
+        "vacuum_pages_per_step": 1024,
+        "convert_auto_vacuum": True
+    }
 }
 
 
@@ -445,6 +512,8 @@ def setup_cron_job():
     print("(Edit crontab with: crontab -e)")
     print("\n# Run Fund ETL daily at 6 AM Eastern Time")
     print(f"0 6 * * * /usr/bin/python3 {script_path} --run-daily >> /var/log/fund_etl_cron.log 2>&1")
+    print("\n# Weekly database maintenance, Sunday at 3 AM (also run by --run-daily when overdue)")
+    print(f"0 3 * * 0 /usr/bin/python3 {script_path} --maintenance-weekly >> /var/log/fund_etl_cron.log 2>&1")
     print("\nFor Windows Task Scheduler, create a task that runs:")
     print(f"python {script_path} --run-daily")
 
@@ -466,10 +535,14 @@ def main():
                        help='Run 30-day lookback validation with selective updates')
     parser.add_argument('--validate-full', action='store_true',
                        help='Run 30-day lookback validation with full replacement')
-    parser.add_argument('--update-mode', choices=['selective', 'full'],
+    parser.add_argument('--update-mode', choices=['selective', 'full', 'reconcile'],
                        help='Override validation update mode')
     parser.add_argument('--run-date', metavar='DATE',
                        help='Run ETL for a specific date (YYYY-MM-DD format)')
+    parser.add_argument('--maintenance', action='store_true',
+                       help='Run post-load database maintenance')
+    parser.add_argument('--maintenance-weekly', action='store_true',
+                       help='Run weekly database maintenance (full ANALYZE and integrity check)')
     
     args = parser.parse_args()
     
@@ -504,6 +577,16 @@ def main():
         # Full replacement validation
         scheduler.run_validation(update_mode='full')
     
+    elif args.maintenance or args.maintenance_weekly:
+        # Not while a load holds the database
+        if not scheduler.acquire_lock():
+            sys.exit(1)
+        try:
+            success = scheduler.run_maintenance(weekly=args.maintenance_weekly)
+        finally:
+            scheduler.release_lock()
+        sys.exit(0 if success else 1)
+    
     elif args.run_date:
         # Run ETL for specific date
         try:
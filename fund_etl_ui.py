@@ -12,7 +12,6 @@ Key improvements:
 """
 
 from flask import Flask, render_template_string, jsonify, request
-import sqlite3
 import pandas as pd
 import numpy as np
 import json
@@ -27,10 +26,30 @@ import time
 import sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from workflow_db_tracker import DatabaseWorkflowTracker
+from daily_summary import totals as summary_totals
+from db_maintenance import recent_runs as recent_maintenance
+from db_connection import READ_ONLY_SETTINGS, connect
+from load_quality import read_profile
+from snapshot import snapshot_info
+from partitions import ROUTED_VIEW, PartitionRouter
+from columnar_mirror import ColumnarMirror
+from bulk_loader import FUND_DATA_COLUMNS
 
 app = Flask(__name__)
 
 DB_PATH = os.environ.get('DB_PATH', '/data/fund_data.db')
+# Parquet mirror written by the pipeline (columnar_mirror config section); exports use it only when enabled
+MIRROR_DIR = os.environ.get('COLUMNAR_MIRROR_DIR', '/data/columnar')
+MIRROR_ENABLED = os.environ.get('COLUMNAR_MIRROR_ENABLED', '').lower() in ('1', 'true', 'yes')
+# Read-only snapshot published by the pipeline (snapshot config section); unset reads the live database
+SNAPSHOT_PATH = os.environ.get('DB_SNAPSHOT_PATH')
+
+
+def read_connection():
+    """Connection for dashboard reads: the latest published snapshot when there is one, else the live database"""
+    if SNAPSHOT_PATH and os.path.exists(SNAPSHOT_PATH):
+        return connect(SNAPSHOT_PATH, READ_ONLY_SETTINGS)
+    return connect(DB_PATH)
 
 # Workflow tracking - now using database persistence
 workflow_status = {}
@@ -310,7 +329,7 @@ HTML_TEMPLATE = '''
 <body>
     <div class="header">
         <h1>🏦 Fund ETL Monitor - Enhanced Dashboard</h1>
-        <p style="margin: 5px 0 0 0; opacity: 0.9;">Last updated: {{ current_time }}</p>
+        <p style="margin: 5px 0 0 0; opacity: 0.9;">Last updated: {{ current_time }}{% if snapshot %} &middot; Data snapshot: {{ snapshot.published_at }}{% endif %}</p>
     </div>
     
     <div class="nav">
@@ -371,6 +390,32 @@ HTML_TEMPLATE = '''
                 </tbody>
             </table>
             
+            <h3>Database Maintenance</h3>
+            <table>
+                <thead>
+                    <tr>
+                        <th>Started</th>
+                        <th>Trigger</th>
+                        <th>Duration</th>
+                        <th>Database Size</th>
+                        <th>Steps</th>
+                    </tr>
+                </thead>
+                <tbody>
+                    {% for run in maintenance_runs %}
+                    <tr>
+                        <td>{{ run.run_started }}</td>
+                        <td>{{ run.trigger }}</td>
+                        <td>{{ '%.1f'|format(run.duration_ms / 1000) }}s</td>
+                        <td>{{ '%.1f'|format(run.db_bytes_before / 1048576) }} MB &rarr; {{ '%.1f'|format(run.db_bytes_after / 1048576) }} MB</td>
+                        <td class="status-{{ 'failed' if run.failed else 'success' }}">{{ run.steps }}</td>
+                    </tr>
+                    {% else %}
+                    <tr><td colspan="5">No maintenance runs recorded</td></tr>
+                    {% endfor %}
+                </tbody>
+            </table>
+            
             <h3>Data Quality by Region</h3>
             <table>
                 <thead>
@@ -459,6 +504,7 @@ HTML_TEMPLATE = '''
                 <select id="etlStatusFilter" onchange="filterETLLog()">
                     <option value="">All Status</option>
                     <option value="SUCCESS">Success</option>
+                    <option value="SKIPPED_UNCHANGED">Skipped (Unchanged)</option>
                     <option value="FAILED">Failed</option>
                     <option value="CARRIED_FORWARD">Carried Forward</option>
                     <option value="LOOKBACK_UPDATE">Lookback Update</option>
@@ -711,7 +757,7 @@ HTML_TEMPLATE = '''
             
             filtered.forEach(row => {
                 const tr = document.createElement('tr');
-                const statusClass = row.status === 'SUCCESS' ? 'status-success' : 
+                const statusClass = ['SUCCESS', 'SKIPPED_UNCHANGED'].includes(row.status) ? 'status-success' : 
                                   row.status === 'FAILED' ? 'status-failed' : 'status-carried';
                 
                 tr.innerHTML = `
@@ -1065,16 +1111,21 @@ HTML_TEMPLATE = '''
 </html>
 '''
 
+def _round_pct(value):
+    return None if value is None else round(value, 1)
+
+
 @app.route('/')
 def index():
     """Main dashboard page"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = read_connection()
         
-        # Get overview metrics
-        total_records = pd.read_sql_query("SELECT COUNT(*) as count FROM fund_data", conn).iloc[0]['count']
-        unique_funds = pd.read_sql_query("SELECT COUNT(DISTINCT fund_code) as count FROM fund_data", conn).iloc[0]['count']
-        latest_date = pd.read_sql_query("SELECT MAX(date) as date FROM fund_data", conn).iloc[0]['date']
+        # Get overview metrics (daily_summary is maintained by each load, not recounted here)
+        totals = summary_totals(conn)
+        total_records = totals['records']
+        unique_funds = totals['unique_funds']
+        latest_date = totals['max_date']
         
         # Get missing dates count
         end_date = datetime.now().date()
@@ -1082,7 +1133,7 @@ def index():
         missing_query = f"""
         SELECT COUNT(DISTINCT date) as count 
         FROM (
-            SELECT DISTINCT date FROM fund_data 
+            SELECT DISTINCT date FROM resolved_dates 
             WHERE date BETWEEN '{start_date}' AND '{end_date}'
         )
         """
@@ -1100,7 +1151,7 @@ def index():
         
         recent_runs = []
         for _, run in recent_runs_df.iterrows():
-            status_class = 'success' if run['status'] == 'SUCCESS' else 'failed' if run['status'] == 'FAILED' else 'carried'
+            status_class = 'success' if run['status'] in ('SUCCESS', 'SKIPPED_UNCHANGED') else 'failed' if run['status'] == 'FAILED' else 'carried'
             recent_runs.append({
                 'run_date': run['run_date'],
                 'region': run['region'],
@@ -1117,35 +1168,27 @@ def index():
             # First get the latest date for this specific region
             region_date_query = f"""
             SELECT MAX(date) as latest_date 
-            FROM fund_data 
+            FROM resolved_dates 
             WHERE region = '{region}'
             """
             region_latest = pd.read_sql_query(region_date_query, conn).iloc[0]['latest_date']
             
             if region_latest:
-                quality_query = f"""
-                SELECT 
-                    COUNT(*) as records,
-                    ROUND(AVG(CASE WHEN share_class_assets IS NOT NULL THEN 1 ELSE 0 END) * 100, 1) as assets_pct,
-                    ROUND(AVG(CASE WHEN one_day_yield IS NOT NULL THEN 1 ELSE 0 END) * 100, 1) as yield_1d_pct,
-                    ROUND(AVG(CASE WHEN seven_day_yield IS NOT NULL THEN 1 ELSE 0 END) * 100, 1) as yield_7d_pct,
-                    ROUND(AVG(CASE WHEN daily_liquidity IS NOT NULL THEN 1 ELSE 0 END) * 100, 1) as liquidity_pct
-                FROM fund_data
-                WHERE region = '{region}' AND date = '{region_latest}'
-                """
-                
-                quality_df = pd.read_sql_query(quality_query, conn)
-                if len(quality_df) > 0 and quality_df.iloc[0]['records'] > 0:
-                    row = quality_df.iloc[0]
+                # Profile stored at load time (load_quality), not a rescan of fund_data
+                profile = read_profile(conn, region, region_latest)
+                if profile and profile['records']:
                     data_quality.append({
                         'name': f"{region} ({region_latest})",
-                        'records': row['records'],
-                        'assets_pct': row['assets_pct'],
-                        'yield_1d_pct': row['yield_1d_pct'],
-                        'yield_7d_pct': row['yield_7d_pct'],
-                        'liquidity_pct': row['liquidity_pct']
+                        'records': profile['records'],
+                        'assets_pct': _round_pct(profile['pct_with_assets']),
+                        'yield_1d_pct': _round_pct(profile['pct_with_1d_yield']),
+                        'yield_7d_pct': _round_pct(profile['pct_with_7d_yield']),
+                        'liquidity_pct': _round_pct(profile['pct_with_daily_liq'])
                     })
         
+        maintenance_runs = recent_maintenance(conn, limit=5)
+        snapshot = snapshot_info(conn)
+        
         conn.close()
         
         return render_template_string(
@@ -1156,6 +1199,8 @@ def index():
             latest_date=latest_date,
             missing_dates=missing_dates,
             recent_runs=recent_runs,
+            maintenance_runs=maintenance_runs,
+            snapshot=snapshot,
             data_quality=data_quality
         )
         
@@ -1166,7 +1211,7 @@ def index():
 def get_fund_data():
     """API endpoint for fund data"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = read_connection()
         
         # Fixed query - removed problematic date filtering
         query = """
@@ -1175,7 +1220,7 @@ def get_fund_data():
             share_class_assets, portfolio_assets,
             one_day_yield, seven_day_yield,
             daily_liquidity
-        FROM fund_data
+        FROM fund_data_resolved
         ORDER BY date DESC, region, fund_code
         LIMIT 10000
         """
@@ -1195,7 +1240,7 @@ def get_fund_data():
 def get_etl_log():
     """API endpoint for ETL log data"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = read_connection()
         
         query = """
         SELECT 
@@ -1216,11 +1261,23 @@ def get_etl_log():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/maintenance')
+def get_maintenance():
+    """API endpoint for database maintenance runs"""
+    try:
+        conn = read_connection()
+        runs = recent_maintenance(conn, limit=int(request.args.get('limit', 20)))
+        conn.close()
+        return jsonify(runs)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/telemetry')
 def get_telemetry():
     """API endpoint for telemetry data"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = read_connection()
         
         telemetry = {}
         
@@ -1252,7 +1309,7 @@ def get_telemetry():
         # Success rate (last 7 days)
         success_rate_query = """
         SELECT 
-            ROUND(AVG(CASE WHEN status = 'SUCCESS' THEN 100.0 ELSE 0.0 END), 1) as rate
+            ROUND(AVG(CASE WHEN status IN ('SUCCESS', 'SKIPPED_UNCHANGED') THEN 100.0 ELSE 0.0 END), 1) as rate
         FROM etl_log
         WHERE run_date >= date('now', '-7 days')
         """
@@ -1262,27 +1319,26 @@ def get_telemetry():
         # Average processing time (dummy for now)
         telemetry['avg_processing_time'] = '45'
         
-        # Data coverage
-        coverage_query = """
-        SELECT 
-            CAST(julianday(MAX(date)) - julianday(MIN(date)) AS INTEGER) as days
-        FROM fund_data
-        """
-        coverage = pd.read_sql_query(coverage_query, conn).iloc[0]['days']
-        telemetry['data_coverage_days'] = int(coverage) if coverage is not None else 0
+        # Data coverage, funds and row counts come from daily_summary
+        totals = summary_totals(conn)
+        if totals['min_date']:
+            coverage = (pd.Timestamp(totals['max_date']) - pd.Timestamp(totals['min_date'])).days
+        else:
+            coverage = 0
+        telemetry['data_coverage_days'] = int(coverage)
         
         # Unique funds
-        unique_funds = pd.read_sql_query(
-            "SELECT COUNT(DISTINCT fund_code) as count FROM fund_data", 
-            conn
-        ).iloc[0]['count']
-        telemetry['unique_funds'] = int(unique_funds)
+        telemetry['unique_funds'] = int(totals['unique_funds'])
         
         # Database statistics
-        db_stats = []
+        db_stats = [{
+            'metric': 'fund_data rows',
+            'value': f"{totals['stored_records']:,}",
+            'details': 'Total records in fund_data table'
+        }]
         
         # Row counts by table
-        for table in ['fund_data', 'etl_log']:
+        for table in ['date_alias', 'etl_log']:
             count = pd.read_sql_query(f"SELECT COUNT(*) as count FROM {table}", conn).iloc[0]['count']
             db_stats.append({
                 'metric': f'{table} rows',
@@ -1291,27 +1347,19 @@ def get_telemetry():
             })
         
         # Data date range
-        date_range = pd.read_sql_query(
-            "SELECT MIN(date) as min_date, MAX(date) as max_date FROM fund_data", 
-            conn
-        )
-        if date_range.iloc[0]['min_date']:
+        if totals['min_date']:
             db_stats.append({
                 'metric': 'Date Range',
-                'value': f"{date_range.iloc[0]['min_date']} to {date_range.iloc[0]['max_date']}",
+                'value': f"{totals['min_date']} to {totals['max_date']}",
                 'details': 'Range of data dates in database'
             })
         
         # Region distribution
-        region_dist = pd.read_sql_query(
-            "SELECT region, COUNT(*) as count FROM fund_data GROUP BY region", 
-            conn
-        )
-        for _, row in region_dist.iterrows():
+        for region, count in totals['region_records'].items():
             db_stats.append({
-                'metric': f'{row["region"]} Records',
-                'value': f"{row['count']:,}",
-                'details': f'Total records for {row["region"]} region'
+                'metric': f'{region} Records',
+                'value': f"{count:,}",
+                'details': f'Total records for {region} region'
             })
         
         telemetry['db_stats'] = db_stats
@@ -1327,29 +1375,40 @@ def get_telemetry():
 def export_fund_data():
     """Export fund data as CSV"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = read_connection()
         
         # Get filters from query params
         region = request.args.get('region', '')
         date_from = request.args.get('date_from', '')
         date_to = request.args.get('date_to', '')
         
-        query = "SELECT * FROM fund_data WHERE 1=1"
-        params = []
-        
-        if region:
-            query += " AND region = ?"
-            params.append(region)
-        if date_from:
-            query += " AND date >= ?"
-            params.append(date_from)
-        if date_to:
-            query += " AND date <= ?"
-            params.append(date_to)
+        mirror = ColumnarMirror(MIRROR_DIR, enabled=MIRROR_ENABLED)
+        start, end, regions = date_from or '0000-01-01', date_to or '9999-12-31', [region] if region else None
+        if mirror.available() and mirror.is_fresh(conn, start, end, regions):
+            # Reads only the region/month Parquet files in range
+            df = mirror.read(conn, start, end, regions=regions)
+            df = df.sort_values(['date', 'region', 'fund_code'], ascending=[False, True, True])
+        else:
+            # The same columns as the mirror (no internal row_hash)
+            query = f"SELECT {', '.join(FUND_DATA_COLUMNS)} FROM {ROUTED_VIEW} WHERE 1=1"
+            params = []
             
-        query += " ORDER BY date DESC, region, fund_code"
-        
-        df = pd.read_sql_query(query, conn, params=params)
+            if region:
+                query += " AND region = ?"
+                params.append(region)
+            if date_from:
+                query += " AND date >= ?"
+                params.append(date_from)
+            if date_to:
+                query += " AND date <= ?"
+                params.append(date_to)
+                
+            query += " ORDER BY date DESC, region, fund_code"
+            
+            # Only the archived months inside the requested range are attached
+            df = PartitionRouter(conn).read_frame(query, params, start=date_from or None, end=date_to or None,
+                                                  sort_by=['date', 'region', 'fund_code'],
+                                                  ascending=[False, True, True])
         conn.close()
         
         # Convert to CSV (pandas handles NaN properly in CSV format)
@@ -1371,7 +1430,7 @@ def export_fund_data():
 def export_etl_log():
     """Export ETL log as CSV"""
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = read_connection()
         
         df = pd.read_sql_query("SELECT * FROM etl_log ORDER BY created_at DESC", conn)
         conn.close()
@@ -1582,7 +1641,7 @@ def health():
     """Health check endpoint"""
     try:
         # Check database connection
-        conn = sqlite3.connect(DB_PATH)
+        conn = connect(DB_PATH)
         conn.execute("SELECT 1")
         conn.close()
         
@@ -4,29 +4,31 @@ Fund ETL Utilities and Monitoring Tools
 Provides utilities for monitoring ETL runs, data quality checks, and reporting
 """
 
-import sqlite3
+import os
 import pandas as pd
-from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-import seaborn as sns
+from datetime import datetime
 from typing import Optional, Dict, List
 import logging
-import holidays
+
+from bulk_loader import FUND_DATA_COLUMNS
+from business_calendar import get_calendar
+from columnar_mirror import ColumnarMirror
+from db_connection import connect
+from load_quality import COMPLETENESS_FIELDS, read_profile
+from partitions import ROUTED_DATES_VIEW, ROUTED_VIEW, PartitionRouter
+from revision_log import as_of
+from transform_plan import categorize
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# The pipeline's calendar.cache_dir, so both read the same cached calendars
+CALENDAR_CACHE_DIR = os.environ.get('CALENDAR_CACHE_DIR')
+
 
-def get_previous_business_day(date: datetime) -> datetime:
+def get_previous_business_day(date: datetime, cache_dir: Optional[str] = None) -> datetime:
     """Get the previous business day, accounting for weekends and US holidays"""
-    us_holidays = holidays.US()
-    prev_day = date - timedelta(days=1)
-    
-    # Keep going back until we find a business day
-    while prev_day.weekday() >= 5 or prev_day in us_holidays:
-        prev_day = prev_day - timedelta(days=1)
-    
-    return prev_day
+    return get_calendar('US', cache_dir or CALENDAR_CACHE_DIR).prior_business_day(date)
 
 
 class FundDataMonitor:
@@ -37,7 +39,7 @@ class FundDataMonitor:
     
     def get_etl_status(self, days: int = 7) -> pd.DataFrame:
         """Get ETL run status for the last N days"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         
         query = """
         SELECT 
@@ -56,58 +58,53 @@ class FundDataMonitor:
         df = pd.read_sql_query(query, conn)
         conn.close()
         
-        return df
+        return categorize(df, ['region', 'status'])
     
     def check_data_completeness(self, date: Optional[str] = None) -> Dict[str, pd.DataFrame]:
         """Check data completeness for a specific date or latest date"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         
         if date is None:
             # Get the latest date
-            date_query = "SELECT MAX(date) FROM fund_data"
+            date_query = "SELECT MAX(date) FROM resolved_dates"
             date = pd.read_sql_query(date_query, conn).iloc[0, 0]
         
         results = {}
         
         for region in ['AMRS', 'EMEA']:
-            query = f"""
-            SELECT 
-                COUNT(*) as total_records,
-                COUNT(DISTINCT fund_code) as unique_funds,
-                AVG(CASE WHEN share_class_assets IS NOT NULL THEN 1 ELSE 0 END) * 100 as pct_with_assets,
-                AVG(CASE WHEN one_day_yield IS NOT NULL THEN 1 ELSE 0 END) * 100 as pct_with_1d_yield,
-                AVG(CASE WHEN seven_day_yield IS NOT NULL THEN 1 ELSE 0 END) * 100 as pct_with_7d_yield,
-                AVG(CASE WHEN wam IS NOT NULL THEN 1 ELSE 0 END) * 100 as pct_with_wam,
-                AVG(CASE WHEN wal IS NOT NULL THEN 1 ELSE 0 END) * 100 as pct_with_wal,
-                AVG(CASE WHEN daily_liquidity IS NOT NULL THEN 1 ELSE 0 END) * 100 as pct_with_daily_liq,
-                AVG(CASE WHEN weekly_liquidity IS NOT NULL THEN 1 ELSE 0 END) * 100 as pct_with_weekly_liq
-            FROM fund_data
-            WHERE date = '{date}' AND region = '{region}'
-            """
-            
-            results[region] = pd.read_sql_query(query, conn)
+            # Stored at load time in load_quality (profiled from fund_data only if missing)
+            profile = read_profile(conn, region, date) if date else None
+            metrics = {'total_records': 0, 'unique_funds': 0}
+            metrics.update({field: None for field in COMPLETENESS_FIELDS})
+            if profile:
+                metrics['total_records'] = profile['records']
+                metrics['unique_funds'] = profile['unique_funds']
+                metrics.update({field: profile[field] for field in COMPLETENESS_FIELDS})
+            results[region] = pd.DataFrame([metrics])
         
         conn.close()
         return results
     
     def find_missing_dates(self, start_date: str, end_date: str) -> Dict[str, List[str]]:
         """Find missing dates in the database for each region"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         
         # Generate all business days in the range
         date_range = pd.bdate_range(start=start_date, end=end_date, freq='B')
         
         missing_dates = {}
         
+        # Older ranges include the archived monthly partitions they overlap
+        router = PartitionRouter(conn)
         for region in ['AMRS', 'EMEA']:
             query = f"""
             SELECT DISTINCT date 
-            FROM fund_data 
+            FROM {ROUTED_DATES_VIEW} 
             WHERE region = '{region}' 
             AND date BETWEEN '{start_date}' AND '{end_date}'
             """
             
-            existing_dates = pd.read_sql_query(query, conn)['date'].tolist()
+            existing_dates = router.read_frame(query, start=start_date, end=end_date)['date'].tolist()
             existing_dates = [pd.to_datetime(d).date() for d in existing_dates]
             
             missing = [d.date() for d in date_range if d.date() not in existing_dates]
@@ -118,7 +115,7 @@ class FundDataMonitor:
     
     def get_lookback_validation_history(self, days: int = 7) -> pd.DataFrame:
         """Get history of lookback validation updates"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         
         query = """
         SELECT 
@@ -136,7 +133,7 @@ class FundDataMonitor:
         df = pd.read_sql_query(query, conn)
         conn.close()
         
-        return df
+        return categorize(df, ['region'])
     
     def generate_validation_report(self) -> str:
         """Generate a report of recent validation activities"""
@@ -168,8 +165,8 @@ class FundDataMonitor:
     def generate_data_quality_report(self, date: Optional[str] = None) -> str:
         """Generate a comprehensive data quality report"""
         if date is None:
-            conn = sqlite3.connect(self.db_path)
-            date = pd.read_sql_query("SELECT MAX(date) FROM fund_data", conn).iloc[0, 0]
+            conn = connect(self.db_path)
+            date = pd.read_sql_query("SELECT MAX(date) FROM resolved_dates", conn).iloc[0, 0]
             conn.close()
         
         report = f"\n{'='*60}\n"
@@ -218,23 +215,25 @@ class FundDataMonitor:
     
     def plot_data_trends(self, days: int = 30):
         """Plot fund data trends over time"""
-        conn = sqlite3.connect(self.db_path)
+        # matplotlib is only needed here; importing it costs about half a second
+        import matplotlib.pyplot as plt
+        
+        conn = connect(self.db_path)
         
-        # Get daily record counts
+        # Get daily record counts (maintained per load in daily_summary)
         query = """
         SELECT 
             date,
             region,
-            COUNT(*) as record_count,
-            COUNT(DISTINCT fund_code) as unique_funds,
-            AVG(share_class_assets) as avg_assets
-        FROM fund_data
+            row_count as record_count,
+            unique_funds,
+            avg_assets
+        FROM daily_summary
         WHERE date >= date('now', '-{} days')
-        GROUP BY date, region
         ORDER BY date
         """.format(days)
         
-        df = pd.read_sql_query(query, conn, parse_dates=['date'])
+        df = categorize(pd.read_sql_query(query, conn, parse_dates=['date']), ['region'])
         conn.close()
         
         if len(df) == 0:
@@ -286,7 +285,7 @@ class FundDataMonitor:
         ax4 = axes[1, 1]
         etl_df = self.get_etl_status(days)
         if len(etl_df) > 0:
-            etl_summary = etl_df.groupby(['region', 'status']).size().unstack(fill_value=0)
+            etl_summary = etl_df.groupby(['region', 'status'], observed=True).size().unstack(fill_value=0)
             etl_summary.plot(kind='bar', ax=ax4, stacked=True)
             ax4.set_xlabel('Region')
             ax4.set_ylabel('ETL Run Count')
@@ -303,14 +302,23 @@ class FundDataMonitor:
 class FundDataQuery:
     """Query utilities for fund data"""
     
-    def __init__(self, db_path: str = '/data/fund_data.db'):
+    HISTORY_COLUMNS = ['date', 'fund_name', 'share_class_assets', 'portfolio_assets', 'one_day_yield',
+                       'seven_day_yield', 'expense_ratio', 'wam', 'wal', 'daily_liquidity',
+                       'weekly_liquidity']
+    
+    def __init__(self, db_path: str = '/data/fund_data.db', mirror_dir: Optional[str] = None):
         self.db_path = db_path
+        # Range history and exports read the Parquet mirror when one is given and written
+        self.mirror = ColumnarMirror(mirror_dir) if mirror_dir else None
+    
+    def _use_mirror(self) -> bool:
+        return self.mirror is not None and self.mirror.available()
     
     def search_funds(self, search_term: str, region: Optional[str] = None) -> pd.DataFrame:
         """Search for funds by name or code"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         
-        query = """
+        query = f"""
         SELECT DISTINCT
             fund_code,
             fund_name,
@@ -319,7 +327,7 @@ class FundDataQuery:
             currency,
             domicile,
             fund_complex
-        FROM fund_data
+        FROM {ROUTED_VIEW}
         WHERE (fund_name LIKE ? OR fund_code LIKE ? OR master_class_fund_name LIKE ?)
         """
         
@@ -331,51 +339,87 @@ class FundDataQuery:
         
         query += " ORDER BY fund_name"
         
-        df = pd.read_sql_query(query, conn, params=params)
+        # No date range: every archived month is searched
+        df = PartitionRouter(conn).read_frame(query, params, sort_by='fund_name', distinct=True)
         conn.close()
         
-        return df
+        return categorize(df)
     
     def get_fund_history(self, fund_code: str, start_date: str, end_date: str) -> pd.DataFrame:
         """Get historical data for a specific fund"""
-        conn = sqlite3.connect(self.db_path)
+        # One fund is served by the (fund_code, date) index faster than by the mirror
+        conn = connect(self.db_path)
         
-        query = """
-        SELECT 
-            date,
-            fund_name,
-            share_class_assets,
-            portfolio_assets,
-            one_day_yield,
-            seven_day_yield,
-            expense_ratio,
-            wam,
-            wal,
-            daily_liquidity,
-            weekly_liquidity
-        FROM fund_data
+        query = f"""
+        SELECT {', '.join(self.HISTORY_COLUMNS)}
+        FROM {ROUTED_VIEW}
         WHERE fund_code = ?
         AND date BETWEEN ? AND ?
         ORDER BY date
         """
         
-        df = pd.read_sql_query(query, conn, params=[fund_code, start_date, end_date],
-                              parse_dates=['date'])
+        df = PartitionRouter(conn).read_frame(query, [fund_code, start_date, end_date],
+                                              start=start_date, end=end_date, sort_by='date',
+                                              parse_dates=['date'])
+        conn.close()
+        
+        return df
+    
+    def get_history(self, start_date: str, end_date: str, columns: Optional[List[str]] = None,
+                    region: Optional[str] = None) -> pd.DataFrame:
+        """Selected columns of every fund over a date range, for long-range analytics"""
+        columns = columns or ['date', 'region', 'fund_code'] + self.HISTORY_COLUMNS[1:]
+        conn = connect(self.db_path)
+        
+        regions = [region] if region else None
+        if self._use_mirror() and self.mirror.is_fresh(conn, start_date, end_date, regions):
+            # Only the region/month files in range and the requested columns are read
+            df = self.mirror.read(conn, start_date, end_date, columns, regions=regions)
+        else:
+            query = f"""
+            SELECT {', '.join(columns)}
+            FROM {ROUTED_VIEW}
+            WHERE date BETWEEN ? AND ?
+            """
+            params = [start_date, end_date]
+            if region:
+                query += " AND region = ?"
+                params.append(region)
+            query += " ORDER BY date, region, fund_code"
+            df = PartitionRouter(conn).read_frame(query, params, start=start_date, end=end_date,
+                                                  sort_by=['date', 'region', 'fund_code'])
         conn.close()
         
+        if 'date' in df.columns:
+            df['date'] = pd.to_datetime(df['date'])
+        return df
+    
+    def export_range(self, start_date: str, end_date: str, output_file: str, region: Optional[str] = None,
+                     columns: Optional[List[str]] = None):
+        """Export a date range (all columns unless given) to CSV"""
+        df = self.get_history(start_date, end_date, columns or FUND_DATA_COLUMNS, region)
+        df['date'] = df['date'].dt.strftime('%Y-%m-%d')
+        df.to_csv(output_file, index=False)
+        logger.info(f"Exported {len(df)} records for {start_date} to {end_date} to {output_file}")
+    
+    def get_data_as_of(self, date: str, region: str, timestamp) -> pd.DataFrame:
+        """Data for a date and region as published at timestamp (UTC), before later lookback corrections"""
+        conn = connect(self.db_path)
+        df = as_of(conn, region, date, timestamp)
+        conn.close()
         return df
     
     def export_data(self, date: str, region: str, output_file: str):
         """Export data for a specific date and region to CSV"""
-        conn = sqlite3.connect(self.db_path)
+        conn = connect(self.db_path)
         
-        query = """
-        SELECT * FROM fund_data
+        query = f"""
+        SELECT {', '.join(FUND_DATA_COLUMNS)} FROM {ROUTED_VIEW}
         WHERE date = ? AND region = ?
         ORDER BY fund_code
         """
         
-        df = pd.read_sql_query(query, conn, params=[date, region])
+        df = PartitionRouter(conn).read_frame(query, [date, region], start=date, end=date)
         conn.close()
         
         df.to_csv(output_file, index=False)
@@ -9,7 +9,7 @@ sys.path.append('/app')
 
 from fund_etl_pipeline import FundDataETL
 from fund_etl_scheduler import ETLScheduler
-import sqlite3
+from db_connection import connect
 import pandas as pd
 from datetime import datetime, timedelta
 
@@ -18,10 +18,10 @@ def initialize_database():
     print("=== Database Initialization Tool ===\n")
     
     etl = FundDataETL('/config/config.json')
-    conn = sqlite3.connect(etl.db_path)
+    conn = connect(etl.db_path)
     
     # Check current state
-    total_records = pd.read_sql_query("SELECT COUNT(*) as count FROM fund_data", conn).iloc[0]['count']
+    total_records = pd.read_sql_query("SELECT COUNT(*) as count FROM fund_data_resolved", conn).iloc[0]['count']
     
     print(f"Current database status: {total_records:,} records\n")
     
@@ -87,10 +87,10 @@ def initialize_database():
     print("="*60)
     
     # Check final state
-    conn = sqlite3.connect(etl.db_path)
-    final_records = pd.read_sql_query("SELECT COUNT(*) as count FROM fund_data", conn).iloc[0]['count']
+    conn = connect(etl.db_path)
+    final_records = pd.read_sql_query("SELECT COUNT(*) as count FROM fund_data_resolved", conn).iloc[0]['count']
     final_regions = pd.read_sql_query(
-        "SELECT region, COUNT(*) as count FROM fund_data GROUP BY region", 
+        "SELECT region, COUNT(*) as count FROM fund_data_resolved GROUP BY region", 
         conn
     )
     
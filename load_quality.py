@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Load Quality
+Single-pass data-quality profile of a DataDump frame, or of a file streamed in
+chunks. The profile feeds validate_dataframe and is persisted per (date, region)
+in the load_quality table, so the dashboard and reports read stored numbers
+instead of rescanning fund_data on every request.
+"""
+
+import json
+import logging
+import sqlite3
+from typing import Any, Dict, Iterable, Optional
+
+import pandas as pd
+
+from row_fingerprint import ROW_HASH_COLUMN
+from transform_plan import COLUMN_MAPPING
+
+logger = logging.getLogger(__name__)
+
+# fund_data column -> Excel column, so a profile can be read under either name
+EXCEL_NAMES = {target: col for col, target in COLUMN_MAPPING.items()}
+EXCEL_NAMES['date'] = 'Date'
+
+# Stored completeness percentages and the fund_data column each one measures
+COMPLETENESS_FIELDS = {
+    'pct_with_assets': 'share_class_assets',
+    'pct_with_portfolio_assets': 'portfolio_assets',
+    'pct_with_1d_yield': 'one_day_yield',
+    'pct_with_7d_yield': 'seven_day_yield',
+    'pct_with_wam': 'wam',
+    'pct_with_wal': 'wal',
+    'pct_with_daily_liq': 'daily_liquidity',
+    'pct_with_weekly_liq': 'weekly_liquidity'
+}
+
+PROFILE_COLUMNS = (['file_date', 'total_rows', 'records', 'empty_rows', 'unique_funds',
+                    'duplicate_funds', 'min_date', 'max_date'] + list(COMPLETENESS_FIELDS)
+                   + ['pct_missing_nasdaq', 'null_counts'])
+
+CREATE_LOAD_QUALITY_SQL = """
+CREATE TABLE IF NOT EXISTS load_quality (
+    date DATE,
+    region TEXT,
+    file_date DATE,
+    total_rows INTEGER,
+    records INTEGER,
+    empty_rows INTEGER,
+    unique_funds INTEGER,
+    duplicate_funds INTEGER,
+    min_date TEXT,
+    max_date TEXT,
+    pct_with_assets REAL,
+    pct_with_portfolio_assets REAL,
+    pct_with_1d_yield REAL,
+    pct_with_7d_yield REAL,
+    pct_with_wam REAL,
+    pct_with_wal REAL,
+    pct_with_daily_liq REAL,
+    pct_with_weekly_liq REAL,
+    pct_missing_nasdaq REAL,
+    null_counts TEXT,
+    profiled_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (date, region)
+)
+"""
+
+
+def _first_present(df: pd.DataFrame, *names: str) -> Optional[str]:
+    return next((name for name in names if name in df.columns), None)
+
+
+def profile_frame(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Every quality count for one frame (or one chunk) from a single missing-value mask.
+    Works on Excel-named frames and on fund_data rows; profiles of several
+    chunks combine with merge_profiles.
+    """
+    missing = df.isna().to_numpy()
+    empty = missing.all(axis=1)
+    null_counts = missing[~empty].sum(axis=0)
+
+    code_col = _first_present(df, 'Fund Code', 'fund_code')
+    date_col = _first_present(df, 'Date', 'date')
+    rows = int((~empty).sum())
+
+    if code_col:
+        fund_code_counts = df[code_col][~empty].value_counts()
+    else:
+        fund_code_counts = pd.Series(dtype='int64')
+
+    dates = df[date_col][~empty] if date_col and rows else None
+
+    return {
+        'columns': set(df.columns),
+        'total_rows': len(df),
+        'rows': rows,
+        'empty_rows': len(df) - rows,
+        'fund_code_counts': fund_code_counts,
+        'null_counts': {col: int(count) for col, count in zip(df.columns, null_counts)},
+        'min_date': dates.min() if dates is not None else None,
+        'max_date': dates.max() if dates is not None else None
+    }
+
+
+def merge_profiles(total: Optional[Dict[str, Any]], chunk: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold one chunk's profile into a running total"""
+    if total is None:
+        return chunk
+
+    null_counts = dict(total['null_counts'])
+    for col, count in chunk['null_counts'].items():
+        null_counts[col] = null_counts.get(col, 0) + count
+
+    dates = [d for d in (total['min_date'], total['max_date'],
+                         chunk['min_date'], chunk['max_date']) if d is not None and pd.notna(d)]
+
+    return {
+        'columns': total['columns'] | chunk['columns'],
+        'total_rows': total['total_rows'] + chunk['total_rows'],
+        'rows': total['rows'] + chunk['rows'],
+        'empty_rows': total['empty_rows'] + chunk['empty_rows'],
+        'fund_code_counts': total['fund_code_counts'].add(chunk['fund_code_counts'], fill_value=0),
+        'null_counts': null_counts,
+        'min_date': min(dates) if dates else None,
+        'max_date': max(dates) if dates else None
+    }
+
+
+def _null_count(profile: Dict[str, Any], column: str) -> Optional[int]:
+    """Null count of a fund_data column under its own or its Excel name"""
+    for name in (column, EXCEL_NAMES.get(column)):
+        if name in profile['null_counts']:
+            return profile['null_counts'][name]
+    return None
+
+
+def _format_date(value) -> Optional[str]:
+    if value is None or pd.isna(value):
+        return None
+    return pd.Timestamp(value).strftime('%Y-%m-%d')
+
+
+def profile_row(profile: Dict[str, Any], file_date: Optional[str] = None) -> Dict[str, Any]:
+    """Flatten a profile into the load_quality metrics"""
+    rows = profile['rows']
+    counts = profile['fund_code_counts']
+
+    row = {
+        'file_date': file_date,
+        'total_rows': profile['total_rows'],
+        'records': rows,
+        'empty_rows': profile['empty_rows'],
+        'unique_funds': len(counts),
+        'duplicate_funds': int((counts > 1).sum()),
+        'min_date': _format_date(profile['min_date']),
+        'max_date': _format_date(profile['max_date'])
+    }
+
+    for field, column in COMPLETENESS_FIELDS.items():
+        nulls = _null_count(profile, column)
+        row[field] = 100.0 * (rows - nulls) / rows if nulls is not None and rows else None
+
+    nasdaq_nulls = _null_count(profile, 'nasdaq')
+    row['pct_missing_nasdaq'] = 100.0 * nasdaq_nulls / rows if nasdaq_nulls is not None and rows else None
+    row['null_counts'] = json.dumps(profile['null_counts'], sort_keys=True)
+    return row
+
+
+def ensure_table(cursor):
+    cursor.execute(CREATE_LOAD_QUALITY_SQL)
+
+
+def _store_row(cursor, region: str, dates: Iterable[str], row: Dict[str, Any]):
+    columns = ['date', 'region'] + PROFILE_COLUMNS
+    cursor.executemany(
+        f"INSERT OR REPLACE INTO load_quality ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)})",
+        [[date, region] + [row[col] for col in PROFILE_COLUMNS] for date in dates]
+    )
+
+
+def save_profile(cursor, region: str, dates: Iterable[str], profile: Dict[str, Any],
+                 file_date: Optional[str] = None):
+    """Store (replace) the profile for each date a load was written under"""
+    _store_row(cursor, region, dates, profile_row(profile, file_date))
+
+
+def profile_fund_data(conn, region: str, date: str) -> Optional[Dict[str, Any]]:
+    """Profile metrics computed from the stored fund_data slice (None when it is empty)"""
+    df = pd.read_sql_query("SELECT * FROM fund_data_resolved WHERE region = ? AND date = ?",
+                           conn, params=[region, date])
+    if len(df) == 0:
+        return None
+    df = df.drop(columns=['region', 'created_at', ROW_HASH_COLUMN], errors='ignore')
+    return profile_row(profile_frame(df), file_date=date)
+
+
+def refresh_profiles(cursor, region: str, dates: Iterable[str]):
+    """Re-profile fund_data slices that were changed outside a file load"""
+    ensure_table(cursor)
+    for date in dates:
+        row = profile_fund_data(cursor.connection, region, date)
+        if row is None:
+            cursor.execute("DELETE FROM load_quality WHERE region = ? AND date = ?", (region, date))
+        else:
+            _store_row(cursor, region, [date], row)
+
+
+def copy_profile(cursor, region: str, source_date: str, target_date: str):
+    """Give a carried-forward date the profile of the date it was copied from"""
+    ensure_table(cursor)
+    columns = ', '.join(PROFILE_COLUMNS)
+    cursor.execute(f"""
+    INSERT OR REPLACE INTO load_quality (date, region, {columns})
+    SELECT ?, region, {columns} FROM load_quality
+    WHERE region = ? AND date = ?
+    """, (target_date, region, source_date))
+
+
+def read_profile(conn, region: str, date: str) -> Optional[Dict[str, Any]]:
+    """
+    Stored load_quality metrics for a region/date. Slices written without a
+    profile (older databases, rows inserted directly) are profiled from
+    fund_data on the fly instead.
+    """
+    try:
+        cursor = conn.execute(f"SELECT {', '.join(PROFILE_COLUMNS)} FROM load_quality "
+                              f"WHERE region = ? AND date = ?", (region, date))
+        stored = cursor.fetchone()
+    except sqlite3.OperationalError:
+        stored = None
+
+    if stored is not None:
+        return dict(zip(PROFILE_COLUMNS, stored))
+
+    logger.debug(f"No stored load_quality profile for {region} {date} - profiling fund_data")
+    return profile_fund_data(conn, region, date)
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Lookback Comparison
+Compares a lookback slice with the stored rows of the same date in whole
+columns: the lookback is merged onto the stored rows by fund code, then null
+mismatches, epsilon equality and percentage change are computed as arrays
+for every configured field. The result is a columnar change set with one
+row per changed field of a matched fund and one 'new_fund' row per lookback
+fund that is not stored.
+
+change_records() turns a change set into the per-fund dicts validation
+results carry (changed_fields plus the full lookback row).
+"""
+
+import logging
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Lookback column of each field validation can compare
+LOOKBACK_FIELDS = {
+    'share_class_assets': 'Share Class Assets (dly/$mils)',
+    'portfolio_assets': 'Portfolio Assets (dly/$mils)',
+    'one_day_yield': '1-DSY (dly)',
+    'seven_day_yield': '7-DSY (dly)'
+}
+
+# Differences below this are float noise, and stored values below it count as zero
+EPSILON = 1e-10
+
+CHANGE_COLUMNS = ['row', 'fund_code', 'date', 'type', 'field', 'db_value', 'lookback_value', 'pct_change']
+
+
+def compared_fields(fields: List[str], db_df: pd.DataFrame, lookback_df: pd.DataFrame) -> List[str]:
+    """The configured fields both frames carry, in configured order"""
+    return [field for field in fields
+            if field in LOOKBACK_FIELDS and LOOKBACK_FIELDS[field] in lookback_df.columns and field in db_df.columns]
+
+
+def _field_changes(merged: pd.DataFrame, matched: np.ndarray, field: str, threshold_pct: float) -> pd.DataFrame:
+    db_values = merged[field].astype(float).to_numpy()
+    lookback_values = merged[LOOKBACK_FIELDS[field]].astype(float).to_numpy()
+    db_null = np.isnan(db_values)
+    lookback_null = np.isnan(lookback_values)
+    both = ~db_null & ~lookback_null & (np.abs(lookback_values - db_values) >= EPSILON)
+    nonzero = np.abs(db_values) > EPSILON
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct_change = np.abs((lookback_values - db_values) / db_values * 100)
+    material = both & nonzero & (pct_change > threshold_pct)
+    from_zero = both & ~nonzero & (np.abs(lookback_values) > EPSILON)
+    changed = matched & ((db_null != lookback_null) | material | from_zero)
+
+    return pd.DataFrame({
+        'row': merged['row'].to_numpy()[changed],
+        'fund_code': merged['fund_code'].to_numpy()[changed],
+        'date': merged['date'].to_numpy()[changed],
+        'type': 'value_change',
+        'field': field,
+        'db_value': db_values[changed],
+        'lookback_value': lookback_values[changed],
+        # Only material changes of a non-zero value carry a percentage
+        'pct_change': np.where(material, pct_change, np.nan)[changed]
+    })
+
+
+def compare_frames(db_df: pd.DataFrame, lookback_df: pd.DataFrame, fields: List[str],
+                   threshold_pct: float) -> pd.DataFrame:
+    """
+    Change set of lookback_df (Excel columns, typed) against the stored rows
+    db_df of one date. 'row' is the position of the lookback row; a fund
+    stored twice is compared with its first row.
+    """
+    fields = compared_fields(fields, db_df, lookback_df)
+    incoming = pd.DataFrame({
+        'row': np.arange(len(lookback_df)),
+        'fund_code': lookback_df['Fund Code'].to_numpy(),
+        'lookback_date': lookback_df['Date'].dt.strftime('%Y-%m-%d').to_numpy()
+    })
+    for field in fields:
+        incoming[LOOKBACK_FIELDS[field]] = lookback_df[LOOKBACK_FIELDS[field]].to_numpy()
+    stored = db_df.drop_duplicates('fund_code')[['fund_code', 'date', *fields]]
+
+    merged = incoming.merge(stored, on='fund_code', how='left', indicator=True)
+    matched = (merged['_merge'] == 'both').to_numpy()
+
+    new_funds = merged.loc[~matched, ['row', 'fund_code', 'lookback_date']].rename(columns={'lookback_date': 'date'})
+    new_funds['type'] = 'new_fund'
+    parts = [new_funds] + [_field_changes(merged, matched, field, threshold_pct) for field in fields]
+    parts = [part for part in parts if len(part)]
+    if not parts:
+        return pd.DataFrame(columns=CHANGE_COLUMNS)
+
+    changes = pd.concat(parts, ignore_index=True).reindex(columns=CHANGE_COLUMNS)
+    # Lookback order, and configured field order within a fund
+    changes['field_order'] = changes['field'].map({field: i for i, field in enumerate(fields)}).fillna(-1)
+    changes = changes.sort_values(['row', 'field_order'], kind='stable').drop(columns='field_order')
+
+    if logger.isEnabledFor(logging.DEBUG):
+        counts = changes.loc[changes['type'] == 'value_change', 'field'].value_counts().to_dict()
+        logger.debug(f"Compared {len(lookback_df)} lookback rows: {int((~matched).sum())} new funds, "
+                     f"changed fields {counts}")
+    return changes.reset_index(drop=True)
+
+
+def change_records(changes: pd.DataFrame, lookback_df: pd.DataFrame) -> List[Dict]:
+    """One validation result dict per changed lookback row, in lookback order"""
+    records = {}
+    for change in changes.to_dict('records'):
+        row = change['row']
+        if change['type'] == 'new_fund':
+            records[row] = {
+                'type': 'new_fund',
+                'fund_code': change['fund_code'],
+                'date': change['date'],
+                'details': 'Fund not found in database',
+                'lookback_row': lookback_df.iloc[row]  # Full row for insertion
+            }
+            continue
+
+        if row not in records:
+            records[row] = {
+                'type': 'value_change',
+                'fund_code': change['fund_code'],
+                'date': change['date'],
+                'changed_fields': [],
+                'lookback_row': lookback_df.iloc[row]  # Full row for update
+            }
+        field = {name: change[name] for name in ('field', 'db_value', 'lookback_value')}
+        if not pd.isna(change['pct_change']):
+            field['pct_change'] = change['pct_change']
+        records[row]['changed_fields'].append(field)
+    return list(records.values())
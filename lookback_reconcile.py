@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Lookback Reconciliation
+Validates and corrects a region against a lookback file inside SQLite. The
+typed lookback rows are bulk-loaded into a temporary staging table once
+(chunk by chunk when the lookback file is streamed);
+missing dates, new funds and changed values (the validation threshold rules
+over the critical fields) are then found with joins against fund_data, and
+the corrections are written, and logged to fund_data_revisions, by a
+handful of INSERT ... SELECT and UPDATE statements. No stored rows are read
+into Python.
+
+Semantics follow the selective update: rows whose critical fields changed
+get every field the lookback carries, funds and dates missing from the
+database are inserted, and stored funds absent from the lookback are kept.
+Lookback dates aliased to an earlier date are compared with that date's
+rows and become physical only when they are corrected; a missing Friday
+that is inserted aliases its weekend, as a daily load does. Dates in
+archived months are skipped, since their partitions are read-only.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Union
+
+import pandas as pd
+
+from bulk_loader import typed_rows
+from date_alias import materialize, set_aliases
+from partitions import closed_months
+from revision_log import ROW_FIELD
+from row_fingerprint import ROW_HASH_COLUMN
+
+logger = logging.getLogger(__name__)
+
+STAGE_TABLE = 'lookback_stage'
+# Staged date -> the physical date its stored rows are under
+STAGE_DATES_TABLE = 'lookback_stage_dates'
+# (date, fund_code, action) of each staged row to insert or update
+RECONCILE_TABLE = 'lookback_reconcile_rows'
+
+SOURCE = 'lookback_reconcile'
+
+# Differences below this are float noise, and stored values below it count as zero
+EPSILON = 1e-10
+
+
+def _drop_temp_tables(cursor):
+    for table in (STAGE_TABLE, STAGE_DATES_TABLE, RECONCILE_TABLE):
+        cursor.execute(f"DROP TABLE IF EXISTS temp.{table}")
+
+
+def stage_lookback(cursor, region: str, df_load: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+                   fields: List[str]) -> int:
+    """
+    Load df_load (database columns, one row per date and fund), a frame or
+    frames such as the chunks of a streamed file, into the staging table
+    with fund_data's column types; a fund repeated on a date keeps its first
+    row. Returns the rows staged.
+    """
+    _drop_temp_tables(cursor)
+    columns = ['date', 'fund_code'] + fields
+    cursor.execute(f"CREATE TEMP TABLE {STAGE_TABLE} AS SELECT {', '.join(columns)} FROM fund_data WHERE 0")
+    for frame in [df_load] if isinstance(df_load, pd.DataFrame) else df_load:
+        cursor.executemany(f"""
+        INSERT INTO {STAGE_TABLE} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})
+        """, typed_rows(frame, columns))
+    cursor.execute(f"""
+    DELETE FROM {STAGE_TABLE}
+    WHERE rowid NOT IN (SELECT MIN(rowid) FROM {STAGE_TABLE} GROUP BY date, fund_code)
+    """)
+    cursor.execute(f"CREATE UNIQUE INDEX temp.idx_{STAGE_TABLE} ON {STAGE_TABLE}(date, fund_code)")
+
+    cursor.execute(f"""
+    CREATE TEMP TABLE {STAGE_DATES_TABLE} AS
+    SELECT d.date, COALESCE(a.source_date, d.date) AS source_date
+    FROM (SELECT DISTINCT date FROM {STAGE_TABLE}) d
+    LEFT JOIN date_alias a ON a.region = ? AND a.date = d.date
+    """, (region,))
+    cursor.execute(f"SELECT COUNT(*) FROM {STAGE_TABLE}")
+    return cursor.fetchone()[0]
+
+
+def _skip_closed_months(cursor, region: str) -> List[str]:
+    """Drop staged dates in archived months; returns the dates dropped"""
+    cursor.execute(f"SELECT date FROM {STAGE_DATES_TABLE} ORDER BY date")
+    dates = [row[0] for row in cursor.fetchall()]
+    closed = closed_months(cursor, dates)
+    skipped = [date for date in dates if date[:7] in closed]
+    if skipped:
+        for table in (STAGE_TABLE, STAGE_DATES_TABLE):
+            cursor.execute(f"DELETE FROM {table} WHERE substr(date, 1, 7) IN ({', '.join('?' for _ in closed)})",
+                           closed)
+        logger.warning(f"Skipping {len(skipped)} {region} lookback dates in archived month(s) "
+                       f"{', '.join(closed)}")
+    return skipped
+
+
+def _alias_weekends(cursor, region: str, fridays: List[str]) -> List[str]:
+    """Alias the weekend after each inserted Friday to it, unless the lookback has rows for it"""
+    cursor.execute(f"SELECT date FROM {STAGE_DATES_TABLE}")
+    staged = {row[0] for row in cursor.fetchall()}
+    aliased = []
+    for friday in fridays:
+        day = datetime.strptime(friday, '%Y-%m-%d')
+        if day.weekday() != 4:
+            continue
+        weekend = [(day + timedelta(days=days)).strftime('%Y-%m-%d') for days in (1, 2)]
+        weekend = [date for date in weekend if date not in staged]
+        set_aliases(cursor, region, weekend, friday, 'weekend')
+        aliased.extend(weekend)
+    return aliased
+
+
+def changed_condition(fields: List[str], threshold_pct: float) -> str:
+    """
+    SQL that is true when any of fields differs between stored row f and
+    staged row s: a null on one side only, or a change beyond threshold_pct
+    (any change from a stored zero)
+    """
+    rules = [f"""((f.{field} IS NULL) <> (s.{field} IS NULL)
+        OR (ABS(s.{field} - f.{field}) >= {EPSILON!r} AND CASE
+            WHEN ABS(f.{field}) > {EPSILON!r} THEN ABS((s.{field} - f.{field}) / f.{field} * 100) > {float(threshold_pct)!r}
+            ELSE ABS(s.{field}) > {EPSILON!r} END))"""
+             for field in fields]
+    return ' OR '.join(rules) if rules else '0'
+
+
+def _log_revisions(cursor, region: str, fields: List[str]) -> int:
+    """Revisions of the staged changes, written before fund_data is"""
+    revisions = 0
+    for field in fields:
+        cursor.execute(f"""
+        INSERT INTO fund_data_revisions (date, region, fund_code, field, old_value, new_value, source)
+        SELECT r.date, ?, r.fund_code, ?, f.{field}, s.{field}, ?
+        FROM {RECONCILE_TABLE} r
+        JOIN {STAGE_TABLE} s ON s.date = r.date AND s.fund_code = r.fund_code
+        JOIN fund_data f ON f.region = ? AND f.date = r.date AND f.fund_code = r.fund_code
+        WHERE r.action = 'update' AND f.{field} IS NOT s.{field}
+        """, (region, field, SOURCE, region))
+        revisions += cursor.rowcount
+
+    # Added rows log their presence and each value they bring
+    cursor.execute(f"""
+    INSERT INTO fund_data_revisions (date, region, fund_code, field, old_value, new_value, source)
+    SELECT date, ?, fund_code, ?, NULL, 1, ? FROM {RECONCILE_TABLE} WHERE action = 'insert'
+    """, (region, ROW_FIELD, SOURCE))
+    revisions += cursor.rowcount
+    for field in fields:
+        cursor.execute(f"""
+        INSERT INTO fund_data_revisions (date, region, fund_code, field, old_value, new_value, source)
+        SELECT r.date, ?, r.fund_code, ?, NULL, s.{field}, ?
+        FROM {RECONCILE_TABLE} r
+        JOIN {STAGE_TABLE} s ON s.date = r.date AND s.fund_code = r.fund_code
+        WHERE r.action = 'insert' AND s.{field} IS NOT NULL
+        """, (region, field, SOURCE))
+        revisions += cursor.rowcount
+    return revisions
+
+
+def reconcile(cursor, region: str, df_load: Union[pd.DataFrame, Iterable[pd.DataFrame]], fields: List[str],
+              critical_fields: List[str], threshold_pct: float) -> Dict[str, Any]:
+    """
+    Bring region in line with the lookback rows df_load (as stage_lookback
+    takes them) inside the caller's transaction. fields are written,
+    critical_fields decide which stored rows changed. Returns the dates
+    staged, missing dates, row counts, revisions written, the dates
+    corrected, the weekend dates aliased to inserted Fridays and the dates
+    skipped in archived months.
+    """
+    critical_fields = [field for field in critical_fields if field in fields]
+    staged = stage_lookback(cursor, region, df_load, fields)
+    skipped_dates = _skip_closed_months(cursor, region)
+    cursor.execute(f"SELECT COUNT(*) FROM {STAGE_DATES_TABLE}")
+    staged_dates = cursor.fetchone()[0]
+
+    cursor.execute(f"""
+    SELECT d.date FROM {STAGE_DATES_TABLE} d
+    WHERE NOT EXISTS (SELECT 1 FROM fund_data f WHERE f.region = ? AND f.date = d.source_date)
+    ORDER BY d.date
+    """, (region,))
+    missing_dates = [row[0] for row in cursor.fetchall()]
+
+    # Staged rows with no stored row, or whose critical fields changed
+    cursor.execute(f"""
+    CREATE TEMP TABLE {RECONCILE_TABLE} AS
+    SELECT s.date, s.fund_code, CASE WHEN f.fund_code IS NULL THEN 'insert' ELSE 'update' END AS action
+    FROM {STAGE_TABLE} s
+    JOIN {STAGE_DATES_TABLE} d ON d.date = s.date
+    LEFT JOIN fund_data f ON f.region = ? AND f.date = d.source_date AND f.fund_code = s.fund_code
+    WHERE f.fund_code IS NULL OR {changed_condition(critical_fields, threshold_pct)}
+    """, (region,))
+    cursor.execute(f"""
+    SELECT r.date, d.source_date, SUM(r.action = 'insert'), SUM(r.action = 'update')
+    FROM {RECONCILE_TABLE} r JOIN {STAGE_DATES_TABLE} d ON d.date = r.date
+    GROUP BY r.date
+    """)
+    by_date = cursor.fetchall()
+    dates = [date for date, _, _, _ in by_date]
+    result = {
+        'staged': staged,
+        'staged_dates': staged_dates,
+        'missing_dates': missing_dates,
+        'new_funds': sum(inserts for date, _, inserts, _ in by_date if date not in missing_dates),
+        'inserted': sum(inserts for _, _, inserts, _ in by_date),
+        'updated': sum(updates for _, _, _, updates in by_date),
+        'revisions': 0,
+        'dates': dates,
+        'aliased_dates': [],
+        'skipped_dates': skipped_dates
+    }
+
+    if dates:
+        # A correction to an aliased date applies to that date only
+        materialize(cursor, region, [date for date, source_date, _, _ in by_date
+                                     if source_date != date and date not in missing_dates])
+        result['revisions'] = _log_revisions(cursor, region, fields)
+        cursor.execute(f"""
+        UPDATE fund_data SET ({', '.join(fields)}) = (
+            SELECT {', '.join(f's.{field}' for field in fields)} FROM {STAGE_TABLE} s
+            WHERE s.date = fund_data.date AND s.fund_code = fund_data.fund_code), {ROW_HASH_COLUMN} = NULL
+        WHERE region = ? AND (date, fund_code) IN (
+            SELECT date, fund_code FROM {RECONCILE_TABLE} WHERE action = 'update')
+        """, (region,))
+        cursor.execute(f"""
+        INSERT INTO fund_data (date, region, fund_code, {', '.join(fields)})
+        SELECT s.date, ?, s.fund_code, {', '.join(f's.{field}' for field in fields)}
+        FROM {RECONCILE_TABLE} r
+        JOIN {STAGE_TABLE} s ON s.date = r.date AND s.fund_code = r.fund_code
+        WHERE r.action = 'insert'
+        """, (region,))
+        result['aliased_dates'] = _alias_weekends(cursor, region, [date for date in missing_dates if date in dates])
+
+    _drop_temp_tables(cursor)
+    logger.info(f"Reconciled {staged} {region} lookback rows: {len(missing_dates)} missing dates, "
+                f"{result['new_funds']} new funds, {result['updated']} changed, {result['revisions']} revisions")
+    return result
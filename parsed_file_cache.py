@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Parsed File Cache
+Content-addressed cache of parsed DataDump workbooks. The first read of a file
+streams it through StreamingXLSXReader and writes each typed DataFrame chunk to
+a sidecar under data_dir; later reads of the same bytes load the sidecar instead
+of parsing the XLSX again. Sidecars written through a read plan are keyed by the
+plan signature as well, so typed and raw chunks are never mixed up.
+
+A sidecar is a sequence of Arrow IPC streams: one holding the file's header,
+then one per chunk, each with its own schema so chunks keep the dtypes the
+reader gave them. A hit is re-chunked to the caller's chunk_size. A workbook
+with a column Arrow cannot hold (mixed Python types) is read without caching.
+
+Needs pyarrow; without it every read parses the workbook.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Iterator, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from xlsx_stream_reader import StreamingXLSXReader
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+# Bump when the reader's output changes so stale sidecars are never served
+CACHE_VERSION = 3
+
+SIDECAR_SUFFIX = '.arrows'
+
+
+def _write_stream(sink, table):
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _chunk_table(chunk: pd.DataFrame):
+    """Arrow table of a chunk, its attrs (the read plan mark) kept in the schema metadata"""
+    table = pa.Table.from_pandas(chunk, preserve_index=False)
+    return table.replace_schema_metadata({**table.schema.metadata, b'attrs': json.dumps(chunk.attrs)})
+
+
+class SidecarReader:
+    """Reader over a cached sidecar with the same interface as StreamingXLSXReader"""
+
+    def __init__(self, sidecar_path: Path, expected_columns: Optional[List[str]] = None,
+                 chunk_size: int = 5000):
+        self.sidecar_path = Path(sidecar_path)
+        self.expected_columns = expected_columns or []
+        self.chunk_size = chunk_size
+
+        self.header: List[str] = []
+        self.missing_columns: Set[str] = set()
+        self.rows_read = 0
+
+        self._file = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def open(self) -> 'SidecarReader':
+        """Open the sidecar and read the stored header"""
+        if self._file is not None:
+            return self
+        self._file = pa.OSFile(str(self.sidecar_path), 'rb')
+        try:
+            stream = pa.ipc.open_stream(self._file)
+            stream.read_all()
+            meta = json.loads(stream.schema.metadata[b'meta'])
+            if meta.get('version') != CACHE_VERSION:
+                raise ValueError(f"sidecar version {meta.get('version')} != {CACHE_VERSION}")
+        except Exception:
+            self.close()
+            raise
+
+        self.header = meta['header']
+        self.missing_columns = set(self.expected_columns) - set(self.header)
+        return self
+
+    def _stored_chunks(self) -> Iterator[pd.DataFrame]:
+        while self._file.tell() < self._file.size():
+            table = pa.ipc.open_stream(self._file).read_all()
+            chunk = table.to_pandas()
+            chunk.attrs.update(json.loads(table.schema.metadata[b'attrs']))
+            yield chunk
+
+    def _emit(self, chunk: pd.DataFrame, attrs: dict) -> pd.DataFrame:
+        chunk.attrs.update(attrs)
+        self.rows_read += len(chunk)
+        return chunk
+
+    def iter_chunks(self) -> Iterator[pd.DataFrame]:
+        """Yield the cached rows in file order as DataFrames of at most chunk_size rows"""
+        if self._file is None:
+            self.open()
+
+        pending: List[pd.DataFrame] = []
+        pending_rows = 0
+        for stored in self._stored_chunks():
+            pending.append(stored)
+            pending_rows += len(stored)
+            while pending_rows >= self.chunk_size:
+                attrs = pending[0].attrs
+                frame = pending[0] if len(pending) == 1 else pd.concat(pending, ignore_index=True)
+                if len(frame) == self.chunk_size:
+                    yield self._emit(frame, attrs)
+                    pending, pending_rows = [], 0
+                else:
+                    yield self._emit(frame.iloc[:self.chunk_size].reset_index(drop=True), attrs)
+                    rest = frame.iloc[self.chunk_size:].reset_index(drop=True)
+                    pending, pending_rows = [rest], len(rest)
+
+        if pending_rows:
+            yield self._emit(pd.concat(pending, ignore_index=True), pending[0].attrs)
+
+    def close(self):
+        """Release the sidecar file handle"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class CachingReader:
+    """Wrap a StreamingXLSXReader and tee every chunk into a new sidecar"""
+
+    def __init__(self, reader: StreamingXLSXReader, sidecar_path: Path, on_complete=None):
+        self.reader = reader
+        self.sidecar_path = Path(sidecar_path)
+        self.on_complete = on_complete
+        self._tmp_path = self.sidecar_path.with_name(f"{self.sidecar_path.name}.{os.getpid()}.tmp")
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    @property
+    def header(self) -> List[str]:
+        return self.reader.header
+
+    @property
+    def missing_columns(self) -> Set[str]:
+        return self.reader.missing_columns
+
+    @property
+    def rows_read(self) -> int:
+        return self.reader.rows_read
+
+    def open(self) -> 'CachingReader':
+        self.reader.open()
+        return self
+
+    def iter_chunks(self) -> Iterator[pd.DataFrame]:
+        """Yield chunks from the workbook, publishing the sidecar once all are read"""
+        self.sidecar_path.parent.mkdir(parents=True, exist_ok=True)
+        source = os.path.basename(self.reader.filepath)
+        cacheable = True
+
+        with pa.OSFile(str(self._tmp_path), 'wb') as f:
+            meta = {'version': CACHE_VERSION, 'header': self.reader.header, 'source': source}
+            _write_stream(f, pa.schema([], metadata={'meta': json.dumps(meta)}).empty_table())
+            for chunk in self.reader.iter_chunks():
+                # Written before yielding: callers clean chunks in place
+                if cacheable:
+                    try:
+                        _write_stream(f, _chunk_table(chunk))
+                    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+                        logger.warning(f"Not caching {source}: {e}")
+                        cacheable = False
+                yield chunk
+
+        # close() drops the partial sidecar of a workbook that could not be cached
+        if not cacheable:
+            return
+        os.replace(self._tmp_path, self.sidecar_path)
+        if self.on_complete:
+            self.on_complete()
+
+    def close(self):
+        """Close the workbook and drop any partially written sidecar"""
+        self.reader.close()
+        if self._tmp_path.exists():
+            self._tmp_path.unlink()
+
+
+class ParsedFileCache:
+    """Content-hash keyed store of parsed workbooks with age and size eviction"""
+
+    def __init__(self, cache_dir: str, max_age_days: float = 14, max_size_mb: float = 512,
+                 enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.max_age_days = max_age_days
+        self.max_size_mb = max_size_mb
+        self.enabled = enabled
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def file_digest(filepath: str) -> str:
+        """SHA-256 of the file contents"""
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def sidecar_path(self, digest: str, read_plan=None) -> Path:
+        """Location of the sidecar for a content digest (and read plan, if any)"""
+        plan = f".{read_plan.signature}" if read_plan is not None else ''
+        return self.cache_dir / f"{digest}{plan}.v{CACHE_VERSION}{SIDECAR_SUFFIX}"
+
+    def open_reader(self, filepath: str, expected_columns: Optional[List[str]] = None,
+                    chunk_size: int = 5000, read_plan=None, digest: Optional[str] = None):
+        """
+        Return a chunk reader for filepath, served from the sidecar when one exists.
+        Use the reader as a context manager, as with StreamingXLSXReader. Pass
+        digest when the caller has already hashed the file.
+        """
+        stream_reader = StreamingXLSXReader(filepath, expected_columns, chunk_size, read_plan)
+        if not self.enabled or pa is None:
+            return stream_reader
+
+        if digest is None:
+            digest = self.file_digest(filepath)
+        sidecar = self.sidecar_path(digest, read_plan)
+        name = os.path.basename(str(filepath))
+
+        if sidecar.exists():
+            try:
+                reader = SidecarReader(sidecar, expected_columns, chunk_size).open()
+                # Refresh mtime so size eviction drops least recently used entries first
+                os.utime(sidecar)
+                self.hits += 1
+                logger.info(f"Parsed-file cache hit for {name} ({digest[:12]})")
+                return reader
+            except Exception as e:
+                logger.warning(f"Discarding unreadable cache entry {sidecar.name}: {e}")
+                sidecar.unlink(missing_ok=True)
+
+        self.misses += 1
+        logger.info(f"Parsed-file cache miss for {name} ({digest[:12]}) - parsing workbook")
+        return CachingReader(stream_reader, sidecar, on_complete=self.evict)
+
+    def read(self, filepath: str, expected_columns: Optional[List[str]] = None,
+             chunk_size: int = 5000, read_plan=None) -> pd.DataFrame:
+        """Read a whole workbook (through the cache) into one DataFrame"""
+        with self.open_reader(filepath, expected_columns, chunk_size, read_plan) as reader:
+            chunks = list(reader.iter_chunks())
+            header = reader.header
+
+        if not chunks:
+            return pd.DataFrame(columns=header)
+        return pd.concat(chunks, ignore_index=True)
+
+    def _entries(self) -> List[Tuple[Path, os.stat_result]]:
+        if not self.cache_dir.exists():
+            return []
+        return [(path, path.stat()) for path in self.cache_dir.glob(f'*{SIDECAR_SUFFIX}')]
+
+    def evict(self) -> int:
+        """Remove entries older than max_age_days, then least recently used until under max_size_mb"""
+        entries = self._entries()
+        removed = 0
+
+        cutoff = time.time() - self.max_age_days * 86400
+        for path, stat in list(entries):
+            if stat.st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+                entries.remove((path, stat))
+                removed += 1
+
+        max_bytes = self.max_size_mb * 1024 * 1024
+        total = sum(stat.st_size for _, stat in entries)
+        for path, stat in sorted(entries, key=lambda entry: entry[1].st_mtime):
+            if total <= max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= stat.st_size
+            removed += 1
+
+        if removed:
+            logger.info(f"Evicted {removed} parsed-file cache entries ({total / 1024 / 1024:.1f} MB retained)")
+        return removed
+
+    def clear(self):
+        """Remove every cache entry"""
+        for path, _ in self._entries():
+            path.unlink(missing_ok=True)
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Monthly Partitions
+fund_data keeps the open months that loads, carry-forward and lookback
+corrections still write to. Once a month is closed (older than the last
+`open_months` calendar months) its rows and date aliases move into their own
+SQLite file, fund_data_YYYY_MM.db, which is VACUUMed, switched to a rollback
+journal and made read-only, and can later be moved to cold storage. The main
+database, its indexes, VACUUM and backups then only grow with the open months.
+
+fund_data_partitions records every closed month. PartitionRouter prunes that
+registry by date range, attaches only the month files a query needs (read
+only, which needs a connection opened with uri=True, as db_connection's
+are) and exposes them with the open months through the temporary
+fund_data_routed and resolved_dates_routed union views. Writes to a closed
+month are refused.
+
+daily_summary, fund_registry, load_quality and etl_log stay in the main
+database and keep covering the whole history.
+
+Usage: python partitions.py [--db /data/fund_data.db] [--dir /data/partitions]
+                            [--open-months 3] [--cold-dir /mnt/cold] [--cold-after-months 12]
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import sqlite3
+import stat
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from date_alias import DATES_VIEW, RESOLVED_VIEW, ensure_schema as ensure_date_alias_schema, materialize
+from db_connection import sqlite_uri
+from query_catalog import INDEXES
+
+logger = logging.getLogger(__name__)
+
+PARTITIONS_TABLE = 'fund_data_partitions'
+ROUTED_VIEW = 'fund_data_routed'
+ROUTED_DATES_VIEW = 'resolved_dates_routed'
+
+# Lookback corrections reach 30 days back, so the previous month always stays open
+MIN_OPEN_MONTHS = 2
+
+# SQLite allows 10 attached databases per connection; keep one free for callers
+MAX_ATTACHED = 9
+
+CREATE_PARTITIONS_SQL = f"""
+CREATE TABLE IF NOT EXISTS {PARTITIONS_TABLE} (
+    month TEXT PRIMARY KEY,
+    path TEXT,
+    first_date DATE,
+    last_date DATE,
+    row_count INTEGER,
+    alias_count INTEGER,
+    size_bytes INTEGER,
+    storage TEXT DEFAULT 'archive',
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+class ClosedMonthError(ValueError):
+    """A write targets a month that has been moved to a read-only partition"""
+
+
+def ensure_table(cursor):
+    """Create the partition registry"""
+    cursor.execute(CREATE_PARTITIONS_SQL)
+
+
+def month_bounds(month: str) -> tuple:
+    """First and last calendar date of a YYYY-MM month"""
+    first = datetime.strptime(month, '%Y-%m').date()
+    following = date(first.year + first.month // 12, first.month % 12 + 1, 1)
+    return first.isoformat(), date.fromordinal(following.toordinal() - 1).isoformat()
+
+
+def _shift_month(month: str, months: int) -> str:
+    year, number = divmod(int(month[:4]) * 12 + int(month[5:7]) - 1 + months, 12)
+    return f"{year:04d}-{number + 1:02d}"
+
+
+def archived_condition(column: str) -> str:
+    """SQL condition true when `column` falls in an archived month"""
+    return (f"EXISTS (SELECT 1 FROM {PARTITIONS_TABLE} p "
+            f"WHERE {column} BETWEEN p.first_date AND p.last_date)")
+
+
+def closed_months(cursor, dates: Iterable[str]) -> List[str]:
+    """Archived months among the months of `dates`"""
+    months = sorted({str(value)[:7] for value in dates})
+    if not months:
+        return []
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (PARTITIONS_TABLE,))
+    if cursor.fetchone() is None:
+        return []
+    cursor.execute(f"SELECT month FROM {PARTITIONS_TABLE} WHERE month IN ({', '.join('?' for _ in months)})",
+                   months)
+    return sorted(row[0] for row in cursor.fetchall())
+
+
+def check_open(cursor, dates: Iterable[str]):
+    """Raise ClosedMonthError when any of `dates` is in an archived month"""
+    closed = closed_months(cursor, dates)
+    if closed:
+        raise ClosedMonthError(f"Month(s) {', '.join(closed)} are archived read-only partitions")
+
+
+def partition_path(directory: str, month: str) -> str:
+    return os.path.join(directory, f"fund_data_{month.replace('-', '_')}.db")
+
+
+def _create_partition_file(cursor, path: str):
+    """Empty partition database with fund_data's schema, date_alias and the resolved views"""
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'fund_data'")
+    create_sql = cursor.fetchone()[0]
+    part = sqlite3.connect(path)
+    try:
+        part.execute("PRAGMA journal_mode = DELETE")
+        part.execute(create_sql)
+        ensure_date_alias_schema(part.cursor())
+        for name, target in INDEXES.items():
+            if target.startswith('fund_data('):
+                part.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+        part.commit()
+    finally:
+        part.close()
+
+
+def _compact(path: str):
+    # A run interrupted after the chmod leaves the file read-only
+    os.chmod(path, stat.S_IRUSR | stat.S_IWUSR)
+    part = sqlite3.connect(path)
+    try:
+        part.execute("ANALYZE")
+        part.commit()
+        part.execute("VACUUM")
+    finally:
+        part.close()
+    os.chmod(path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+
+def _finish_partition(conn, month: str, path: str) -> int:
+    """Compact a registered partition file and record its size"""
+    _compact(path)
+    size_bytes = os.path.getsize(path)
+    conn.execute(f"UPDATE {PARTITIONS_TABLE} SET size_bytes = ? WHERE month = ?", (size_bytes, month))
+    conn.commit()
+    return size_bytes
+
+
+def archive_month(conn, month: str, directory: str) -> Dict[str, Any]:
+    """
+    Move one closed month's fund_data rows and date aliases into its partition
+    file. Later aliases that point into the month are materialized first so
+    the open months never depend on an archived one. The partition file is
+    committed first, and the month is registered in the same transaction that
+    deletes it from the main database, so an interrupted run never leaves rows
+    only in an unregistered file. Returns the registry entry plus the
+    materialized {region: [dates]}.
+    """
+    first_date, last_date = month_bounds(month)
+    cursor = conn.cursor()
+    ensure_table(cursor)
+    if closed_months(cursor, [first_date]):
+        raise ClosedMonthError(f"Month {month} is already archived")
+
+    cursor.execute("""
+    SELECT region, date FROM date_alias
+    WHERE date > ? AND source_date BETWEEN ? AND ?
+    ORDER BY region, date
+    """, (last_date, first_date, last_date))
+    materialized = {}
+    for region, alias_date in cursor.fetchall():
+        materialized.setdefault(region, []).append(alias_date)
+    for region, dates in materialized.items():
+        materialize(cursor, region, dates)
+    # ATTACH is not allowed inside a transaction
+    conn.commit()
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.abspath(partition_path(directory, month))
+    if os.path.exists(path):
+        # Left behind by an interrupted run; the month is still in fund_data
+        os.chmod(path, stat.S_IRUSR | stat.S_IWUSR)
+        os.remove(path)
+    _create_partition_file(cursor, path)
+
+    try:
+        cursor.execute("ATTACH DATABASE ? AS archive", (path,))
+        cursor.execute("INSERT INTO archive.fund_data SELECT * FROM main.fund_data WHERE date BETWEEN ? AND ?",
+                       (first_date, last_date))
+        row_count = cursor.rowcount
+        cursor.execute("INSERT INTO archive.date_alias SELECT * FROM main.date_alias WHERE date BETWEEN ? AND ?",
+                       (first_date, last_date))
+        alias_count = cursor.rowcount
+        # The partition file is complete before the main database hands the month over
+        conn.commit()
+        # size_bytes stays NULL until the file is compacted
+        entry = {'month': month, 'path': path, 'first_date': first_date, 'last_date': last_date,
+                 'row_count': row_count, 'alias_count': alias_count, 'size_bytes': None}
+        cursor.execute(f"""
+        INSERT INTO main.{PARTITIONS_TABLE} (month, path, first_date, last_date, row_count, alias_count)
+        VALUES (:month, :path, :first_date, :last_date, :row_count, :alias_count)
+        """, entry)
+        cursor.execute("DELETE FROM main.fund_data WHERE date BETWEEN ? AND ?", (first_date, last_date))
+        cursor.execute("DELETE FROM main.date_alias WHERE date BETWEEN ? AND ?", (first_date, last_date))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute("DETACH DATABASE archive")
+
+    entry['size_bytes'] = _finish_partition(conn, month, path)
+    logger.info(f"Archived {month}: {row_count} rows and {alias_count} aliases to {path}")
+    return {**entry, 'materialized': materialized}
+
+
+def months_to_close(cursor, open_months: int, as_of: Optional[str] = None) -> List[str]:
+    """Months with rows or aliases in the main database older than the open window"""
+    if open_months < MIN_OPEN_MONTHS:
+        raise ValueError(f"open_months must be at least {MIN_OPEN_MONTHS}")
+    as_of = as_of or date.today().isoformat()
+    cutoff, _ = month_bounds(_shift_month(as_of[:7], 1 - open_months))
+    cursor.execute("""
+    SELECT DISTINCT substr(date, 1, 7) FROM resolved_dates WHERE date < ? ORDER BY 1
+    """, (cutoff,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def move_to_cold(conn, month: str, cold_dir: str) -> str:
+    """Move an archived month's file to cold storage; returns its new path"""
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT path FROM {PARTITIONS_TABLE} WHERE month = ?", (month,))
+    row = cursor.fetchone()
+    if row is None:
+        raise ValueError(f"Month {month} is not archived")
+    os.makedirs(cold_dir, exist_ok=True)
+    target = os.path.abspath(os.path.join(cold_dir, os.path.basename(row[0])))
+    shutil.move(row[0], target)
+    cursor.execute(f"UPDATE {PARTITIONS_TABLE} SET path = ?, storage = 'cold' WHERE month = ?", (target, month))
+    conn.commit()
+    logger.info(f"Moved partition {month} to cold storage: {target}")
+    return target
+
+
+def archive_closed_months(conn, directory: str, open_months: int = 3, as_of: Optional[str] = None,
+                          cold_dir: Optional[str] = None, cold_after_months: int = 12,
+                          vacuum: bool = True) -> Dict[str, Any]:
+    """
+    Archive every closed month (oldest first), optionally move partitions older
+    than `cold_after_months` to cold_dir, and VACUUM the main database when
+    anything moved out. Returns the archived entries, the months moved to cold
+    storage and the materialized {region: [dates]} that need a summary refresh.
+    """
+    cursor = conn.cursor()
+    ensure_table(cursor)
+    # Months registered by a run that stopped before compacting their file
+    cursor.execute(f"SELECT month, path FROM {PARTITIONS_TABLE} WHERE size_bytes IS NULL ORDER BY month")
+    for month, path in cursor.fetchall():
+        if os.path.exists(path):
+            _finish_partition(conn, month, path)
+
+    archived, materialized = [], {}
+    for month in months_to_close(cursor, open_months, as_of):
+        entry = archive_month(conn, month, directory)
+        archived.append(entry)
+        for region, dates in entry['materialized'].items():
+            materialized.setdefault(region, []).extend(dates)
+
+    cold = []
+    if cold_dir:
+        as_of = as_of or date.today().isoformat()
+        cutoff = _shift_month(as_of[:7], -cold_after_months)
+        cursor.execute(f"SELECT month FROM {PARTITIONS_TABLE} WHERE storage = 'archive' AND month < ? "
+                       f"ORDER BY month", (cutoff,))
+        for (month,) in cursor.fetchall():
+            move_to_cold(conn, month, cold_dir)
+            cold.append(month)
+
+    if archived and vacuum:
+        conn.commit()
+        conn.execute("VACUUM")
+        logger.info("Compacted the main database after archiving")
+    return {'archived': archived, 'cold': cold, 'materialized': materialized}
+
+
+class PartitionRouter:
+    """
+    Reads fund data for a date range from the open months in the main
+    database plus only the archived months the range overlaps.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def partitions(self, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Archived months overlapping [start, end] whose files are reachable"""
+        if not self._has_partitions():
+            return []
+        cursor = self.conn.execute(f"""
+        SELECT month, path, storage FROM {PARTITIONS_TABLE}
+        WHERE last_date >= ? AND first_date <= ?
+        ORDER BY month
+        """, (start or '0000-01-01', end or '9999-12-31'))
+        found = []
+        for month, path, storage in cursor.fetchall():
+            if os.path.exists(path):
+                found.append({'month': month, 'path': path, 'storage': storage})
+            else:
+                logger.warning(f"Partition {month} ({storage}) is not reachable at {path}; skipped")
+        return found
+
+    def _has_partitions(self) -> bool:
+        cursor = self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                   (PARTITIONS_TABLE,))
+        return cursor.fetchone() is not None
+
+    def _columns(self, schema: str) -> List[str]:
+        return [row[1] for row in self.conn.execute(f"PRAGMA {schema}.table_info(fund_data)").fetchall()]
+
+    def _create_views(self, schemas: List[str]):
+        columns = self._columns('main')
+        rows, dates = [], []
+        for schema in schemas:
+            present = set(self._columns(schema))
+            select = ', '.join(col if col in present else f'NULL AS {col}' for col in columns)
+            rows.append(f"SELECT {select} FROM {schema}.{RESOLVED_VIEW}")
+            dates.append(f"SELECT region, date FROM {schema}.{DATES_VIEW}")
+        self.conn.execute(f"DROP VIEW IF EXISTS temp.{ROUTED_VIEW}")
+        self.conn.execute(f"DROP VIEW IF EXISTS temp.{ROUTED_DATES_VIEW}")
+        self.conn.execute(f"CREATE TEMP VIEW {ROUTED_VIEW} AS {' UNION ALL '.join(rows)}")
+        self.conn.execute(f"CREATE TEMP VIEW {ROUTED_DATES_VIEW} AS {' UNION ALL '.join(dates)}")
+
+    def _drop_views(self):
+        self.conn.execute(f"DROP VIEW IF EXISTS temp.{ROUTED_VIEW}")
+        self.conn.execute(f"DROP VIEW IF EXISTS temp.{ROUTED_DATES_VIEW}")
+
+    def read_frame(self, query: str, params=(), start: Optional[str] = None, end: Optional[str] = None,
+                   sort_by=None, ascending=True, distinct: bool = False, **read_options) -> pd.DataFrame:
+        """
+        Run `query` against fund_data_routed / resolved_dates_routed covering
+        [start, end]. Ranges needing more month files than can be attached at
+        once run in batches whose results are concatenated, de-duplicated when
+        `distinct` and re-sorted by `sort_by`.
+        """
+        parts = self.partitions(start, end)
+        batches = [parts[i:i + MAX_ATTACHED] for i in range(0, len(parts), MAX_ATTACHED)] or [[]]
+        frames = []
+        for number, batch in enumerate(batches):
+            attached = []
+            try:
+                for part in batch:
+                    schema = f"partition_{len(attached)}"
+                    self.conn.execute(f"ATTACH DATABASE ? AS {schema}", (sqlite_uri(part['path'], mode='ro'),))
+                    attached.append(schema)
+                self._create_views((['main'] if number == 0 else []) + attached)
+                frames.append(pd.read_sql_query(query, self.conn, params=params, **read_options))
+            finally:
+                self._drop_views()
+                for schema in attached:
+                    self.conn.execute(f"DETACH DATABASE {schema}")
+
+        if len(frames) == 1:
+            return frames[0]
+        df = pd.concat(frames, ignore_index=True)
+        if distinct:
+            df = df.drop_duplicates(ignore_index=True)
+        if sort_by is not None:
+            df = df.sort_values(sort_by, ascending=ascending, ignore_index=True)
+        return df
+
+
+def main():
+    from columnar_mirror import ColumnarMirror
+    from daily_summary import refresh
+    from db_connection import connect
+    from row_fingerprint import refresh as refresh_digests
+
+    parser = argparse.ArgumentParser(description='Archive closed months of fund_data into read-only partitions')
+    parser.add_argument('--db', default='/data/fund_data.db', help='SQLite database')
+    parser.add_argument('--dir', default='/data/partitions', help='Directory for month partition files')
+    parser.add_argument('--open-months', type=int, default=3, help='Calendar months kept in fund_data')
+    parser.add_argument('--cold-dir', help='Cold storage directory for old partitions')
+    parser.add_argument('--cold-after-months', type=int, default=12, help='Age before moving to cold storage')
+    parser.add_argument('--mirror-dir', default='/data/columnar',
+                        help='Columnar mirror to update for materialized dates, when it has been written')
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    result = archive_closed_months(conn, args.dir, args.open_months, cold_dir=args.cold_dir,
+                                   cold_after_months=args.cold_after_months)
+    # Aliases into an archived month became physical rows in the open months
+    for region, dates in result['materialized'].items():
+        refresh(conn.cursor(), region, dates)
+        refresh_digests(conn.cursor(), region, dates)
+    conn.commit()
+    mirror = ColumnarMirror(args.mirror_dir)
+    if mirror.available():
+        for region, dates in result['materialized'].items():
+            mirror.write_dates(conn, region, dates)
+    for entry in result['archived']:
+        print(f"{entry['month']}: {entry['row_count']:,} rows, {entry['size_bytes'] / 1024 / 1024:.1f} MB "
+              f"-> {entry['path']}")
+    print(f"Archived {len(result['archived'])} month(s); moved {len(result['cold'])} to cold storage")
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Query Catalog
+The project's hot fund_data and etl_log queries in one place, with an index
+advisor that runs EXPLAIN QUERY PLAN over them and the index migrations that
+fit them. Almost every query filters on region AND date or on fund_code AND a
+date range, so fund_data carries composite (region, date) and
+(fund_code, date) indexes; the single-column date, region and fund_code
+indexes are prefixes of those (or of the primary key) and are dropped.
+
+Usage: python query_catalog.py [--db /data/fund_data.db] [--apply]
+"""
+
+import argparse
+import logging
+import time
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# name -> (where it runs, SQL with named parameters filled by sample_params)
+QUERY_CATALOG = {
+    'validation_window': (
+        'FundDataETL.validate_against_lookback',
+        "SELECT date, fund_code, share_class_assets, portfolio_assets, one_day_yield, seven_day_yield "
+        "FROM fund_data_resolved WHERE region = :region AND date BETWEEN :start AND :end"),
+    'validation_digests': (
+        'row_fingerprint.stored_digests',
+        "SELECT d.date, g.row_count, g.hash_high, g.hash_low FROM resolved_dates d "
+        "LEFT JOIN date_alias a ON a.region = d.region AND a.date = d.date "
+        "LEFT JOIN fund_data_digests g ON g.region = d.region AND g.date = COALESCE(a.source_date, d.date) "
+        "WHERE d.region = :region AND d.date BETWEEN :start AND :end"),
+    'carry_forward_source': (
+        'FundDataETL.carry_forward_data',
+        "SELECT DISTINCT date FROM fund_data WHERE region = :region AND date < :date "
+        "ORDER BY date DESC LIMIT 1"),
+    'last_load_digests': (
+        'FundDataETL._last_load_digests',
+        "SELECT file_hash, data_digest FROM etl_log WHERE region = :region AND file_date = :date "
+        "AND status = 'SUCCESS' ORDER BY id DESC LIMIT 1"),
+    'upsert_existing_keys': (
+        'bulk_loader.SliceUpsert',
+        "SELECT date, fund_code FROM fund_data WHERE region = :region AND date IN (:date)"),
+    'fund_history': (
+        'FundDataQuery.get_fund_history',
+        "SELECT date, fund_name, share_class_assets, one_day_yield, seven_day_yield "
+        "FROM fund_data_resolved WHERE fund_code = :fund_code AND date BETWEEN :start AND :end "
+        "ORDER BY date"),
+    'missing_dates': (
+        'FundDataMonitor.find_missing_dates',
+        "SELECT DISTINCT date FROM resolved_dates WHERE region = :region "
+        "AND date BETWEEN :start AND :end"),
+    'region_latest_date': (
+        'fund_etl_ui dashboard quality panel',
+        "SELECT MAX(date) FROM resolved_dates WHERE region = :region"),
+    'latest_date': (
+        'FundDataMonitor.check_data_completeness',
+        "SELECT MAX(date) FROM resolved_dates"),
+    'region_counts': (
+        'fund_etl_ui telemetry',
+        "SELECT region, COUNT(*) FROM fund_data GROUP BY region"),
+    'export_slice': (
+        'FundDataQuery.export_data',
+        "SELECT date, region, fund_code, fund_name, master_class_fund_name, rating, unique_identifier, "
+        "nasdaq, fund_complex, subcategory, domicile, currency, share_class_assets, portfolio_assets, "
+        "one_day_yield, one_day_gross_yield, seven_day_yield, seven_day_gross_yield, expense_ratio, wam, "
+        "wal, transactional_nav, market_nav, daily_liquidity, weekly_liquidity, fees, gates "
+        "FROM fund_data_resolved WHERE date = :date AND region = :region ORDER BY fund_code")
+}
+
+# Index name -> table(columns). (date, region, fund_code) is already the primary key.
+INDEXES = {
+    # region = ? AND date ... ; covers DISTINCT date, MAX(date) and per-region counts
+    'idx_fund_data_region_date': 'fund_data(region, date)',
+    # fund_code = ? AND date BETWEEN ? AND ?, in date order
+    'idx_fund_data_fund_code_date': 'fund_data(fund_code, date)',
+    # Digest lookup on every ingest
+    'idx_etl_log_region_file_date': 'etl_log(region, file_date, status)'
+}
+
+# Indexes whose columns lead an index above or the primary key
+REDUNDANT_INDEXES = {
+    'idx_fund_data_date': 'primary key (date, region, fund_code)',
+    'idx_fund_data_region': 'idx_fund_data_region_date',
+    'idx_fund_data_fund_code': 'idx_fund_data_fund_code_date'
+}
+
+
+def _index_names(cursor) -> set:
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def apply_index_migrations(cursor) -> Dict[str, Any]:
+    """
+    Create the catalog's indexes, drop the redundant ones and refresh planner
+    statistics when anything changed. Safe to run on every setup.
+    """
+    existing = _index_names(cursor)
+    created = [name for name in INDEXES if name not in existing]
+    dropped = [name for name in REDUNDANT_INDEXES if name in existing]
+
+    for name in created:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {INDEXES[name]}")
+    for name in dropped:
+        cursor.execute(f"DROP INDEX IF EXISTS {name}")
+
+    analyzed = bool(created or dropped)
+    if analyzed:
+        cursor.execute("ANALYZE")
+        logger.info(f"Index migration: created {created or 'none'}, dropped {dropped or 'none'}; ran ANALYZE")
+    return {'created': created, 'dropped': dropped, 'analyzed': analyzed}
+
+
+def sample_params(conn) -> Dict[str, Any]:
+    """Representative parameters: the latest stored AMRS date and one of its funds"""
+    cursor = conn.cursor()
+    region = 'AMRS'
+    cursor.execute("SELECT MAX(date) FROM fund_data WHERE region = ?", (region,))
+    date = cursor.fetchone()[0] or '2024-01-16'
+    cursor.execute("SELECT fund_code FROM fund_data WHERE region = ? AND date = ? LIMIT 1", (region, date))
+    row = cursor.fetchone()
+    cursor.execute("SELECT date(?, '-30 days')", (date,))
+    start = cursor.fetchone()[0]
+    return {'region': region, 'date': date, 'start': start, 'end': date,
+            'fund_code': row[0] if row else 'FUND0001'}
+
+
+def explain(conn, sql: str, params: Dict[str, Any]) -> List[str]:
+    """EXPLAIN QUERY PLAN detail lines for one query"""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()]
+
+
+def _tables(conn) -> set:
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def plan_issues(plan: List[str], tables: set) -> List[str]:
+    """Full scans of stored tables in a query plan (scans of a view's rows are not counted)"""
+    issues = []
+    for detail in plan:
+        words = detail.split()
+        if words[0] == 'SCAN' and words[1] in tables and 'INDEX' not in detail:
+            issues.append(f"full scan: {detail}")
+    return issues
+
+
+def advise(conn, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    """Plan, full-scan issues and temporary sorts for every catalog query"""
+    params = params or sample_params(conn)
+    tables = _tables(conn)
+    report = []
+    for name, (source, sql) in QUERY_CATALOG.items():
+        plan = explain(conn, sql, params)
+        report.append({'name': name, 'source': source, 'plan': plan,
+                       'issues': plan_issues(plan, tables),
+                       'sorts': [detail for detail in plan if 'USE TEMP B-TREE' in detail]})
+    return report
+
+
+def time_queries(conn, params: Dict[str, Any] = None, repeat: int = 5) -> Dict[str, float]:
+    """Best-of-N milliseconds for each catalog query"""
+    params = params or sample_params(conn)
+    timings = {}
+    for name, (_, sql) in QUERY_CATALOG.items():
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            best = min(best, time.perf_counter() - started)
+        timings[name] = best * 1000
+    return timings
+
+
+def main():
+    from db_connection import connect
+
+    parser = argparse.ArgumentParser(description='Index advisor for the fund_data query catalog')
+    parser.add_argument('--db', default='/data/fund_data.db', help='SQLite database')
+    parser.add_argument('--apply', action='store_true', help='Apply the index migrations')
+    args = parser.parse_args()
+
+    conn = connect(args.db)
+    params = sample_params(conn)
+    before = time_queries(conn, params)
+    for entry in advise(conn, params):
+        status = '; '.join(entry['issues'] + entry['sorts']) or 'ok'
+        print(f"{entry['name']:<24} {before[entry['name']]:>8.2f} ms  {status}")
+        for detail in entry['plan']:
+            print(f"    {detail}")
+
+    if args.apply:
+        result = apply_index_migrations(conn.cursor())
+        conn.commit()
+        after = time_queries(conn, params)
+        print(f"\nCreated {result['created'] or 'none'}, dropped {result['dropped'] or 'none'}")
+        for name in QUERY_CATALOG:
+            print(f"{name:<24} {before[name]:>8.2f} ms -> {after[name]:>8.2f} ms")
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
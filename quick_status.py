@@ -7,21 +7,23 @@ import sys
 import os
 sys.path.append('/app')
 
-from fund_etl_pipeline import FundDataETL
-from fund_etl_scheduler import ETLScheduler
-import sqlite3
-import pandas as pd
+from db_connection import connect
 from datetime import datetime, timedelta
 
 def initialize_database():
     """Initialize empty database with data"""
+    # The pipeline (and pandas with it) loads only when the tool runs
+    import pandas as pd
+    from fund_etl_pipeline import FundDataETL
+    from fund_etl_scheduler import ETLScheduler
+    
     print("=== Database Initialization Tool ===\n")
     
     etl = FundDataETL('/config/config.json')
-    conn = sqlite3.connect(etl.db_path)
+    conn = connect(etl.db_path)
     
     # Check current state
-    total_records = pd.read_sql_query("SELECT COUNT(*) as count FROM fund_data", conn).iloc[0]['count']
+    total_records = pd.read_sql_query("SELECT COUNT(*) as count FROM fund_data_resolved", conn).iloc[0]['count']
     
     print(f"Current database status: {total_records:,} records\n")
     
@@ -87,10 +89,10 @@ def initialize_database():
     print("="*60)
     
     # Check final state
-    conn = sqlite3.connect(etl.db_path)
-    final_records = pd.read_sql_query("SELECT COUNT(*) as count FROM fund_data", conn).iloc[0]['count']
+    conn = connect(etl.db_path)
+    final_records = pd.read_sql_query("SELECT COUNT(*) as count FROM fund_data_resolved", conn).iloc[0]['count']
     final_regions = pd.read_sql_query(
-        "SELECT region, COUNT(*) as count FROM fund_data GROUP BY region", 
+        "SELECT region, COUNT(*) as count FROM fund_data_resolved GROUP BY region", 
         conn
     )
     
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Revision Log
+Append-only fund_data_revisions table of the field values lookback
+corrections change: one (date, region, fund_code, field, old_value,
+new_value, source) row per changed field. Full lookback updates diff the
+lookback rows against the stored ones and write only those deltas, and an
+as-of read undoes the revisions made after a timestamp to show the values as
+they were published then, without keeping snapshots of whole dates.
+
+Rows added or removed by a correction are logged as a ROW_FIELD revision
+(old_value/new_value 1 for present, NULL for absent) plus one revision per
+non-null field, so their values can be reconstructed too. Revisions are
+stored against the physical date the correction was written to. Rows updated
+in place have their row_hash cleared for row_fingerprint.refresh() to recompute.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from bulk_loader import FUND_DATA_COLUMNS, FUND_DATA_KEY, typed_column, typed_rows
+from date_alias import RESOLVED_VIEW, resolve_date
+from partitions import ROUTED_VIEW, PartitionRouter
+from row_fingerprint import ROW_HASH_COLUMN
+
+logger = logging.getLogger(__name__)
+
+# Pseudo-field recording a row's presence
+ROW_FIELD = '*'
+
+# Fields a correction can revise
+REVISION_FIELDS = [col for col in FUND_DATA_COLUMNS if col not in FUND_DATA_KEY]
+
+REVISION_COLUMNS = ['date', 'fund_code', 'field', 'old_value', 'new_value']
+
+# old_value/new_value have no declared type so REAL and TEXT values keep their type
+CREATE_REVISIONS_SQL = """
+CREATE TABLE IF NOT EXISTS fund_data_revisions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date DATE,
+    region TEXT,
+    fund_code TEXT,
+    field TEXT,
+    old_value,
+    new_value,
+    source TEXT,
+    revised_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+def ensure_table(cursor):
+    cursor.execute(CREATE_REVISIONS_SQL)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_revisions_region_date
+    ON fund_data_revisions(region, date, fund_code)
+    """)
+
+
+def record(cursor, region: str, changes: pd.DataFrame, source: str) -> int:
+    """Append revisions (REVISION_COLUMNS) for region; returns the number written"""
+    if changes.empty:
+        return 0
+    cursor.executemany("""
+    INSERT INTO fund_data_revisions (date, region, fund_code, field, old_value, new_value, source)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, [(date, region, fund_code, field, old, new, source)
+          for date, fund_code, field, old, new in typed_rows(changes, REVISION_COLUMNS)])
+    return len(changes)
+
+
+def stored_rows(cursor, region: str, dates: Iterable[str], fields: List[str]) -> pd.DataFrame:
+    """Rows currently shown for dates (aliased dates included) with the given fields"""
+    dates = sorted(set(dates))
+    cursor.execute(f"""
+    SELECT date, fund_code, {', '.join(fields)} FROM {RESOLVED_VIEW}
+    WHERE region = ? AND date IN ({', '.join('?' for _ in dates)})
+    """, [region] + dates)
+    return pd.DataFrame(cursor.fetchall(), columns=['date', 'fund_code'] + fields)
+
+
+def _differs(old: pd.Series, new: pd.Series) -> np.ndarray:
+    if old.dtype.kind in 'iuf' and new.dtype.kind in 'iuf':
+        old_values, new_values = old.to_numpy(float), new.to_numpy(float)
+        return ~((old_values == new_values) | (np.isnan(old_values) & np.isnan(new_values)))
+    old, new = old.astype(object), new.astype(object)
+    return (~((old == new) | (old.isna() & new.isna()))).to_numpy()
+
+
+def _field_changes(frame: pd.DataFrame, field: str, old: Optional[pd.Series],
+                   new: Optional[pd.Series]) -> pd.DataFrame:
+    return pd.DataFrame({
+        'date': frame['date'].tolist(),
+        'fund_code': frame['fund_code'].tolist(),
+        'field': field,
+        'old_value': typed_column(old) if old is not None else None,
+        'new_value': typed_column(new) if new is not None else None
+    }, columns=REVISION_COLUMNS)
+
+
+def _presence_changes(rows: pd.DataFrame, fields: List[str], suffix: str, added: bool) -> List[pd.DataFrame]:
+    """Revisions adding (or removing) whole rows: ROW_FIELD plus each non-null field"""
+    changes = [pd.DataFrame({'date': rows['date'].tolist(), 'fund_code': rows['fund_code'].tolist(),
+                             'field': ROW_FIELD, 'old_value': None if added else 1,
+                             'new_value': 1 if added else None}, columns=REVISION_COLUMNS)]
+    for field in fields:
+        with_value = rows[rows[f'{field}{suffix}'].notna().to_numpy()]
+        if not with_value.empty:
+            values = with_value[f'{field}{suffix}']
+            changes.append(_field_changes(with_value, field, None if added else values, values if added else None))
+    return changes
+
+
+def _concat(changes: List[pd.DataFrame]) -> pd.DataFrame:
+    if not changes:
+        return pd.DataFrame(columns=REVISION_COLUMNS)
+    return pd.concat([frame.astype(object) for frame in changes], ignore_index=True)
+
+
+def diff_rows(stored: pd.DataFrame, incoming: pd.DataFrame, fields: List[str]) -> pd.DataFrame:
+    """
+    Revisions turning the stored rows into the incoming ones, compared on
+    (date, fund_code) and the given fields, in REVISION_COLUMNS.
+    """
+    key = ['date', 'fund_code']
+    merged = stored[key + fields].merge(incoming[key + fields], on=key, how='outer',
+                                        suffixes=('_old', '_new'), indicator=True)
+    both = merged[merged['_merge'] == 'both']
+    changes = []
+    for field in fields:
+        old, new = both[f'{field}_old'], both[f'{field}_new']
+        changed = _differs(old, new)
+        if changed.any():
+            changes.append(_field_changes(both[changed], field, old[changed], new[changed]))
+
+    for side, suffix in (('right_only', '_new'), ('left_only', '_old')):
+        rows = merged[merged['_merge'] == side]
+        if not rows.empty:
+            changes.extend(_presence_changes(rows, fields, suffix, added=side == 'right_only'))
+    return _concat(changes)
+
+
+def diff_stored(cursor, region: str, dates: Iterable[str], incoming: pd.DataFrame,
+                fields: List[str]) -> pd.DataFrame:
+    """
+    diff_rows against the rows stored for dates. Only the compared fields are
+    read for every row; removed rows also log the fields the lookback does
+    not carry, so as-of reads can restore them whole.
+    """
+    changes = diff_rows(stored_rows(cursor, region, dates, fields), incoming, fields)
+    removed = changes.loc[(changes['field'] == ROW_FIELD) & changes['old_value'].notna(), ['date', 'fund_code']]
+    other_fields = [field for field in REVISION_FIELDS if field not in fields]
+    if removed.empty or not other_fields:
+        return changes
+    rows = stored_rows(cursor, region, removed['date'], other_fields).merge(removed, on=['date', 'fund_code'])
+    rows = rows.rename(columns={field: f'{field}_old' for field in other_fields})
+    return _concat([changes] + _presence_changes(rows, other_fields, '_old', added=False)[1:])
+
+
+def apply_revisions(cursor, region: str, changes: pd.DataFrame) -> Dict[str, int]:
+    """
+    Write revisions from diff_rows to fund_data: changed fields are updated,
+    added rows inserted and removed rows deleted. Returns the rows inserted,
+    updated and deleted.
+    """
+    counts = {'inserted': 0, 'updated': 0, 'deleted': 0}
+    if changes.empty:
+        return counts
+    rows = changes[changes['field'] == ROW_FIELD]
+    added = set(rows.loc[rows['new_value'].notna(), ['date', 'fund_code']].itertuples(index=False, name=None))
+    removed = set(rows.loc[rows['old_value'].notna(), ['date', 'fund_code']].itertuples(index=False, name=None))
+    keys = list(changes[['date', 'fund_code']].itertuples(index=False, name=None))
+    is_added = np.array([key in added for key in keys], dtype=bool)
+    is_removed = np.array([key in removed for key in keys], dtype=bool)
+
+    fields = changes[~is_added & ~is_removed]
+    for field, field_changes in fields.groupby('field', sort=False):
+        cursor.executemany(f"""
+        UPDATE fund_data SET {field} = ?, {ROW_HASH_COLUMN} = NULL WHERE region = ? AND date = ? AND fund_code = ?
+        """, [(value, region, date, fund_code) for value, date, fund_code in
+              typed_rows(field_changes, ['new_value', 'date', 'fund_code'])])
+    counts['updated'] = len(set(zip(fields['date'], fields['fund_code'])))
+
+    if added:
+        values = {}
+        inserted = changes[is_added & (changes['field'] != ROW_FIELD).to_numpy()]
+        for date, fund_code, field, new_value in typed_rows(inserted, ['date', 'fund_code', 'field', 'new_value']):
+            values.setdefault((date, fund_code), {})[field] = new_value
+        # Rows carrying the same fields share one statement
+        groups = {}
+        for (date, fund_code) in sorted(added, key=str):
+            row = values.get((date, fund_code), {})
+            row_fields = tuple(sorted(row))
+            groups.setdefault(row_fields, []).append([date, region, fund_code] + [row[field] for field in row_fields])
+        for row_fields, params in groups.items():
+            columns = ['date', 'region', 'fund_code'] + list(row_fields)
+            cursor.executemany(f"""
+            INSERT INTO fund_data ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})
+            """, params)
+        counts['inserted'] = len(added)
+
+    if removed:
+        cursor.executemany("""
+        DELETE FROM fund_data WHERE region = ? AND date = ? AND fund_code IS ?
+        """, [(region, date, fund_code) for date, fund_code in sorted(removed, key=str)])
+        counts['deleted'] = len(removed)
+    return counts
+
+
+def update_rows(cursor, region: str, updates: pd.DataFrame, source: str) -> int:
+    """
+    Set the fields of updates (date, fund_code and field columns) on the
+    stored rows, writing and logging only changed values.
+    Rows sharing the same set of changed fields are written by one UPDATE
+    with executemany. Returns the number of fields revised.
+    """
+    key = ['date', 'fund_code']
+    fields = [col for col in updates.columns if col not in key]
+    updates = updates.drop_duplicates(key)
+    if updates.empty or not fields:
+        return 0
+    dates = sorted(set(updates['date']))
+    cursor.execute(f"""
+    SELECT date, fund_code, {', '.join(fields)} FROM fund_data
+    WHERE region = ? AND date IN ({', '.join('?' for _ in dates)})
+    """, [region] + dates)
+    stored = pd.DataFrame(cursor.fetchall(), columns=key + fields)
+    merged = stored.merge(updates, on=key, suffixes=('_old', '_new'))
+
+    changes = []
+    for field in fields:
+        old, new = merged[f'{field}_old'], merged[f'{field}_new']
+        changed = _differs(old, new)
+        if changed.any():
+            changes.append(_field_changes(merged[changed], field, old[changed], new[changed]))
+    changes = _concat(changes)
+    if changes.empty:
+        return 0
+
+    rows = {}
+    for date, fund_code, field, new_value in typed_rows(changes, ['date', 'fund_code', 'field', 'new_value']):
+        rows.setdefault((date, fund_code), {})[field] = new_value
+    by_signature = {}
+    for (date, fund_code), values in rows.items():
+        by_signature.setdefault(tuple(values), []).append(list(values.values()) + [region, date, fund_code])
+    for signature, params in by_signature.items():
+        cursor.executemany(f"""
+        UPDATE fund_data SET {', '.join(f'{field} = ?' for field in signature)}, {ROW_HASH_COLUMN} = NULL
+        WHERE region = ? AND date = ? AND fund_code = ?
+        """, params)
+    logger.debug(f"Updated {len(rows)} {region} rows with {len(by_signature)} statements")
+    return record(cursor, region, changes, source)
+
+
+def as_of(conn, region: str, date: str, timestamp: Union[str, datetime]) -> pd.DataFrame:
+    """
+    Rows of a region and date as they stood at timestamp (UTC, like
+    revised_at): revisions made later are undone, earliest first.
+    """
+    if isinstance(timestamp, datetime):
+        timestamp = timestamp.strftime('%Y-%m-%d %H:%M:%S')
+    cursor = conn.cursor()
+    current = PartitionRouter(conn).read_frame(f"""
+    SELECT {', '.join(FUND_DATA_COLUMNS)} FROM {ROUTED_VIEW}
+    WHERE region = ? AND date = ?
+    """, [region, date], start=date, end=date)
+
+    # An aliased date shows, and was revised through, its source date's rows
+    cursor.execute("""
+    SELECT fund_code, field, old_value FROM fund_data_revisions
+    WHERE region = ? AND date = ? AND revised_at > ?
+    ORDER BY id
+    """, (region, resolve_date(cursor, region, date), timestamp))
+    undo = pd.DataFrame(cursor.fetchall(), columns=['fund_code', 'field', 'old_value'])
+    if undo.empty:
+        return current.sort_values('fund_code', ignore_index=True)
+
+    # The earliest later revision of each field holds the value it had at timestamp
+    undo = undo.drop_duplicates(['fund_code', 'field'], keep='first')
+    rows = {row['fund_code']: row for row in current.to_dict('records')}
+    for fund_code, old_value in undo.loc[undo['field'] == ROW_FIELD, ['fund_code', 'old_value']].itertuples(index=False):
+        if old_value is None:
+            rows.pop(fund_code, None)
+        else:
+            rows.setdefault(fund_code, {'date': date, 'region': region, 'fund_code': fund_code})
+    for fund_code, field, old_value in undo[undo['field'] != ROW_FIELD].itertuples(index=False):
+        if fund_code in rows:
+            rows[fund_code][field] = old_value
+
+    df = pd.DataFrame(list(rows.values()), columns=FUND_DATA_COLUMNS)
+    return df.sort_values('fund_code', ignore_index=True)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Row Fingerprints
+A 64-bit hash of each stored row's fund code and lookback-compared fields
+(fund_data.row_hash) and, per (date, region), a digest of those hashes: the
+row count and the sums of their high and low 32 bits (fund_data_digests).
+Lookback validation compares the digest of each lookback day with the stored
+one and skips identical days; on days that differ, only lookback rows whose
+hash is not the stored row's go through the numeric threshold checks, so
+validation cost follows the drift rather than the size of the window.
+
+Loads write row_hash with the row. Corrections that update fields in place
+clear it, and refresh() hashes those rows again from their stored values and
+recomputes the digests of the dates written, next to the daily summary.
+"""
+
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from date_alias import DATES_VIEW
+from lookback_compare import LOOKBACK_FIELDS
+
+logger = logging.getLogger(__name__)
+
+ROW_HASH_COLUMN = 'row_hash'
+
+# Fields a row hash covers: every field lookback validation can compare
+FINGERPRINT_FIELDS = list(LOOKBACK_FIELDS)
+
+# Lookback (Excel) column of the fund code and of each fingerprint field
+LOOKBACK_COLUMNS = {'fund_code': 'Fund Code', **LOOKBACK_FIELDS}
+
+DIGESTS_TABLE = 'fund_data_digests'
+
+CREATE_DIGESTS_SQL = f"""
+CREATE TABLE IF NOT EXISTS {DIGESTS_TABLE} (
+    date DATE,
+    region TEXT,
+    row_count INTEGER,
+    hash_high INTEGER,
+    hash_low INTEGER,
+    PRIMARY KEY (date, region)
+)
+"""
+
+# Dates rebuild() refreshes per statement
+REBUILD_BATCH = 200
+
+Digest = Tuple[int, int, int]
+
+
+def ensure_schema(cursor) -> bool:
+    """Add fund_data.row_hash and create the digest table; True when row_hash is new"""
+    cursor.execute("PRAGMA table_info(fund_data)")
+    created = ROW_HASH_COLUMN not in [row[1] for row in cursor.fetchall()]
+    if created:
+        cursor.execute(f"ALTER TABLE fund_data ADD COLUMN {ROW_HASH_COLUMN} INTEGER")
+    cursor.execute(CREATE_DIGESTS_SQL)
+    return created
+
+
+def row_hashes(frame: pd.DataFrame, columns: Optional[Dict[str, str]] = None) -> np.ndarray:
+    """
+    int64 row hash of each row of frame from fund_code and the fingerprint
+    fields as float64 (a field frame lacks counts as null). columns maps those
+    names to frame's own column names, e.g. LOOKBACK_COLUMNS.
+    """
+    columns = columns or {}
+    key = pd.DataFrame({'fund_code': frame[columns.get('fund_code', 'fund_code')].astype(str).to_numpy()})
+    for field in FINGERPRINT_FIELDS:
+        column = columns.get(field, field)
+        if column in frame.columns:
+            key[field] = pd.to_numeric(frame[column], errors='coerce').astype('float64').to_numpy()
+        else:
+            key[field] = np.nan
+    return pd.util.hash_pandas_object(key, index=False).to_numpy().view(np.int64)
+
+
+def day_digests(dates: np.ndarray, hashes: np.ndarray) -> Dict[str, Digest]:
+    """(row_count, hash_high, hash_low) of the row hashes of each date, as refresh() stores them"""
+    frame = pd.DataFrame({'date': dates, 'high': hashes >> 32, 'low': hashes & 0xFFFFFFFF})
+    grouped = frame.groupby('date', sort=False).agg(row_count=('high', 'size'), high=('high', 'sum'),
+                                                     low=('low', 'sum'))
+    return {date: (int(count), int(high), int(low)) for date, count, high, low in grouped.itertuples()}
+
+
+def refresh(cursor, region: str, dates: Iterable[str]):
+    """Hash the rows of the given dates whose row_hash was cleared and recompute their digests"""
+    dates = sorted(set(dates))
+    if not dates:
+        return
+    placeholders = ', '.join('?' for _ in dates)
+    cursor.execute(f"""
+    SELECT rowid, fund_code, {', '.join(FINGERPRINT_FIELDS)} FROM fund_data
+    WHERE region = ? AND date IN ({placeholders}) AND {ROW_HASH_COLUMN} IS NULL
+    """, [region] + dates)
+    rows = pd.DataFrame(cursor.fetchall(), columns=['rowid', 'fund_code'] + FINGERPRINT_FIELDS)
+    if len(rows):
+        cursor.executemany(f"UPDATE fund_data SET {ROW_HASH_COLUMN} = ? WHERE rowid = ?",
+                           zip(row_hashes(rows).tolist(), rows['rowid'].tolist()))
+        logger.debug(f"Hashed {len(rows)} {region} rows")
+
+    # Aliased dates have no rows of their own and so no digest
+    cursor.execute(f"DELETE FROM {DIGESTS_TABLE} WHERE region = ? AND date IN ({placeholders})", [region] + dates)
+    cursor.execute(f"""
+    INSERT INTO {DIGESTS_TABLE} (date, region, row_count, hash_high, hash_low)
+    SELECT date, region, COUNT(*), SUM({ROW_HASH_COLUMN} >> 32), SUM({ROW_HASH_COLUMN} & 4294967295)
+    FROM fund_data WHERE region = ? AND date IN ({placeholders})
+    GROUP BY date, region
+    """, [region] + dates)
+
+
+def rebuild(cursor):
+    """Hash every stored row that has no row_hash and recompute every digest"""
+    cursor.execute("SELECT DISTINCT region, date FROM fund_data ORDER BY region, date")
+    by_region = {}
+    for region, date in cursor.fetchall():
+        by_region.setdefault(region, []).append(date)
+    for region, dates in by_region.items():
+        for start in range(0, len(dates), REBUILD_BATCH):
+            refresh(cursor, region, dates[start:start + REBUILD_BATCH])
+    cursor.execute(f"SELECT COUNT(*) FROM {DIGESTS_TABLE}")
+    logger.info(f"Rebuilt {DIGESTS_TABLE}: {cursor.fetchone()[0]} date/region rows")
+
+
+def stored_digests(cursor, region: str, dates: Iterable[str]) -> Dict[str, Optional[Digest]]:
+    """
+    Digest of each of dates that has rows, an aliased date taking its source
+    date's; None for a stored date without a digest. Dates with no rows are
+    left out.
+    """
+    dates = set(dates)
+    if not dates:
+        return {}
+    cursor.execute(f"""
+    SELECT d.date, g.row_count, g.hash_high, g.hash_low
+    FROM {DATES_VIEW} d
+    LEFT JOIN date_alias a ON a.region = d.region AND a.date = d.date
+    LEFT JOIN {DIGESTS_TABLE} g ON g.region = d.region AND g.date = COALESCE(a.source_date, d.date)
+    WHERE d.region = ? AND d.date BETWEEN ? AND ?
+    """, (region, min(dates), max(dates)))
+    return {date: None if row_count is None else (row_count, high, low)
+            for date, row_count, high, low in cursor.fetchall() if date in dates}
+
+
+def drifted(dates: np.ndarray, fund_codes: np.ndarray, hashes: np.ndarray, stored: pd.DataFrame) -> np.ndarray:
+    """
+    Mask of the lookback rows (dates, fund_codes, hashes) whose hash is not
+    the stored hash of their fund on that date. stored has date, fund_code,
+    row_hash and unhashed (row_hash was NULL) columns; rows not stored count
+    as drifted.
+    """
+    key = ['date', 'fund_code']
+    known = stored.loc[stored['unhashed'] == 0].drop_duplicates(key)[key + [ROW_HASH_COLUMN]]
+    incoming = pd.DataFrame({'date': dates, 'fund_code': fund_codes, ROW_HASH_COLUMN: hashes})
+    same = incoming.merge(known, on=key + [ROW_HASH_COLUMN], how='left', indicator=True)['_merge'] == 'both'
+    return ~same.to_numpy()
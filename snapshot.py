@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Read Snapshots
+Publishes a consistent, read-only copy of the database for the dashboard.
+After each committed load or validation the pipeline copies the live
+database with SQLite's online backup API (one step, so the copy is a single
+committed state even while the ETL keeps writing), switches the copy out of
+WAL mode, makes it read-only and renames it over the previous snapshot.
+
+The UI opens the snapshot immutable through db_connection, so its queries
+take no locks on the file the ETL writes, never see a half-applied lookback
+update, and pick up the next snapshot once it has been swapped in. Archived
+month partitions are read-only already and are attached from the snapshot by
+the same registry paths.
+
+Usage: python snapshot.py [--db /data/fund_data.db] [--out /data/snapshots/fund_data.db]
+"""
+
+import argparse
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CREATE_SNAPSHOT_INFO_SQL = """
+CREATE TABLE snapshot_info (
+    published_at TIMESTAMP,
+    source_path TEXT,
+    backup_ms REAL
+)
+"""
+
+
+def publish_snapshot(db_path: str, snapshot_path: str) -> Dict[str, Any]:
+    """
+    Back up db_path into a read-only file and atomically replace
+    snapshot_path with it. Returns the published path, size and timings.
+    """
+    started = time.perf_counter()
+    snapshot_path = Path(snapshot_path)
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = snapshot_path.with_name(f".{snapshot_path.name}.{os.getpid()}.tmp")
+    if tmp_path.exists():
+        tmp_path.unlink()
+
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(tmp_path)
+    try:
+        # pages=-1 copies everything in one step from one read transaction
+        source.backup(target, pages=-1)
+        backup_ms = (time.perf_counter() - started) * 1000
+        # A rollback-journal file needs no -wal/-shm next to it to be read
+        target.execute("PRAGMA journal_mode = DELETE")
+        target.execute("DROP TABLE IF EXISTS snapshot_info")
+        target.execute(CREATE_SNAPSHOT_INFO_SQL)
+        published_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        target.execute("INSERT INTO snapshot_info VALUES (?, ?, ?)",
+                       (published_at, os.path.abspath(db_path), round(backup_ms, 1)))
+        target.commit()
+    except Exception:
+        target.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    finally:
+        source.close()
+    target.close()
+
+    os.chmod(tmp_path, 0o444)
+    # Readers keep the file they opened; new connections get this one
+    os.replace(tmp_path, snapshot_path)
+    result = {'path': str(snapshot_path), 'bytes': snapshot_path.stat().st_size, 'published_at': published_at,
+              'backup_ms': round(backup_ms, 1), 'duration_ms': round((time.perf_counter() - started) * 1000, 1)}
+    logger.info(f"Published snapshot {snapshot_path} ({result['bytes']:,} bytes) in {result['duration_ms']:.0f} ms")
+    return result
+
+
+def snapshot_info(conn) -> Optional[Dict[str, Any]]:
+    """When and from where the connected snapshot was published; None for a live database"""
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'snapshot_info'").fetchone() is None:
+        return None
+    published_at, source_path, backup_ms = conn.execute(
+        "SELECT published_at, source_path, backup_ms FROM snapshot_info").fetchone()
+    return {'published_at': published_at, 'source_path': source_path, 'backup_ms': backup_ms}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Publish a read-only snapshot of the database')
+    parser.add_argument('--db', default='/data/fund_data.db', help='Live SQLite database')
+    parser.add_argument('--out', default='/data/snapshots/fund_data.db', help='Snapshot file')
+    args = parser.parse_args()
+
+    result = publish_snapshot(args.db, args.out)
+    print(f"Published {result['path']} ({result['bytes']:,} bytes) in {result['duration_ms']:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Bulk Loader Tests
+Tests the ON CONFLICT upsert loader and the row counts it reports
+"""
+
+import unittest
+import sqlite3
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from test_framework import ETLTestCase
+from fund_etl_pipeline import FundDataETL
+from bulk_loader import typed_rows, upsert_frame
+from test_streaming_ingest import StreamingTestMixin
+
+
+class TestSliceUpsert(ETLTestCase):
+    """Test upsert counts against a stored slice"""
+
+    def setUp(self):
+        super().setUp()
+        self.etl = FundDataETL(self.create_test_config())
+        self.etl.setup_database()
+        self.conn = sqlite3.connect(self.etl.db_path)
+
+    def tearDown(self):
+        self.conn.close()
+        super().tearDown()
+
+    def frame(self, codes, assets):
+        return pd.DataFrame({
+            'date': '2024-01-16',
+            'region': 'AMRS',
+            'fund_code': codes,
+            'fund_name': [f'Fund {code}' for code in codes],
+            'share_class_assets': assets
+        })
+
+    def test_reload_counts(self):
+        """Test inserted, updated, unchanged and deleted rows on a reload of the same slice"""
+        cursor = self.conn.cursor()
+        first = upsert_frame(cursor, self.frame(['A', 'B', 'C', 'D'], [1.0, 2.0, np.nan, 4.0]), 'AMRS')
+        same = upsert_frame(cursor, self.frame(['A', 'B', 'C', 'D'], [1.0, 2.0, np.nan, 4.0]), 'AMRS')
+        # B changes, D drops out, E is new
+        reload = upsert_frame(cursor, self.frame(['A', 'B', 'C', 'E'], [1.0, 2.5, np.nan, 5.0]), 'AMRS')
+        self.conn.commit()
+
+        self.assertEqual(first, {'inserted': 4, 'updated': 0, 'unchanged': 0, 'deleted': 0})
+        self.assertEqual(same, {'inserted': 0, 'updated': 0, 'unchanged': 4, 'deleted': 0})
+        self.assertEqual(reload, {'inserted': 1, 'updated': 1, 'unchanged': 2, 'deleted': 1})
+        self.assertEqual(cursor.execute("SELECT fund_code, share_class_assets FROM fund_data "
+                                        "ORDER BY fund_code").fetchall(),
+                         [('A', 1.0), ('B', 2.5), ('C', None), ('E', 5.0)])
+
+    def test_cleared_hash_is_not_a_change(self):
+        """Test identical rows whose row_hash a correction cleared reload as unchanged"""
+        cursor = self.conn.cursor()
+        upsert_frame(cursor, self.frame(['A', 'B'], [1.0, 2.0]), 'AMRS')
+        cursor.execute("UPDATE fund_data SET row_hash = NULL WHERE fund_code = 'A'")
+
+        same = upsert_frame(cursor, self.frame(['A', 'B'], [1.0, 2.0]), 'AMRS')
+
+        self.assertEqual(same, {'inserted': 0, 'updated': 0, 'unchanged': 2, 'deleted': 0})
+
+    def test_typed_rows(self):
+        """Test rows are plain Python values with None for missing values"""
+        df = pd.DataFrame({'fund_code': pd.Categorical(['A', None]), 'wam': [1.5, np.nan],
+                           'count': np.array([3, 4], dtype='int64')})
+
+        rows = typed_rows(df, ['fund_code', 'wam', 'count'])
+
+        self.assertEqual(rows, [('A', 1.5, 3), (None, None, 4)])
+        self.assertIs(type(rows[0][2]), int)
+
+
+class TestLoadCounts(StreamingTestMixin, ETLTestCase):
+    """Test ingest and lookback loads record their upsert counts"""
+
+    def setUp(self):
+        super().setUp()
+        self.etl = FundDataETL(self.create_test_config())
+        self.etl.setup_database()
+
+    def last_counts(self):
+        conn = sqlite3.connect(self.etl.db_path)
+        row = conn.execute("SELECT rows_inserted, rows_updated, rows_unchanged, rows_deleted FROM etl_log "
+                           "WHERE status = 'SUCCESS' ORDER BY id DESC LIMIT 1").fetchone()
+        conn.close()
+        return row
+
+    def test_friday_reload_logged(self):
+        """Test a Friday reload counts the stored Friday rows and logs them in etl_log"""
+        first = self.write_datadump('first.xlsx', ['FUND001', 'FUND002'], date='2024-01-12')
+        second = self.write_datadump('second.xlsx', ['FUND001', 'FUND003'], date='2024-01-12')
+
+        self.etl.ingest_file(first, 'AMRS', datetime(2024, 1, 12))
+        self.assertEqual(self.last_counts(), (2, 0, 0, 0))
+
+        self.etl.ingest_file(second, 'AMRS', datetime(2024, 1, 12))
+        # FUND001 is unchanged and FUND003 replaces FUND002; the weekend is aliased, not rewritten
+        self.assertEqual(self.last_counts(), (1, 0, 1, 1))
+        self.assertEqual(self.get_record_count('fund_data', "fund_code = 'FUND002'"), 0)
+
+    def test_full_lookback_update_counts(self):
+        """Test full mode upserts lookback rows and reports the counts"""
+        conn = sqlite3.connect(self.etl.db_path)
+        self.insert_test_data(conn, 'AMRS', '2024-01-15', 3)
+        conn.close()
+
+        lookback_df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-15', '2024-01-15', '2024-01-15']),
+            'Fund Code': ['TEST0000', 'TEST0001', 'NEW0001'],
+            'Fund Name': ['Test Fund 0', 'Renamed Fund', 'New Fund'],
+            'Share Class Assets (dly/$mils)': [1000000.0, 1100000.0, 5.0]
+        })
+        results = self.etl.validate_against_lookback('AMRS', lookback_df)
+
+        result = self.etl.update_from_lookback('AMRS', lookback_df, results, update_mode='full')
+
+        # TEST0000 matches, TEST0001 is renamed, NEW0001 is new and TEST0002 is gone
+        self.assertEqual({name: result[name] for name in ('inserted', 'updated', 'unchanged', 'deleted')},
+                         {'inserted': 1, 'updated': 1, 'unchanged': 1, 'deleted': 1})
+        self.assertEqual(self.get_record_count('fund_data', "date = '2024-01-15'"), 3)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Business Calendar Tests
+Tests the precomputed business-day mask, its disk cache and the pipeline hooks
+"""
+
+import unittest
+import numpy as np
+import holidays
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from test_framework import ETLTestCase
+from fund_etl_pipeline import FundDataETL
+from business_calendar import BusinessCalendar
+
+
+class TestBusinessCalendar(ETLTestCase):
+    """Test calendar lookups and caching"""
+
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = self.data_dir / 'cache' / 'calendar_test'
+        self.calendar = BusinessCalendar('US', cache_dir=self.cache_dir)
+
+    def test_range_matches_day_by_day_walk(self):
+        """Test a multi-year range equals the weekday/holiday check done one day at a time"""
+        us_holidays = holidays.US(years=range(2020, 2030))
+        expected, day = [], date(2021, 6, 1)
+        while day <= date(2025, 12, 31):
+            if day.weekday() < 5 and day not in us_holidays:
+                expected.append(day)
+            day += timedelta(days=1)
+
+        business_days = self.calendar.business_days('2021-06-01', '2025-12-31')
+
+        self.assertEqual(business_days.tolist(), expected)
+        self.assertEqual(self.calendar.count_business_days('2021-06-01', '2025-12-31'), len(expected))
+
+    def test_prior_and_next_skip_holiday_weekend(self):
+        """Test MLK weekend 2024 is skipped in both directions, keeping the input type"""
+        self.assertEqual(self.calendar.prior_business_day(datetime(2024, 1, 16, 6, 0)),
+                         datetime(2024, 1, 12, 6, 0))
+        self.assertEqual(self.calendar.next_business_day(date(2024, 1, 12)), date(2024, 1, 16))
+        self.assertEqual(self.calendar.prior_business_day('2024-01-16'), np.datetime64('2024-01-12'))
+
+    def test_mask_served_from_disk_cache(self):
+        """Test a second calendar loads the cached mask without rebuilding holidays"""
+        with patch.object(BusinessCalendar, '_build_holidays', side_effect=AssertionError('rebuilt')):
+            cached = BusinessCalendar('US', cache_dir=self.cache_dir)
+
+        np.testing.assert_array_equal(cached.mask, self.calendar.mask)
+        self.assertFalse(cached.is_business_day(date(2025, 7, 4)))
+
+    def test_holidays_upgrade_rebuilds_cache(self):
+        """Test a cached mask is not served to a different holidays package version"""
+        with patch('business_calendar._holidays_version', return_value='0.0.0'), \
+                patch.object(BusinessCalendar, '_build_holidays', wraps=self.calendar._build_holidays) as build:
+            BusinessCalendar('US', cache_dir=self.cache_dir)
+
+        build.assert_called_once()
+
+    def test_dates_outside_span_widen_calendar(self):
+        """Test a lookup past the cached years extends the calendar"""
+        # Christmas 2032 falls on a Saturday and is observed on Friday the 24th
+        self.assertFalse(self.calendar.is_business_day(date(2032, 12, 24)))
+        self.assertEqual(self.calendar.last_year, 2032)
+
+
+class TestPipelineCalendar(ETLTestCase):
+    """Test FundDataETL business-day helpers use the regional calendars"""
+
+    def test_region_calendars_from_config(self):
+        """Test each configured region gets a calendar and run dates use AMRS"""
+        etl = FundDataETL(self.create_test_config({'calendar': {'regions': {'AMRS': 'US', 'EMEA': 'GB'}}}))
+
+        # Boxing Day is a UK holiday but a US business day
+        self.assertTrue(etl.is_business_day(datetime(2024, 12, 26)))
+        self.assertFalse(etl.is_business_day(datetime(2024, 12, 26), region='EMEA'))
+        self.assertEqual(etl.get_prior_business_day(datetime(2024, 12, 27), region='EMEA'),
+                         datetime(2024, 12, 24))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Columnar Mirror Tests
+Tests the Parquet mirror written after loads and the history/export reads served from it
+"""
+
+import shutil
+import unittest
+import sqlite3
+import pandas as pd
+from datetime import datetime
+
+from test_framework import ETLTestCase
+from fund_etl_pipeline import FundDataETL
+from fund_etl_utilities import FundDataQuery
+from columnar_mirror import ColumnarMirror, parquet_available
+from daily_summary import rebuild
+from test_streaming_ingest import StreamingTestMixin
+
+
+@unittest.skipUnless(parquet_available(), "pyarrow or fastparquet is required")
+class TestColumnarMirror(StreamingTestMixin, ETLTestCase):
+    """Test the mirror follows fund_data and answers like SQLite"""
+
+    def setUp(self):
+        super().setUp()
+        self.mirror_dir = self.data_dir / 'columnar'
+        shutil.rmtree(self.mirror_dir, ignore_errors=True)
+        self.etl = FundDataETL(self.create_test_config({
+            'columnar_mirror': {'enabled': True, 'dir': str(self.mirror_dir)}
+        }))
+        self.etl.setup_database()
+
+    def load(self, date, fund_codes=('FUND001', 'FUND002')):
+        filepath = self.write_datadump(f'{date}.xlsx', list(fund_codes), date=date)
+        self.etl.ingest_file(filepath, 'AMRS', datetime.strptime(date, '%Y-%m-%d'))
+
+    def test_load_writes_region_month_files(self):
+        """Test loads land in their region/month file without weekend copies"""
+        self.load('2024-01-12')
+        self.load('2024-01-15', ['FUND001'])
+
+        files = sorted(p.relative_to(self.mirror_dir).as_posix() for p in self.mirror_dir.rglob('*.parquet'))
+        self.assertEqual(files, ['region=AMRS/month=2024-01/part.parquet'])
+        df = pd.read_parquet(self.mirror_dir / files[0])
+        self.assertEqual(df[['fund_code', 'date']].values.tolist(),
+                         [['FUND001', '2024-01-12'], ['FUND001', '2024-01-15'], ['FUND002', '2024-01-12']])
+
+    def test_history_matches_sqlite(self):
+        """Test range history from the mirror equals the SQLite history, weekend dates included"""
+        self.load('2024-01-12')
+        self.load('2024-01-15', ['FUND001'])
+        self.etl.carry_forward_data(datetime(2024, 1, 16), 'AMRS')
+        columns = ['date', 'fund_code', 'share_class_assets', 'one_day_yield']
+
+        from_sql = FundDataQuery(self.etl.db_path).get_history('2024-01-13', '2024-01-16', columns)
+        from_mirror = FundDataQuery(self.etl.db_path, str(self.mirror_dir)).get_history(
+            '2024-01-13', '2024-01-16', columns)
+
+        self.assertEqual(from_mirror['date'].dt.strftime('%Y-%m-%d').tolist(),
+                         ['2024-01-13', '2024-01-13', '2024-01-14', '2024-01-14', '2024-01-15', '2024-01-16'])
+        pd.testing.assert_frame_equal(from_mirror, from_sql)
+
+    def test_reload_and_lookback_rewrite_files(self):
+        """Test a reload drops removed funds and a lookback correction shows up in the mirror"""
+        self.load('2024-01-12', ['FUND001', 'FUND002', 'FUND003'])
+        self.load('2024-01-12', ['FUND001', 'FUND002'])
+        self.etl.update_from_lookback('AMRS', pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-12']),
+            'Fund Code': ['FUND001'],
+            'Share Class Assets (dly/$mils)': [50.0]
+        }), {'changed_records': [{'fund_code': 'FUND001', 'date': '2024-01-12', 'type': 'value_change'}]})
+
+        conn = sqlite3.connect(self.etl.db_path)
+        df = ColumnarMirror(self.mirror_dir).read(conn, '2024-01-12', '2024-01-12',
+                                                  ['fund_code', 'share_class_assets'])
+        conn.close()
+        self.assertEqual(df.values.tolist(), [['FUND001', 50.0], ['FUND002', 101.0]])
+
+    def test_stale_mirror_falls_back_to_sqlite(self):
+        """Test a load the mirror missed makes it stale, and history is read from SQLite"""
+        self.load('2024-01-12')
+        self.load('2024-01-16')
+        self.etl.columnar_mirror.enabled = False
+        self.load('2024-01-16', ['FUND001', 'FUND002', 'FUND003'])
+
+        conn = sqlite3.connect(self.etl.db_path)
+        mirror = ColumnarMirror(self.mirror_dir)
+        self.assertTrue(mirror.is_fresh(conn, '2024-01-01', '2024-01-15'))
+        self.assertFalse(mirror.is_fresh(conn, '2024-01-01', '2024-01-31'))
+        conn.close()
+
+        history = FundDataQuery(self.etl.db_path, str(self.mirror_dir)).get_history('2024-01-16', '2024-01-16')
+        self.assertEqual(history['fund_code'].tolist(), ['FUND001', 'FUND002', 'FUND003'])
+
+    def test_rebuild_and_export(self):
+        """Test rebuilding a mirror for an existing database and exporting from it"""
+        conn = sqlite3.connect(self.etl.db_path)
+        self.insert_test_data(conn, 'EMEA', '2024-01-15', 3)
+        rebuild(conn.cursor())
+        conn.commit()
+        rows = ColumnarMirror(self.mirror_dir).rebuild(conn)
+        conn.close()
+        self.assertEqual(rows, 3)
+
+        output = self.test_data_dir / 'export.csv'
+        FundDataQuery(self.etl.db_path, str(self.mirror_dir)).export_range('2024-01-01', '2024-01-31',
+                                                                           str(output), 'EMEA')
+        self.assertEqual(len(pd.read_csv(output)), 3)
+
+
+class TestColumnarMirrorFallback(ETLTestCase):
+    """Test readers keep using SQLite without a written mirror"""
+
+    def test_unwritten_mirror_unavailable(self):
+        """Test a missing or disabled mirror is not offered to readers"""
+        self.assertFalse(ColumnarMirror(self.data_dir / 'missing').available())
+        self.assertFalse(ColumnarMirror(self.data_dir, enabled=False).available())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
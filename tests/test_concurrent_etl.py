@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Concurrent ETL Tests
+Tests the worker-pool run mode of run_daily_etl with its single SQLite writer
+"""
+
+import unittest
+import sqlite3
+from datetime import datetime
+from unittest.mock import patch
+
+from test_framework import ETLTestCase
+from fund_etl_pipeline import FundDataETL
+from test_streaming_ingest import StreamingTestMixin
+
+
+class TestConcurrentRun(StreamingTestMixin, ETLTestCase):
+    """Test run_daily_etl with concurrency enabled"""
+
+    def setUp(self):
+        super().setUp()
+        self.run_date = datetime(2024, 1, 17)  # Wednesday -> data for Tuesday 2024-01-16
+        self.files = {
+            'AMRS': self.write_datadump('DataDump__AMRS_20240116.xlsx', ['FUND001', 'FUND002', 'FUND003']),
+            'EMEA': self.write_datadump('DataDump__EMEA_20240116.xlsx', ['FUND101', 'FUND102'])
+        }
+
+    def create_etl(self, validation: bool = False) -> FundDataETL:
+        etl = FundDataETL(self.create_test_config({
+            'sap_urls': {'amrs': 'http://sap/amrs', 'emea': 'http://sap/emea'},
+            'validation': {'enabled': validation},
+            'concurrency': {'enabled': True, 'process_workers': 2}
+        }))
+        etl.setup_database()
+        return etl
+
+    def fake_download(self, url, region, date):
+        return self.files.get(region)
+
+    def get_status_by_region(self):
+        conn = sqlite3.connect(str(self.test_db))
+        rows = dict(conn.execute("SELECT region, status FROM etl_log ORDER BY id").fetchall())
+        conn.close()
+        return rows
+
+    def test_regions_loaded_concurrently(self):
+        """Test both regions are parsed in workers and written by the writer"""
+        etl = self.create_etl()
+
+        with patch.object(FundDataETL, 'download_file', side_effect=self.fake_download, autospec=False):
+            result = etl.run_daily_etl(self.run_date)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(self.get_record_count('fund_data', "region = 'AMRS' AND date = '2024-01-16'"), 3)
+        self.assertEqual(self.get_record_count('fund_data', "region = 'EMEA' AND date = '2024-01-16'"), 2)
+        self.assertEqual(self.get_status_by_region(), {'AMRS': 'SUCCESS', 'EMEA': 'SUCCESS'})
+
+    def test_failed_region_does_not_block_other(self):
+        """Test a download error is logged as FAILED while the other region still loads"""
+        etl = self.create_etl()
+
+        def download(url, region, date):
+            if region == 'EMEA':
+                raise RuntimeError("SAP unavailable")
+            return self.files[region]
+
+        with patch.object(FundDataETL, 'download_file', side_effect=download):
+            etl.run_daily_etl(self.run_date)
+
+        self.assertEqual(self.get_status_by_region(), {'AMRS': 'SUCCESS', 'EMEA': 'FAILED'})
+        self.assertEqual(self.get_record_count('fund_data', "region = 'EMEA'"), 0)
+
+    def test_repeat_run_skips_unchanged(self):
+        """Test the concurrent writer applies the unchanged-file short-circuit"""
+        etl = self.create_etl()
+
+        with patch.object(FundDataETL, 'download_file', side_effect=self.fake_download):
+            etl.run_daily_etl(self.run_date)
+            etl.run_daily_etl(self.run_date)
+
+        self.assertEqual(self.get_record_count('etl_log', "status = 'SKIPPED_UNCHANGED'"), 2)
+        self.assertEqual(self.get_record_count('fund_data'), 5)
+
+    def test_lookback_validated_after_daily_load(self):
+        """Test lookback validation runs in workers against the freshly written data"""
+        etl = self.create_etl(validation=True)
+
+        with patch.object(FundDataETL, 'download_file', side_effect=self.fake_download), \
+             patch.object(FundDataETL, 'download_lookback_path', side_effect=lambda region: self.files[region]):
+            result = etl.run_daily_etl(self.run_date)
+
+        self.assertTrue(result['success'])
+        self.assertNotIn('validation_alerts', result)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
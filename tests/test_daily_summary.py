@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Daily Summary Tests
+Tests the per (date, region) summary kept up to date by loads, carry-forward and lookback updates
+"""
+
+import unittest
+import sqlite3
+import pandas as pd
+from datetime import datetime
+
+from test_framework import ETLTestCase
+from fund_etl_pipeline import FundDataETL
+from daily_summary import rebuild, totals
+from test_streaming_ingest import StreamingTestMixin
+
+
+class TestDailySummary(StreamingTestMixin, ETLTestCase):
+    """Test daily_summary follows every write path"""
+
+    def setUp(self):
+        super().setUp()
+        self.etl = FundDataETL(self.create_test_config())
+        self.etl.setup_database()
+
+    def summary(self):
+        conn = sqlite3.connect(self.etl.db_path)
+        rows = conn.execute("SELECT date, region, source_date, row_count, unique_funds, pct_with_assets, "
+                            "total_assets FROM daily_summary ORDER BY region, date").fetchall()
+        conn.close()
+        return rows
+
+    def test_friday_load_summarized_for_weekend(self):
+        """Test a Friday ingest summarizes Friday and copies it to the aliased weekend"""
+        filepath = self.write_datadump('friday.xlsx', ['FUND001', 'FUND002'], date='2024-01-12')
+
+        self.etl.ingest_file(filepath, 'AMRS', datetime(2024, 1, 12))
+
+        self.assertEqual(self.summary(), [
+            ('2024-01-12', 'AMRS', None, 2, 2, 100.0, 201.0),
+            ('2024-01-13', 'AMRS', '2024-01-12', 2, 2, 100.0, 201.0),
+            ('2024-01-14', 'AMRS', '2024-01-12', 2, 2, 100.0, 201.0)
+        ])
+
+    def test_updates_match_rebuild(self):
+        """Test reload, carry-forward and lookback updates leave the same summary a rebuild gives"""
+        first = self.write_datadump('first.xlsx', ['FUND001', 'FUND002', 'FUND003'], date='2024-01-12')
+        second = self.write_datadump('second.xlsx', ['FUND001', 'FUND004'], date='2024-01-12')
+        self.etl.ingest_file(first, 'AMRS', datetime(2024, 1, 12))
+        self.etl.ingest_file(second, 'AMRS', datetime(2024, 1, 12))
+        self.etl.carry_forward_data(datetime(2024, 1, 15), 'AMRS')
+        lookback_df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-12']),
+            'Fund Code': ['FUND001'],
+            'Share Class Assets (dly/$mils)': [50.0]
+        })
+        self.etl.update_from_lookback('AMRS', lookback_df, {'changed_records': [
+            {'fund_code': 'FUND001', 'date': '2024-01-12', 'type': 'value_change'}]})
+        incremental = self.summary()
+
+        conn = sqlite3.connect(self.etl.db_path)
+        rebuild(conn.cursor())
+        conn.commit()
+        conn.close()
+
+        self.assertEqual(incremental, self.summary())
+        # FUND004 (101) plus the corrected FUND001, on Friday, the weekend and the carried-forward Monday
+        self.assertEqual([(row[0], row[3], row[6]) for row in incremental],
+                         [(date, 2, 151.0) for date in ('2024-01-12', '2024-01-13', '2024-01-14', '2024-01-15')])
+
+    def test_totals(self):
+        """Test whole-database figures are read from the summary"""
+        filepath = self.write_datadump('friday.xlsx', ['FUND001', 'FUND002'], date='2024-01-12')
+        self.etl.ingest_file(filepath, 'EMEA', datetime(2024, 1, 12))
+
+        conn = sqlite3.connect(self.etl.db_path)
+        result = totals(conn)
+        conn.close()
+
+        self.assertEqual(result, {'records': 6, 'stored_records': 2, 'unique_funds': 2,
+                                  'min_date': '2024-01-12', 'max_date': '2024-01-14',
+                                  'region_records': {'EMEA': 6}})
+
+    def test_removed_fund_leaves_registry(self):
+        """Test a fund whose last stored row is replaced away no longer counts as a fund"""
+        first = self.write_datadump('first.xlsx', ['FUND001', 'FUND002'], date='2024-01-16')
+        second = self.write_datadump('second.xlsx', ['FUND001'], date='2024-01-16')
+        self.etl.ingest_file(first, 'AMRS', datetime(2024, 1, 16))
+        self.etl.ingest_file(second, 'AMRS', datetime(2024, 1, 16))
+
+        conn = sqlite3.connect(self.etl.db_path)
+        result = totals(conn)
+        conn.close()
+
+        self.assertEqual(result['unique_funds'], 1)
+        self.assertEqual(self.get_record_count('fund_registry'), 1)
+
+    def test_existing_data_summarized_on_setup(self):
+        """Test setup builds the summary for a database created before it existed"""
+        conn = sqlite3.connect(self.etl.db_path)
+        self.insert_test_data(conn, 'AMRS', '2024-01-15', 4)
+        conn.execute("DROP TABLE daily_summary")
+        conn.commit()
+        conn.close()
+
+        self.etl.setup_database()
+
+        self.assertEqual([row[:5] for row in self.summary()], [('2024-01-15', 'AMRS', None, 4, 4)])
+        self.assertEqual(self.get_record_count('fund_registry'), 4)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -6,6 +6,7 @@ Tests database initialization, operations, and integrity
 
 import unittest
 import sqlite3
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -13,6 +14,7 @@ from test_framework import ETLTestCase
 from fund_etl_pipeline import FundDataETL
 from fund_etl_utilities import FundDataMonitor
 from workflow_db_tracker import DatabaseWorkflowTracker
+from db_connection import connect
 
 
 class TestDatabaseInitialization(ETLTestCase):
@@ -82,14 +84,18 @@ class TestDatabaseInitialization(ETLTestCase):
         
         # Check critical indices exist
         expected_indices = [
-            'idx_fund_data_region',
-            'idx_fund_data_date',
-            'idx_fund_data_fund_code'
+            'idx_fund_data_region_date',
+            'idx_fund_data_fund_code_date',
+            'idx_etl_log_region_file_date'
         ]
         
         for idx in expected_indices:
             self.assertIn(idx, indices, f"Index {idx} not found")
         
+        # Single-column indexes are prefixes of the composite ones
+        for idx in ['idx_fund_data_region', 'idx_fund_data_date', 'idx_fund_data_fund_code']:
+            self.assertNotIn(idx, indices)
+        
         conn.close()
 
 
@@ -415,5 +421,71 @@ class TestDataIntegrity(ETLTestCase):
         self.assertIsNone(row[2])
 
 
+class TestConnectionManager(ETLTestCase):
+    """Test pooled connections, pragmas and WAL reads"""
+    
+    def setUp(self):
+        super().setUp()
+        self.etl = FundDataETL(self.create_test_config({'database': {'cache_size_kb': 8192}}))
+        self.etl.setup_database()
+    
+    def test_pragmas_applied(self):
+        """Test new connections get WAL, synchronous=NORMAL, temp_store=MEMORY and configured cache"""
+        conn = connect(self.etl.db_path, self.etl.db_settings)
+        
+        pragmas = {name: conn.execute(f"PRAGMA {name}").fetchone()[0]
+                   for name in ('journal_mode', 'synchronous', 'temp_store', 'cache_size', 'busy_timeout')}
+        conn.close()
+        
+        self.assertEqual(pragmas, {'journal_mode': 'wal', 'synchronous': 1, 'temp_store': 2,
+                                   'cache_size': -8192, 'busy_timeout': 30000})
+    
+    def test_connections_pooled_per_thread(self):
+        """Test close() returns a connection for reuse by the same thread only"""
+        first = connect(self.etl.db_path)
+        first.close()
+        second = connect(self.etl.db_path)
+        nested = connect(self.etl.db_path)
+        
+        other = []
+        thread = threading.Thread(target=lambda: other.append(connect(self.etl.db_path)))
+        thread.start()
+        thread.join()
+        
+        self.assertIs(second, first)
+        self.assertIsNot(nested, first)
+        self.assertIsNot(other[0], first)
+        second.close()
+        nested.close()
+    
+    def test_released_connection_rolls_back(self):
+        """Test uncommitted work is discarded when a connection goes back to the pool"""
+        conn = connect(self.etl.db_path)
+        self.insert_test_data(conn, 'AMRS', '2024-01-15', 2)
+        conn.execute("DELETE FROM fund_data")
+        conn.close()
+        
+        self.assertEqual(self.get_record_count('fund_data'), 2)
+        self.assertFalse(connect(self.etl.db_path).in_transaction)
+    
+    def test_reader_not_blocked_by_open_write(self):
+        """Test a reader sees the last committed data while a load transaction is open"""
+        writer = connect(self.etl.db_path)
+        self.insert_test_data(writer, 'AMRS', '2024-01-15', 3)
+        writer.execute("BEGIN IMMEDIATE")
+        writer.execute("DELETE FROM fund_data")
+        
+        counts = []
+        reader = threading.Thread(target=lambda: counts.append(
+            connect(self.etl.db_path, {'busy_timeout_ms': 100}).execute(
+                "SELECT COUNT(*) FROM fund_data").fetchone()[0]))
+        reader.start()
+        reader.join()
+        writer.commit()
+        writer.close()
+        
+        self.assertEqual(counts, [3])
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Date Alias Tests
+Tests weekend and carry-forward dates resolving through date_alias
+"""
+
+import unittest
+import sqlite3
+import pandas as pd
+from datetime import datetime
+
+from test_framework import ETLTestCase
+from fund_etl_pipeline import FundDataETL
+from test_streaming_ingest import StreamingTestMixin
+
+
+class TestDateAlias(StreamingTestMixin, ETLTestCase):
+    """Test aliased dates are resolved instead of stored"""
+
+    def setUp(self):
+        super().setUp()
+        self.etl = FundDataETL(self.create_test_config())
+        self.etl.setup_database()
+
+    def resolved(self, region: str, date: str):
+        conn = sqlite3.connect(self.etl.db_path)
+        rows = conn.execute("SELECT fund_code, share_class_assets FROM fund_data_resolved "
+                            "WHERE region = ? AND date = ? ORDER BY fund_code", (region, date)).fetchall()
+        conn.close()
+        return rows
+
+    def test_carry_forward_creates_alias(self):
+        """Test a carried-forward date resolves to its source without copied rows"""
+        conn = sqlite3.connect(self.etl.db_path)
+        self.insert_test_data(conn, 'AMRS', '2024-01-12', 3)
+        conn.close()
+
+        self.etl.carry_forward_data(datetime(2024, 1, 15), 'AMRS')
+
+        self.assertEqual(self.get_record_count('fund_data', "date = '2024-01-15'"), 0)
+        self.assertEqual(self.get_record_count('date_alias', "date = '2024-01-15' AND source_date = '2024-01-12'"), 1)
+        self.assertEqual(self.resolved('AMRS', '2024-01-15'), self.resolved('AMRS', '2024-01-12'))
+        self.assertEqual(self.get_record_count('etl_log', "status = 'CARRIED_FORWARD' AND records_processed = 3"), 1)
+
+    def test_friday_correction_visible_on_weekend(self):
+        """Test one selective update of Friday's row is what Saturday and Sunday show"""
+        filepath = self.write_datadump('friday.xlsx', ['FUND001', 'FUND002'], date='2024-01-12')
+        self.etl.ingest_file(filepath, 'AMRS', datetime(2024, 1, 12))
+        lookback_df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-12']),
+            'Fund Code': ['FUND001'],
+            'Share Class Assets (dly/$mils)': [555.0]
+        })
+
+        self.etl.update_from_lookback('AMRS', lookback_df, {'changed_records': [
+            {'fund_code': 'FUND001', 'date': '2024-01-12', 'type': 'value_change'}]})
+
+        for date in ('2024-01-12', '2024-01-13', '2024-01-14'):
+            self.assertEqual(self.resolved('AMRS', date)[0], ('FUND001', 555.0))
+        self.assertEqual(self.get_record_count('fund_data'), 2)
+
+    def test_correction_to_carried_forward_date(self):
+        """Test correcting a carried-forward date stores that date and leaves its source alone"""
+        conn = sqlite3.connect(self.etl.db_path)
+        self.insert_test_data(conn, 'AMRS', '2024-01-12', 2)
+        conn.close()
+        self.etl.carry_forward_data(datetime(2024, 1, 15), 'AMRS')
+        lookback_df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-15']),
+            'Fund Code': ['TEST0000'],
+            'Share Class Assets (dly/$mils)': [7.0]
+        })
+
+        self.etl.update_from_lookback('AMRS', lookback_df, {'changed_records': [
+            {'fund_code': 'TEST0000', 'date': '2024-01-15', 'type': 'value_change'}]})
+
+        self.assertEqual(self.resolved('AMRS', '2024-01-15')[0], ('TEST0000', 7.0))
+        self.assertEqual(self.resolved('AMRS', '2024-01-12')[0], ('TEST0000', 1000000.0))
+        self.assertEqual(self.get_record_count('date_alias'), 0)
+
+    def test_business_day_load_replaces_alias(self):
+        """Test loading a file for a carried-forward date makes it a stored date again"""
+        first = self.write_datadump('first.xlsx', ['FUND001'], date='2024-01-12')
+        self.etl.ingest_file(first, 'AMRS', datetime(2024, 1, 12))
+        self.etl.carry_forward_data(datetime(2024, 1, 15), 'AMRS')
+
+        late = self.write_datadump('late.xlsx', ['FUND009'], date='2024-01-15')
+        self.etl.ingest_file(late, 'AMRS', datetime(2024, 1, 15))
+
+        self.assertEqual(self.get_record_count('date_alias', "date = '2024-01-15'"), 0)
+        self.assertEqual([code for code, _ in self.resolved('AMRS', '2024-01-15')], ['FUND009'])
+
+    def test_existing_copies_virtualized(self):
+        """Test setup turns weekend copies in an older database into aliases"""
+        conn = sqlite3.connect(self.etl.db_path)
+        for date in ('2024-01-12', '2024-01-13', '2024-01-14'):
+            self.insert_test_data(conn, 'EMEA', date, 3)
+        # A weekend date that differs from Friday stays stored
+        self.insert_test_data(conn, 'AMRS', '2024-01-12', 3)
+        self.insert_test_data(conn, 'AMRS', '2024-01-13', 2)
+        conn.execute("DROP TABLE date_alias")
+        conn.commit()
+        conn.close()
+
+        self.etl.setup_database()
+
+        self.assertEqual(self.get_record_count('fund_data', "region = 'EMEA'"), 3)
+        self.assertEqual(self.get_record_count('date_alias'), 2)
+        self.assertEqual(self.get_record_count('fund_data_resolved', "region = 'EMEA'"), 9)
+        self.assertEqual(self.get_record_count('fund_data', "region = 'AMRS'"), 5)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
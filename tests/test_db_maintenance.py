@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Database Maintenance Tests
+Tests the post-load and weekly maintenance runs and the log the dashboard reads
+"""
+
+import unittest
+import sqlite3
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from test_framework import ETLTestCase
+from fund_etl_pipeline import FundDataETL
+from db_connection import close_all
+from db_maintenance import recent_runs, run_maintenance, weekly_due
+
+
+class TestDatabaseMaintenance(ETLTestCase):
+    """Test maintenance steps are run, measured and logged"""
+
+    def setUp(self):
+        super().setUp()
+        self.etl = FundDataETL(self.create_test_config())
+        self.etl.setup_database()
+
+    def test_new_database_reclaims_deleted_pages(self):
+        """Test a new database uses incremental vacuum and post-load maintenance shrinks it"""
+        conn = sqlite3.connect(self.etl.db_path)
+        self.assertEqual(conn.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+        self.insert_test_data(conn, 'AMRS', '2024-01-15', 2000)
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("DELETE FROM fund_data")
+        conn.commit()
+        conn.close()
+
+        steps = run_maintenance(self.etl.db_path)
+
+        self.assertEqual([(step['step'], step['status']) for step in steps], [
+            ('optimize', 'OK'), ('incremental_vacuum', 'OK'), ('checkpoint', 'OK'), ('integrity_check', 'OK')
+        ])
+        vacuum = steps[1]
+        self.assertGreater(vacuum['free_pages_before'], 0)
+        self.assertEqual(vacuum['free_pages_after'], 0)
+        self.assertLess(steps[2]['db_bytes_after'], steps[0]['db_bytes_before'] / 2)
+        self.assertEqual(self.get_record_count('maintenance_log', "trigger = 'post_load'"), 4)
+
+    def test_weekly_run_converts_existing_database(self):
+        """Test the weekly run switches an old database to incremental vacuum and resets the due date"""
+        legacy = self.data_dir / 'legacy.db'
+        if legacy.exists():
+            legacy.unlink()
+        conn = sqlite3.connect(legacy)
+        conn.execute("CREATE TABLE t (x)")
+        conn.commit()
+        conn.close()
+        self.assertTrue(weekly_due(str(legacy)))
+
+        steps = run_maintenance(str(legacy), weekly=True)
+
+        self.assertEqual([step['step'] for step in steps], ['analyze', 'incremental_vacuum', 'checkpoint',
+                                                            'integrity_check'])
+        self.assertIn('converted', steps[1]['detail'])
+        conn = sqlite3.connect(legacy)
+        self.assertEqual(conn.execute("PRAGMA auto_vacuum").fetchone()[0], 2)
+        runs = recent_runs(conn)
+        conn.close()
+        self.assertEqual([(run['trigger'], run['failed']) for run in runs], [('weekly', False)])
+        self.assertFalse(weekly_due(str(legacy)))
+        self.assertTrue(weekly_due(str(legacy), now=datetime.now() + timedelta(days=7)))
+        close_all(str(legacy))
+
+    def test_maintenance_api(self):
+        """Test the dashboard API lists runs with their failed steps"""
+        run_maintenance(self.etl.db_path)
+        with patch('db_maintenance._integrity', lambda full: lambda conn: ('FAILED', 'page 7 is never used')):
+            run_maintenance(self.etl.db_path, trigger='manual')
+
+        from fund_etl_ui import app
+        with patch('fund_etl_ui.DB_PATH', self.etl.db_path):
+            runs = app.test_client().get('/api/maintenance').get_json()
+
+        self.assertEqual(sorted((run['trigger'], run['failed']) for run in runs),
+                         [('manual', True), ('post_load', False)])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
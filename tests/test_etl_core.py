@@ -452,6 +452,7 @@ class TestETLMonitoring(ETLTestCase):
         emea_row = status_df[status_df['region'] == 'EMEA'].iloc[0]
         self.assertEqual(emea_row['status'], 'FAILED')
         self.assertEqual(emea_row['issues'], 'Connection timeout')
+        self.assertIsInstance(status_df['status'].dtype, pd.CategoricalDtype)
     
     def test_missing_dates_detection(self):
         """Test detection of missing data dates"""
@@ -62,9 +62,12 @@ class ETLTestCase(unittest.TestCase):
     
     def setUp(self):
         """Set up for each test"""
-        # Create fresh database for each test
-        if self.test_db.exists():
-            self.test_db.unlink()
+        # Create fresh database for each test (pooled connections and WAL files included)
+        from db_connection import close_all
+        close_all(self.test_db)
+        for path in (self.test_db, Path(f"{self.test_db}-wal"), Path(f"{self.test_db}-shm")):
+            if path.exists():
+                path.unlink()
         
         # Clear logs
         for log_file in self.logs_dir.glob('*.log'):
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Load Quality Tests
+Tests the single-pass quality profiler and the load_quality table it persists
+"""
+
+import unittest
+import sqlite3
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from test_framework import ETLTestCase
+from fund_etl_pipeline import FundDataETL
+from fund_etl_utilities import FundDataMonitor
+from load_quality import profile_frame, merge_profiles, read_profile
+from test_streaming_ingest import StreamingTestMixin
+
+
+class TestProfileFrame(ETLTestCase):
+    """Test the profiler counts against the per-metric scans it replaces"""
+
+    def test_counts_match_separate_scans(self):
+        """Test empty rows, null counts and duplicate codes from one pass"""
+        df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-16', '2024-01-16', None, '2024-01-15']),
+            'Fund Code': ['FUND001', 'FUND001', None, 'FUND002'],
+            'NASDAQ': [None, 'ABCDX', None, None],
+            'Share Class Assets (dly/$mils)': [1.0, np.nan, np.nan, 3.0]
+        })
+
+        profile = profile_frame(df)
+        non_empty = df.dropna(how='all')
+
+        self.assertEqual(profile['empty_rows'], 1)
+        self.assertEqual(profile['rows'], len(non_empty))
+        self.assertEqual(profile['null_counts'], non_empty.isna().sum().to_dict())
+        self.assertEqual(profile['fund_code_counts'].to_dict(), {'FUND001': 2, 'FUND002': 1})
+        self.assertEqual(profile['min_date'], pd.Timestamp('2024-01-15'))
+
+    def test_chunk_profiles_merge_to_whole_frame(self):
+        """Test merged chunk profiles equal the profile of the whole frame"""
+        df = pd.DataFrame({
+            'Fund Code': ['A', 'B', 'A', None],
+            'WAM (dly)': [1.0, np.nan, np.nan, np.nan]
+        })
+
+        merged = merge_profiles(profile_frame(df.iloc[:2]), profile_frame(df.iloc[2:]))
+        whole = profile_frame(df)
+
+        self.assertEqual(merged['null_counts'], whole['null_counts'])
+        self.assertEqual((merged['rows'], merged['empty_rows']), (whole['rows'], whole['empty_rows']))
+        self.assertEqual(merged['fund_code_counts'].to_dict(), whole['fund_code_counts'].to_dict())
+
+
+class TestLoadQualityTable(StreamingTestMixin, ETLTestCase):
+    """Test profiles persisted per (date, region) and read back by reports"""
+
+    def setUp(self):
+        super().setUp()
+        self.etl = FundDataETL(self.create_test_config())
+        self.etl.setup_database()
+
+    def read_stored(self, region: str, date: str):
+        conn = sqlite3.connect(self.etl.db_path)
+        row = conn.execute("SELECT records, pct_with_assets, pct_with_portfolio_assets, unique_funds "
+                           "FROM load_quality WHERE region = ? AND date = ?", (region, date)).fetchone()
+        conn.close()
+        return row
+
+    def test_friday_load_profiled_for_each_date(self):
+        """Test an ingest stores its profile under every date the file was loaded for"""
+        filepath = self.write_datadump('friday.xlsx', ['FUND001', 'FUND002'], date='2024-01-12')
+
+        is_valid, _ = self.etl.ingest_file(filepath, 'AMRS', datetime(2024, 1, 12))
+
+        self.assertTrue(is_valid)
+        self.assertEqual(self.get_record_count('load_quality'), 3)
+        # Portfolio Assets is '-' throughout the test workbook
+        self.assertEqual(self.read_stored('AMRS', '2024-01-14'), (2, 100.0, 0.0, 2))
+
+    def test_reports_read_stored_profile(self):
+        """Test check_data_completeness uses the stored numbers rather than fund_data"""
+        filepath = self.write_datadump('daily.xlsx', ['FUND001', 'FUND002'])
+        self.etl.ingest_file(filepath, 'AMRS', datetime(2024, 1, 16))
+
+        conn = sqlite3.connect(self.etl.db_path)
+        conn.execute("UPDATE load_quality SET pct_with_wam = 42.0")
+        conn.commit()
+        conn.close()
+
+        completeness = FundDataMonitor(self.etl.db_path).check_data_completeness('2024-01-16')
+
+        self.assertEqual(completeness['AMRS'].iloc[0]['pct_with_wam'], 42.0)
+        self.assertEqual(completeness['AMRS'].iloc[0]['total_records'], 2)
+        self.assertEqual(completeness['EMEA'].iloc[0]['total_records'], 0)
+
+    def test_unprofiled_slice_profiled_from_fund_data(self):
+        """Test rows written without a profile are profiled on read"""
+        conn = sqlite3.connect(self.etl.db_path)
+        self.insert_test_data(conn, 'EMEA', '2024-01-16', 4)
+
+        profile = read_profile(conn, 'EMEA', '2024-01-16')
+        conn.close()
+
+        self.assertEqual(profile['records'], 4)
+        self.assertEqual(profile['unique_funds'], 4)
+
+    def test_carry_forward_copies_profile(self):
+        """Test a carried-forward date gets the profile of its source date"""
+        filepath = self.write_datadump('daily.xlsx', ['FUND001', 'FUND002', 'FUND003'])
+        self.etl.ingest_file(filepath, 'AMRS', datetime(2024, 1, 16))
+
+        self.etl.carry_forward_data(datetime(2024, 1, 17), 'AMRS')
+
+        self.assertEqual(self.read_stored('AMRS', '2024-01-17'), self.read_stored('AMRS', '2024-01-16'))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
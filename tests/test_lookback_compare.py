@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Lookback Comparison Tests
+Tests the columnar change set and the validation records built from it
+"""
+
+import unittest
+import sqlite3
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+
+from test_framework import ETLTestCase
+from fund_etl_pipeline import FundDataETL
+from lookback_compare import change_records, compare_frames
+
+FIELDS = ['share_class_assets', 'one_day_yield', 'seven_day_yield']
+
+
+class TestLookbackCompare(ETLTestCase):
+    """Test whole-column comparison flags the same changes as a row by row check"""
+
+    def frames(self):
+        db_df = pd.DataFrame({
+            'fund_code': ['SAME', 'NOISE', 'SMALL', 'BIG', 'NULLED', 'ZERO', 'ZEROS', 'DUP', 'DUP'],
+            'date': '2024-01-15',
+            'share_class_assets': [100.0, 100.0, 100.0, 100.0, 100.0, 0.0, 0.0, 50.0, 10.0],
+            'one_day_yield': [0.01, 0.01, 0.01, 0.01, None, 0.01, 0.0, 0.01, 0.01],
+            'seven_day_yield': [None] * 9
+        })
+        lookback_df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-15'] * 9),
+            'Fund Code': ['SAME', 'NOISE', 'SMALL', 'BIG', 'NULLED', 'ZERO', 'ZEROS', 'DUP', 'NEW'],
+            'Share Class Assets (dly/$mils)': [100.0, 100.0 + 1e-12, 104.0, 150.0, 100.0, 5.0, 0.0, 50.0, 1.0],
+            '1-DSY (dly)': [0.01, 0.01, 0.01, 0.03, 0.02, 0.01, 1e-12, 0.01, 0.01],
+            '7-DSY (dly)': [np.nan] * 9
+        })
+        return db_df, lookback_df
+
+    def test_change_set(self):
+        """Test threshold, epsilon, null, zero and new fund rules over whole columns"""
+        db_df, lookback_df = self.frames()
+
+        changes = compare_frames(db_df, lookback_df, FIELDS, 5.0)
+
+        self.assertEqual(list(changes[['fund_code', 'type']].itertuples(index=False, name=None)), [
+            ('BIG', 'value_change'), ('BIG', 'value_change'), ('NULLED', 'value_change'),
+            ('ZERO', 'value_change'), ('NEW', 'new_fund')
+        ])
+        self.assertEqual(changes['field'].tolist()[:4],
+                         ['share_class_assets', 'one_day_yield', 'one_day_yield', 'share_class_assets'])
+        self.assertEqual(changes['pct_change'].round(6).tolist()[:2], [50.0, 200.0])
+        self.assertTrue(changes['pct_change'].iloc[2:].isna().all())
+        self.assertEqual(changes['row'].tolist(), [3, 3, 4, 5, 8])
+
+    def test_change_records(self):
+        """Test the change set becomes one validation record per changed lookback row"""
+        db_df, lookback_df = self.frames()
+
+        records = change_records(compare_frames(db_df, lookback_df, FIELDS, 5.0), lookback_df)
+
+        self.assertEqual([(r['type'], r['fund_code'], r['date']) for r in records], [
+            ('value_change', 'BIG', '2024-01-15'), ('value_change', 'NULLED', '2024-01-15'),
+            ('value_change', 'ZERO', '2024-01-15'), ('new_fund', 'NEW', '2024-01-15')
+        ])
+        self.assertEqual(records[0]['changed_fields'][0],
+                         {'field': 'share_class_assets', 'db_value': 100.0, 'lookback_value': 150.0,
+                          'pct_change': 50.0})
+        self.assertNotIn('pct_change', records[2]['changed_fields'][0])
+        self.assertEqual(records[3]['lookback_row']['Fund Code'], 'NEW')
+        self.assertEqual(compare_frames(db_df, lookback_df.iloc[:0], FIELDS, 5.0).columns.tolist()[:3],
+                         ['row', 'fund_code', 'date'])
+
+
+class TestValidationWindow(ETLTestCase):
+    """Test validation reads the whole lookback window in one query"""
+
+    def test_single_range_query(self):
+        """Test missing dates, changes and region filtering come from one projected query"""
+        etl = FundDataETL(self.create_test_config())
+        etl.setup_database()
+        conn = sqlite3.connect(etl.db_path)
+        for date in ('2024-01-10', '2024-01-12'):
+            self.insert_test_data(conn, 'AMRS', date, 3)
+        self.insert_test_data(conn, 'EMEA', '2024-01-11', 3)
+        conn.close()
+
+        dates = ['2024-01-10', '2024-01-11', '2024-01-12']
+        lookback_df = pd.DataFrame({
+            'Date': pd.to_datetime(dates).repeat(3),
+            'Fund Code': [f'TEST{i:04d}' for i in range(3)] * 3,
+            'Region': 'AMRS',
+            '1-DSY (dly)': [0.01, 0.011, 0.012] * 3
+        })
+        lookback_df.loc[8, '1-DSY (dly)'] = 0.5
+        lookback_df.loc[9] = [pd.Timestamp('2024-01-12'), 'TEST0000', 'EMEA', 0.9]
+        columns = lookback_df.columns.tolist()
+        dtypes = lookback_df.dtypes.tolist()
+
+        with patch('fund_etl_pipeline.pd.read_sql_query', wraps=pd.read_sql_query) as read_sql:
+            results = etl.validate_against_lookback('AMRS', lookback_df)
+
+        self.assertEqual(read_sql.call_count, 1)
+        self.assertNotIn('*', read_sql.call_args.args[0])
+        self.assertEqual(results['missing_dates'], ['2024-01-11'])
+        self.assertEqual([(c['fund_code'], c['date'], [f['field'] for f in c['changed_fields']])
+                          for c in results['changed_records']], [('TEST0002', '2024-01-12', ['one_day_yield'])])
+        self.assertEqual(lookback_df.columns.tolist(), columns)
+        self.assertEqual(lookback_df.dtypes.tolist(), dtypes)
+        self.assertEqual(lookback_df.attrs, {})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
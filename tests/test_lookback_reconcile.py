@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Lookback Reconciliation Tests
+Tests validation and correction against a lookback done in SQL through the staging table
+"""
+
+import unittest
+import sqlite3
+import pandas as pd
+from datetime import datetime
+from unittest.mock import patch
+
+from test_framework import ETLTestCase
+from fund_etl_pipeline import FundDataETL
+from test_streaming_ingest import StreamingTestMixin
+
+
+class TestLookbackReconcile(StreamingTestMixin, ETLTestCase):
+    """Test reconcile mode finds and applies the same changes as pandas validation"""
+
+    def setUp(self):
+        super().setUp()
+        self.etl = FundDataETL(self.create_test_config())
+        self.etl.setup_database()
+
+    def query(self, sql, params=()):
+        conn = sqlite3.connect(self.etl.db_path)
+        rows = conn.execute(sql, params).fetchall()
+        conn.close()
+        return rows
+
+    def lookback(self):
+        # TEST0000 +50%, TEST0001 +1% (under threshold), TEST0002 unchanged, TEST0009 new;
+        # 2024-01-11 is not stored at all
+        return pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-10'] * 4 + ['2024-01-11']),
+            'Fund Code': ['TEST0000', 'TEST0001', 'TEST0002', 'TEST0009', 'TEST0000'],
+            'Fund Name': ['Renamed Fund 0', 'Test Fund 1', 'Test Fund 2', 'New Fund', 'Test Fund 0'],
+            'Share Class Assets (dly/$mils)': [1500000.0, 1111000.0, 1200000.0, 5.0, 1000000.0],
+            '1-DSY (dly)': [0.01, 0.011, 0.012, None, 0.01]
+        })
+
+    def test_reconcile_matches_validation(self):
+        """Test missing dates, changed and new funds agree with validate_against_lookback and are applied"""
+        conn = sqlite3.connect(self.etl.db_path)
+        self.insert_test_data(conn, 'AMRS', '2024-01-10', 4)
+        conn.close()
+        validated = self.etl.validate_against_lookback('AMRS', self.lookback())
+
+        results = self.etl.reconcile_lookback('AMRS', self.lookback())
+
+        self.assertEqual(results['missing_dates'], validated['missing_dates'])
+        self.assertEqual(results['summary']['changed_records_count'],
+                         validated['summary']['changed_records_count'])
+        reconciled = results['reconciled']
+        self.assertEqual({name: reconciled[name] for name in ('staged', 'new_funds', 'inserted', 'updated')},
+                         {'staged': 5, 'new_funds': 1, 'inserted': 2, 'updated': 1})
+        self.assertEqual(self.query("""
+        SELECT date, fund_code, fund_name, share_class_assets FROM fund_data ORDER BY date, fund_code
+        """), [
+            ('2024-01-10', 'TEST0000', 'Renamed Fund 0', 1500000.0),
+            ('2024-01-10', 'TEST0001', 'Test Fund 1', 1100000.0),
+            ('2024-01-10', 'TEST0002', 'Test Fund 2', 1200000.0),
+            ('2024-01-10', 'TEST0003', 'Test Fund 3', 1300000.0),
+            ('2024-01-10', 'TEST0009', 'New Fund', 5.0),
+            ('2024-01-11', 'TEST0000', 'Test Fund 0', 1000000.0)
+        ])
+        self.assertIn(('TEST0000', 'share_class_assets', 1000000.0, 1500000.0),
+                      self.query("SELECT fund_code, field, old_value, new_value FROM fund_data_revisions "
+                                 "WHERE source = 'lookback_reconcile'"))
+        self.assertEqual(self.query("SELECT COUNT(*) FROM fund_data_revisions")[0][0], reconciled['revisions'])
+
+        # Reconciling again finds nothing to do
+        again = self.etl.update_from_lookback('AMRS', self.lookback(), {}, update_mode='reconcile')
+        self.assertEqual((again['mode'], again['inserted'], again['updated'], again['revisions']),
+                         ('reconcile', 0, 0, 0))
+
+    def test_blank_rows_are_ignored(self):
+        """Test a blank trailing row is not staged in reconcile mode nor diffed in full mode"""
+        conn = sqlite3.connect(self.etl.db_path)
+        self.insert_test_data(conn, 'AMRS', '2024-01-10', 2)
+        conn.close()
+        lookback_df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-10', '2024-01-10', '2024-01-11', None]),
+            'Fund Code': ['TEST0000', 'TEST0001', 'TEST0000', None],
+            'Share Class Assets (dly/$mils)': [1000000.0, 1100000.0, 1000000.0, None]
+        })
+        validated = self.etl.validate_against_lookback('AMRS', lookback_df.copy())
+
+        results = self.etl.reconcile_lookback('AMRS', lookback_df.copy())
+
+        self.assertEqual(results['missing_dates'], validated['missing_dates'])
+        self.assertEqual(results['missing_dates'], ['2024-01-11'])
+        self.assertEqual({name: results['summary'][name] for name in ('total_dates_checked', 'missing_dates_count')},
+                         {'total_dates_checked': 2, 'missing_dates_count': 1})
+
+        full = self.etl.update_from_lookback('AMRS', lookback_df.copy(), {}, update_mode='full')
+        self.assertEqual(full['mode'], 'full')
+        self.assertEqual(self.query("SELECT DISTINCT date, fund_code FROM fund_data ORDER BY date, fund_code"),
+                         [('2024-01-10', 'TEST0000'), ('2024-01-10', 'TEST0001'), ('2024-01-11', 'TEST0000')])
+
+    def test_file_is_streamed(self):
+        """Test a lookback file is staged chunk by chunk, never read whole, with the same outcome"""
+        conn = sqlite3.connect(self.etl.db_path)
+        self.insert_test_data(conn, 'AMRS', '2024-01-16', 2)
+        conn.close()
+        # TEST0000 repeats in the second chunk and keeps its first row
+        filepath = self.write_datadump('lookback.xlsx', ['TEST0000', 'TEST0001', 'TEST0009', 'TEST0000'],
+                                       trailing_blank_rows=1)
+        self.etl.read_chunk_size = 2
+
+        with patch.object(self.etl.parsed_cache, 'read') as read:
+            results = self.etl.reconcile_lookback_file('AMRS', filepath)
+        read.assert_not_called()
+
+        reconciled = results['reconciled']
+        self.assertEqual({name: reconciled[name] for name in ('staged', 'staged_dates', 'inserted', 'updated')},
+                         {'staged': 3, 'staged_dates': 1, 'inserted': 1, 'updated': 2})
+        self.assertEqual(results['summary']['total_dates_checked'], 1)
+        self.assertEqual(self.query("SELECT fund_code, fund_name, share_class_assets FROM fund_data "
+                                    "ORDER BY fund_code"),
+                         [('TEST0000', 'Test Fund 0', 100.0), ('TEST0001', 'Test Fund 1', 101.0),
+                          ('TEST0009', 'Test Fund 2', 102.0)])
+
+    def test_corrected_weekend_becomes_physical(self):
+        """Test aliased dates compare with their source and only a corrected one is materialized"""
+        filepath = self.write_datadump('2024-01-12.xlsx', ['FUND001', 'FUND002'], date='2024-01-12')
+        self.etl.ingest_file(filepath, 'AMRS', datetime(2024, 1, 12))
+        lookback_df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-12', '2024-01-13', '2024-01-14']).repeat(2),
+            'Fund Code': ['FUND001', 'FUND002'] * 3,
+            'Share Class Assets (dly/$mils)': [100.0, 101.0, 100.0, 202.0, 100.0, 101.0]
+        })
+
+        results = self.etl.reconcile_lookback('AMRS', lookback_df)
+
+        self.assertEqual((results['reconciled']['dates'], results['missing_dates']), (['2024-01-13'], []))
+        self.assertEqual(self.query("SELECT date FROM date_alias ORDER BY date"), [('2024-01-14',)])
+        self.assertEqual(self.query("""
+        SELECT date, share_class_assets FROM fund_data_resolved WHERE fund_code = 'FUND002' ORDER BY date
+        """), [('2024-01-12', 101.0), ('2024-01-13', 202.0), ('2024-01-14', 101.0)])
+
+    def test_missing_friday_aliases_weekend(self):
+        """Test an inserted Friday carries its rows over the weekend, as a daily load does"""
+        lookback_df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-12', '2024-01-12']),
+            'Fund Code': ['FUND001', 'FUND002'],
+            'Share Class Assets (dly/$mils)': [100.0, 101.0]
+        })
+
+        results = self.etl.reconcile_lookback('AMRS', lookback_df)
+
+        self.assertEqual(results['missing_dates'], ['2024-01-12'])
+        self.assertEqual(results['reconciled']['aliased_dates'], ['2024-01-13', '2024-01-14'])
+        self.assertEqual(self.query("SELECT date, source_date, reason FROM date_alias ORDER BY date"),
+                         [('2024-01-13', '2024-01-12', 'weekend'), ('2024-01-14', '2024-01-12', 'weekend')])
+        self.assertEqual(self.query("SELECT date, COUNT(*) FROM fund_data_resolved GROUP BY date ORDER BY date"),
+                         [('2024-01-12', 2), ('2024-01-13', 2), ('2024-01-14', 2)])
+
+    def test_archived_month_is_skipped(self):
+        """Test dates in an archived month are skipped while the open months are still corrected"""
+        self.etl.partition_config.update({'enabled': True, 'dir': str(self.data_dir / 'partitions'),
+                                          'open_months': 2})
+        for date in ('2024-01-10', '2024-04-10'):
+            filepath = self.write_datadump(f'{date}.xlsx', ['FUND001'], date=date)
+            self.etl.ingest_file(filepath, 'AMRS', datetime.strptime(date, '%Y-%m-%d'))
+        self.etl.archive_closed_months(datetime(2024, 4, 15))
+        lookback_df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-10', '2024-04-10']),
+            'Fund Code': ['FUND001', 'FUND001'],
+            'Share Class Assets (dly/$mils)': [500.0, 500.0]
+        })
+
+        results = self.etl.reconcile_lookback('AMRS', lookback_df)
+
+        reconciled = results['reconciled']
+        self.assertEqual((reconciled['skipped_dates'], reconciled['dates'], results['missing_dates']),
+                         (['2024-01-10'], ['2024-04-10'], []))
+        self.assertEqual(self.query("SELECT date, share_class_assets FROM fund_data"), [('2024-04-10', 500.0)])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
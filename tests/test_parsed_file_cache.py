@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Parsed File Cache Tests
+Tests the content-addressed sidecar cache used by the pipeline and diagnostics
+"""
+
+import os
+import time
+import unittest
+import pandas as pd
+from datetime import datetime
+
+from test_framework import ETLTestCase
+from fund_etl_pipeline import FundDataETL
+from parsed_file_cache import ParsedFileCache
+from transform_plan import TYPED_ATTR, ReadPlan
+from test_streaming_ingest import StreamingTestMixin
+
+
+class TestParsedFileCache(StreamingTestMixin, ETLTestCase):
+    """Test cache hits, misses and eviction"""
+
+    def setUp(self):
+        super().setUp()
+        self.cache = ParsedFileCache(self.data_dir / 'cache' / 'parsed')
+        self.cache.clear()
+
+    def test_second_read_is_served_from_sidecar(self):
+        """Test a repeated read hits the cache and returns the same typed frame"""
+        filepath = self.write_datadump('hit.xlsx', ['FUND001', 'FUND002', 'FUND003'])
+
+        first = self.cache.read(filepath, chunk_size=2)
+        second = self.cache.read(filepath, chunk_size=2)
+
+        self.assertEqual((self.cache.misses, self.cache.hits), (1, 1))
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_hit_is_rechunked(self):
+        """Test a hit yields the caller's chunk size and keeps the read plan mark"""
+        filepath = self.write_datadump('rechunk.xlsx', ['FUND001', 'FUND002', 'FUND003'])
+        read_plan = ReadPlan(FundDataETL(self.create_test_config()).expected_columns)
+        first = self.cache.read(filepath, chunk_size=2, read_plan=read_plan)
+
+        for chunk_size, lengths in ((1, [1, 1, 1]), (3, [3]), (5, [3])):
+            with self.cache.open_reader(filepath, chunk_size=chunk_size, read_plan=read_plan) as reader:
+                chunks = list(reader.iter_chunks())
+            self.assertEqual([len(chunk) for chunk in chunks], lengths)
+            self.assertEqual({chunk.attrs[TYPED_ATTR] for chunk in chunks}, {read_plan.signature})
+            pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), first)
+        self.assertEqual((self.cache.misses, self.cache.hits), (1, 3))
+
+    def test_mixed_types_not_cached(self):
+        """Test a column Arrow cannot hold is read in full but leaves no sidecar"""
+        filepath = str(self.test_data_dir / 'mixed.xlsx')
+        pd.DataFrame({'Fund Code': ['FUND001', 2], 'Fund Name': ['Fund 1', 'Fund 2']}).to_excel(filepath, index=False)
+
+        df = self.cache.read(filepath)
+
+        self.assertEqual(df['Fund Code'].tolist(), ['FUND001', 2])
+        self.assertEqual(list(self.cache.cache_dir.iterdir()), [])
+
+    def test_changed_content_is_a_miss(self):
+        """Test the key follows file content, not the file name"""
+        filepath = self.write_datadump('changed.xlsx', ['FUND001'])
+        self.cache.read(filepath)
+
+        self.write_datadump('changed.xlsx', ['FUND001', 'FUND002'])
+        df = self.cache.read(filepath)
+
+        self.assertEqual(self.cache.misses, 2)
+        self.assertEqual(len(df), 2)
+
+    def test_partial_read_not_cached(self):
+        """Test a reader closed before the body is consumed leaves no sidecar"""
+        filepath = self.write_datadump('partial.xlsx', ['FUND001', 'FUND002'])
+
+        with self.cache.open_reader(filepath, chunk_size=1) as reader:
+            next(reader.iter_chunks())
+
+        self.assertEqual(list(self.cache.cache_dir.iterdir()), [])
+
+    def test_eviction_by_age_and_size(self):
+        """Test old entries are dropped, then least recently used until under the size cap"""
+        paths = [self.write_datadump(f'evict{i}.xlsx', [f'FUND{i:03d}']) for i in range(3)]
+        for path in paths:
+            self.cache.read(path)
+        sidecars = [self.cache.sidecar_path(ParsedFileCache.file_digest(p)) for p in paths]
+
+        now = time.time()
+        os.utime(sidecars[0], (now - 30 * 86400, now - 30 * 86400))
+        os.utime(sidecars[1], (now - 60, now - 60))
+
+        self.cache.max_size_mb = sidecars[2].stat().st_size / 1024 / 1024
+        removed = self.cache.evict()
+
+        self.assertEqual(removed, 2)
+        self.assertEqual([s.exists() for s in sidecars], [False, False, True])
+
+    def test_pipeline_ingest_uses_cache(self):
+        """Test re-reading the same file during ingest loads it from the sidecar"""
+        etl = FundDataETL(self.create_test_config())
+        etl.setup_database()
+        etl.parsed_cache.clear()
+        filepath = self.write_datadump('ingest.xlsx', ['FUND001', 'FUND002'])
+
+        for day in (16, 17):
+            is_valid, _ = etl.ingest_file(filepath, 'AMRS', datetime(2024, 1, day))
+            self.assertTrue(is_valid)
+
+        # Each ingest reads the file once; only the first read parses the workbook
+        self.assertEqual((etl.parsed_cache.misses, etl.parsed_cache.hits), (1, 1))
+        self.assertEqual(self.get_record_count('fund_data'), 4)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
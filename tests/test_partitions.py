@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Monthly Partition Tests
+Tests archiving closed months to read-only partition files and routing reads by date range
+"""
+
+import os
+import unittest
+import sqlite3
+from datetime import datetime
+from unittest.mock import patch
+
+from test_framework import ETLTestCase
+from fund_etl_pipeline import FundDataETL
+from fund_etl_utilities import FundDataMonitor, FundDataQuery
+from daily_summary import totals
+from db_connection import connect
+from partitions import ClosedMonthError, PartitionRouter, ROUTED_VIEW
+from test_streaming_ingest import StreamingTestMixin
+
+
+class TestPartitions(StreamingTestMixin, ETLTestCase):
+    """Test closed months move to partitions and stay readable"""
+
+    def setUp(self):
+        super().setUp()
+        self.partition_dir = self.data_dir / 'partitions'
+        self.etl = FundDataETL(self.create_test_config({
+            'partitions': {'enabled': True, 'dir': str(self.partition_dir), 'open_months': 2}
+        }))
+        self.etl.setup_database()
+
+    def load(self, *dates):
+        for date in dates:
+            filepath = self.write_datadump(f'{date}.xlsx', ['FUND001', 'FUND002'], date=date)
+            self.etl.ingest_file(filepath, 'AMRS', datetime.strptime(date, '%Y-%m-%d'))
+
+    def query(self, sql, params=()):
+        conn = sqlite3.connect(self.etl.db_path)
+        rows = conn.execute(sql, params).fetchall()
+        conn.close()
+        return rows
+
+    def test_closed_months_archived(self):
+        """Test months before the open window leave fund_data for read-only, registered files"""
+        self.load('2024-01-10', '2024-02-14', '2024-03-13', '2024-04-10')
+        conn = sqlite3.connect(self.etl.db_path)
+        before = totals(conn)
+        conn.close()
+
+        result = self.etl.archive_closed_months(datetime(2024, 4, 15))
+
+        self.assertEqual([entry['month'] for entry in result['archived']], ['2024-01', '2024-02'])
+        self.assertEqual(self.query("SELECT DISTINCT date FROM fund_data ORDER BY date"),
+                         [('2024-03-13',), ('2024-04-10',)])
+        registry = self.query("SELECT month, row_count, path FROM fund_data_partitions ORDER BY month")
+        self.assertEqual([row[:2] for row in registry], [('2024-01', 2), ('2024-02', 2)])
+        for _, _, path in registry:
+            self.assertFalse(os.stat(path).st_mode & 0o222)
+            part = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+            self.assertEqual(part.execute("SELECT COUNT(*) FROM fund_data").fetchone()[0], 2)
+            part.close()
+
+        # The summary keeps covering the archived history, also after a rebuild
+        self.etl.setup_database()
+        conn = sqlite3.connect(self.etl.db_path)
+        self.assertEqual(totals(conn), before)
+        conn.close()
+
+    def test_interrupted_archive_keeps_month_reachable(self):
+        """Test a run that stops before compacting leaves the month registered and finishes it next time"""
+        self.load('2024-01-10', '2024-04-10')
+        with patch('partitions._compact', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                self.etl.archive_closed_months(datetime(2024, 4, 15))
+
+        self.assertEqual(self.query("SELECT month, row_count, size_bytes FROM fund_data_partitions"),
+                         [('2024-01', 2, None)])
+        history = FundDataQuery(self.etl.db_path).get_fund_history('FUND001', '2024-01-01', '2024-04-30')
+        self.assertEqual(history['date'].dt.strftime('%Y-%m-%d').tolist(), ['2024-01-10', '2024-04-10'])
+
+        result = self.etl.archive_closed_months(datetime(2024, 4, 15))
+        self.assertEqual(result['archived'], [])
+        (path, size_bytes), = self.query("SELECT path, size_bytes FROM fund_data_partitions")
+        self.assertEqual(size_bytes, os.path.getsize(path))
+        self.assertFalse(os.stat(path).st_mode & 0o222)
+
+    def test_router_prunes_by_range(self):
+        """Test reads attach only the archived months their date range overlaps"""
+        self.load('2024-01-10', '2024-02-14', '2024-04-10')
+        self.etl.archive_closed_months(datetime(2024, 4, 15))
+
+        conn = connect(self.etl.db_path)
+        router = PartitionRouter(conn)
+        self.assertEqual([part['month'] for part in router.partitions('2024-02-01', '2024-04-30')], ['2024-02'])
+        self.assertEqual(router.partitions('2024-04-01', '2024-04-30'), [])
+        df = router.read_frame(f"SELECT DISTINCT date FROM {ROUTED_VIEW} ORDER BY date",
+                               start='2024-02-01', end='2024-04-30')
+        self.assertEqual(df['date'].tolist(), ['2024-02-14', '2024-04-10'])
+        attached = [row[1] for row in conn.execute("PRAGMA database_list")]
+        self.assertNotIn('partition_0', attached)
+        conn.close()
+
+        query = FundDataQuery(self.etl.db_path)
+        history = query.get_fund_history('FUND001', '2024-01-01', '2024-04-30')
+        self.assertEqual(history['date'].dt.strftime('%Y-%m-%d').tolist(),
+                         ['2024-01-10', '2024-02-14', '2024-04-10'])
+        self.assertEqual(len(query.search_funds('Test Fund')), 2)
+
+        missing = FundDataMonitor(self.etl.db_path).find_missing_dates('2024-01-08', '2024-01-12')
+        self.assertEqual(missing['AMRS'], ['2024-01-08', '2024-01-09', '2024-01-11', '2024-01-12'])
+
+    def test_aliases_into_closed_month_materialized(self):
+        """Test a weekend aliased to the last Friday of an archived month becomes physical"""
+        self.load('2024-05-31')
+        self.etl.archive_closed_months(datetime(2024, 7, 1))
+
+        self.assertEqual(self.query("SELECT date, COUNT(*) FROM fund_data GROUP BY date"),
+                         [('2024-06-01', 2), ('2024-06-02', 2)])
+        self.assertEqual(self.query("SELECT COUNT(*) FROM date_alias"), [(0,)])
+        self.assertEqual(self.query("SELECT date, source_date FROM daily_summary ORDER BY date"),
+                         [('2024-05-31', None), ('2024-06-01', None), ('2024-06-02', None)])
+
+    def test_closed_month_is_read_only(self):
+        """Test a reload of an archived date is refused and cold storage stays routable"""
+        self.load('2024-01-10', '2024-04-10')
+        cold_dir = self.data_dir / 'cold'
+        self.etl.partition_config.update({'cold_dir': str(cold_dir), 'cold_after_months': 2})
+        result = self.etl.archive_closed_months(datetime(2024, 4, 15))
+        self.assertEqual(result['cold'], ['2024-01'])
+        self.assertTrue((cold_dir / 'fund_data_2024_01.db').exists())
+
+        filepath = self.write_datadump('reload.xlsx', ['FUND001'], date='2024-01-10')
+        with self.assertRaises(ClosedMonthError):
+            self.etl.ingest_file(filepath, 'AMRS', datetime(2024, 1, 10))
+
+        history = FundDataQuery(self.etl.db_path).get_fund_history('FUND002', '2024-01-01', '2024-01-31')
+        self.assertEqual(len(history), 1)
+
+    def test_router_attaches_path_needing_escapes(self):
+        """Test a partition directory with URI metacharacters in its name is attached as-is"""
+        self.etl.partition_config['dir'] = str(self.data_dir / 'parts?#1')
+        self.load('2024-01-10', '2024-04-10')
+        self.etl.archive_closed_months(datetime(2024, 4, 15))
+
+        conn = connect(self.etl.db_path)
+        df = PartitionRouter(conn).read_frame(f"SELECT DISTINCT date FROM {ROUTED_VIEW} ORDER BY date")
+        conn.close()
+        self.assertEqual(df['date'].tolist(), ['2024-01-10', '2024-04-10'])
+        self.assertEqual(sorted(os.listdir(self.data_dir / 'parts?#1')), ['fund_data_2024_01.db'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Query Catalog Tests
+Tests the index advisor and the index migrations run by setup_database
+"""
+
+import unittest
+import sqlite3
+
+from test_framework import ETLTestCase
+from bulk_loader import FUND_DATA_COLUMNS
+from fund_etl_pipeline import FundDataETL
+from query_catalog import QUERY_CATALOG, advise, apply_index_migrations, time_queries
+
+
+class TestIndexMigrations(ETLTestCase):
+    """Test composite indexes replace the single-column ones"""
+
+    def setUp(self):
+        super().setUp()
+        self.etl = FundDataETL(self.create_test_config())
+        self.etl.setup_database()
+        self.conn = sqlite3.connect(self.etl.db_path)
+        # Enough rows per region and date for the planner to prefer the indexes
+        for region in ('AMRS', 'EMEA'):
+            for date in ('2024-01-12', '2024-01-15', '2024-01-16'):
+                self.insert_test_data(self.conn, region, date, 200)
+
+    def tearDown(self):
+        self.conn.close()
+        super().tearDown()
+
+    def make_legacy(self):
+        """Indexes as setup_database created them before the catalog"""
+        for name in ('idx_fund_data_region_date', 'idx_fund_data_fund_code_date', 'idx_etl_log_region_file_date'):
+            self.conn.execute(f"DROP INDEX {name}")
+        for column in ('date', 'region', 'fund_code'):
+            self.conn.execute(f"CREATE INDEX idx_fund_data_{column} ON fund_data({column})")
+        self.conn.commit()
+
+    def test_legacy_database_migrated(self):
+        """Test migration creates composite indexes, drops redundant ones and runs ANALYZE"""
+        self.make_legacy()
+
+        result = apply_index_migrations(self.conn.cursor())
+        self.conn.commit()
+
+        self.assertEqual(sorted(result['dropped']),
+                         ['idx_fund_data_date', 'idx_fund_data_fund_code', 'idx_fund_data_region'])
+        self.assertEqual(len(result['created']), 3)
+        self.assertTrue(result['analyzed'])
+        self.assertGreater(self.get_record_count('sqlite_stat1', "tbl = 'fund_data'"), 0)
+
+        # A second run has nothing to do
+        self.assertEqual(apply_index_migrations(self.conn.cursor()),
+                         {'created': [], 'dropped': [], 'analyzed': False})
+
+    def test_advisor_flags_full_scans(self):
+        """Test the advisor reports the etl_log scan of a legacy schema and none after migration"""
+        self.make_legacy()
+        before = {entry['name']: entry['issues'] for entry in advise(self.conn)}
+
+        apply_index_migrations(self.conn.cursor())
+        after = {entry['name']: entry['issues'] for entry in advise(self.conn)}
+
+        self.assertTrue(before['last_load_digests'])
+        self.assertEqual({name: issues for name, issues in after.items() if issues}, {})
+
+    def test_time_queries_covers_catalog(self):
+        """Test every catalog query runs against the schema"""
+        timings = time_queries(self.conn, repeat=1)
+
+        self.assertEqual(set(timings), set(QUERY_CATALOG))
+
+    def test_export_slice_selects_fund_data_columns(self):
+        """Test the export query names the exported columns, leaving out row_hash"""
+        cursor = self.conn.execute(QUERY_CATALOG['export_slice'][1], {'date': '2024-01-12', 'region': 'AMRS'})
+
+        self.assertEqual([column[0] for column in cursor.description], FUND_DATA_COLUMNS)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Revision Log Tests
+Tests lookback corrections written as field-level deltas and as-of reads of earlier values
+"""
+
+import unittest
+import sqlite3
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from test_framework import ETLTestCase
+from fund_etl_pipeline import FundDataETL
+from fund_etl_utilities import FundDataQuery
+from test_streaming_ingest import StreamingTestMixin
+
+
+class TestRevisionLog(StreamingTestMixin, ETLTestCase):
+    """Test lookback updates log what they change and as-of reads undo it"""
+
+    def setUp(self):
+        super().setUp()
+        self.etl = FundDataETL(self.create_test_config())
+        self.etl.setup_database()
+
+    def load(self, date, fund_codes=('FUND001', 'FUND002', 'FUND003')):
+        filepath = self.write_datadump(f'{date}.xlsx', list(fund_codes), date=date)
+        self.etl.ingest_file(filepath, 'AMRS', datetime.strptime(date, '%Y-%m-%d'))
+
+    def full_update(self, date, assets):
+        lookback_df = pd.DataFrame({
+            'Date': pd.to_datetime([date] * len(assets)),
+            'Fund Code': list(assets),
+            'Fund Name': [f'Test Fund {i}' for i in range(len(assets))],
+            'Share Class Assets (dly/$mils)': list(assets.values())
+        })
+        return self.etl.update_from_lookback('AMRS', lookback_df, {}, update_mode='full')
+
+    def query(self, sql, params=()):
+        conn = sqlite3.connect(self.etl.db_path)
+        rows = conn.execute(sql, params).fetchall()
+        conn.commit()
+        conn.close()
+        return rows
+
+    def test_full_update_writes_deltas(self):
+        """Test full mode logs and writes only changed fields, added and removed rows"""
+        self.load('2024-01-10')
+
+        result = self.full_update('2024-01-10', {'FUND001': 100.0, 'FUND002': 150.0, 'FUND004': 7.0})
+
+        self.assertEqual({name: result[name] for name in ('inserted', 'updated', 'unchanged', 'deleted')},
+                         {'inserted': 1, 'updated': 1, 'unchanged': 1, 'deleted': 1})
+        revisions = self.query("""
+        SELECT fund_code, field, old_value, new_value, source FROM fund_data_revisions
+        WHERE field IN ('*', 'share_class_assets') ORDER BY fund_code, field
+        """)
+        self.assertEqual(revisions, [
+            ('FUND002', 'share_class_assets', 101.0, 150.0, 'lookback_full'),
+            ('FUND003', '*', 1, None, 'lookback_full'),
+            ('FUND003', 'share_class_assets', 102.0, None, 'lookback_full'),
+            ('FUND004', '*', None, 1, 'lookback_full'),
+            ('FUND004', 'share_class_assets', None, 7.0, 'lookback_full')
+        ])
+        self.assertEqual(result['revisions'], self.query("SELECT COUNT(*) FROM fund_data_revisions")[0][0])
+
+        # Repeating the same lookback changes nothing
+        self.assertEqual(self.full_update('2024-01-10', {'FUND001': 100.0, 'FUND002': 150.0, 'FUND004': 7.0})
+                         ['revisions'], 0)
+
+    def test_as_of_reconstructs_published_values(self):
+        """Test as-of reads return each earlier version of a date"""
+        self.load('2024-01-10')
+        self.full_update('2024-01-10', {'FUND001': 100.0, 'FUND002': 150.0, 'FUND004': 7.0})
+        self.query("UPDATE fund_data_revisions SET revised_at = '2024-02-01 00:00:00'")
+        self.full_update('2024-01-10', {'FUND001': 100.0, 'FUND002': 175.0})
+        self.query("UPDATE fund_data_revisions SET revised_at = '2024-03-01 00:00:00' "
+                   "WHERE revised_at > '2024-02-01 00:00:00'")
+
+        query = FundDataQuery(self.etl.db_path)
+
+        def assets(timestamp):
+            df = query.get_data_as_of('2024-01-10', 'AMRS', timestamp)
+            return dict(zip(df['fund_code'], df['share_class_assets']))
+
+        self.assertEqual(assets('2024-01-31 00:00:00'), {'FUND001': 100.0, 'FUND002': 101.0, 'FUND003': 102.0})
+        self.assertEqual(assets(datetime(2024, 2, 15)), {'FUND001': 100.0, 'FUND002': 150.0, 'FUND004': 7.0})
+        self.assertEqual(assets('2024-03-15 00:00:00'), {'FUND001': 100.0, 'FUND002': 175.0})
+
+        original = query.get_data_as_of('2024-01-10', 'AMRS', '2024-01-31 00:00:00')
+        self.assertEqual(original.loc[original['fund_code'] == 'FUND003', 'currency'].tolist(), ['US Dollar'])
+
+    def test_selective_update_on_aliased_weekend(self):
+        """Test selective corrections are logged and the aliased weekend reads through them"""
+        self.load('2024-01-12')
+        lookback_df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-12', '2024-01-12']),
+            'Fund Code': ['FUND001', 'FUND002'],
+            'Share Class Assets (dly/$mils)': [100.0, 250.0]
+        })
+
+        result = self.etl.update_from_lookback('AMRS', lookback_df, {'changed_records': [
+            {'fund_code': 'FUND001', 'date': '2024-01-12', 'type': 'value_change'},
+            {'fund_code': 'FUND002', 'date': '2024-01-12', 'type': 'value_change'}
+        ]})
+
+        # FUND001 already held 100.0, so only FUND002 is revised
+        self.assertEqual(result['revisions'], 1)
+        self.assertEqual(self.query("SELECT fund_code, old_value, new_value, source FROM fund_data_revisions"),
+                         [('FUND002', 101.0, 250.0, 'lookback_selective')])
+        self.query("UPDATE fund_data_revisions SET revised_at = '2024-02-01 00:00:00'")
+
+        before = FundDataQuery(self.etl.db_path).get_data_as_of('2024-01-13', 'AMRS', '2024-01-31 00:00:00')
+        self.assertEqual(before['date'].unique().tolist(), ['2024-01-13'])
+        self.assertEqual(before['share_class_assets'].tolist(), [100.0, 101.0, 102.0])
+
+    def test_selective_update_batches_signatures(self):
+        """Test records changing different fields are written together and each field logged"""
+        self.load('2024-01-10')
+        lookback_df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-10'] * 4),
+            'Fund Code': ['FUND001', 'FUND002', 'FUND003', 'FUND009'],
+            'Share Class Assets (dly/$mils)': [110.0, 101.0, 120.0, 1.0],
+            '1-DSY (dly)': [0.05, 0.06, np.nan, 0.01]
+        })
+        records = [{'fund_code': code, 'date': '2024-01-10', 'type': 'value_change'}
+                   for code in ('FUND001', 'FUND002', 'FUND003', 'FUND009', 'FUND001')]
+
+        result = self.etl.update_from_lookback('AMRS', lookback_df, {'changed_records': records})
+
+        self.assertEqual(result['records_updated'], 5)
+        stored = self.query("""
+        SELECT fund_code, share_class_assets, one_day_yield FROM fund_data ORDER BY fund_code
+        """)
+        self.assertEqual(stored, [('FUND001', 110.0, 0.05), ('FUND002', 101.0, 0.06), ('FUND003', 120.0, None)])
+        revisions = self.query("SELECT fund_code, field FROM fund_data_revisions ORDER BY fund_code, field")
+        self.assertEqual([revision for revision in revisions if revision[1] == 'share_class_assets'],
+                         [('FUND001', 'share_class_assets'), ('FUND003', 'share_class_assets')])
+        self.assertEqual(result['revisions'], len(revisions))
+
+    def test_failed_update_rolls_back(self):
+        """Test a lookback update failing after its writes raises and leaves nothing behind"""
+        self.load('2024-01-10')
+
+        with patch('fund_etl_pipeline.refresh_summary', side_effect=RuntimeError('summary failed')):
+            with self.assertRaises(RuntimeError):
+                self.full_update('2024-01-10', {'FUND001': 100.0, 'FUND002': 150.0, 'FUND004': 7.0})
+
+        self.assertEqual(self.query("SELECT COUNT(*) FROM fund_data_revisions"), [(0,)])
+        self.assertEqual(self.query("SELECT fund_code, share_class_assets FROM fund_data ORDER BY fund_code"),
+                         [('FUND001', 100.0), ('FUND002', 101.0), ('FUND003', 102.0)])
+
+    def test_unrevised_alias_stays_aliased(self):
+        """Test a full lookback covering an unchanged weekend leaves it aliased"""
+        self.load('2024-01-12')
+        lookback_df = pd.DataFrame({
+            'Date': pd.to_datetime(['2024-01-12', '2024-01-13', '2024-01-14']).repeat(3),
+            'Fund Code': ['FUND001', 'FUND002', 'FUND003'] * 3,
+            'Share Class Assets (dly/$mils)': [100.0, 101.0, 102.0] * 3
+        })
+        result = self.etl.update_from_lookback('AMRS', lookback_df, {}, update_mode='full')
+        self.assertEqual((result['unchanged'], result['revisions']), (9, 0))
+        self.assertEqual(self.query("SELECT date FROM date_alias ORDER BY date"),
+                         [('2024-01-13',), ('2024-01-14',)])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
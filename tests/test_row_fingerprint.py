@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Row Fingerprint Tests
+Tests row hashes and day digests written at load time and hash-first lookback validation
+"""
+
+import unittest
+import sqlite3
+import pandas as pd
+from datetime import datetime
+from unittest.mock import patch
+
+from test_framework import ETLTestCase
+from fund_etl_pipeline import FundDataETL
+from row_fingerprint import LOOKBACK_COLUMNS, day_digests, row_hashes
+from test_streaming_ingest import StreamingTestMixin
+
+
+class TestRowFingerprint(StreamingTestMixin, ETLTestCase):
+    """Test fingerprints follow every write and let validation skip unchanged days"""
+
+    def setUp(self):
+        super().setUp()
+        self.etl = FundDataETL(self.create_test_config())
+        self.etl.setup_database()
+        # Friday, so the 13th and 14th alias it
+        filepath = self.write_datadump('2024-01-12.xlsx', ['FUND001', 'FUND002', 'FUND003'], date='2024-01-12')
+        self.etl.ingest_file(filepath, 'AMRS', datetime(2024, 1, 12))
+
+    def query(self, sql, params=()):
+        conn = sqlite3.connect(self.etl.db_path)
+        rows = conn.execute(sql, params).fetchall()
+        conn.close()
+        return rows
+
+    def lookback(self, dates=('2024-01-12',)):
+        """Lookback carrying the stored values of the loaded funds on each date"""
+        return pd.DataFrame({
+            'Date': pd.to_datetime(list(dates)).repeat(3),
+            'Fund Code': ['FUND001', 'FUND002', 'FUND003'] * len(dates),
+            'Share Class Assets (dly/$mils)': [100.0, 101.0, 102.0] * len(dates),
+            'Portfolio Assets (dly/$mils)': float('nan'),
+            '1-DSY (dly)': 4.25,
+            '7-DSY (dly)': float('nan')
+        })
+
+    def test_load_writes_hashes_and_digest(self):
+        """Test loaded rows are hashed and the stored digest matches the lookback's"""
+        self.assertEqual(self.query("SELECT COUNT(*) FROM fund_data WHERE row_hash IS NULL")[0][0], 0)
+        lookback_df = self.lookback()
+        expected = day_digests(lookback_df['Date'].dt.strftime('%Y-%m-%d').to_numpy(),
+                               row_hashes(lookback_df, LOOKBACK_COLUMNS))
+        self.assertEqual(self.query("SELECT date, row_count, hash_high, hash_low FROM fund_data_digests"),
+                         [('2024-01-12',) + expected['2024-01-12']])
+
+    def test_unchanged_days_are_skipped(self):
+        """Test identical and aliased days read no rows and only drifted rows are compared"""
+        lookback_df = self.lookback(['2024-01-12', '2024-01-13', '2024-01-15'])
+        with patch('fund_etl_pipeline.pd.read_sql_query', wraps=pd.read_sql_query) as read_sql:
+            results = self.etl.validate_against_lookback('AMRS', lookback_df.copy())
+        self.assertEqual(read_sql.call_count, 0)
+        self.assertEqual((results['missing_dates'], results['changed_records']), (['2024-01-15'], []))
+        self.assertEqual(results['summary']['unchanged_dates_count'], 2)
+
+        lookback_df.loc[4, 'Share Class Assets (dly/$mils)'] = 150.0
+        with patch.object(self.etl, '_compare_dataframes', wraps=self.etl._compare_dataframes) as compare:
+            results = self.etl.validate_against_lookback('AMRS', lookback_df)
+        self.assertEqual(results['summary']['unchanged_dates_count'], 1)
+        self.assertEqual([(c['fund_code'], c['date']) for c in results['changed_records']],
+                         [('FUND002', '2024-01-13')])
+        self.assertEqual(compare.call_args.args[1]['Fund Code'].tolist(), ['FUND002'])
+
+    def test_corrections_are_rehashed(self):
+        """Test a selective update clears and recomputes the hashes it changes"""
+        lookback_df = self.lookback()
+        lookback_df.loc[1, '1-DSY (dly)'] = 5.0
+        validated = self.etl.validate_against_lookback('AMRS', lookback_df.copy())
+        self.etl.update_from_lookback('AMRS', lookback_df.copy(), validated)
+
+        self.assertEqual(self.query("SELECT COUNT(*) FROM fund_data WHERE row_hash IS NULL")[0][0], 0)
+        again = self.etl.validate_against_lookback('AMRS', lookback_df)
+        self.assertEqual((again['summary']['unchanged_dates_count'], again['changed_records']), (1, []))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Read Snapshot Tests
+Tests publishing read-only snapshots of the database and serving the UI from them
+"""
+
+import os
+import shutil
+import unittest
+import sqlite3
+from unittest.mock import patch
+
+from test_framework import ETLTestCase
+from fund_etl_pipeline import FundDataETL
+from snapshot import publish_snapshot, snapshot_info
+
+
+class TestReadSnapshot(ETLTestCase):
+    """Test snapshots are consistent, read-only and swapped in atomically"""
+
+    def setUp(self):
+        super().setUp()
+        self.snapshot_dir = self.data_dir / 'snapshots'
+        shutil.rmtree(self.snapshot_dir, ignore_errors=True)
+        self.snapshot_path = str(self.snapshot_dir / 'fund_data.db')
+        self.etl = FundDataETL(self.create_test_config({
+            'snapshot': {'enabled': True, 'path': self.snapshot_path}
+        }))
+        self.etl.setup_database()
+
+    def snapshot_count(self):
+        conn = sqlite3.connect(f'file:{self.snapshot_path}?mode=ro', uri=True)
+        count = conn.execute("SELECT COUNT(*) FROM fund_data").fetchone()[0]
+        conn.close()
+        return count
+
+    def test_snapshot_excludes_uncommitted_writes(self):
+        """Test a snapshot taken during a write transaction holds only committed rows"""
+        conn = sqlite3.connect(self.etl.db_path)
+        self.insert_test_data(conn, 'AMRS', '2024-01-15', 3)
+        conn.execute("DELETE FROM fund_data WHERE fund_code = 'TEST0000'")
+
+        result = self.etl.publish_snapshot()
+        conn.rollback()
+        conn.close()
+
+        self.assertEqual(self.snapshot_count(), 3)
+        self.assertFalse(os.stat(self.snapshot_path).st_mode & 0o222)
+        self.assertEqual([p.name for p in self.snapshot_dir.iterdir()], ['fund_data.db'])
+        snapshot = sqlite3.connect(f'file:{self.snapshot_path}?mode=ro', uri=True)
+        self.assertEqual(snapshot.execute("PRAGMA journal_mode").fetchone()[0], 'delete')
+        self.assertEqual(snapshot_info(snapshot)['published_at'], result['published_at'])
+        snapshot.close()
+
+    def test_ui_serves_latest_snapshot(self):
+        """Test the UI reads the snapshot, not the live database, and picks up a republished one"""
+        conn = sqlite3.connect(self.etl.db_path)
+        self.insert_test_data(conn, 'AMRS', '2024-01-15', 3)
+        publish_snapshot(self.etl.db_path, self.snapshot_path)
+        self.insert_test_data(conn, 'EMEA', '2024-01-15', 2)
+        conn.close()
+
+        import fund_etl_ui
+        with patch('fund_etl_ui.SNAPSHOT_PATH', self.snapshot_path), \
+                patch('fund_etl_ui.DB_PATH', self.etl.db_path):
+            def rows():
+                ui_conn = fund_etl_ui.read_connection()
+                count = ui_conn.execute("SELECT COUNT(*) FROM fund_data").fetchone()[0]
+                ui_conn.close()
+                return count
+
+            self.assertEqual(rows(), 3)
+            self.etl.publish_snapshot()
+            self.assertEqual(rows(), 5)
+
+            page = fund_etl_ui.app.test_client().get('/')
+            self.assertIn(b'Data snapshot:', page.data)
+
+    def test_disabled_snapshot_not_published(self):
+        """Test nothing is published unless the snapshot section enables it"""
+        etl = FundDataETL(self.create_test_config())
+        self.assertIsNone(etl.publish_snapshot())
+        self.assertFalse(os.path.exists(self.snapshot_path))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
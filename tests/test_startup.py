@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Startup Tests
+Tests that CLI entry points only import heavy libraries on the paths that use them
+"""
+
+import os
+import subprocess
+import sys
+import unittest
+
+from test_framework import ETLTestCase
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestLazyImports(ETLTestCase):
+    """Test entry points start without pandas, numpy or matplotlib"""
+
+    def run_python(self, *args: str) -> subprocess.CompletedProcess:
+        """Run a fresh interpreter from the test directory"""
+        result = subprocess.run([sys.executable] + list(args), cwd=self.temp_dir,
+                                env=dict(os.environ, PYTHONPATH=ROOT),
+                                capture_output=True, text=True, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        return result
+
+    def test_scheduler_import_is_light(self):
+        """Test importing the scheduler does not pull in the pipeline's dependencies"""
+        result = self.run_python('-c', (
+            "import sys, fund_etl_scheduler; "
+            "print(sorted(m for m in ('pandas', 'numpy', 'matplotlib', 'requests') if m in sys.modules))"
+        ))
+
+        self.assertEqual(result.stdout.strip(), '[]')
+
+    def test_quick_status_import_is_light(self):
+        """Test importing quick_status loads the pipeline only when the tool runs"""
+        result = self.run_python('-c', (
+            "import sys, quick_status; "
+            "print(sorted(m for m in ('pandas', 'numpy', 'fund_etl_pipeline') if m in sys.modules))"
+        ))
+
+        self.assertEqual(result.stdout.strip(), '[]')
+
+    def test_monitor_import_skips_matplotlib(self):
+        """Test FundDataMonitor loads matplotlib only when plotting"""
+        result = self.run_python('-c', (
+            "import sys; from fund_etl_utilities import FundDataMonitor; "
+            "print('matplotlib' in sys.modules, 'seaborn' in sys.modules)"
+        ))
+
+        self.assertEqual(result.stdout.strip(), 'False False')
+
+    def test_setup_cron_runs_without_pipeline(self):
+        """Test --setup-cron prints instructions without importing the pipeline"""
+        result = self.run_python('-X', 'importtime', os.path.join(ROOT, 'fund_etl_scheduler.py'),
+                                 '--setup-cron')
+
+        self.assertIn('--run-daily', result.stdout)
+        # -X importtime lists every module imported on stderr
+        self.assertNotIn('fund_etl_pipeline', result.stderr)
+        self.assertNotIn('pandas', result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
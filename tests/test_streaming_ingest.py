@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Streaming Ingest Tests
+Tests chunked XLSX reading and the chunk-by-chunk validate/transform/load path
+"""
+
+import unittest
+import sqlite3
+import pandas as pd
+from datetime import datetime
+
+from test_framework import ETLTestCase
+from fund_etl_pipeline import FundDataETL
+from transform_plan import COLUMN_MAPPING, NUMERIC_COLUMNS
+from xlsx_stream_reader import StreamingXLSXReader, read_excel_streaming
+
+
+class StreamingTestMixin:
+    """Helpers for writing DataDump-shaped workbooks"""
+
+    def write_datadump(self, filename: str, fund_codes, date: str = '2024-01-16',
+                       drop_columns=None, trailing_blank_rows: int = 0) -> str:
+        etl = FundDataETL(self.create_test_config())
+        rows = []
+        for i, code in enumerate(fund_codes):
+            row = {col: None for col in etl.expected_columns}
+            row.update({
+                'Date': pd.Timestamp(date),
+                'Fund Code': code,
+                'Fund Name': f'Test Fund {i}',
+                'NASDAQ': f'TST{i:02d}X',
+                'Currency': 'US Dollar',
+                'Share Class Assets (dly/$mils)': 100 + i,
+                'Portfolio Assets (dly/$mils)': '-',
+                '1-DSY (dly)': 4.25
+            })
+            rows.append(row)
+
+        df = pd.DataFrame(rows, columns=etl.expected_columns)
+        if drop_columns:
+            df = df.drop(columns=drop_columns)
+        if trailing_blank_rows:
+            blank = pd.DataFrame([[None] * len(df.columns)] * trailing_blank_rows, columns=df.columns)
+            df = pd.concat([df, blank], ignore_index=True)
+
+        filepath = self.test_data_dir / filename
+        df.to_excel(filepath, index=False)
+        return str(filepath)
+
+
+class TestStreamingReader(StreamingTestMixin, ETLTestCase):
+    """Test the read-only XLSX chunk reader"""
+
+    def test_chunks_are_bounded(self):
+        """Test the body is yielded in chunks of at most chunk_size rows"""
+        filepath = self.write_datadump('chunks.xlsx', [f'FUND{i:03d}' for i in range(10)])
+        etl = FundDataETL(self.create_test_config())
+
+        with StreamingXLSXReader(filepath, etl.expected_columns, chunk_size=4) as reader:
+            sizes = [len(chunk) for chunk in reader.iter_chunks()]
+            self.assertEqual(reader.rows_read, 10)
+
+        self.assertEqual(sizes, [4, 4, 2])
+
+    def test_header_checked_before_body(self):
+        """Test missing columns are reported from the header row alone"""
+        filepath = self.write_datadump('missing.xlsx', ['FUND001'], drop_columns=['Currency'])
+        etl = FundDataETL(self.create_test_config())
+
+        with StreamingXLSXReader(filepath, etl.expected_columns) as reader:
+            self.assertEqual(reader.missing_columns, {'Currency'})
+            self.assertEqual(reader.rows_read, 0)
+
+    def test_trailing_blank_rows_dropped(self):
+        """Test trailing blank rows are dropped like pd.read_excel does"""
+        filepath = self.write_datadump('blank.xlsx', ['FUND001', 'FUND002'], trailing_blank_rows=3)
+
+        df = read_excel_streaming(filepath)
+        expected = pd.read_excel(filepath)
+
+        self.assertEqual(len(df), len(expected))
+        self.assertEqual(list(df.columns), list(expected.columns))
+        self.assertEqual(df['Share Class Assets (dly/$mils)'].tolist(),
+                         expected['Share Class Assets (dly/$mils)'].tolist())
+
+    def test_read_plan_gives_final_dtypes(self):
+        """Test chunks read through the read plan carry float64 financials and string codes"""
+        filepath = self.write_datadump('typed.xlsx', [100620, 101200])
+        etl = FundDataETL(self.create_test_config())
+
+        df = read_excel_streaming(filepath, etl.expected_columns, read_plan=etl.read_plan)
+
+        financial = [col for col, target in COLUMN_MAPPING.items() if target in NUMERIC_COLUMNS]
+        self.assertEqual(len(financial), 11)
+        for col in financial:
+            self.assertEqual(df[col].dtype, 'float64', col)
+        self.assertEqual(df['Fund Code'].tolist(), ['100620', '101200'])
+        self.assertEqual(df['Share Class Assets (dly/$mils)'].tolist(), [100.0, 101.0])
+        self.assertTrue(df['Portfolio Assets (dly/$mils)'].isna().all())
+        self.assertEqual(df.attrs['read_plan'], etl.read_plan.signature)
+
+
+class TestStreamingIngest(StreamingTestMixin, ETLTestCase):
+    """Test chunked ingestion into the database"""
+
+    def setUp(self):
+        super().setUp()
+        self.etl = FundDataETL(self.create_test_config({'read_chunk_size': 3}))
+        self.etl.setup_database()
+
+    def test_ingest_across_chunks(self):
+        """Test a multi-chunk file loads every row and numbers #MULTIVALUE codes globally"""
+        codes = ['FUND001', '#MULTIVALUE', 'FUND002', 'FUND003', '#MULTIVALUE', 'FUND004', 'FUND005']
+        filepath = self.write_datadump('daily.xlsx', codes)
+
+        is_valid, issues = self.etl.ingest_file(filepath, 'AMRS', datetime(2024, 1, 16))
+
+        self.assertTrue(is_valid, issues)
+        conn = sqlite3.connect(self.etl.db_path)
+        loaded = [row[0] for row in conn.execute(
+            "SELECT fund_code FROM fund_data WHERE date = '2024-01-16' ORDER BY fund_code")]
+        status = conn.execute("SELECT status, records_processed FROM etl_log").fetchone()
+        conn.close()
+
+        self.assertEqual(len(loaded), 7)
+        self.assertIn('#MULTIVALUE_1', loaded)
+        self.assertIn('#MULTIVALUE_2', loaded)
+        self.assertEqual(status, ('SUCCESS', 7))
+
+    def test_friday_file_covers_weekend(self):
+        """Test Friday data is stored once and resolves for Friday, Saturday and Sunday"""
+        filepath = self.write_datadump('friday.xlsx', ['FUND001', 'FUND002'], date='2024-01-12')
+
+        is_valid, _ = self.etl.ingest_file(filepath, 'EMEA', datetime(2024, 1, 12))
+
+        self.assertTrue(is_valid)
+        conn = sqlite3.connect(self.etl.db_path)
+        counts = dict(conn.execute("SELECT date, COUNT(*) FROM fund_data_resolved GROUP BY date").fetchall())
+        stored = dict(conn.execute("SELECT date, COUNT(*) FROM fund_data GROUP BY date").fetchall())
+        conn.close()
+        self.assertEqual(counts, {'2024-01-12': 2, '2024-01-13': 2, '2024-01-14': 2})
+        self.assertEqual(stored, {'2024-01-12': 2})
+
+    def test_invalid_file_rolled_back(self):
+        """Test a file failing validation leaves existing data untouched"""
+        conn = sqlite3.connect(self.etl.db_path)
+        self.insert_test_data(conn, 'AMRS', '2024-01-16', 5)
+        conn.close()
+
+        # Duplicate fund codes split across chunks
+        filepath = self.write_datadump('dupes.xlsx', ['FUND001', 'FUND002', 'FUND003', 'FUND001'])
+
+        is_valid, issues = self.etl.ingest_file(filepath, 'AMRS', datetime(2024, 1, 16))
+
+        self.assertFalse(is_valid)
+        self.assertIn('Found 1 duplicate Fund Codes', issues)
+        self.assertEqual(self.get_record_count('fund_data', "fund_code LIKE 'TEST%'"), 5)
+        self.assertEqual(self.get_record_count('etl_log'), 0)
+
+
+class TestSkipUnchanged(StreamingTestMixin, ETLTestCase):
+    """Test SKIPPED_UNCHANGED short-circuiting on repeated files"""
+
+    def setUp(self):
+        super().setUp()
+        self.etl = FundDataETL(self.create_test_config())
+        self.etl.setup_database()
+        self.data_date = datetime(2024, 1, 16)
+
+    def get_statuses(self):
+        conn = sqlite3.connect(self.etl.db_path)
+        rows = conn.execute("SELECT status, file_hash, data_digest FROM etl_log ORDER BY id").fetchall()
+        conn.close()
+        return rows
+
+    def test_identical_file_skipped_without_touching_data(self):
+        """Test a byte-identical retry is skipped and fund_data is not rewritten"""
+        filepath = self.write_datadump('retry.xlsx', ['FUND001', 'FUND002'])
+        self.etl.ingest_file(filepath, 'AMRS', self.data_date)
+
+        # A later correction must survive the retry
+        conn = sqlite3.connect(self.etl.db_path)
+        conn.execute("UPDATE fund_data SET share_class_assets = 999 WHERE fund_code = 'FUND001'")
+        conn.commit()
+        conn.close()
+
+        is_valid, issues = self.etl.ingest_file(filepath, 'AMRS', self.data_date)
+
+        self.assertTrue(is_valid)
+        self.assertEqual(issues, [])
+        statuses = self.get_statuses()
+        self.assertEqual([row[0] for row in statuses], ['SUCCESS', 'SKIPPED_UNCHANGED'])
+        self.assertEqual(statuses[0][1:], statuses[1][1:])
+        self.assertEqual(self.get_record_count('fund_data', "share_class_assets = 999"), 1)
+
+    def test_reordered_file_skipped_by_digest(self):
+        """Test a re-exported file with the same rows in a different order is skipped"""
+        self.etl.ingest_file(self.write_datadump('first.xlsx', ['FUND001', 'FUND002', 'FUND003']),
+                             'AMRS', self.data_date)
+
+        second = self.write_datadump('second.xlsx', ['FUND001', 'FUND002', 'FUND003'])
+        df = pd.read_excel(second)
+        df.iloc[::-1].to_excel(second, index=False)
+
+        # The load's writes are rolled back, so a later correction survives
+        conn = sqlite3.connect(self.etl.db_path)
+        conn.execute("UPDATE fund_data SET share_class_assets = 999 WHERE fund_code = 'FUND001'")
+        conn.commit()
+        conn.close()
+
+        self.etl.ingest_file(second, 'AMRS', self.data_date)
+        self.assertEqual(self.get_record_count('fund_data', "share_class_assets = 999"), 1)
+
+        statuses = self.get_statuses()
+        self.assertEqual([row[0] for row in statuses], ['SUCCESS', 'SKIPPED_UNCHANGED'])
+        self.assertNotEqual(statuses[0][1], statuses[1][1])
+        self.assertEqual(statuses[0][2], statuses[1][2])
+
+    def test_changed_file_reloaded(self):
+        """Test a file with different rows is loaded with a new digest"""
+        self.etl.ingest_file(self.write_datadump('day.xlsx', ['FUND001', 'FUND002']),
+                             'AMRS', self.data_date)
+        self.etl.ingest_file(self.write_datadump('day.xlsx', ['FUND001', 'FUND002', 'FUND003']),
+                             'AMRS', self.data_date)
+
+        statuses = self.get_statuses()
+        self.assertEqual([row[0] for row in statuses], ['SUCCESS', 'SUCCESS'])
+        self.assertNotEqual(statuses[0][2], statuses[1][2])
+        self.assertEqual(self.get_record_count('fund_data'), 3)
+
+    def test_legacy_etl_log_migrated(self):
+        """Test digest columns are added to an etl_log created without them"""
+        conn = sqlite3.connect(self.etl.db_path)
+        conn.execute("DROP TABLE etl_log")
+        conn.execute("""
+        CREATE TABLE etl_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, run_date DATE, region TEXT,
+            file_date DATE, status TEXT, records_processed INTEGER,
+            download_time REAL, processing_time REAL, issues TEXT
+        )
+        """)
+        conn.commit()
+        conn.close()
+
+        is_valid, _ = self.etl.ingest_file(self.write_datadump('legacy.xlsx', ['FUND001']),
+                                           'AMRS', self.data_date)
+
+        self.assertTrue(is_valid)
+        self.assertEqual(self.get_statuses()[0][0], 'SUCCESS')
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -16,6 +16,7 @@ from pathlib import Path
 
 from test_framework import ETLTestCase
 from fund_etl_pipeline import FundDataETL
+from transform_plan import categorize
 
 
 class TestDataTransformation(ETLTestCase):
@@ -145,6 +146,113 @@ class TestDataTransformation(ETLTestCase):
         self.assertEqual(transformed.iloc[0]['date'], '2024-01-13')
         self.assertEqual(transformed.iloc[0]['file_date'], '2024-01-12')
 
+    def test_mixed_type_columns(self):
+        """Test cells mixing numbers, sentinels and padded text as read from Excel"""
+        raw_data = pd.DataFrame({
+            'Fund Code': [100620, 101200, 101300],
+            'Fund Name': ['  Padded Fund  ', None, 'Plain'],
+            'Market NAV': ['-', 1.0, 0],
+            'Share Class Assets (dly/$mils)': [655, '-', '1,234.5'],
+            'WAM (dly)': [15, 'N/A', 30],
+            'Daily Liquidity (%)': [85.06, np.nan, 90.0]
+        })
+
+        transformed = self.etl.transform_data(raw_data, 'AMRS', datetime(2024, 1, 15))
+
+        self.assertEqual(transformed['fund_code'].tolist(), ['100620', '101200', '101300'])
+        self.assertEqual(transformed['fund_name'].tolist(), ['Padded Fund', '', 'Plain'])
+        self.assertEqual(transformed['market_nav'].tolist(), ['-', '1.0', ''])
+        self.assertEqual(transformed['share_class_assets'].tolist()[::2], [655.0, 1234.5])
+        self.assertTrue(np.isnan(transformed['share_class_assets'].iloc[1]))
+        self.assertTrue(np.isnan(transformed['wam'].iloc[1]))
+        self.assertEqual(transformed['daily_liquidity'].iloc[0], 85.06)
+
+    def test_plan_compiled_once_per_schema(self):
+        """Test chunks with the same schema reuse one compiled plan"""
+        chunk = pd.DataFrame({
+            'Fund Code': ['FUND001'],
+            'Share Class Assets (dly/$mils)': ['1,000']
+        })
+
+        self.etl.transform_data(chunk, 'AMRS', datetime(2024, 1, 15))
+        self.etl.transform_data(chunk.copy(), 'AMRS', datetime(2024, 1, 16))
+        self.assertEqual(len(self.etl._transform_plans), 1)
+
+        # A numeric-typed column is a different schema and gets its own plan
+        numeric_chunk = chunk.assign(**{'Share Class Assets (dly/$mils)': [1000.0]})
+        transformed = self.etl.transform_data(numeric_chunk, 'AMRS', datetime(2024, 1, 15))
+        self.assertEqual(len(self.etl._transform_plans), 2)
+        self.assertEqual(transformed.iloc[0]['share_class_assets'], 1000.0)
+
+    def test_typed_frame_transforms_like_raw(self):
+        """Test a frame typed by the read plan transforms to the same rows as the raw frame"""
+        raw_data = pd.DataFrame({
+            'Fund Code': [100620, 101200, 101300],
+            'Fund Name': ['  Padded Fund  ', None, 'Plain'],
+            'Market NAV': ['-', 1.0, 0],
+            'Share Class Assets (dly/$mils)': [655, '-', '1,234.5'],
+            'WAM (dly)': [15, 'N/A', 30]
+        })
+        typed = self.etl.read_plan.apply(raw_data.copy())
+
+        self.assertEqual(typed['Share Class Assets (dly/$mils)'].dtype, 'float64')
+        self.assertEqual(typed['Fund Code'].tolist(), ['100620', '101200', '101300'])
+        # Applying the plan again leaves the typed frame as it is
+        self.assertIs(self.etl.read_plan.apply(typed), typed)
+
+        date = datetime(2024, 1, 15)
+        expected = self.etl.transform_data(raw_data, 'AMRS', date)
+        actual = self.etl.transform_data(typed, 'AMRS', date)
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+        self.assertEqual(len(self.etl._transform_plans), 2)
+
+    def test_low_cardinality_columns_are_categorical(self):
+        """Test region and attribute columns come out of transform as categoricals"""
+        raw_data = pd.DataFrame({
+            'Fund Code': ['FUND001', 'FUND002', 'FUND003'],
+            'Fund Name': ['Fund A', 'Fund B', 'Fund C'],
+            'Currency': ['US Dollar', 'US Dollar', None],
+            'Fees': ['False', 'False', 'True']
+        })
+
+        transformed = self.etl.transform_data(raw_data, 'AMRS', datetime(2024, 1, 15))
+
+        for col in ('region', 'currency', 'fees'):
+            self.assertIsInstance(transformed[col].dtype, pd.CategoricalDtype, col)
+        self.assertEqual(transformed['fund_name'].dtype, object)
+        self.assertEqual(transformed['currency'].tolist(), ['US Dollar', 'US Dollar', ''])
+        self.assertEqual(list(transformed['region'].cat.categories), ['AMRS'])
+
+    def test_categorized_typed_frame_with_gaps(self):
+        """Test a typed, categorized whole-file frame transforms its missing attributes to ''"""
+        raw_data = pd.DataFrame({
+            'Fund Code': ['FUND001', 'FUND002'],
+            'Currency': ['US Dollar', None],
+            'Domicile': [None, None]
+        })
+        self.etl.read_plan.apply(raw_data)
+        categorize(raw_data)
+
+        transformed = self.etl.transform_data(raw_data, 'AMRS', datetime(2024, 1, 15))
+
+        self.assertEqual(transformed['currency'].tolist(), ['US Dollar', ''])
+        self.assertEqual(transformed['domicile'].tolist(), ['', ''])
+
+    def test_friday_rows_not_copied(self):
+        """Test process_dates returns Friday rows once, with categorical attributes"""
+        raw_data = pd.DataFrame({
+            'Date': ['2024-01-12', '2024-01-12'],
+            'Fund Code': ['FUND001', 'FUND002'],
+            'Currency': ['US Dollar', 'Euro']
+        })
+
+        processed = self.etl.process_dates(raw_data, datetime(2024, 1, 12))
+
+        # Saturday and Sunday resolve through date_alias instead of copies
+        self.assertEqual(len(processed), 2)
+        self.assertIsInstance(processed['Currency'].dtype, pd.CategoricalDtype)
+        self.assertEqual(processed['Currency'].cat.categories.size, 2)
+
 
 class TestDataValidation(ETLTestCase):
     """Test data validation functionality"""
@@ -15,6 +15,7 @@ from flask import Flask
 from pathlib import Path
 
 from test_framework import ETLTestCase, APITestMixin
+from bulk_loader import FUND_DATA_COLUMNS
 from workflow_db_tracker import DatabaseWorkflowTracker
 
 
@@ -580,6 +581,7 @@ class TestUIAPI(ETLTestCase, APITestMixin):
             csv_data = response.data.decode('utf-8')
             lines = csv_data.strip().split('\n')
             self.assertEqual(len(lines), 4)  # Header + 3 records
+            self.assertEqual(lines[0].split(','), FUND_DATA_COLUMNS)
     
     def test_export_etl_log(self):
         """Test ETL log export"""
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Transform Plan
+Column conversion plans for DataDump frames.
+
+ReadPlan gives the columns their final dtypes while a file is parsed: float64
+for the financial fields (with '-', 'N/A' and comma-formatted values handled)
+and stripped text for the text fields. TransformPlan maps a frame to fund_data
+rows; it is compiled once per input schema (column names and dtypes) and assigns
+each column a single vectorized converter chosen from its dtype, so columns the
+read plan already typed are not converted again. Low-cardinality attributes
+(region, currency, rating, ...) leave the plan as pandas categoricals.
+"""
+
+import hashlib
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import (infer_dtype, is_bool_dtype, is_integer_dtype,
+                              is_numeric_dtype, is_object_dtype)
+
+logger = logging.getLogger(__name__)
+
+# Excel column -> fund_data column ('Date' is handled separately)
+COLUMN_MAPPING = {
+    'Fund Code': 'fund_code',
+    'Fund Name': 'fund_name',
+    'Master Class Fund Name': 'master_class_fund_name',
+    'Rating (M/S&P/F)': 'rating',
+    'Unique Identifier': 'unique_identifier',
+    'NASDAQ': 'nasdaq',
+    'Fund Complex (Historical)': 'fund_complex',
+    'SubCategory Historical': 'subcategory',
+    'Domicile': 'domicile',
+    'Currency': 'currency',
+    'Share Class Assets (dly/$mils)': 'share_class_assets',
+    'Portfolio Assets (dly/$mils)': 'portfolio_assets',
+    '1-DSY (dly)': 'one_day_yield',
+    '1-GDSY (dly)': 'one_day_gross_yield',
+    '7-DSY (dly)': 'seven_day_yield',
+    '7-GDSY (dly)': 'seven_day_gross_yield',
+    'Chgd Expense Ratio (mo/dly)': 'expense_ratio',
+    'WAM (dly)': 'wam',
+    'WAL (dly)': 'wal',
+    'Transactional NAV': 'transactional_nav',
+    'Market NAV': 'market_nav',
+    'Daily Liquidity (%)': 'daily_liquidity',
+    'Weekly Liquidity (%)': 'weekly_liquidity',
+    'Fees': 'fees',
+    'Gates': 'gates'
+}
+
+TEXT_COLUMNS = [
+    'fund_code', 'fund_name', 'master_class_fund_name', 'rating',
+    'unique_identifier', 'nasdaq', 'fund_complex', 'subcategory',
+    'domicile', 'currency', 'transactional_nav', 'market_nav',
+    'fees', 'gates'
+]
+
+NUMERIC_COLUMNS = [
+    'share_class_assets', 'portfolio_assets', 'one_day_yield',
+    'one_day_gross_yield', 'seven_day_yield', 'seven_day_gross_yield',
+    'expense_ratio', 'wam', 'wal', 'daily_liquidity', 'weekly_liquidity'
+]
+
+NUMERIC_SENTINELS = ['-', '', 'N/A', 'nan']
+
+# Attributes with a handful of distinct values, held as categoricals in memory
+CATEGORICAL_COLUMNS = [
+    'region', 'currency', 'domicile', 'rating', 'fund_complex', 'subcategory',
+    'fees', 'gates', 'transactional_nav', 'market_nav'
+]
+
+# The same attributes under their Excel names (lookback frames carry 'Region')
+CATEGORICAL_EXCEL_COLUMNS = ['Region'] + [col for col, target in COLUMN_MAPPING.items()
+                                          if target in CATEGORICAL_COLUMNS]
+
+# DataFrame.attrs key marking a frame whose columns went through a ReadPlan
+TYPED_ATTR = 'read_plan'
+
+
+def _text_generic(s: pd.Series) -> pd.Series:
+    """Per-cell text cleaning for dtypes without a vectorized path"""
+    return s.fillna('').apply(lambda x: str(x).strip() if x else '')
+
+
+def _text_object(s: pd.Series) -> pd.Series:
+    """Strip text; missing and falsy cells (None, '', 0) become ''"""
+    if infer_dtype(s, skipna=True) in ('string', 'empty'):
+        # Only strings and gaps: strip each distinct value once, gaps become ''
+        codes, uniques = pd.factorize(s)
+        stripped = np.array([value.strip() for value in uniques] + [''], dtype=object)
+        return pd.Series(stripped[codes], index=s.index)
+    falsy = s.isna() | s.isin(['', 0])
+    out = s.astype(str).str.strip()
+    out[falsy] = ''
+    return out
+
+
+def _text_numeric(s: pd.Series) -> pd.Series:
+    """Render numbers as text; NaN and 0 become ''"""
+    falsy = s.isna() | (s == 0)
+    out = s.astype(str)
+    out[falsy] = ''
+    return out
+
+
+def _fund_code(s: pd.Series) -> pd.Series:
+    return s.astype(str).str.strip()
+
+
+def _fund_code_integer(s: pd.Series) -> pd.Series:
+    # Integer codes render without surrounding whitespace
+    return s.astype(str)
+
+
+def _text_typed(s: pd.Series) -> pd.Series:
+    """Text already cleaned by the read plan; only gaps remain to fill"""
+    if isinstance(s.dtype, pd.CategoricalDtype) and '' not in s.cat.categories:
+        # Categorized whole-file frames need '' as a category before it can fill a gap
+        s = s.cat.add_categories('')
+    return s.fillna('')
+
+
+def _fund_code_typed(s: pd.Series) -> pd.Series:
+    return s.astype(str)
+
+
+def _number_generic(s: pd.Series) -> pd.Series:
+    """String round-trip conversion for dtypes without a vectorized path"""
+    s = s.astype(str).str.replace(',', '')
+    s = s.mask(s.isin(NUMERIC_SENTINELS))
+    return pd.to_numeric(s, errors='coerce')
+
+
+def _number_passthrough(s: pd.Series) -> pd.Series:
+    return s.copy()
+
+
+def _number_object(s: pd.Series) -> pd.Series:
+    """Parse mixed numbers/strings; only unparsed non-sentinel strings get comma removal"""
+    sentinels = s.isin(NUMERIC_SENTINELS)
+    numbers = pd.to_numeric(s.mask(sentinels), errors='coerce')
+    retry = numbers.isna() & s.notna() & ~sentinels
+    if retry.any():
+        cleaned = s[retry].astype(str).str.replace(',', '', regex=False)
+        numbers = numbers.astype('float64')
+        numbers[retry] = pd.to_numeric(cleaned, errors='coerce')
+    return numbers
+
+
+def read_float(s: pd.Series) -> pd.Series:
+    """Parse a financial column to float64; sentinels and unparseable cells become NaN"""
+    if s.dtype == 'float64':
+        return s
+    if is_bool_dtype(s.dtype):
+        return _number_generic(s).astype('float64')
+    if is_numeric_dtype(s.dtype):
+        return s.astype('float64')
+    if is_object_dtype(s.dtype):
+        return _number_object(s).astype('float64')
+    return _number_generic(s).astype('float64')
+
+
+def read_text(s: pd.Series) -> pd.Series:
+    """Stripped text; missing cells stay NaN and other falsy cells (0, False) become ''"""
+    if is_object_dtype(s.dtype) and infer_dtype(s, skipna=True) in ('string', 'empty'):
+        codes, uniques = pd.factorize(s)
+        stripped = np.array([value.strip() for value in uniques] + [np.nan], dtype=object)
+        return pd.Series(stripped[codes], index=s.index)
+
+    missing = s.isna()
+    if is_numeric_dtype(s.dtype):
+        falsy = ~missing & (s == 0)
+    elif is_object_dtype(s.dtype):
+        falsy = ~missing & s.isin(['', 0])
+    else:
+        return s.apply(lambda x: np.nan if pd.isna(x) else (str(x).strip() if x else ''))
+
+    out = s.astype(str).str.strip().astype(object)
+    out[falsy] = ''
+    out[missing] = np.nan
+    return out
+
+
+def read_code(s: pd.Series) -> pd.Series:
+    """Fund codes as stripped strings (integer codes included); missing cells stay NaN"""
+    if is_object_dtype(s.dtype) and infer_dtype(s, skipna=True) in ('string', 'empty'):
+        return read_text(s)
+    out = s.astype(str).str.strip().astype(object)
+    out[s.isna()] = np.nan
+    return out
+
+
+def is_typed(df: pd.DataFrame) -> bool:
+    """Whether a frame's columns already have their read-plan dtypes"""
+    return bool(df.attrs.get(TYPED_ATTR))
+
+
+class ReadPlan:
+    """Final dtypes for the DataDump columns, applied to each chunk as it is parsed"""
+
+    def __init__(self, expected_columns: List[str]):
+        self.converters: Dict[str, Callable[[pd.Series], pd.Series]] = {}
+        for col in expected_columns:
+            target = COLUMN_MAPPING.get(col)
+            if target == 'fund_code':
+                self.converters[col] = read_code
+            elif target in NUMERIC_COLUMNS:
+                self.converters[col] = read_float
+            elif target in TEXT_COLUMNS:
+                self.converters[col] = read_text
+
+        description = ';'.join(f"{col}:{func.__name__}" for col, func in sorted(self.converters.items()))
+        self.signature = hashlib.sha1(description.encode()).hexdigest()[:12]
+
+    def apply(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Convert df's plan columns in place (a no-op for frames already typed by this plan)"""
+        if df.attrs.get(TYPED_ATTR) == self.signature:
+            return df
+        for col, converter in self.converters.items():
+            if col in df.columns:
+                df[col] = converter(df[col])
+        df.attrs[TYPED_ATTR] = self.signature
+        return df
+
+
+def categorize(df: pd.DataFrame, columns: List[str] = None) -> pd.DataFrame:
+    """
+    Convert low-cardinality text columns to category dtype in place.
+    Defaults to CATEGORICAL_COLUMNS under either their fund_data or Excel names.
+    """
+    if columns is None:
+        columns = CATEGORICAL_COLUMNS + CATEGORICAL_EXCEL_COLUMNS
+    for col in columns:
+        if col in df.columns and is_object_dtype(df[col].dtype):
+            df[col] = df[col].astype('category')
+    return df
+
+
+def _text_converter(s: pd.Series) -> Callable[[pd.Series], pd.Series]:
+    if is_object_dtype(s.dtype):
+        return _text_object
+    if is_numeric_dtype(s.dtype):
+        return _text_numeric
+    return _text_generic
+
+
+def _number_converter(s: pd.Series) -> Callable[[pd.Series], pd.Series]:
+    if is_bool_dtype(s.dtype):
+        return _number_generic
+    if is_numeric_dtype(s.dtype):
+        return _number_passthrough
+    if is_object_dtype(s.dtype):
+        return _number_object
+    return _number_generic
+
+
+def format_dates(values: pd.Series) -> pd.Series:
+    """Format datetimes as YYYY-MM-DD (missing values stay NaN)"""
+    dates = pd.to_datetime(values)
+    formatted = dates.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(str)
+    return pd.Series(formatted, index=dates.index).where(dates.notna())
+
+
+def _as_category(converter: Callable[[pd.Series], pd.Series]) -> Callable[[pd.Series], pd.Series]:
+    def convert(s: pd.Series) -> pd.Series:
+        return (converter(s) if converter else s).astype('category')
+    return convert
+
+
+def schema_key(df: pd.DataFrame) -> Tuple:
+    """Hashable description of a frame's columns, dtypes and read-plan typing"""
+    return tuple((col, str(dtype)) for col, dtype in df.dtypes.items()) + (is_typed(df),)
+
+
+class TransformPlan:
+    """Compiled per-schema conversion of a raw DataDump frame to fund_data rows"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.steps: List[Tuple[str, str, Callable[[pd.Series], pd.Series]]] = []
+        typed = is_typed(df)
+
+        for col in df.columns:
+            if col == 'Date':
+                continue
+            target = COLUMN_MAPPING.get(col, col)
+            if target == 'fund_code':
+                if typed:
+                    converter = _fund_code_typed
+                else:
+                    converter = _fund_code_integer if is_integer_dtype(df[col].dtype) else _fund_code
+            elif target in TEXT_COLUMNS:
+                converter = _text_typed if typed else _text_converter(df[col])
+            elif target in NUMERIC_COLUMNS:
+                converter = _number_converter(df[col])
+            else:
+                converter = None
+            if target in CATEGORICAL_COLUMNS:
+                converter = _as_category(converter)
+            self.steps.append((col, target, converter))
+
+        self.has_date = 'Date' in df.columns
+        self.has_fund_code = 'Fund Code' in df.columns
+
+    def apply(self, df: pd.DataFrame, region: str, date: datetime) -> pd.DataFrame:
+        """Run the plan over a frame with the schema it was compiled for"""
+        if self.has_fund_code:
+            multivalue_mask = (df['Fund Code'] == '#MULTIVALUE').to_numpy()
+            if multivalue_mask.any():
+                logger.info(f"Filtering out {multivalue_mask.sum()} #MULTIVALUE records")
+                df = df[~multivalue_mask]
+
+        columns: Dict[str, pd.Series] = {}
+        for source, target, converter in self.steps:
+            columns[target] = converter(df[source]) if converter else df[source].copy()
+
+        columns['region'] = pd.Categorical.from_codes(np.zeros(len(df), dtype='int8'), [region])
+        columns['date'] = date.strftime('%Y-%m-%d')
+        if self.has_date:
+            # Date from the actual file, kept for tracking
+            columns['file_date'] = format_dates(df['Date'])
+
+        # Converters return fresh columns, so they can be adopted without another copy
+        return pd.DataFrame(columns, index=df.index, copy=False)
@@ -3,13 +3,14 @@
 Database-backed workflow tracker for persistent workflow management
 """
 
-import sqlite3
 import json
 import uuid
 import threading
 from datetime import datetime
 from typing import Optional, Dict, List
 
+from db_connection import transaction
+
 
 class DatabaseWorkflowTracker:
     """Track workflows persistently in SQLite database"""
@@ -21,7 +22,7 @@ class DatabaseWorkflowTracker:
     
     def _ensure_table_exists(self):
         """Ensure the workflows table exists"""
-        with sqlite3.connect(self.db_path) as conn:
+        with transaction(self.db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("""
             CREATE TABLE IF NOT EXISTS workflows (
@@ -58,7 +59,7 @@ class DatabaseWorkflowTracker:
             workflow_id = str(uuid.uuid4())
         
         with self.lock:
-            with sqlite3.connect(self.db_path) as conn:
+            with transaction(self.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                 INSERT INTO workflows (
@@ -82,7 +83,7 @@ class DatabaseWorkflowTracker:
                        message: Optional[str] = None, etl_workflow_id: Optional[str] = None):
         """Update workflow status or add output"""
         with self.lock:
-            with sqlite3.connect(self.db_path) as conn:
+            with transaction(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # Get current workflow data
@@ -148,7 +149,7 @@ class DatabaseWorkflowTracker:
     def get_workflow(self, workflow_id: str) -> Optional[Dict]:
         """Get workflow status"""
         with self.lock:
-            with sqlite3.connect(self.db_path) as conn:
+            with transaction(self.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                 SELECT id, type, status, created_at, started_at, completed_at,
@@ -178,7 +179,7 @@ class DatabaseWorkflowTracker:
     def get_all_workflows(self, limit: int = 50) -> List[Dict]:
         """Get all workflows, sorted by created_at descending"""
         with self.lock:
-            with sqlite3.connect(self.db_path) as conn:
+            with transaction(self.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                 SELECT id, type, status, created_at, started_at, completed_at,
@@ -212,7 +213,7 @@ class DatabaseWorkflowTracker:
         cutoff_iso = datetime.fromtimestamp(cutoff).isoformat()
         
         with self.lock:
-            with sqlite3.connect(self.db_path) as conn:
+            with transaction(self.db_path) as conn:
                 cursor = conn.cursor()
                 cursor.execute("""
                 DELETE FROM workflows
@@ -228,7 +229,7 @@ class DatabaseWorkflowTracker:
     def sync_with_backend_workflows(self, backend_workflows: List[Dict]):
         """Sync workflows from backend API (for migration/recovery)"""
         with self.lock:
-            with sqlite3.connect(self.db_path) as conn:
+            with transaction(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 for wf in backend_workflows:
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Streaming XLSX Reader
+Reads SAP DataDump workbooks with openpyxl's read-only row iterator and yields
+bounded-size DataFrame chunks, so memory use does not grow with file size. An
+optional read plan (transform_plan.ReadPlan) gives each chunk its final column
+dtypes as it is built.
+"""
+
+import logging
+from typing import Iterator, List, Optional, Set
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingXLSXReader:
+    """Iterate the first worksheet of an XLSX file in fixed-size DataFrame chunks"""
+
+    def __init__(self, filepath: str, expected_columns: Optional[List[str]] = None,
+                 chunk_size: int = 5000, read_plan=None):
+        self.filepath = str(filepath)
+        self.expected_columns = expected_columns or []
+        self.chunk_size = max(1, int(chunk_size))
+        self.read_plan = read_plan
+
+        self.header: List[str] = []
+        self.missing_columns: Set[str] = set()
+        self.rows_read = 0
+
+        self._workbook = None
+        self._rows = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def open(self) -> 'StreamingXLSXReader':
+        """Open the workbook and read the header row (the body is not touched)"""
+        from openpyxl import load_workbook
+
+        self._workbook = load_workbook(self.filepath, read_only=True, data_only=True)
+        sheet = self._workbook.active
+        self._rows = sheet.iter_rows(values_only=True)
+
+        header_row = next(self._rows, None) or ()
+        # Trailing header cells are sometimes present but empty
+        header = [str(value) if value is not None else '' for value in header_row]
+        while header and header[-1] == '':
+            header.pop()
+        self.header = header
+
+        self.missing_columns = set(self.expected_columns) - set(self.header)
+        if self.missing_columns:
+            logger.warning(f"{self.filepath}: header is missing columns {self.missing_columns}")
+
+        return self
+
+    def iter_chunks(self) -> Iterator[pd.DataFrame]:
+        """Yield the worksheet body as DataFrames of at most chunk_size rows"""
+        if self._rows is None:
+            self.open()
+
+        width = len(self.header)
+        buffer = []
+        pending_empty = 0
+
+        for row in self._rows:
+            row = tuple(row[:width]) + (None,) * (width - len(row))
+
+            # Hold back blank rows so that trailing ones are dropped (as pd.read_excel does)
+            if all(value is None for value in row):
+                pending_empty += 1
+                continue
+            if pending_empty:
+                buffer.extend([(None,) * width] * pending_empty)
+                pending_empty = 0
+
+            buffer.append(row)
+            if len(buffer) >= self.chunk_size:
+                yield self._to_frame(buffer)
+                buffer = []
+
+        if buffer:
+            yield self._to_frame(buffer)
+
+    def _to_frame(self, rows: List[tuple]) -> pd.DataFrame:
+        """Build a typed DataFrame from raw row tuples"""
+        frame = pd.DataFrame.from_records(rows, columns=self.header)
+        frame = frame.infer_objects()
+        if self.read_plan is not None:
+            frame = self.read_plan.apply(frame)
+        self.rows_read += len(frame)
+        return frame
+
+    def close(self):
+        """Release the workbook file handle"""
+        if self._workbook is not None:
+            self._workbook.close()
+            self._workbook = None
+        self._rows = None
+
+
+def read_excel_streaming(filepath: str, expected_columns: Optional[List[str]] = None,
+                         chunk_size: int = 5000, read_plan=None) -> pd.DataFrame:
+    """Read a whole workbook through the streaming reader and return one DataFrame"""
+    with StreamingXLSXReader(filepath, expected_columns, chunk_size, read_plan) as reader:
+        chunks = list(reader.iter_chunks())
+        header = reader.header
+
+    if not chunks:
+        return pd.DataFrame(columns=header)
+    return pd.concat(chunks, ignore_index=True)